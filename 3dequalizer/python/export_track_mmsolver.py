@@ -82,25 +82,33 @@ def main():
     req = tde4.createCustomRequester()
     tde4.addFileWidget(req, 'file_browser_widget', 'Filename...', pattern)
     tde4.addTextFieldWidget(req, 'start_frame_widget', 'Start Frame', str(start_frame))
+    tde4.addToggleWidget(req, 'binary_format_widget', 'Binary Format', 0)
     ret = tde4.postCustomRequester(req, TITLE, 500, 0, 'Ok', 'Cancel')
     if ret == 1:
         # Query GUI Widgets
         path = tde4.getWidgetValue(req, 'file_browser_widget')
         start_frame = tde4.getWidgetValue(req, 'start_frame_widget')
         start_frame = int(start_frame)
+        binary_format = tde4.getWidgetValue(req, 'binary_format_widget')
+        binary_format = bool(binary_format)
 
         # Generate file contents
+        fmt = uvtrack_format.UV_TRACK_FORMAT_VERSION_PREFERRED
+        file_mode = 'w'
+        if binary_format is True:
+            fmt = uvtrack_format.UV_TRACK_FORMAT_VERSION_5
+            file_mode = 'wb'
         data_str = uvtrack_format.generate(
             point_group, camera, points,
             start_frame=start_frame,
-            fmt=uvtrack_format.UV_TRACK_FORMAT_VERSION_PREFERRED,
+            fmt=fmt,
         )
 
         # Write file.
         if path.find(EXT, len(path)-3) == -1:
             # Ensure the file path ends with the extension, if not add it.
             path += EXT
-        f = open(path, 'w')
+        f = open(path, file_mode)
         if f.closed:
             msg = "Error, couldn't open file.\n"
             msg += repr(path)
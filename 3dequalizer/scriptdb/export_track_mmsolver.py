@@ -41,7 +41,10 @@
 #
 #
 
+import sys
 import json
+import array
+import struct
 import tde4
 
 
@@ -55,6 +58,7 @@ UV_TRACK_FORMAT_VERSION_1 = 1
 UV_TRACK_FORMAT_VERSION_2 = 2
 UV_TRACK_FORMAT_VERSION_3 = 3
 UV_TRACK_FORMAT_VERSION_4 = 4
+UV_TRACK_FORMAT_VERSION_5 = 5
 
 UV_TRACK_HEADER_VERSION_2 = {
     'version': UV_TRACK_FORMAT_VERSION_2,
@@ -68,6 +72,18 @@ UV_TRACK_HEADER_VERSION_4 = {
     'version': UV_TRACK_FORMAT_VERSION_4,
 }
 
+UV_TRACK_HEADER_VERSION_5 = {
+    'version': UV_TRACK_FORMAT_VERSION_5,
+}
+
+# Binary (version 5) format layout.
+UV_TRACK_BINARY_MAGIC = b'MMSUVTRK'
+UV_TRACK_BINARY_PREFIX_FORMAT = '<8sII'
+UV_TRACK_BINARY_ALIGNMENT = 8
+UV_TRACK_BINARY_COLUMNS = [
+    'frame', 'pos_x', 'pos_y', 'pos_dist_x', 'pos_dist_y', 'weight'
+]
+
 # Preferred UV Track format version (changes the format
 # version used for writing data).
 UV_TRACK_FORMAT_VERSION_PREFERRED = UV_TRACK_FORMAT_VERSION_4
@@ -114,25 +130,33 @@ def main():
     req = tde4.createCustomRequester()
     tde4.addFileWidget(req, 'file_browser_widget', 'Filename...', pattern)
     tde4.addTextFieldWidget(req, 'start_frame_widget', 'Start Frame', str(start_frame))
+    tde4.addToggleWidget(req, 'binary_format_widget', 'Binary Format', 0)
     ret = tde4.postCustomRequester(req, TITLE, 500, 0, 'Ok', 'Cancel')
     if ret == 1:
         # Query GUI Widgets
         path = tde4.getWidgetValue(req, 'file_browser_widget')
         start_frame = tde4.getWidgetValue(req, 'start_frame_widget')
         start_frame = int(start_frame)
+        binary_format = tde4.getWidgetValue(req, 'binary_format_widget')
+        binary_format = bool(binary_format)
 
         # Generate file contents
+        fmt = UV_TRACK_FORMAT_VERSION_PREFERRED
+        file_mode = 'w'
+        if binary_format is True:
+            fmt = UV_TRACK_FORMAT_VERSION_5
+            file_mode = 'wb'
         data_str = generate(
             point_group, camera, points,
             start_frame=start_frame,
-            fmt=UV_TRACK_FORMAT_VERSION_PREFERRED,
+            fmt=fmt,
         )
 
         # Write file.
         if path.find(EXT, len(path)-3) == -1:
             # Ensure the file path ends with the extension, if not add it.
             path += EXT
-        f = open(path, 'w')
+        f = open(path, file_mode)
         if f.closed:
             msg = "Error, couldn't open file.\n"
             msg += repr(path)
@@ -297,15 +321,21 @@ def generate(point_group, camera, points, fmt=None, **kwargs):
     :type points: list of str
 
     :param fmt: The format to generate, either
-                UV_TRACK_FORMAT_VERSION_1, UV_TRACK_FORMAT_VERSION_2
-                or UV_TRACK_FORMAT_VERSION_3.
+                UV_TRACK_FORMAT_VERSION_1, UV_TRACK_FORMAT_VERSION_2,
+                UV_TRACK_FORMAT_VERSION_3, UV_TRACK_FORMAT_VERSION_4
+                or UV_TRACK_FORMAT_VERSION_5.
     :type fmt: None or UV_TRACK_FORMAT_VERSION_*
 
     Supported 'kwargs':
     - undistort (True or False) - Should points be undistorted?
                                   (Format v1 and v2)
     - start_frame - (int) - Frame '1' 3DE should be mapped to this value.
-                    (Format v1, v2 and v3)
+                    (Format v1, v2, v3, v4 and v5)
+    - single_precision (True or False) - Store float32 values, rather
+                                         than float64. (Format v5)
+
+    .. note:: Format v5 is binary; the returned string must be written
+              to a file opened in binary mode.
     """
     if fmt is None:
         fmt = UV_TRACK_FORMAT_VERSION_PREFERRED
@@ -318,6 +348,8 @@ def generate(point_group, camera, points, fmt=None, **kwargs):
         data = _generate_v3(point_group, camera, points, **kwargs)
     elif fmt == UV_TRACK_FORMAT_VERSION_4:
         data = _generate_v4(point_group, camera, points, **kwargs)
+    elif fmt == UV_TRACK_FORMAT_VERSION_5:
+        data = _generate_v5(point_group, camera, points, **kwargs)
     return data
 
 
@@ -433,7 +465,6 @@ def _generate_v1(point_group, camera, points, start_frame=None, undistort=False)
     return data_str
 
 
-
 def _generate_camera_data(camera, lens, frame0):
     camera_data = {}
     cam_num_frames = tde4.getCameraNoFrames(camera)
@@ -464,6 +495,82 @@ def _generate_camera_data(camera, lens, frame0):
     return camera_data
 
 
+def _get_point_per_frame_samples(point_group, point, camera,
+                                 cam_num_frames, camera_fov, valid_mode,
+                                 frame0, undistort):
+    """
+    Get the valid 2D samples of a point, for each frame.
+
+    :param point_group: The 3DE Point Group containing 'point'
+    :type point_group: str
+
+    :param point: The 3DE Point to query.
+    :type point: str
+
+    :param camera: The 3DE Camera containing 2D 'point' data.
+    :type camera: str
+
+    :param cam_num_frames: The number of frames in 'camera'.
+    :type cam_num_frames: int
+
+    :param camera_fov: The Camera FOV as given by 'tde4.getCameraFOV'.
+    :type camera_fov: [float, float, float, float]
+
+    :param valid_mode: The point valid mode, see _get_point_valid_mode.
+    :type valid_mode: str
+
+    :param frame0: Offset added to the 3DE frame numbers.
+    :type frame0: int
+
+    :param undistort: Should undistortion be applied to the
+                      undistorted position? None means True.
+    :type undistort: bool or None
+
+    :returns: List of (frame, undistorted position, distorted
+              position, weight) tuples.
+    :rtype: [(int, (float, float), (float, float), float), ..]
+    """
+    samples = []
+    frame = 1  # 3DE starts at frame '1' regardless of the 'start frame'.
+    pos_block = tde4.getPointPosition2DBlock(
+        point_group, point, camera,
+        1, cam_num_frames
+    )
+    for pos in pos_block:
+        if pos[0] == -1.0 or pos[1] == -1.0:
+            # No valid data here.
+            frame += 1
+            continue
+
+        # Is the 2D point obscured?
+        valid = tde4.isPointPos2DValid(
+            point_group,
+            point,
+            camera,
+            frame
+        )
+        if valid == 0:
+            # No valid data here.
+            frame += 1
+            continue
+
+        # Check if we're inside the FOV / Frame or not.
+        valid_pos = _is_valid_position(pos, camera_fov, valid_mode)
+        if valid_pos is False:
+            frame += 1
+            continue
+
+        pos_undist = pos
+        if undistort is True or undistort is None:
+            pos_undist = tde4.removeDistortion2D(camera, frame,  pos)
+        weight = _get_point_weight(point_group, point, camera, frame)
+
+        f = frame + frame0
+        samples.append((f, pos_undist, pos, weight))
+        frame += 1
+    return samples
+
+
 def _generate_v2_v3_and_v4(point_group, camera, points,
                            version=None,
                            **kwargs):
@@ -566,42 +673,13 @@ def _generate_v2_v3_and_v4(point_group, camera, points,
             point_data['3d'] = _get_3d_data_from_point(point_group, point)
 
         # Write per-frame position data
-        frame = 1  # 3DE starts at frame '1' regardless of the 'start frame'.
         point_data['per_frame'] = []
-        pos_block = tde4.getPointPosition2DBlock(
+        per_frame_samples = _get_point_per_frame_samples(
             point_group, point, camera,
-            1, cam_num_frames
+            cam_num_frames, camera_fov, valid_mode,
+            frame0, undistort
         )
-        for pos in pos_block:
-            if pos[0] == -1.0 or pos[1] == -1.0:
-                # No valid data here.
-                frame += 1
-                continue
-
-            # Is the 2D point obscured?
-            valid = tde4.isPointPos2DValid(
-                point_group,
-                point,
-                camera,
-                frame
-            )
-            if valid == 0:
-                # No valid data here.
-                frame += 1
-                continue
-
-            # Check if we're inside the FOV / Frame or not.
-            valid_pos = _is_valid_position(pos, camera_fov, valid_mode)
-            if valid_pos is False:
-                frame += 1
-                continue
-
-            pos_undist = pos
-            if undistort is True or undistort is None:
-                pos_undist = tde4.removeDistortion2D(camera, frame,  pos)
-            weight = _get_point_weight(point_group, point, camera, frame)
-
-            f = frame + frame0
+        for f, pos_undist, pos, weight in per_frame_samples:
             frame_data = {
                 'frame': f,
                 'pos': pos_undist,
@@ -611,7 +689,6 @@ def _generate_v2_v3_and_v4(point_group, camera, points,
                            UV_TRACK_FORMAT_VERSION_4]:
                 frame_data['pos_dist'] = pos
             point_data['per_frame'].append(frame_data)
-            frame += 1
 
         data['points'].append(point_data)
 
@@ -750,5 +827,137 @@ def _generate_v4(point_group, camera, points,
     )
 
 
+def _generate_v5(point_group, camera, points,
+                 start_frame=None,
+                 single_precision=False):
+    """
+    Generate the UV file format contents, using a binary format.
+
+    The file starts with a fixed-size prefix; the 8 byte magic
+    UV_TRACK_BINARY_MAGIC, the format version and the size of the
+    JSON header (both unsigned 32-bit little-endian integers).
+
+    The JSON header stores the same information as format v4, except
+    the 'per_frame' list of each point is replaced by 'num_frames'
+    and 'offset'. The header is padded to UV_TRACK_BINARY_ALIGNMENT
+    bytes.
+
+    After the header, each point has a contiguous block of
+    little-endian float columns (UV_TRACK_BINARY_COLUMNS), each
+    'num_frames' long. The 'offset' of a point is the number of bytes
+    from the end of the header to the start of the point's block, so
+    a reader can read a single point without reading the others.
+
+    :param point_group: The 3DE Point Group containing 'points'
+    :type point_group: str
+
+    :param camera: The 3DE Camera containing 2D 'points' data.
+    :type camera: str
+
+    :param points: The list of 3DE Points representing 2D data to
+                   save.
+    :type points: list of str
+
+    :param start_frame: The frame number to be considered at
+                        'first frame'. Defaults to 1001 if set to None.
+    :type start_frame: None or int
+
+    :param single_precision: Store float32 (True) or float64 (False)
+                             values.
+    :type single_precision: bool
+
+    :returns: A binary string, with the UV Track data in it.
+    :rtype: bytes
+    """
+    assert isinstance(point_group, basestring)
+    assert isinstance(camera, basestring)
+    assert isinstance(points, (list, tuple))
+    assert start_frame is None or isinstance(start_frame, int)
+    assert isinstance(single_precision, bool)
+    if start_frame is None:
+        start_frame = 1001
+
+    type_code = 'd'
+    if single_precision is True:
+        type_code = 'f'
+    float_size = array.array(type_code).itemsize
+
+    cam_num_frames = tde4.getCameraNoFrames(camera)
+    camera_fov = tde4.getCameraFOV(camera)
+    frame0 = int(start_frame)
+    frame0 -= 1
+
+    header = UV_TRACK_HEADER_VERSION_5.copy()
+    header['num_points'] = len(points)
+    header['is_undistorted'] = None
+    header['float_size'] = float_size
+    header['columns'] = list(UV_TRACK_BINARY_COLUMNS)
+    header['points'] = []
+
+    blocks = []
+    offset = 0
+    for point in points:
+        name = tde4.getPointName(point_group, point)
+        uid = None
+        if SUPPORT_PERSISTENT_ID is True:
+            uid = tde4.getPointPersistentID(point_group, point)
+        point_set = tde4.getPointSet(point_group, point)
+        point_set_name = None
+        if point_set is not None:
+            point_set_name = tde4.getSetName(point_group, point_set)
+        valid_mode = _get_point_valid_mode(point_group, point)
+
+        samples = _get_point_per_frame_samples(
+            point_group, point, camera,
+            cam_num_frames, camera_fov, valid_mode,
+            frame0, None
+        )
+        columns = [array.array(type_code) for _ in UV_TRACK_BINARY_COLUMNS]
+        for f, pos_undist, pos, weight in samples:
+            columns[0].append(f)
+            columns[1].append(pos_undist[0])
+            columns[2].append(pos_undist[1])
+            columns[3].append(pos[0])
+            columns[4].append(pos[1])
+            columns[5].append(weight)
+        block = b''
+        for column in columns:
+            if sys.byteorder == 'big':
+                column.byteswap()
+            if hasattr(column, 'tobytes'):
+                block += column.tobytes()
+            else:
+                # Python 2.x
+                block += column.tostring()
+        blocks.append(block)
+
+        point_data = {
+            'name': name,
+            'id': uid,
+            'set_name': point_set_name,
+            '3d': _get_3d_data_from_point(point_group, point),
+            'num_frames': len(samples),
+            'offset': offset,
+        }
+        header['points'].append(point_data)
+        offset += len(block)
+
+    lens = tde4.getCameraLens(camera)
+    header['camera'] = _generate_camera_data(camera, lens, frame0)
+
+    header_str = json.dumps(header).encode('utf-8')
+    remainder = len(header_str) % UV_TRACK_BINARY_ALIGNMENT
+    if remainder > 0:
+        header_str += b' ' * (UV_TRACK_BINARY_ALIGNMENT - remainder)
+    prefix = struct.pack(
+        UV_TRACK_BINARY_PREFIX_FORMAT,
+        UV_TRACK_BINARY_MAGIC,
+        UV_TRACK_FORMAT_VERSION_5,
+        len(header_str),
+    )
+    data = prefix + header_str + b''.join(blocks)
+    return data
+
+
 if __name__ == '__main__':
     main()
@@ -20,6 +20,7 @@ Actions - a wrapper tuple for a callable function with positional and keyword ar
 """
 
 import collections
+import hashlib
 import importlib
 
 
@@ -72,3 +73,30 @@ def action_to_components(action):
         func = func_str_to_callable(func)
     assert callable(func)
     return func, args, kwargs
+
+
+def action_to_signature(action, ignore_keys=None):
+    """
+    Create a signature of the structure of an Action.
+
+    Two Actions with the same function, arguments and keyword
+    arguments have the same signature.
+
+    :param action: The Action to create a signature for.
+    :type action: Action
+
+    :param ignore_keys: Keyword argument names to not include in the
+                        signature.
+    :type ignore_keys: [str, ..] or None
+
+    :rtype: str
+    """
+    if ignore_keys is None:
+        ignore_keys = []
+    func = action.func
+    if callable(func):
+        func = '{0}.{1}'.format(func.__module__, func.__name__)
+    kwargs = [(k, v) for k, v in sorted(action.kwargs.items())
+              if k not in ignore_keys]
+    text = repr((func, list(action.args), kwargs))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
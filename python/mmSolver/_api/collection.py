@@ -35,6 +35,7 @@ import mmSolver._api.compile as api_compile
 import mmSolver._api.excep as excep
 import mmSolver._api.constant as const
 import mmSolver._api.solveresult as solveresult
+import mmSolver._api.solvehistory as solvehistory
 import mmSolver._api.solverbase as solverbase
 import mmSolver._api.solverstep as solverstep
 import mmSolver._api.marker as marker
@@ -73,6 +74,26 @@ def _create_collection_attributes(node):
         plug = node + '.' + attr
         maya.cmds.setAttr(plug, lock=True)
 
+    attr = const.COLLECTION_ATTR_LONG_NAME_SOLVE_HISTORY
+    if not node_utils.attribute_exists(attr, node):
+        maya.cmds.addAttr(
+            node,
+            longName=attr,
+            dataType='string'
+        )
+        plug = node + '.' + attr
+        maya.cmds.setAttr(plug, lock=True)
+
+    attr = const.COLLECTION_ATTR_LONG_NAME_SOLVE_STATISTICS
+    if not node_utils.attribute_exists(attr, node):
+        maya.cmds.addAttr(
+            node,
+            longName=attr,
+            dataType='string'
+        )
+        plug = node + '.' + attr
+        maya.cmds.setAttr(plug, lock=True)
+
     attr = const.COLLECTION_ATTR_LONG_NAME_DEVIATION
     if not node_utils.attribute_exists(attr, node):
         maya.cmds.addAttr(
@@ -340,22 +361,152 @@ class Collection(object):
         self._set_attr_data(attr, value)
         return
 
+    def get_last_solve_statistics(self):
+        """
+        Get the execution statistics stored from the last solve.
+
+        The statistics contain 'refresh_count', the number of viewport
+        refreshes, 'refresh_skipped_count', the number of refreshes
+        skipped to keep within the refresh rate, and
+        'refresh_duration', the seconds spent refreshing the viewport.
+        'validate_count' is the number of validate actions run, and
+        'validate_skipped_count' the number of validations skipped
+        because an action with the same structure was validated.
+
+        :rtype: dict
+        """
+        attr = const.COLLECTION_ATTR_LONG_NAME_SOLVE_STATISTICS
+        value = self._get_attr_data(attr)
+        if isinstance(value, dict) is False:
+            value = {}
+        return value
+
+    def _set_last_solve_statistics(self, value):
+        assert isinstance(value, dict)
+        attr = const.COLLECTION_ATTR_LONG_NAME_SOLVE_STATISTICS
+        self._set_attr_data(attr, value)
+        return
+
     def get_last_solve_results(self):
+        """
+        Get the SolveResult objects stored from the last solve.
+
+        The per-marker errors are decoded only when requested.
+
+        :rtype: [SolveResult, ..]
+        """
         attr = const.COLLECTION_ATTR_LONG_NAME_SOLVER_RESULTS
-        raw_data_list = self._get_attr_data(attr)
-        solres_list = []
-        for raw_data in raw_data_list:
-            solres = solveresult.SolveResult(raw_data)
-            solres_list.append(solres)
-        return solres_list
+        data = self._get_attr_data(attr)
+        return solveresult.decode_solve_results(data)
 
     def _set_last_solve_results(self, solres_list):
         attr = const.COLLECTION_ATTR_LONG_NAME_SOLVER_RESULTS
-        raw_data_list = []
-        for solres in solres_list:
-            raw_data = solres.get_data_raw()
-            raw_data_list.append(raw_data)
-        self._set_attr_data(attr, raw_data_list)
+        data = solveresult.encode_solve_results(solres_list)
+        self._set_attr_data(attr, data)
+        return
+
+    ############################################################################
+
+    def _get_solve_history(self):
+        attr = const.COLLECTION_ATTR_LONG_NAME_SOLVE_HISTORY
+        history = self._get_attr_data(attr)
+        if solvehistory.is_valid_history(history) is False:
+            history = solvehistory.create_history()
+        return history
+
+    def _set_solve_history(self, history):
+        attr = const.COLLECTION_ATTR_LONG_NAME_SOLVE_HISTORY
+        self._set_attr_data(attr, history)
+        return
+
+    def get_solve_history(self):
+        """
+        Get the runs stored in the solve history, oldest first.
+
+        Each run is a dict with 'timestamp', 'duration',
+        'options_hash', 'success' and 'statistics' keys. The
+        per-frame errors are stored compressed, use
+        'get_solve_history_frame_error_list' or 'diff_solve_history'
+        to query them.
+
+        :rtype: [dict, ..]
+        """
+        return list(self._get_solve_history()['runs'])
+
+    def get_solve_history_frame_error_list(self, index):
+        """
+        Get the per-frame errors of a run in the solve history.
+
+        :param index: Index of the run, as returned by
+                      'get_solve_history'. Negative values index
+                      from the newest run.
+        :type index: int
+
+        :returns: Mapping of frame number to error values.
+        :rtype: {float: float}
+        """
+        run = self._get_solve_history()['runs'][index]
+        return solvehistory.get_run_frame_error_list(run)
+
+    def diff_solve_history(self, index_a, index_b):
+        """
+        Compare the per-frame errors of two runs in the solve history.
+
+        Only the two runs given are decoded.
+
+        :param index_a: Index of the first run.
+        :type index_a: int
+
+        :param index_b: Index of the second run.
+        :type index_b: int
+
+        :returns: Mapping of frame number to the error of run 'b'
+                  minus the error of run 'a', for frames in both runs.
+        :rtype: {float: float}
+        """
+        runs = self._get_solve_history()['runs']
+        return solvehistory.diff_frame_error_list(runs[index_a], runs[index_b])
+
+    def get_solve_history_max_runs(self):
+        return self._get_solve_history()['max_runs']
+
+    def set_solve_history_max_runs(self, value):
+        assert isinstance(value, (int, long))
+        history = self._get_solve_history()
+        history['max_runs'] = value
+        solvehistory.evict_runs(history)
+        self._set_solve_history(history)
+        return
+
+    def get_solve_history_max_bytes(self):
+        return self._get_solve_history()['max_bytes']
+
+    def set_solve_history_max_bytes(self, value):
+        assert isinstance(value, (int, long))
+        history = self._get_solve_history()
+        history['max_bytes'] = value
+        solvehistory.evict_runs(history)
+        self._set_solve_history(history)
+        return
+
+    def clear_solve_history(self):
+        history = self._get_solve_history()
+        history['runs'] = []
+        self._set_solve_history(history)
+        return
+
+    def _add_solve_history(self, solres_list, timestamp, duration,
+                           options_hash=None,
+                           statistics=None):
+        history = self._get_solve_history()
+        if history['max_runs'] <= 0:
+            return
+        run = solvehistory.create_run(
+            solres_list, timestamp, duration,
+            options_hash=options_hash,
+            statistics=statistics)
+        solvehistory.add_run(history, run)
+        self._set_solve_history(history)
         return
 
     ############################################################################
@@ -26,9 +26,12 @@ first Action.
 """
 
 import collections
+import hashlib
+import json
 
 import maya.cmds
 import maya.mel
+import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
 import mmSolver._api.constant as const
@@ -37,6 +40,8 @@ import mmSolver._api.utils as api_utils
 import mmSolver._api.action as api_action
 import mmSolver._api.solverbase as solverbase
 import mmSolver._api.marker as marker
+import mmSolver._api.markeractivity as markeractivity
+import mmSolver._api.profiler as profiler
 import mmSolver._api.attribute as attribute
 
 LOG = mmSolver.logger.get_logger()
@@ -66,6 +71,274 @@ class DictGetOrCall(dict):
         return value
 
 
+# Attribute static values that do not change when the attribute is
+# animated, locked or has its min/max values changed. These values
+# are stored in the CompileCache.
+#
+# The Maya min/max values are not stored, they can be changed with
+# 'addAttr -edit' without any change to the Collection.
+ATTR_STRUCTURAL_VALUE_KEYS = [
+    'attribute_type',
+]
+
+# module level cache, stores 'CompileCache' objects, keyed on
+# Collection node UUID.
+__compile_caches = {}
+
+# Maya callback ids that clear the compile caches when a new scene is
+# created or a file is opened, or None if not yet added.
+#
+# The ids are kept when this module is reloaded, so the callbacks
+# added by the previous module can be removed, see
+# '_remove_scene_callbacks'.
+try:
+    __scene_callback_ids
+except NameError:
+    __scene_callback_ids = None
+
+
+def _create_fingerprint(*values):
+    text = json.dumps(values, sort_keys=True, default=repr)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def create_collection_fingerprint(col, sol_list, mkr_list, attr_list):
+    """
+    Create a fingerprint of the structure of a Collection.
+
+    The fingerprint changes when Markers, Bundle links, Attributes,
+    Solvers or solver frames are added, removed or renamed. Changes
+    to animated values do not change the fingerprint.
+
+    :param col: The Collection to fingerprint.
+    :type col: Collection
+
+    :param sol_list: The Solvers used to compile.
+    :type sol_list: [SolverBase, ..]
+
+    :param mkr_list: The Markers used to compile.
+    :type mkr_list: [Marker, ..]
+
+    :param attr_list: The Attributes used to compile.
+    :type attr_list: [Attribute, ..]
+
+    :rtype: str
+    """
+    mkr_nodes = [mkr.get_node() for mkr in mkr_list]
+    bnd_plugs = [n + '.bundle' for n in mkr_nodes if n is not None]
+    bnd_links = []
+    if len(bnd_plugs) > 0:
+        bnd_links = maya.cmds.listConnections(
+            bnd_plugs,
+            source=True,
+            destination=False,
+            connections=True) or []
+    attr_names = [attr.get_name() for attr in attr_list]
+    sol_data = [sol.get_data() for sol in sol_list]
+    return _create_fingerprint(
+        col.get_node(), mkr_nodes, bnd_links, attr_names, sol_data)
+
+
+class CompileCache(object):
+    """
+    Values queried from Maya when compiling a Collection, stored
+    between executions of the Collection.
+
+    The cache stores the Bundle and Camera nodes of each Marker, and
+    the Attribute values that do not change when animated (the
+    attribute type).
+
+    The cache is cleared when the Collection fingerprint changes,
+    when a node used is renamed or deleted, or when
+    'invalidate_compile_caches' is called with a node UUID in the
+    cache. All caches are cleared before a new scene is created or a
+    file is opened.
+    """
+
+    def __init__(self):
+        self._fingerprint = None
+        self._node_uuids = set()
+        self._dependency_nodes = set()
+        self._marker_values = {}
+        self._attr_values = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get_hit_count(self):
+        return self._hits
+
+    def get_miss_count(self):
+        return self._misses
+
+    def get_fingerprint(self):
+        return self._fingerprint
+
+    def get_node_uuids(self):
+        return set(self._node_uuids)
+
+    def update(self, fingerprint, node_list):
+        """
+        Make sure the cache is valid for the given fingerprint.
+
+        :param fingerprint: The current Collection fingerprint.
+        :type fingerprint: str
+
+        :param node_list: The nodes of the Collection; Markers and
+                          Attribute nodes.
+        :type node_list: [str, ..]
+
+        :returns: True if the cached values can be used, False if
+                  the cache was cleared.
+        :rtype: bool
+        """
+        valid = fingerprint == self._fingerprint
+        if valid is True and len(self._dependency_nodes) > 0:
+            # Renamed or deleted Bundle or Camera nodes.
+            nodes = list(self._dependency_nodes)
+            existing_nodes = maya.cmds.ls(nodes, long=True) or []
+            valid = len(set(existing_nodes)) == len(nodes)
+        if valid is True:
+            self._hits += 1
+            return True
+
+        self._misses += 1
+        self.clear()
+        self._fingerprint = fingerprint
+        if len(node_list) > 0:
+            uuids = maya.cmds.ls(node_list, uuid=True) or []
+            self._node_uuids = set(uuids)
+        return False
+
+    def get_marker_values(self, mkr_node):
+        return self._marker_values.get(mkr_node)
+
+    def set_marker_values(self, mkr_node, values):
+        self._marker_values[mkr_node] = values
+        bnd_node = values.get('bundle_node_name')
+        if bnd_node is not None:
+            self._dependency_nodes.add(bnd_node)
+        cam_nodes = values.get('camera_node_names')
+        if cam_nodes is not None:
+            self._dependency_nodes |= set(cam_nodes)
+        return
+
+    def get_attribute_values(self, attr_name):
+        return self._attr_values.get(attr_name)
+
+    def set_attribute_values(self, attr_name, values):
+        self._attr_values[attr_name] = values
+        return
+
+    def has_node_uuid(self, node_uuid):
+        return node_uuid in self._node_uuids
+
+    def clear(self):
+        self._fingerprint = None
+        self._node_uuids = set()
+        self._dependency_nodes = set()
+        self._marker_values = {}
+        self._attr_values = {}
+        return
+
+
+def _scene_changed_func(clientData):
+    invalidate_compile_caches()
+    return
+
+
+def _remove_scene_callbacks():
+    """
+    Remove the callbacks added by '_add_scene_callbacks'.
+    """
+    global __scene_callback_ids
+    if __scene_callback_ids is None:
+        return
+    for callback_id in __scene_callback_ids:
+        try:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        except RuntimeError:
+            LOG.debug('Could not remove scene callback: %r', callback_id)
+    __scene_callback_ids = None
+    return
+
+
+def _add_scene_callbacks():
+    """
+    Clear the compile caches when a new scene is created or a file
+    is opened.
+
+    Node UUIDs are saved with the scene, so a re-opened scene would
+    otherwise re-use the caches of the previous scene.
+    """
+    global __scene_callback_ids
+    if __scene_callback_ids is not None:
+        return
+    msgs = [
+        OpenMaya.MSceneMessage.kBeforeNew,
+        OpenMaya.MSceneMessage.kBeforeOpen
+    ]
+    callback_ids = []
+    for msg in msgs:
+        callback_id = OpenMaya.MSceneMessage.addCallback(
+            msg,
+            _scene_changed_func
+        )
+        callback_ids.append(callback_id)
+    __scene_callback_ids = callback_ids
+    return
+
+
+# When this module is reloaded the callbacks of the previous module
+# still exist, remove them so they are not added twice.
+_remove_scene_callbacks()
+
+
+def get_compile_cache(col):
+    """
+    Get the CompileCache for a Collection.
+
+    :param col: The Collection to get the cache for.
+    :type col: Collection
+
+    :rtype: CompileCache or None
+    """
+    global __compile_caches
+    col_uuid = col.get_node_uid()
+    if col_uuid is None:
+        return None
+    _add_scene_callbacks()
+    cache = __compile_caches.get(col_uuid)
+    if cache is None:
+        cache = CompileCache()
+        __compile_caches[col_uuid] = cache
+    return cache
+
+
+def invalidate_compile_caches(node_uuids=None):
+    """
+    Clear the compile caches using any of the given nodes.
+
+    :param node_uuids: The UUIDs of the nodes changed. If None, all
+                       compile caches are cleared.
+    :type node_uuids: [str, ..] or None
+    """
+    global __compile_caches
+    if node_uuids is None:
+        __compile_caches.clear()
+        return
+    if isinstance(node_uuids, basestring):
+        node_uuids = [node_uuids]
+    for col_uuid, cache in list(__compile_caches.items()):
+        if col_uuid in node_uuids:
+            del __compile_caches[col_uuid]
+            continue
+        for node_uuid in node_uuids:
+            if cache.has_node_uuid(node_uuid):
+                cache.clear()
+                break
+    return
+
+
 def _get_bundle_node_name_from_marker(mkr):
     assert isinstance(mkr, marker.Marker)
     bnd = mkr.get_bundle()
@@ -132,7 +405,7 @@ def _get_maya_max_value_from_attr(node_name, attr_name):
         maximum=True)
 
 
-def get_markers_static_values(mkr_list):
+def get_markers_static_values(mkr_list, compile_cache=None):
     """
     Get static values from markers.
 
@@ -142,6 +415,10 @@ def get_markers_static_values(mkr_list):
     :param mkr_list: List of Markers to compile.
     :type mkr_list: [Marker, ..]
 
+    :param compile_cache: Cache of values from previous compiles,
+        values not in the cache are queried and added.
+    :type compile_cache: CompileCache or None
+
     :returns: dictionary with marker nodes as keys, and values for
         each marker.
     :rtype: {str: {stc: any}, ..}, ..}
@@ -152,6 +429,12 @@ def get_markers_static_values(mkr_list):
         mkr_node = mkr.get_node()
         assert isinstance(mkr_node, basestring)
 
+        if compile_cache is not None:
+            values = compile_cache.get_marker_values(mkr_node)
+            if values is not None:
+                cache[mkr_node] = dict(values)
+                continue
+
         bnd_node = _get_bundle_node_name_from_marker(mkr)
         if bnd_node is None:
             continue
@@ -161,6 +444,8 @@ def get_markers_static_values(mkr_list):
         if cam_nodes is None:
             continue
         cache[mkr_node]['camera_node_names'] = cam_nodes
+        if compile_cache is not None:
+            compile_cache.set_marker_values(mkr_node, dict(cache[mkr_node]))
     return dict(cache)
 
 
@@ -312,7 +597,36 @@ def categorise_attributes(attr_list):
     return categories
 
 
-def get_attributes_static_values(col, attr_list):
+def _get_attribute_structural_values(node_name, attr_name):
+    """
+    Query the attribute values that do not change over time, see
+    ATTR_STRUCTURAL_VALUE_KEYS.
+    """
+    values = {}
+    values['attribute_type'] = _get_attribute_type_from_attr(
+        node_name, attr_name)
+    return values
+
+
+def _get_attribute_maya_min_max_values(node_name, attr_name):
+    """
+    Query the Maya minimum and maximum values of the attribute.
+    """
+    values = {}
+    exists = _get_maya_min_exists_from_attr(node_name, attr_name)
+    values['maya_min_exists'] = exists
+    if exists:
+        values['maya_min_value'] = _get_maya_min_value_from_attr(
+            node_name, attr_name)
+    exists = _get_maya_max_exists_from_attr(node_name, attr_name)
+    values['maya_max_exists'] = exists
+    if exists:
+        values['maya_max_value'] = _get_maya_max_value_from_attr(
+            node_name, attr_name)
+    return values
+
+
+def get_attributes_static_values(col, attr_list, compile_cache=None):
     """
     Get static values from attributes.
 
@@ -325,6 +639,11 @@ def get_attributes_static_values(col, attr_list):
     :param attr_list: List of Attributes to compile
     :type attr_list: [Attribute, ..]
 
+    :param compile_cache: Cache of values from previous compiles; the
+        ATTR_STRUCTURAL_VALUE_KEYS values are re-used from the
+        cache, all other values are always queried.
+    :type compile_cache: CompileCache or None
+
     :returns: A dictionary of per-attribute static values.
     :rtype: {str: {stc: any}, ..}, ..}
     """
@@ -341,26 +660,26 @@ def get_attributes_static_values(col, attr_list):
         cache[name]['is_locked'] = attr.is_locked()
         cache[name]['is_animated'] = attr.is_animated()
         cache[name]['is_static'] = attr.is_static()
-        cache[name]['attribute_type'] = _get_attribute_type_from_attr(
-            node_name, attr_name)
 
-        # Minimum Value
+        # Attribute type.
+        values = None
+        if compile_cache is not None:
+            values = compile_cache.get_attribute_values(name)
+        if values is None:
+            values = _get_attribute_structural_values(node_name, attr_name)
+            if compile_cache is not None:
+                compile_cache.set_attribute_values(name, values)
+        cache[name].update(values)
+
+        # Maya Minimum/Maximum Values.
+        values = _get_attribute_maya_min_max_values(node_name, attr_name)
+        cache[name].update(values)
+
+        # Solver Minimum/Maximum Values
         cache[name]['solver_min_enable'] = col.get_attribute_min_enable(attr)
         cache[name]['solver_min_value'] = col.get_attribute_min_value(attr)
-        exists = _get_maya_min_exists_from_attr(node_name, attr_name)
-        cache[name]['maya_min_exists'] = exists
-        if exists:
-            cache[name]['maya_min_value'] = _get_maya_min_value_from_attr(
-                node_name, attr_name)
-
-        # Maximum Value
         cache[name]['solver_max_enable'] = col.get_attribute_max_enable(attr)
         cache[name]['solver_max_value'] = col.get_attribute_max_value(attr)
-        exists = _get_maya_max_exists_from_attr(node_name, attr_name)
-        cache[name]['maya_max_exists'] = exists
-        if exists:
-            cache[name]['maya_max_value'] = _get_maya_max_value_from_attr(
-                node_name, attr_name)
     return dict(cache)
 
 
@@ -733,19 +1052,74 @@ def frames_compile_flags(frm_list, frame_use_tags):
     return frames
 
 
-def collection_compile(col, sol_list, mkr_list, attr_list,
-                       withtest=False,
-                       prog_fn=None,
-                       status_fn=None):
+def get_solver_frame_numbers(sol_list):
     """
-    Take the data in this class and compile it into actions to run.
+    Get the frame numbers used by any of the Solvers.
 
-    :return: list of SolverActions.
-    :rtype: [SolverAction, ..]
+    :param sol_list: The Solvers to get frames from.
+    :type sol_list: [SolverBase, ..]
+
+    :returns: The unique frame numbers, sorted.
+    :rtype: [int, ..]
+    """
+    frame_nums = set()
+    for sol in sol_list:
+        get_frame_list = getattr(sol, 'get_frame_list', None)
+        if get_frame_list is not None:
+            frame_nums |= set([f.get_number() for f in get_frame_list()])
+        get_root_frame_list = getattr(sol, 'get_root_frame_list', None)
+        if get_root_frame_list is not None:
+            frame_nums |= set([f.get_number()
+                               for f in get_root_frame_list()])
+    return list(sorted(frame_nums))
+
+
+def _get_solver_frame_range(sol_list):
+    """
+    Get the first and last frame used by any of the Solvers.
+
+    :returns: The start and end frame, or (None, None) if no Solver
+              has any frames.
+    :rtype: (int, int) or (None, None)
+    """
+    frame_nums = get_solver_frame_numbers(sol_list)
+    if len(frame_nums) == 0:
+        return None, None
+    return int(frame_nums[0]), int(frame_nums[-1])
+
+
+def get_marker_activity_index(sol_list, mkr_list):
+    """
+    Create a MarkerActivityIndex over the frames used by the Solvers.
+
+    :param sol_list: The Solvers that will be compiled.
+    :type sol_list: [SolverBase, ..]
+
+    :param mkr_list: List of Markers to compile.
+    :type mkr_list: [Marker, ..]
+
+    :rtype: MarkerActivityIndex or None
+    """
+    start_frame, end_frame = _get_solver_frame_range(sol_list)
+    if start_frame is None:
+        return None
+    return markeractivity.create_marker_activity_index(
+        mkr_list, start_frame, end_frame)
+
+
+def _collection_compile_prepare(col, sol_list, mkr_list, attr_list,
+                                use_cache):
+    """
+    Check the Collection is valid and query the values shared by all
+    Solvers.
+
+    :raises NotValid: When the Collection cannot be compiled.
+
+    :returns: The enabled Solvers and the precomputed data for the
+              Solvers.
+    :rtype: ([SolverBase, ..], dict)
     """
     col_node = col.get_node()
-    action_list = []
-    vaction_list = []
     if len(sol_list) == 0:
         msg = 'Collection is not valid, no Solvers given; '
         msg += 'collection={0}'
@@ -770,20 +1144,47 @@ def collection_compile(col, sol_list, mkr_list, attr_list,
         msg = msg.format(repr(col_node))
         raise excep.NotValid(msg)
 
+    # Values that do not change between executions are re-used from
+    # the Collection's compile cache, unless the structure of the
+    # Collection has changed.
+    compile_cache = None
+    if use_cache is True:
+        compile_cache = get_compile_cache(col)
+    if compile_cache is not None:
+        fingerprint = create_collection_fingerprint(
+            col, sol_list, mkr_list, attr_list)
+        node_list = [col_node]
+        node_list += [mkr.get_node() for mkr in mkr_list]
+        node_list += [attr.get_node() for attr in attr_list]
+        compile_cache.update(fingerprint, node_list)
+
     # Query and cache static values from Maya, so we don't need to
     # re-compute the values inside Solvers.
-    attr_static_values = get_attributes_static_values(col, attr_list)
+    attr_static_values = get_attributes_static_values(
+        col, attr_list, compile_cache=compile_cache)
     attr_stiff_static_values = get_attr_stiffness_static_values(col, attr_list)
     attr_smooth_static_values = get_attr_smoothness_static_values(col, attr_list)
-    mkr_static_values = get_markers_static_values(mkr_list)
+    mkr_static_values = get_markers_static_values(
+        mkr_list, compile_cache=compile_cache)
+    mkr_activity_index = get_marker_activity_index(
+        sol_enabled_list, mkr_list)
     precomputed_data = {
         solverbase.MARKER_STATIC_VALUES_KEY: mkr_static_values,
+        solverbase.MARKER_ACTIVITY_INDEX_KEY: mkr_activity_index,
         solverbase.ATTR_STATIC_VALUES_KEY: attr_static_values,
         solverbase.ATTR_STIFFNESS_STATIC_VALUES_KEY: attr_stiff_static_values,
         solverbase.ATTR_SMOOTHNESS_STATIC_VALUES_KEY: attr_smooth_static_values,
     }
+    return sol_enabled_list, precomputed_data
+
 
-    # Compile all the solvers
+def _compile_solvers(col, sol_enabled_list, mkr_list, attr_list,
+                     precomputed_data, withtest):
+    """
+    Compile the Solvers, yielding each (action, vaction) pair as soon
+    as it is compiled.
+    """
+    col_node = col.get_node()
     msg = 'Collection is not valid, failed to compile solver;'
     msg += ' collection={0}'
     msg = msg.format(repr(col_node))
@@ -797,8 +1198,67 @@ def collection_compile(col, sol_list, mkr_list, attr_list,
             assert action.func is not None
             assert action.args is not None
             assert action.kwargs is not None
-            action_list.append(action)
-            vaction_list.append(vaction)
+            yield action, vaction
+    return
+
+
+def collection_compile_iter(col, sol_list, mkr_list, attr_list,
+                            withtest=False,
+                            use_cache=None):
+    """
+    Compile the Collection into actions, lazily.
+
+    The Collection is checked (and the values shared by all Solvers
+    are queried) when this function is called, but each Solver action
+    is only compiled when the returned generator is advanced. This
+    allows running the first actions while the next actions have not
+    been compiled yet.
+
+    :param use_cache: Re-use values queried by previous compiles of
+        the same Collection, see 'CompileCache'. Defaults to True.
+    :type use_cache: bool or None
+
+    :raises NotValid: When the Collection cannot be compiled.
+
+    :returns: A generator yielding a tuple of two Action objects. The
+              first object is used for solving, the second Action is
+              for validation of the solve.
+    :rtype: generator of (Action, Action or None)
+    """
+    if use_cache is None:
+        use_cache = True
+    with profiler.span('prepare'):
+        sol_enabled_list, precomputed_data = _collection_compile_prepare(
+            col, sol_list, mkr_list, attr_list, use_cache)
+    return _compile_solvers(
+        col, sol_enabled_list, mkr_list, attr_list,
+        precomputed_data, withtest)
+
+
+def collection_compile(col, sol_list, mkr_list, attr_list,
+                       withtest=False,
+                       prog_fn=None,
+                       status_fn=None,
+                       use_cache=None):
+    """
+    Take the data in this class and compile it into actions to run.
+
+    :param use_cache: Re-use values queried by previous compiles of
+        the same Collection, see 'CompileCache'. Defaults to True.
+    :type use_cache: bool or None
+
+    :return: list of SolverActions.
+    :rtype: [SolverAction, ..]
+    """
+    action_list = []
+    vaction_list = []
+    generator = collection_compile_iter(
+        col, sol_list, mkr_list, attr_list,
+        withtest=withtest,
+        use_cache=use_cache)
+    for action, vaction in generator:
+        action_list.append(action)
+        vaction_list.append(vaction)
     assert len(action_list) == len(vaction_list)
     return action_list, vaction_list
 
@@ -864,13 +1324,21 @@ def compile_solver_with_cache(sol, col, mkr_list, attr_list, withtest, cache):
         # one of the frames there are zero markers, most frames will
         # solve, except for that one. We must detect this and skip the entire
         # solve to avoid any invalid solve frames.
+        mkr_activity_index = None
+        precomputed_data = sol.get_precomputed_data()
+        if precomputed_data is not None:
+            mkr_activity_index = precomputed_data.get(
+                solverbase.MARKER_ACTIVITY_INDEX_KEY)
+        if mkr_activity_index is None:
+            mkr_activity_index = markeractivity.MarkerActivityIndex(0, 0)
+        mkr_node_list = [m.get_node() for m in mkr_list]
+
         min_num_of_active_mkr_nodes = 999999999
         min_list_of_active_mkr_nodes = []
         for frm in frame_list:
             frm_num = frm.get_number()
-            active_mkr_nodes = [m.get_node()
-                                for m in mkr_list
-                                if m.get_enable(frm_num)]
+            active_mkr_nodes = mkr_activity_index.get_active_marker_nodes(
+                frm_num, mkr_node_list=mkr_node_list)
             if len(active_mkr_nodes) < min_num_of_active_mkr_nodes:
                 min_list_of_active_mkr_nodes = active_mkr_nodes
 
@@ -137,6 +137,8 @@ COLLECTION_ATTR_LONG_NAME_SOLVER_RESULTS = 'solver_results'
 COLLECTION_ATTR_LONG_NAME_DEVIATION = 'deviation'
 COLLECTION_ATTR_LONG_NAME_SOLVE_TIMESTAMP = 'solve_timestamp'
 COLLECTION_ATTR_LONG_NAME_SOLVE_DURATION = 'solve_duration'
+COLLECTION_ATTR_LONG_NAME_SOLVE_HISTORY = 'solve_history'
+COLLECTION_ATTR_LONG_NAME_SOLVE_STATISTICS = 'solve_statistics'
 COLLECTION_ATTR_LONG_NAME_ATTR_DETAILS = 'attribute_details_{name}'
 
 
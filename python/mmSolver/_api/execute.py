@@ -29,6 +29,7 @@ to update in various ways (DG or Viewport.
 import time
 import pprint
 import collections
+import timeit
 
 import maya.cmds
 import maya.mel
@@ -40,7 +41,10 @@ import mmSolver._api.utils as api_utils
 import mmSolver._api.compile as api_compile
 import mmSolver._api.excep as excep
 import mmSolver._api.solveresult as solveresult
+import mmSolver._api.solvehistory as solvehistory
 import mmSolver._api.action as api_action
+import mmSolver._api.markeractivity as markeractivity
+import mmSolver._api.profiler as profiler
 import mmSolver._api.solverbase as solverbase
 import mmSolver._api.collectionutils as collectionutils
 import mmSolver._api.constant as const
@@ -56,7 +60,10 @@ ExecuteOptions = collections.namedtuple(
      'pre_solve_force_eval',
      'do_isolate',
      'display_grid',
-     'display_node_types')
+     'display_node_types',
+     'stream_compile',
+     'refresh_fps',
+     'refresh_min_interval')
 )
 
 
@@ -67,7 +74,10 @@ def createExecuteOptions(verbose=False,
                          do_isolate=False,
                          pre_solve_force_eval=True,
                          display_grid=True,
-                         display_node_types=None):
+                         display_node_types=None,
+                         stream_compile=False,
+                         refresh_fps=None,
+                         refresh_min_interval=None):
     """
     Create :py:class:`ExecuteOptions` object.
 
@@ -107,6 +117,29 @@ def createExecuteOptions(verbose=False,
                                during solving. If an argument is not
                                given or is None, the object type
                                visibility will not be changed.
+
+    :param stream_compile: Compile each Solver action just before it
+                           is run, rather than compiling all actions
+                           before the first solve. The solve starts
+                           sooner and the actions are validated just
+                           before running, see 'execute'.
+    :type stream_compile: bool
+
+    :param refresh_fps: When 'refresh' is on, the maximum number of
+                        times per-second the viewport is refreshed.
+                        Solves finishing sooner do not refresh the
+                        viewport, the last solved frame is always
+                        refreshed. None or 0 refreshes after every
+                        solve.
+    :type refresh_fps: float or None
+
+    :param refresh_min_interval: When 'refresh' is on, the minimum
+                                 number of seconds between the end of
+                                 a viewport refresh and the next
+                                 refresh. Used together with
+                                 'refresh_fps', the longer interval
+                                 is used.
+    :type refresh_min_interval: float or None
     """
     if display_node_types is None:
         display_node_types = dict()
@@ -118,7 +151,10 @@ def createExecuteOptions(verbose=False,
         do_isolate=do_isolate,
         pre_solve_force_eval=pre_solve_force_eval,
         display_grid=display_grid,
-        display_node_types=display_node_types
+        display_node_types=display_node_types,
+        stream_compile=stream_compile,
+        refresh_fps=refresh_fps,
+        refresh_min_interval=refresh_min_interval,
     )
     return options
 
@@ -209,7 +245,17 @@ def preSolve_setIsolatedNodes(actions_list, options, panels):
         isolate_node_list = list(isolate_nodes)
         for panel in panels:
             viewport_utils.set_isolated_nodes(panel, isolate_node_list, True)
+    preSolve_setDisplayNodeTypes(options, panels)
+    return
 
+
+def preSolve_setDisplayNodeTypes(options, panels):
+    """
+    Change the visibility of node types in the viewport panels, as
+    given by the ExecuteOptions 'display_node_types'.
+    """
+    if options.refresh is not True:
+        return
     display_node_types = options.display_node_types
     if display_node_types is not None:
         assert isinstance(display_node_types, dict)
@@ -222,7 +268,40 @@ def preSolve_setIsolatedNodes(actions_list, options, panels):
     return
 
 
-def preSolve_triggerEvaluation(action_list, cur_frame, options):
+def solve_updateIsolatedNodes(action, isolate_nodes, options, panels):
+    """
+    Add the nodes used by the action to the isolated nodes.
+
+    Used when actions are compiled while solving, so the nodes to
+    isolate are not known before the solve starts.
+
+    :param action: The action about to run.
+    :type action: Action
+
+    :param isolate_nodes: The nodes already isolated, this set is
+                          updated with the new nodes.
+    :type isolate_nodes: set
+
+    :param options: The execution options for the solve.
+    :type options: ExecuteOptions
+
+    :param panels: The viewport panels to isolate nodes in.
+    :type panels: [str, ..]
+    """
+    if options.refresh is not True or options.do_isolate is not True:
+        return
+    nodes = collectionutils.generate_isolate_nodes(action.kwargs)
+    if nodes.issubset(isolate_nodes):
+        return
+    isolate_nodes |= nodes
+    isolate_node_list = list(isolate_nodes)
+    for panel in panels:
+        viewport_utils.set_isolated_nodes(panel, isolate_node_list, True)
+    return
+
+
+def preSolve_triggerEvaluation(action_list, cur_frame, options,
+                               frame_list=None):
     """
     Set the first current time to the frame before current.
 
@@ -239,13 +318,18 @@ def preSolve_triggerEvaluation(action_list, cur_frame, options):
 
     :param options: The execution options for the solve.
     :type options: ExecuteOptions
+
+    :param frame_list: The frames used in the current solve, if None
+                       the frames are found in the 'action_list'.
+    :type frame_list: [int or float, ..] or None
     """
     if options.pre_solve_force_eval is not True:
         return
-    frame_list = []
-    for action in action_list:
-        kwargs = action.kwargs
-        frame_list += kwargs.get('frame', [])
+    if frame_list is None:
+        frame_list = []
+        for action in action_list:
+            kwargs = action.kwargs
+            frame_list += kwargs.get('frame', [])
     frame_list = list(set(frame_list))
     frame_list = list(sorted(frame_list))
     is_whole_solve_single_frame = len(frame_list) == 1
@@ -283,6 +367,99 @@ def postSolve_refreshViewport(options, frame):
     return
 
 
+def _get_refresh_interval(options):
+    """
+    The minimum number of seconds between viewport refreshes.
+
+    :param options: The execution options for the current solve.
+    :type options: ExecuteOptions
+
+    :rtype: float
+    """
+    interval = 0.0
+    if options.refresh_fps:
+        interval = 1.0 / float(options.refresh_fps)
+    if options.refresh_min_interval:
+        interval = max(interval, float(options.refresh_min_interval))
+    return interval
+
+
+class _RefreshScheduler(object):
+    """
+    Limit the number of viewport refreshes while solving.
+
+    A refresh is skipped when the previous refresh ended less than
+    the refresh interval ago; the skipped frame is refreshed by
+    'flush', so the final state is always drawn.
+    """
+
+    def __init__(self, options):
+        """
+        :param options: The execution options for the current solve.
+        :type options: ExecuteOptions
+        """
+        self._options = options
+        self._interval = _get_refresh_interval(options)
+        self._clock = timeit.default_timer
+        self._last_refresh_end = None
+        self._pending_frame = None
+        self.refresh_count = 0
+        self.skipped_count = 0
+        self.refresh_duration = 0.0
+        return
+
+    def request(self, frame):
+        """
+        Refresh the viewport for 'frame', if the interval has passed.
+
+        :param frame: The frame numbers solved, see
+                      'postSolve_refreshViewport'.
+        :type frame: [int or float, ..]
+        """
+        if self._options.refresh is not True:
+            return
+        if self._last_refresh_end is not None and self._interval > 0.0:
+            elapsed = self._clock() - self._last_refresh_end
+            if elapsed < self._interval:
+                self._pending_frame = frame
+                self.skipped_count += 1
+                return
+        self._refresh(frame)
+        return
+
+    def flush(self):
+        """
+        Refresh the viewport for the last skipped frame, if any.
+        """
+        if self._pending_frame is not None:
+            self._refresh(self._pending_frame)
+        return
+
+    def _refresh(self, frame):
+        start = self._clock()
+        with profiler.span('refresh_viewport'):
+            postSolve_refreshViewport(self._options, frame)
+        end = self._clock()
+        self._last_refresh_end = end
+        self._pending_frame = None
+        self.refresh_count += 1
+        self.refresh_duration += end - start
+        return
+
+    def get_statistics(self):
+        """
+        :returns: The number of refreshes, the number of skipped
+                  refreshes and the total seconds spent refreshing.
+        :rtype: dict
+        """
+        stats = {
+            'refresh_count': self.refresh_count,
+            'refresh_skipped_count': self.skipped_count,
+            'refresh_duration': self.refresh_duration,
+        }
+        return stats
+
+
 def postSolve_setViewportState(options, panel_objs, panel_node_type_vis):
     """
     Change the viewport state based on the ExecuteOptions given
@@ -424,6 +601,11 @@ def _create_action_state(status=None, message=None,
     return state
 
 
+def _format_invalid_message(frames):
+    msg = 'Invalid parameters and errors, skipping solve: %r'
+    return msg % list(sorted(frames))
+
+
 def _run_validate_action(vaction):
     """
     Call a single validate action, and see what happens.
@@ -484,8 +666,7 @@ def _run_validate_action(vaction):
     num_param = print_stats.get('number_of_parameters', 0)
     num_err = print_stats.get('number_of_errors', 0)
     if num_param == 0 or num_err == 0 or num_param > num_err:
-        msg = 'Invalid parameters and errors, skipping solve: %r'
-        message = msg % list(sorted(frames))
+        message = _format_invalid_message(frames)
         state = _create_action_state(
             status=const.ACTION_STATUS_FAILED,
             message=message,
@@ -508,29 +689,197 @@ def _run_validate_action(vaction):
     return state
 
 
-def _run_validate_action_list(vaction_list):
+def _create_validate_marker_activity_index(vaction_list):
+    """
+    Create a MarkerActivityIndex for the Markers and frames used by
+    the 'mmSolver' validate actions.
+
+    :rtype: MarkerActivityIndex or None
+    """
+    mkr_nodes = set()
+    frames = set()
+    for vaction in vaction_list:
+        if api_action.action_func_is_mmSolver(vaction) is False:
+            continue
+        kwargs = vaction.kwargs
+        mkr_nodes |= set([x[0] for x in kwargs.get('marker', [])])
+        frames |= set(kwargs.get('frame', []))
+    if len(mkr_nodes) == 0 or len(frames) == 0:
+        return None
+    index = markeractivity.MarkerActivityIndex(
+        int(min(frames)), int(max(frames)))
+    index.add_markers(list(sorted(mkr_nodes)))
+    return index
+
+
+def _get_validate_action_signature(vaction, mkr_activity_index):
+    """
+    Create a signature of the structure of a validate action.
+
+    Validate actions for the 'mmSolver' command with the same
+    signature have the same number of parameters and errors, so only
+    one of them needs to be run. The signature uses the keyword
+    arguments (Markers, Attributes, Cameras and solver options), the
+    number of frames and the Markers active on each frame, but not the
+    frame numbers.
+
+    :param vaction: The validate action.
+    :type vaction: Action
+
+    :param mkr_activity_index: The enabled frames of the Markers. If
+                               None, the frame numbers are part of
+                               the signature.
+    :type mkr_activity_index: MarkerActivityIndex or None
+
+    :rtype: (str, int, tuple)
+    """
+    if (api_action.action_func_is_mmSolver(vaction) is False
+            or mkr_activity_index is None):
+        return api_action.action_to_signature(vaction), None, None
+    kwargs = vaction.kwargs
+    frames = kwargs.get('frame', [])
+    mkr_nodes = [x[0] for x in kwargs.get('marker', [])]
+    active_mkr_nodes = [
+        tuple(mkr_activity_index.get_active_marker_nodes(
+            f, mkr_node_list=mkr_nodes))
+        for f in frames]
+    signature = api_action.action_to_signature(
+        vaction, ignore_keys=['frame'])
+    return signature, len(frames), tuple(sorted(active_mkr_nodes))
+
+
+def _copy_action_state(state, vaction):
+    """
+    Copy a validated ActionState for another validate action with the
+    same signature, using the frames of the given action.
+
+    :rtype: ActionState
+    """
+    frames = list(sorted(vaction.kwargs.get('frame', [])))
+    message = state.message
+    if message == _format_invalid_message(state.frames or []):
+        message = _format_invalid_message(frames)
+    return state._replace(
+        message=message,
+        frames_number=len(frames),
+        frames=frames)
+
+
+class _ValidateCache(object):
+    """
+    Run validate actions, re-using the ActionState of a previous
+    validate action with the same structure.
+
+    Validate actions with the same structure (see
+    :py:func:`_get_validate_action_signature`) are only run once, and
+    the ActionState is copied to the other actions.
+    """
+
+    def __init__(self, mkr_activity_index=None):
+        """
+        :param mkr_activity_index: The enabled frames of the Markers
+                                   used by the validate actions.
+        :type mkr_activity_index: MarkerActivityIndex or None
+        """
+        self._mkr_activity_index = mkr_activity_index
+        self._states = {}
+        self.run_count = 0
+        self.skipped_count = 0
+        return
+
+    def run(self, vaction):
+        """
+        Call a single validate action, see
+        :py:func:`_run_validate_action`.
+
+        :param vaction: Validation action object to be run.
+        :type vaction: Action
+
+        :rtype: ActionState
+        """
+        if not isinstance(vaction, api_action.Action):
+            return _run_validate_action(vaction)
+        signature = _get_validate_action_signature(
+            vaction, self._mkr_activity_index)
+        state = self._states.get(signature)
+        if state is None:
+            state = _run_validate_action(vaction)
+            self._states[signature] = state
+            self.run_count += 1
+        else:
+            state = _copy_action_state(state, vaction)
+            self.skipped_count += 1
+        return state
+
+    def get_statistics(self):
+        """
+        :returns: The number of validate actions run, and the number
+                  skipped because the same structure was already
+                  validated.
+        :rtype: dict
+        """
+        stats = {
+            'validate_count': self.run_count,
+            'validate_skipped_count': self.skipped_count,
+        }
+        return stats
+
+
+def _run_validate_action_list(vaction_list, validate_cache=None):
     """
     Calls the validation functions attached to the Action list.
 
+    Validate actions with the same structure are only run once, see
+    :py:class:`_ValidateCache`.
+
     See :py:func:`_run_validate_action` for more details.
 
     :param vaction_list: List of validate actions to call.
     :type vaction_list: [Action, ..]
 
+    :param validate_cache: The cache used to run the validate
+                           actions, or None to create a new cache.
+    :type validate_cache: _ValidateCache or None
+
     :return:
         A list of validations, with a single valid boolean (did the
         validation succeed?).
     :rtype: (bool, [str, ..], [(int, int, int), ..])
     """
     assert len(vaction_list) > 0
-    state_list = []
-    for vaction in vaction_list:
-        state = _run_validate_action(vaction)
-        state_list.append(state)
+    if validate_cache is None:
+        mkr_activity_index = _create_validate_marker_activity_index(
+            vaction_list)
+        validate_cache = _ValidateCache(mkr_activity_index)
+    state_list = [validate_cache.run(vaction) for vaction in vaction_list]
     assert len(vaction_list) == len(state_list)
     return state_list
 
 
+def _iter_compiled_actions(action_iter):
+    """
+    Yield the compiled (action, vaction) pairs, stopping when an
+    action fails to compile.
+
+    When compiling while solving ('stream_compile'), a Solver that
+    fails to compile raises NotValid in the middle of the solve. The
+    failure is logged and the actions already run are kept, the same
+    as a compile failure before solving.
+
+    :param action_iter: The compiled actions, see
+                        'collection_compile_iter'.
+    :type action_iter: iterable of (Action, Action)
+
+    :rtype: generator of (Action, Action)
+    """
+    try:
+        for action, vaction in action_iter:
+            yield action, vaction
+    except excep.NotValid as e:
+        LOG.warn(e)
+    return
+
+
 def _convert_action_state_to_plain_old_data(state_list):
     """
     Convert ActionStates back to the previous supported data structure.
@@ -630,7 +979,11 @@ def execute(col,
     :type options: ExecuteOptions
 
     :param validate_mode: How should the solve validate? Must be one of
-                          the VALIDATE_MODE_VALUE_LIST values.
+                          the VALIDATE_MODE_VALUE_LIST values. When
+                          the options use 'stream_compile', actions
+                          cannot be validated before solving, so
+                          VALIDATE_MODE_PRE_VALIDATE_VALUE validates
+                          each action just before it is run.
     :type validate_mode: str or None
 
     :param log_level: The log level for the execution.
@@ -651,6 +1004,27 @@ def execute(col,
     :return: List of SolveResults from the executed collection.
     :rtype: [SolverResult, ..]
     """
+    with profiler.span('execute'):
+        return _execute(
+            col,
+            options=options,
+            validate_mode=validate_mode,
+            log_level=log_level,
+            prog_fn=prog_fn,
+            status_fn=status_fn,
+            info_fn=info_fn)
+
+
+def _execute(col,
+             options=None,
+             validate_mode=None,
+             log_level=None,
+             prog_fn=None,
+             status_fn=None,
+             info_fn=None):
+    """
+    Execute the Collection, see :py:func:`execute`.
+    """
     if options is None:
         options = createExecuteOptions()
     if validate_mode is None:
@@ -685,6 +1059,9 @@ def execute(col,
     prev_auto_key_state = maya.cmds.autoKeyframe(query=True, state=True)
     prev_cycle_check = maya.cmds.cycleCheck(query=True, evaluation=True)
 
+    refresh_scheduler = _RefreshScheduler(options)
+    validate_cache = _ValidateCache()
+
     # State information needed to revert reconnect animation curves in
     # 'finally' block.
     kwargs = {}
@@ -707,48 +1084,99 @@ def execute(col,
         sol_list = col.get_solver_list()
         mkr_list = col.get_marker_list()
         attr_list = col.get_attribute_list()
+        stream_compile = options.stream_compile is True
         try:
-            action_list, vaction_list = api_compile.collection_compile(
-                col,
-                sol_list,
-                mkr_list,
-                attr_list,
-                withtest=withtest,
-                prog_fn=prog_fn,
-                status_fn=status_fn
-            )
+            with profiler.span('compile'):
+                if stream_compile is True:
+                    action_iter = api_compile.collection_compile_iter(
+                        col,
+                        sol_list,
+                        mkr_list,
+                        attr_list,
+                        withtest=withtest,
+                    )
+                    action_iter = profiler.iter_span(action_iter, 'compile')
+                    action_iter = _iter_compiled_actions(action_iter)
+                else:
+                    action_list, vaction_list = api_compile.collection_compile(
+                        col,
+                        sol_list,
+                        mkr_list,
+                        attr_list,
+                        withtest=withtest,
+                        prog_fn=prog_fn,
+                        status_fn=status_fn
+                    )
+                    action_iter = zip(action_list, vaction_list)
         except excep.NotValid as e:
             LOG.warn(e)
             return solres_list
         collectionutils.run_progress_func(prog_fn, 1)
 
+        # Validation states are cached on the validate action
+        # structure, so identical actions are only validated once.
         vaction_state_list = []
-        if validate_before is True:
-            vaction_state_list = _run_validate_action_list(vaction_list)
-            assert len(vaction_list) == len(vaction_state_list)
+        if stream_compile is True:
+            # The actions are not known yet, so they are validated
+            # just before running.
+            validate_runtime = validate_runtime or validate_before
+            if validate_runtime is True:
+                with profiler.span('validate'):
+                    validate_cache = _ValidateCache(
+                        api_compile.get_marker_activity_index(
+                            sol_list, mkr_list))
+        elif validate_before is True or validate_runtime is True:
+            with profiler.span('validate'):
+                validate_cache = _ValidateCache(
+                    _create_validate_marker_activity_index(vaction_list))
+                if validate_before is True:
+                    vaction_state_list = _run_validate_action_list(
+                        vaction_list, validate_cache=validate_cache)
+                    assert len(vaction_list) == len(vaction_state_list)
 
         # Prepare frame solve
-        preSolve_setIsolatedNodes(action_list, options, panels)
-        preSolve_triggerEvaluation(action_list, cur_frame, options)
+        isolate_nodes = set()
+        if stream_compile is True:
+            solver_frame_list = api_compile.get_solver_frame_numbers(
+                sol_list)
+            with profiler.span('set_isolated_nodes'):
+                preSolve_setDisplayNodeTypes(options, panels)
+            with profiler.span('trigger_evaluation'):
+                preSolve_triggerEvaluation(
+                    [], cur_frame, options, frame_list=solver_frame_list)
+        else:
+            with profiler.span('set_isolated_nodes'):
+                preSolve_setIsolatedNodes(action_list, options, panels)
+            with profiler.span('trigger_evaluation'):
+                preSolve_triggerEvaluation(action_list, cur_frame, options)
 
         # Ensure prediction attributes are created and initialised.
-        collectionutils.set_initial_prediction_attributes(
-            col, attr_list, cur_frame
-        )
+        with profiler.span('prediction'):
+            collectionutils.set_initial_prediction_attributes(
+                col, attr_list, cur_frame
+            )
 
         # Run Solver Actions...
         message_hashes = set()
         start = 0
-        total = len(action_list)
+        if stream_compile is True:
+            # The number of actions is unknown, estimate one action
+            # per-frame.
+            total = max(1, len(solver_frame_list))
+        else:
+            total = len(action_list)
         number_of_solves = 0
-        for i, (action, vaction) in enumerate(zip(action_list, vaction_list)):
+        for i, (action, vaction) in enumerate(action_iter):
+            if stream_compile is True:
+                total = max(total, i + 1)
             state = None
             if len(vaction_state_list) > 0:
                 # We have pre-computed the state list.
                 state = vaction_state_list[i]
             if isinstance(vaction, api_action.Action) and validate_runtime:
                 # We will calculate the state just-in-time.
-                state = _run_validate_action(vaction)
+                with profiler.span('validate'):
+                    state = validate_cache.run(vaction)
             if state is not None:
                 if state.status != const.ACTION_STATUS_SUCCESS:
                     assert isinstance(state, ActionState)
@@ -759,6 +1187,11 @@ def execute(col,
                     # Skip this action, since the test failed.
                     continue
 
+            if stream_compile is True:
+                with profiler.span('set_isolated_nodes'):
+                    solve_updateIsolatedNodes(
+                        action, isolate_nodes, options, panels)
+
             func, args, kwargs = api_action.action_to_components(action)
             func_is_mmsolver = api_action.action_func_is_mmSolver(action)
 
@@ -793,7 +1226,9 @@ def execute(col,
                     save_node_attrs = []
 
             # Run Solver Maya plug-in command
-            solve_data = func(*args, **kwargs)
+            func_name = getattr(func, '__name__', None)
+            with profiler.span('solve', func=func_name):
+                solve_data = func(*args, **kwargs)
 
             # Revert special HACK for single frame solves
             if func_is_mmsolver is True:
@@ -816,19 +1251,20 @@ def execute(col,
                     raise excep.NotValid
                 single_frame = frame[0]
 
-                if number_of_solves == 0:
-                    collectionutils.set_initial_prediction_attributes(
-                        col, attr_list, single_frame
+                with profiler.span('prediction'):
+                    if number_of_solves == 0:
+                        collectionutils.set_initial_prediction_attributes(
+                            col, attr_list, single_frame
+                        )
+                    # Count number of solves, so we don't need to set the
+                    # initial prediction attributes again.
+                    number_of_solves += 1
+
+                    # Calculate the mean, variance values, and predict the
+                    # next attribute value.
+                    collectionutils.compute_attribute_value_prediction(
+                        col, attr_list, single_frame,
                     )
-                # Count number of solves, so we don't need to set the
-                # initial prediction attributes again.
-                number_of_solves += 1
-
-                # Calculate the mean, variance values, and predict the
-                # next attribute value.
-                collectionutils.compute_attribute_value_prediction(
-                    col, attr_list, single_frame,
-                )
 
             # Update Progress
             interrupt = postSolve_setUpdateProgress(
@@ -841,7 +1277,10 @@ def execute(col,
             # Refresh the Viewport.
             if func_is_mmsolver is True:
                 frame = kwargs.get('frame')
-                postSolve_refreshViewport(options, frame)
+                refresh_scheduler.request(frame)
+
+        # Always draw the final solved state.
+        refresh_scheduler.flush()
     finally:
         # If something has gone wrong, or the user cancels the solver
         # without finishing, then we make sure to reconnect animcurves
@@ -850,9 +1289,10 @@ def execute(col,
             if len(save_node_attrs):
                 collectionutils.reconnect_animcurves(kwargs, save_node_attrs)
 
-        postSolve_setViewportState(
-            options, panel_objs, panel_node_type_vis
-        )
+        with profiler.span('restore_viewport_state'):
+            postSolve_setViewportState(
+                options, panel_objs, panel_node_type_vis
+            )
         collectionutils.run_status_func(status_fn, 'Solve Ended')
         collectionutils.run_progress_func(prog_fn, 100)
         maya.cmds.evaluationManager(
@@ -872,7 +1312,22 @@ def execute(col,
     # Store output information of the solver.
     end_time = time.time()
     duration = end_time - start_time
-    col._set_last_solve_timestamp(end_time)
-    col._set_last_solve_duration(duration)
-    col._set_last_solve_results(solres_list)
+    with profiler.span('store_results'):
+        col._set_last_solve_timestamp(end_time)
+        col._set_last_solve_duration(duration)
+        col._set_last_solve_results(solres_list)
+        stats = refresh_scheduler.get_statistics()
+        stats.update(validate_cache.get_statistics())
+        if validate_cache.skipped_count > 0:
+            LOG.info('Validated %r actions, skipped %r duplicate validations.',
+                     validate_cache.run_count, validate_cache.skipped_count)
+        col._set_last_solve_statistics(stats)
+        options_hash = solvehistory.create_options_hash(
+            options._asdict(),
+            validate_mode,
+            [sol.get_data() for sol in sol_list])
+        col._add_solve_history(
+            solres_list, end_time, duration,
+            options_hash=options_hash,
+            statistics=stats)
     return solres_list
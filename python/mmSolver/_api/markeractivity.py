@@ -0,0 +1,437 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+An index of the frames each Marker is enabled on.
+
+Querying the enabled state of a Marker with 'maya.cmds.getAttr(...,
+time=t)' for each frame and Marker is slow. The MarkerActivityIndex
+reads the enable (and weight) values of all Markers for a frame range
+once, by evaluating the animCurves directly, and stores the enable
+values of each Marker as a bit-mask of frames. Questions such as
+"which Markers are enabled on frame X?" or "which frames are all these
+Markers enabled on?" are then answered without querying Maya.
+
+Frames outside of the index frame range, fractional frames, and
+Markers not in the index, are queried from Maya, so the index always
+gives the same answer as 'Marker.get_enable'.
+
+Example usage::
+
+  >>> import mmSolver._api.markeractivity as markeractivity
+  >>> index = markeractivity.create_marker_activity_index(mkr_list, 1, 120)
+  >>> index.get_active_marker_nodes(42)
+  >>> index.get_first_last_frame(mkr_node)
+
+"""
+
+import maya.cmds
+import maya.OpenMaya as OpenMaya1
+import maya.OpenMayaAnim as OpenMayaAnim1
+
+import mmSolver.logger
+import mmSolver.utils.node as node_utils
+import mmSolver._api.constant as const
+
+
+LOG = mmSolver.logger.get_logger()
+
+
+def _get_plug_name(mkr_node, attr_name):
+    return '{0}.{1}'.format(mkr_node, attr_name)
+
+
+def _read_plug_values(plug_name, frame_list):
+    """
+    Read the values of a plug for each frame, in bulk.
+
+    If the plug is animated with an animCurve, the curve is evaluated
+    directly, if the plug is not connected the value is queried once.
+    Any other connection is queried for each frame.
+
+    :param plug_name: The 'node.attr' to read.
+    :type plug_name: str
+
+    :param frame_list: The frame numbers to read.
+    :type frame_list: [int, ..]
+
+    :rtype: [float, ..]
+    """
+    plug = node_utils.get_as_plug_apione(plug_name)
+    if plug is None:
+        return [0.0] * len(frame_list)
+
+    objs = OpenMaya1.MObjectArray()
+    find = OpenMayaAnim1.MAnimUtil.findAnimation(plug, objs)
+    if find is True and objs.length() == 1:
+        animfn = OpenMayaAnim1.MFnAnimCurve(objs[0])
+        mtime = OpenMaya1.MTime(0.0, OpenMaya1.MTime.uiUnit())
+        values = []
+        for f in frame_list:
+            mtime.setValue(f)
+            values.append(animfn.evaluate(mtime))
+        return values
+
+    if plug.isDestination() is False:
+        value = float(maya.cmds.getAttr(plug_name))
+        return [value] * len(frame_list)
+
+    return [float(maya.cmds.getAttr(plug_name, time=f))
+            for f in frame_list]
+
+
+def _get_plug_key_range(plug_name):
+    """
+    Get the first and last key frame of the animCurve connected to a
+    plug.
+
+    :param plug_name: The 'node.attr' to query.
+    :type plug_name: str
+
+    :returns: The first and last key frame numbers, or None if the
+              plug is not animated (or has no keys).
+    :rtype: (int, int) or None
+    """
+    anim_curves = maya.cmds.listConnections(plug_name, type='animCurve') or []
+    if len(anim_curves) == 0:
+        return None
+    key_times = maya.cmds.keyframe(
+        anim_curves[0],
+        query=True,
+        timeChange=True) or []
+    if len(key_times) == 0:
+        return None
+    return int(min(key_times)), int(max(key_times))
+
+
+def _values_to_bits(values):
+    bits = 0
+    for i, v in enumerate(values):
+        if int(round(v)) != 0:
+            bits |= 1 << i
+    return bits
+
+
+class MarkerActivityIndex(object):
+    """
+    The enabled frames of Markers, over a frame range.
+
+    The enabled state of each Marker is stored as an integer bit-mask,
+    the lowest bit is the start frame. Weights are read when first
+    requested for a Marker.
+    """
+
+    def __init__(self, start_frame, end_frame):
+        """
+        Create an empty index, use 'add_markers' to add Markers.
+
+        :param start_frame: The first frame of the index.
+        :type start_frame: int
+
+        :param end_frame: The last frame of the index.
+        :type end_frame: int
+        """
+        assert isinstance(start_frame, (int, long))
+        assert isinstance(end_frame, (int, long))
+        assert start_frame <= end_frame
+        self._start_frame = start_frame
+        self._end_frame = end_frame
+        self._mkr_node_list = []
+        self._enable_bits = {}
+        self._weights = {}
+        self._key_ranges = {}
+        return
+
+    def get_frame_range(self):
+        """
+        :returns: The start and end frame of the index.
+        :rtype: (int, int)
+        """
+        return self._start_frame, self._end_frame
+
+    def get_marker_node_list(self):
+        return list(self._mkr_node_list)
+
+    def has_marker(self, mkr_node):
+        return mkr_node in self._enable_bits
+
+    def _in_range(self, frame):
+        # Only whole frames are stored in the index.
+        if frame != int(frame):
+            return False
+        return self._start_frame <= frame <= self._end_frame
+
+    def _get_frame_list(self):
+        return list(range(self._start_frame, self._end_frame + 1))
+
+    def add_markers(self, mkr_node_list):
+        """
+        Read the enable values of the Markers, for every frame of the
+        index.
+
+        :param mkr_node_list: The Marker nodes to add.
+        :type mkr_node_list: [str, ..]
+        """
+        frame_list = self._get_frame_list()
+        attr_name = const.MARKER_ATTR_LONG_NAME_ENABLE
+        for mkr_node in mkr_node_list:
+            if mkr_node in self._enable_bits:
+                continue
+            plug_name = _get_plug_name(mkr_node, attr_name)
+            values = _read_plug_values(plug_name, frame_list)
+            self._enable_bits[mkr_node] = _values_to_bits(values)
+            self._mkr_node_list.append(mkr_node)
+        return
+
+    def _get_frames_bits(self, frame_list):
+        """
+        Convert frame numbers into a bit-mask, and the list of frames
+        outside of the index frame range.
+        """
+        if frame_list is None:
+            num = self._end_frame - self._start_frame + 1
+            return (1 << num) - 1, []
+        bits = 0
+        outside_frames = []
+        for f in frame_list:
+            if self._in_range(f):
+                bits |= 1 << (int(f) - self._start_frame)
+            else:
+                outside_frames.append(f)
+        return bits, outside_frames
+
+    def _bits_to_frames(self, bits):
+        start = self._start_frame
+        text = bin(bits)[2:][::-1]
+        return [start + i for i, c in enumerate(text) if c == '1']
+
+    def is_enabled(self, mkr_node, frame):
+        """
+        Is the Marker enabled on the frame?
+
+        :param mkr_node: The Marker node.
+        :type mkr_node: str
+
+        :param frame: The frame number.
+        :type frame: int
+
+        :rtype: bool
+        """
+        bits = self._enable_bits.get(mkr_node)
+        if bits is None or not self._in_range(frame):
+            plug_name = _get_plug_name(
+                mkr_node, const.MARKER_ATTR_LONG_NAME_ENABLE)
+            return bool(maya.cmds.getAttr(plug_name, time=frame))
+        return bool((bits >> (int(frame) - self._start_frame)) & 1)
+
+    def get_weight(self, mkr_node, frame):
+        """
+        Get the weight of the Marker on the frame.
+
+        :param mkr_node: The Marker node.
+        :type mkr_node: str
+
+        :param frame: The frame number.
+        :type frame: int
+
+        :rtype: float
+        """
+        plug_name = _get_plug_name(
+            mkr_node, const.MARKER_ATTR_LONG_NAME_WEIGHT)
+        if mkr_node not in self._enable_bits or not self._in_range(frame):
+            return maya.cmds.getAttr(plug_name, time=frame)
+        weights = self._weights.get(mkr_node)
+        if weights is None:
+            weights = _read_plug_values(plug_name, self._get_frame_list())
+            self._weights[mkr_node] = weights
+        return weights[int(frame) - self._start_frame]
+
+    def get_enabled_frames(self, mkr_node, frame_list=None):
+        """
+        Get the frames the Marker is enabled on.
+
+        :param mkr_node: The Marker node.
+        :type mkr_node: str
+
+        :param frame_list: Only consider these frame numbers. If None,
+                           all frames in the index are used.
+        :type frame_list: [int, ..] or None
+
+        :returns: The enabled frame numbers, in ascending order.
+        :rtype: [int, ..]
+        """
+        bits, outside_frames = self._get_frames_bits(frame_list)
+        mkr_bits = self._enable_bits.get(mkr_node)
+        if mkr_bits is None:
+            if frame_list is None:
+                frame_list = self._get_frame_list()
+            return sorted(set([f for f in frame_list
+                               if self.is_enabled(mkr_node, f)]))
+        frames = self._bits_to_frames(mkr_bits & bits)
+        if len(outside_frames) > 0:
+            frames += [f for f in outside_frames
+                       if self.is_enabled(mkr_node, f)]
+            frames = sorted(set(frames))
+        return frames
+
+    def get_key_range(self, mkr_node):
+        """
+        Get the first and last key frame of the Marker enable
+        attribute.
+
+        :param mkr_node: The Marker node.
+        :type mkr_node: str
+
+        :returns: The first and last key frame numbers, or None if the
+                  enable attribute is not animated.
+        :rtype: (int, int) or None
+        """
+        if mkr_node not in self._key_ranges:
+            plug_name = _get_plug_name(
+                mkr_node, const.MARKER_ATTR_LONG_NAME_ENABLE)
+            self._key_ranges[mkr_node] = _get_plug_key_range(plug_name)
+        return self._key_ranges[mkr_node]
+
+    def get_key_range_enabled_frames(self, mkr_node,
+                                     frame_range_start=None,
+                                     frame_range_end=None):
+        """
+        Get the frames the Marker is enabled on, the same as
+        'Marker.get_enabled_frames'.
+
+        If the Marker enable attribute is animated, the frames between
+        the first and last key are used, even outside of the given
+        frame range. Otherwise the frame range is used.
+
+        :param mkr_node: The Marker node.
+        :type mkr_node: str
+
+        :param frame_range_start: The first frame to consider when
+            the Marker is not animated. If None, the index start frame
+            is used.
+        :type frame_range_start: int or None
+
+        :param frame_range_end: The last frame to consider when the
+            Marker is not animated. If None, the index end frame is
+            used.
+        :type frame_range_end: int or None
+
+        :returns: The enabled frame numbers, in ascending order.
+        :rtype: [int, ..]
+        """
+        if frame_range_start is None:
+            frame_range_start = self._start_frame
+        if frame_range_end is None:
+            frame_range_end = self._end_frame
+        key_range = self.get_key_range(mkr_node)
+        if key_range is not None:
+            frame_range_start, frame_range_end = key_range
+        frame_list = list(range(frame_range_start, frame_range_end + 1))
+        return self.get_enabled_frames(mkr_node, frame_list=frame_list)
+
+    def get_enabled_frame_count(self, mkr_node, frame_list=None):
+        """
+        Count the frames the Marker is enabled on.
+
+        :rtype: int
+        """
+        bits, outside_frames = self._get_frames_bits(frame_list)
+        mkr_bits = self._enable_bits.get(mkr_node)
+        if mkr_bits is None or len(outside_frames) > 0:
+            return len(self.get_enabled_frames(mkr_node, frame_list))
+        return bin(mkr_bits & bits).count('1')
+
+    def get_first_last_frame(self, mkr_node, frame_list=None):
+        """
+        Get the first and last frame the Marker is enabled on.
+
+        :returns: The first and last frame numbers, or an empty list
+                  if the Marker is never enabled.
+        :rtype: [int, int] or []
+        """
+        frames = self.get_enabled_frames(mkr_node, frame_list=frame_list)
+        if len(frames) == 0:
+            return []
+        return [frames[0], frames[-1]]
+
+    def get_active_marker_nodes(self, frame, mkr_node_list=None):
+        """
+        Get the Markers enabled on the frame.
+
+        :param frame: The frame number.
+        :type frame: int
+
+        :param mkr_node_list: The Markers to consider, if None all
+                              Markers in the index are used.
+        :type mkr_node_list: [str, ..] or None
+
+        :returns: The enabled Marker nodes, in the given order.
+        :rtype: [str, ..]
+        """
+        if mkr_node_list is None:
+            mkr_node_list = self._mkr_node_list
+        return [n for n in mkr_node_list if self.is_enabled(n, frame)]
+
+    def get_common_frames(self, mkr_node_list, frame_list=None):
+        """
+        Get the frames that all the Markers are enabled on.
+
+        :param mkr_node_list: The Marker nodes.
+        :type mkr_node_list: [str, ..]
+
+        :param frame_list: Only consider these frame numbers. If None,
+                           all frames in the index are used.
+        :type frame_list: [int, ..] or None
+
+        :rtype: [int, ..]
+        """
+        if len(mkr_node_list) == 0:
+            return []
+        bits, outside_frames = self._get_frames_bits(frame_list)
+        missing = [n for n in mkr_node_list if n not in self._enable_bits]
+        for mkr_node in mkr_node_list:
+            if mkr_node in self._enable_bits:
+                bits &= self._enable_bits[mkr_node]
+        frames = self._bits_to_frames(bits)
+        frames += outside_frames
+        if len(missing) > 0 or len(outside_frames) > 0:
+            frames = [f for f in frames
+                      if all([self.is_enabled(n, f)
+                              for n in mkr_node_list])]
+        return sorted(set(frames))
+
+
+def create_marker_activity_index(mkr_list, start_frame, end_frame):
+    """
+    Create a MarkerActivityIndex for the Markers, over a frame range.
+
+    :param mkr_list: The Markers to index.
+    :type mkr_list: [Marker, ..]
+
+    :param start_frame: The first frame of the index.
+    :type start_frame: int
+
+    :param end_frame: The last frame of the index.
+    :type end_frame: int
+
+    :rtype: MarkerActivityIndex
+    """
+    index = MarkerActivityIndex(int(start_frame), int(end_frame))
+    mkr_node_list = [mkr.get_node() for mkr in mkr_list]
+    mkr_node_list = [n for n in mkr_node_list if n is not None]
+    index.add_markers(mkr_node_list)
+    return index
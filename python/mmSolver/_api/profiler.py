@@ -0,0 +1,304 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Measure the (wall clock) time spent in nested phases of the solver.
+
+Code marks a phase with the 'span' context manager. When no Profiler
+is active, 'span' returns a shared object that does nothing, so the
+spans can be left in the code at (almost) no cost.
+
+A Profiler aggregates the number of calls and time of each phase, and
+keeps the individual spans so they can be written as a Chrome trace
+event file, to be viewed in 'chrome://tracing' or 'Perfetto'.
+
+Example usage::
+
+  >>> import mmSolver.api as mmapi
+  >>> profiler = mmapi.Profiler()
+  >>> with profiler:
+  ...     mmapi.execute(col)
+  >>> print(profiler.format_phase_stats())
+  >>> profiler.write_chrome_trace('/path/to/trace.json')
+
+Adding a phase to a function::
+
+  >>> import mmSolver._api.profiler as profiler
+  >>> with profiler.span('compile'):
+  ...     do_something()
+
+"""
+
+import collections
+import json
+import os
+import timeit
+
+import mmSolver.logger
+
+
+LOG = mmSolver.logger.get_logger()
+
+# The maximum number of spans kept for the Chrome trace, the phase
+# statistics are always updated.
+MAX_EVENTS_DEFAULT = 100000
+
+PhaseStats = collections.namedtuple(
+    'PhaseStats',
+    ('count', 'total', 'minimum', 'maximum')
+)
+
+# The currently active Profiler, or None.
+__active_profiler = None
+
+
+class _NullSpan(object):
+    """A span that does nothing, used when no Profiler is active."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(object):
+    __slots__ = ('_profiler', '_name', '_args')
+
+    def __init__(self, profiler, name, args):
+        self._profiler = profiler
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._profiler._begin(self._name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler._end(self._args)
+        return False
+
+
+class Profiler(object):
+    """
+    Record the time of nested phases.
+
+    A phase is named by the path of the spans it is nested in, for
+    example 'execute/solve'.
+    """
+
+    def __init__(self, max_events=None):
+        """
+        :param max_events: The maximum number of spans to keep for
+                           the Chrome trace.
+        :type max_events: int or None
+        """
+        if max_events is None:
+            max_events = MAX_EVENTS_DEFAULT
+        self._max_events = max_events
+        self._clock = timeit.default_timer
+        self._origin = self._clock()
+        self._stack = []
+        self._events = []
+        self._dropped_events = 0
+        self._stats = {}
+        self._previous_profiler = None
+        return
+
+    def __enter__(self):
+        self._previous_profiler = get_active_profiler()
+        set_active_profiler(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        set_active_profiler(self._previous_profiler)
+        self._previous_profiler = None
+        return False
+
+    def span(self, name, **kwargs):
+        """
+        Measure a phase with this Profiler, used as a context manager.
+
+        :param name: The name of the phase.
+        :type name: str
+
+        :param kwargs: Values stored in the Chrome trace event 'args'.
+        """
+        return _Span(self, name, kwargs)
+
+    def _begin(self, name):
+        if len(self._stack) > 0:
+            path = self._stack[-1][0] + '/' + name
+        else:
+            path = name
+        self._stack.append((path, name, self._clock()))
+        return
+
+    def _end(self, args):
+        end = self._clock()
+        path, name, start = self._stack.pop()
+        duration = end - start
+
+        stats = self._stats.get(path)
+        if stats is None:
+            stats = PhaseStats(1, duration, duration, duration)
+        else:
+            stats = PhaseStats(
+                stats.count + 1,
+                stats.total + duration,
+                min(stats.minimum, duration),
+                max(stats.maximum, duration))
+        self._stats[path] = stats
+
+        if len(self._events) < self._max_events:
+            self._events.append(
+                (name, path, start - self._origin, duration, args))
+        else:
+            self._dropped_events += 1
+        return
+
+    def get_phase_stats(self):
+        """
+        Get the aggregated statistics of each phase.
+
+        :returns: Mapping of phase path to the number of calls and
+                  the total, minimum and maximum seconds of the phase.
+        :rtype: {str: PhaseStats}
+        """
+        return dict(self._stats)
+
+    def format_phase_stats(self):
+        """
+        Format the phase statistics as a table, one phase per line.
+
+        :rtype: str
+        """
+        lines = ['{0:<48} {1:>8} {2:>12} {3:>12}'.format(
+            'phase', 'count', 'total (s)', 'max (s)')]
+        for path in sorted(self._stats.keys()):
+            stats = self._stats[path]
+            depth = path.count('/')
+            name = ('  ' * depth) + path.rsplit('/', 1)[-1]
+            lines.append('{0:<48} {1:>8} {2:>12.6f} {3:>12.6f}'.format(
+                name, stats.count, stats.total, stats.maximum))
+        return '\n'.join(lines)
+
+    def get_trace_events(self):
+        """
+        Get the spans as Chrome trace events.
+
+        :returns: A list of 'complete' events, with times in
+                  microseconds.
+        :rtype: [dict, ..]
+        """
+        pid = os.getpid()
+        events = []
+        for name, path, start, duration, args in self._events:
+            event = {
+                'name': name,
+                'cat': path.split('/', 1)[0],
+                'ph': 'X',
+                'ts': start * 1000000.0,
+                'dur': duration * 1000000.0,
+                'pid': pid,
+                'tid': 0,
+            }
+            if len(args) > 0:
+                event['args'] = args
+            events.append(event)
+        return events
+
+    def write_chrome_trace(self, file_path):
+        """
+        Write the spans to a Chrome trace event JSON file.
+
+        :param file_path: The file path to write.
+        :type file_path: str
+        """
+        if self._dropped_events > 0:
+            LOG.warn('Profiler dropped %r spans from the trace.',
+                     self._dropped_events)
+        data = {
+            'traceEvents': self.get_trace_events(),
+            'displayTimeUnit': 'ms',
+        }
+        with open(file_path, 'w') as f:
+            json.dump(data, f, default=repr)
+        return
+
+
+def get_active_profiler():
+    """
+    :rtype: Profiler or None
+    """
+    global __active_profiler
+    return __active_profiler
+
+
+def set_active_profiler(profiler):
+    """
+    Set the Profiler used by 'span', None disables profiling.
+
+    :type profiler: Profiler or None
+    """
+    global __active_profiler
+    __active_profiler = profiler
+    return
+
+
+def span(name, **kwargs):
+    """
+    Measure a phase with the active Profiler.
+
+    When no Profiler is active this does nothing.
+
+    :param name: The name of the phase.
+    :type name: str
+
+    :param kwargs: Values stored in the Chrome trace event 'args'.
+
+    :rtype: context manager
+    """
+    global __active_profiler
+    if __active_profiler is None:
+        return _NULL_SPAN
+    return _Span(__active_profiler, name, kwargs)
+
+
+def iter_span(iterable, name):
+    """
+    Measure the time taken to produce each item of 'iterable', as a
+    phase.
+
+    :param iterable: The iterable (for example a generator) to
+                     measure.
+    :param name: The name of the phase.
+    :type name: str
+
+    :rtype: generator
+    """
+    iterator = iter(iterable)
+    while True:
+        with span(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
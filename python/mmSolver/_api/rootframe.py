@@ -49,6 +49,7 @@ import collections
 import mmSolver.logger
 import mmSolver._api.constant as const
 import mmSolver._api.attribute as attribute
+import mmSolver._api.markeractivity as markeractivity
 
 
 LOG = mmSolver.logger.get_logger()
@@ -125,7 +126,8 @@ def _default_to_regular(d):
 
 def _markers_to_data_lists(mkr_list,
                            start_frame, end_frame,
-                           min_frames_per_marker):
+                           min_frames_per_marker,
+                           mkr_activity_index):
     mkr_node_list = []
     mkr_enabled_frames = {}
     mkr_min_frames_count = {}
@@ -133,7 +135,8 @@ def _markers_to_data_lists(mkr_list,
     for mkr in mkr_list:
         mkr_node = mkr.get_node()
         mkr_node_list.append(mkr_node)
-        enabled_frames = mkr.get_enabled_frames(
+        enabled_frames = mkr_activity_index.get_key_range_enabled_frames(
+            mkr_node,
             frame_range_start=start_frame,
             frame_range_end=end_frame)
 
@@ -147,7 +150,8 @@ def _markers_to_data_lists(mkr_list,
 
 
 def get_root_frames_from_markers(mkr_list, min_frames_per_marker,
-                                 start_frame, end_frame):
+                                 start_frame, end_frame,
+                                 mkr_activity_index=None):
     """
     Get root frames numbers from the markers.
 
@@ -166,6 +170,11 @@ def get_root_frames_from_markers(mkr_list, min_frames_per_marker,
     :param end_frame:
         The last frame to consider as a root frame.
     :type end_frame: int
+
+    :param mkr_activity_index:
+        The enabled frames of the Markers. If None, an index is
+        created for the start and end frame.
+    :type mkr_activity_index: MarkerActivityIndex or None
     """
     # In future, this paper has a very promising "key-frame selection
     # criterion", which could be used to increase quality and speed of
@@ -179,23 +188,26 @@ def get_root_frames_from_markers(mkr_list, min_frames_per_marker,
     #
     # https://www.researchgate.net/publication/260616120_Optimal_key-frame_selection_for_video-based_structure-from-motion
     #
-    all_frames = range(start_frame, end_frame + 1)
     root_frames = list()
     mkr_root_frames = collections.defaultdict(set)
     root_frame_mkr_list = collections.defaultdict(set)
 
+    if mkr_activity_index is None:
+        mkr_activity_index = markeractivity.create_marker_activity_index(
+            mkr_list, start_frame, end_frame)
+
     # Convert Markers to data lists.
     mkr_node_list, mkr_enabled_frames, mkr_min_frames_count = \
         _markers_to_data_lists(
-            mkr_list, start_frame, end_frame, min_frames_per_marker)
+            mkr_list, start_frame, end_frame, min_frames_per_marker,
+            mkr_activity_index)
 
     # Create maps for frames and markers.
     for mkr_node in mkr_node_list:
         enabled_frames = mkr_enabled_frames[mkr_node]
-        for f in all_frames:
-            if f in enabled_frames:
-                mkr_root_frames[mkr_node].add(f)
-                root_frame_mkr_list[f].add(mkr_node)
+        for f in enabled_frames:
+            mkr_root_frames[mkr_node].add(f)
+            root_frame_mkr_list[f].add(mkr_node)
 
     common_nodes = collections.defaultdict(
         lambda: collections.defaultdict(
@@ -0,0 +1,290 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+A bounded history of solver runs, stored on a Collection.
+
+Each run stores the timestamp, duration, a hash of the options used
+and the per-frame errors, as compressed arrays. Only the last runs
+are kept; when there are more runs than 'max_runs', or the runs use
+more than 'max_bytes', the oldest runs are removed first.
+
+The history is a plain data structure (so it can be stored as JSON
+on a node), and this module does not depend on Maya.
+"""
+
+import array
+import base64
+import hashlib
+import json
+import numbers
+import sys
+import zlib
+
+import mmSolver.logger
+import mmSolver._api.solveresult as solveresult
+
+
+LOG = mmSolver.logger.get_logger()
+
+HISTORY_FORMAT_VERSION = 1
+
+# The default number of solver runs, and the default size of the
+# runs, stored on a Collection.
+SOLVE_HISTORY_MAX_RUNS_DEFAULT = 10
+SOLVE_HISTORY_MAX_BYTES_DEFAULT = 1024 * 1024
+
+# Approximate size of a run, without the error arrays.
+_RUN_OVERHEAD_BYTES = 128
+
+
+def encode_float_array(values):
+    """
+    Compress float values into a text string.
+
+    :param values: Float values to encode.
+    :type values: [float, ..]
+
+    :returns: The values as little-endian doubles, compressed with
+              zlib and encoded as base64 text.
+    :rtype: str
+    """
+    arr = array.array('d', values)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    if sys.version_info[0] == 2:
+        data = arr.tostring()
+    else:
+        data = arr.tobytes()
+    data = zlib.compress(data, solveresult.ENCODE_COMPRESS_LEVEL)
+    return base64.b64encode(data).decode('ascii')
+
+
+def decode_float_array(value):
+    """
+    Decompress float values, encoded with 'encode_float_array'.
+
+    :param value: The encoded text.
+    :type value: str
+
+    :rtype: array.array
+    """
+    data = zlib.decompress(base64.b64decode(value.encode('ascii')))
+    arr = array.array('d')
+    if sys.version_info[0] == 2:
+        arr.fromstring(data)
+    else:
+        arr.frombytes(data)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def create_options_hash(*values):
+    """
+    Create a hash for the given (JSON compatible) values.
+
+    The same values always produce the same hash, so runs solved with
+    the same options can be found.
+
+    :rtype: str
+    """
+    text = json.dumps(values, sort_keys=True, default=repr)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def create_history(max_runs=None, max_bytes=None):
+    """
+    Create a new (empty) history.
+
+    :param max_runs: The maximum number of runs to keep.
+    :type max_runs: int or None
+
+    :param max_bytes: The maximum number of (encoded) bytes used by
+                      the runs.
+    :type max_bytes: int or None
+
+    :rtype: dict
+    """
+    if max_runs is None:
+        max_runs = SOLVE_HISTORY_MAX_RUNS_DEFAULT
+    if max_bytes is None:
+        max_bytes = SOLVE_HISTORY_MAX_BYTES_DEFAULT
+    assert isinstance(max_runs, numbers.Integral)
+    assert isinstance(max_bytes, numbers.Integral)
+    history = {
+        'version': HISTORY_FORMAT_VERSION,
+        'max_runs': max_runs,
+        'max_bytes': max_bytes,
+        'runs': [],
+    }
+    return history
+
+
+def is_valid_history(history):
+    """
+    Is the given data a history that can be used by this module?
+
+    :rtype: bool
+    """
+    if isinstance(history, dict) is False:
+        return False
+    return history.get('version') == HISTORY_FORMAT_VERSION
+
+
+def create_run(solres_list, timestamp, duration, options_hash=None,
+               statistics=None):
+    """
+    Create a run from the results of a solve.
+
+    :param solres_list: The results from a solve.
+    :type solres_list: [SolveResult, ..]
+
+    :param timestamp: The time the solve ended.
+    :type timestamp: float
+
+    :param duration: The number of seconds the solve took.
+    :type duration: float
+
+    :param options_hash: A hash of the options used for the solve,
+                         see 'create_options_hash'.
+    :type options_hash: str or None
+
+    :param statistics: Execution statistics of the solve, for example
+                       the time spent refreshing the viewport.
+    :type statistics: dict or None
+
+    :rtype: dict
+    """
+    if statistics is None:
+        statistics = {}
+    frame_error_list = solveresult.merge_frame_error_list(solres_list)
+    frames = sorted(frame_error_list.keys())
+    errors = [frame_error_list[f] for f in frames]
+    success = all([solres.get_success() for solres in solres_list])
+    run = {
+        'timestamp': timestamp,
+        'duration': duration,
+        'options_hash': options_hash,
+        'success': success,
+        'statistics': statistics,
+        'frames': encode_float_array(frames),
+        'errors': encode_float_array(errors),
+    }
+    return run
+
+
+def get_run_byte_size(run):
+    """
+    The approximate number of bytes used by a run.
+
+    :rtype: int
+    """
+    return _RUN_OVERHEAD_BYTES + len(run['frames']) + len(run['errors'])
+
+
+def get_history_byte_size(history):
+    """
+    The approximate number of bytes used by all runs in the history.
+
+    :rtype: int
+    """
+    return sum([get_run_byte_size(run) for run in history['runs']])
+
+
+def evict_runs(history):
+    """
+    Remove the oldest runs until the history is within the limits.
+
+    :param history: The history to change.
+    :type history: dict
+
+    :returns: The number of runs removed.
+    :rtype: int
+    """
+    runs = history['runs']
+    max_runs = max(0, history['max_runs'])
+    max_bytes = history['max_bytes']
+    num = len(runs)
+    byte_size = get_history_byte_size(history)
+    while len(runs) > 0:
+        if len(runs) <= max_runs and byte_size <= max_bytes:
+            break
+        run = runs.pop(0)
+        byte_size -= get_run_byte_size(run)
+    return num - len(runs)
+
+
+def add_run(history, run):
+    """
+    Add a run to the history, removing the oldest runs as needed.
+
+    A run larger than the whole byte budget is not added.
+
+    :param history: The history to change.
+    :type history: dict
+
+    :param run: The run to add, created by 'create_run'.
+    :type run: dict
+
+    :rtype: None
+    """
+    if get_run_byte_size(run) > history['max_bytes']:
+        LOG.debug('Solve run is too large to store in history.')
+        return
+    history['runs'].append(run)
+    evict_runs(history)
+    return
+
+
+def get_run_frame_error_list(run):
+    """
+    Decode the per-frame errors of a run.
+
+    :returns: Mapping of frame number to error values.
+    :rtype: {float: float}
+    """
+    frames = decode_float_array(run['frames'])
+    errors = decode_float_array(run['errors'])
+    return dict(zip(frames, errors))
+
+
+def diff_frame_error_list(run_a, run_b):
+    """
+    Compare the per-frame errors of two runs.
+
+    Only the frames in both runs are compared.
+
+    :param run_a: The first run.
+    :type run_a: dict
+
+    :param run_b: The second run.
+    :type run_b: dict
+
+    :returns: Mapping of frame number to the error difference, the
+              error of 'run_b' minus the error of 'run_a'.
+    :rtype: {float: float}
+    """
+    frame_error_list_a = get_run_frame_error_list(run_a)
+    frame_error_list_b = get_run_frame_error_list(run_b)
+    diff = {}
+    for frame, error_b in frame_error_list_b.items():
+        error_a = frame_error_list_a.get(frame)
+        if error_a is None:
+            continue
+        diff[frame] = error_b - error_a
+    return diff
@@ -33,6 +33,7 @@ MARKER_STATIC_VALUES_KEY = 'marker_state_values'
 ATTR_STATIC_VALUES_KEY = 'attribute_state_values'
 ATTR_STIFFNESS_STATIC_VALUES_KEY = 'attribute_stiffness_state_values'
 ATTR_SMOOTHNESS_STATIC_VALUES_KEY = 'attribute_smoothness_state_values'
+MARKER_ACTIVITY_INDEX_KEY = 'marker_activity_index'
 
 
 class SolverBase(object):
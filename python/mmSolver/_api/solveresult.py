@@ -19,27 +19,61 @@
 The information returned from a solve.
 """
 
+import array
+import base64
 import collections
 import math
 import datetime
+import zlib
+
 import mmSolver.logger
 
+# NumPy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 LOG = mmSolver.logger.get_logger()
 KEY_VALUE_SEP_CHAR = '='
 SPLIT_SEP_CHAR = '#'
 
-
-def parse_command_result(cmd_result):
+# The per-frame and per-marker error data is large, and is only
+# parsed when it is first used.
+ERROR_PER_FRAME_KEY = 'error_per_frame'
+ERROR_PER_MARKER_PER_FRAME_KEY = 'error_per_marker_per_frame'
+ERROR_STREAM_KEYS = (
+    ERROR_PER_FRAME_KEY,
+    ERROR_PER_MARKER_PER_FRAME_KEY,
+)
+
+# Solve results are stored on a Collection node as compressed
+# text. The 'summary' holds everything except the per-marker errors,
+# which are stored in 'details' and only decoded when requested.
+ENCODE_FORMAT_VERSION = 1
+ENCODE_DETAIL_KEYS = (
+    ERROR_PER_MARKER_PER_FRAME_KEY,
+)
+ENCODE_COMPRESS_LEVEL = 6
+
+
+def parse_command_result(cmd_result, lazy_keys=None):
     """
     Convert results from the mmSolver command into python data structure.
 
     :param cmd_result: 'mmSolver' command result.
     :type cmd_result: list of str
 
+    :param lazy_keys: Keys with values that are not split; the
+                      unparsed value string is stored instead.
+    :type lazy_keys: [str, ..] or None
+
     :return: dict with keys and values for each entry in the result.
     :rtype: dict
     """
+    if lazy_keys is None:
+        lazy_keys = ()
     data = collections.defaultdict(list)
     for res in cmd_result:
         assert isinstance(res, (str, unicode))
@@ -48,12 +82,57 @@ def parse_command_result(cmd_result):
         value = splt[-1]
         if len(key) == 0:
             continue
-        if SPLIT_SEP_CHAR in value:
+        if key not in lazy_keys and SPLIT_SEP_CHAR in value:
             value = value.split(SPLIT_SEP_CHAR)
         data[key].append(value)
     return data
 
 
+def _split_columns(key, lines, num_columns):
+    """
+    Split 'value#value#...' lines into columns of strings.
+
+    Lines without enough values are skipped.
+
+    :rtype: [[str, ..], ..]
+    """
+    columns = [[] for _ in range(num_columns)]
+    for line in lines:
+        values = line.split(SPLIT_SEP_CHAR)
+        if len(values) < num_columns:
+            msg = 'mmSolver data is incomplete, skipping: key=%r value=%r'
+            LOG.debug(msg, key, line)
+            continue
+        for column, value in zip(columns, values):
+            column.append(value)
+    return columns
+
+
+def _to_float_array(values):
+    """
+    Convert strings into a typed array of floats.
+
+    NaN and infinite values are replaced with -1.0.
+
+    :param values: Strings of float numbers.
+    :type values: [str, ..]
+
+    :returns: A NumPy array if NumPy is available, otherwise an
+              'array.array' of doubles.
+    :rtype: numpy.ndarray or array.array
+    """
+    if np is not None:
+        arr = np.fromiter((float(v) for v in values),
+                          dtype=np.float64, count=len(values))
+        arr[~np.isfinite(arr)] = -1.0
+        return arr
+    arr = array.array('d', [float(v) for v in values])
+    for i, v in enumerate(arr):
+        if math.isinf(v) or math.isnan(v):
+            arr[i] = -1.0
+    return arr
+
+
 def _convert_to(name, key, typ, value, index):
     """
     Convert data returned from mmSolver into the value it's meant to be.
@@ -119,19 +198,25 @@ class SolveResult(object):
     needed. This class never modifies data, it only stores and queries
     data.
     """
-    def __init__(self, cmd_data):
+    def __init__(self, cmd_data, encoded_details=None):
         """
         Create a new SolveResult using command data from
         *maya.cmds.mmSolver* command.
 
         :param cmd_data: Command data from mmSolver.
         :type cmd_data: [[str, ..], ..]
+
+        :param encoded_details: More command data, encoded with
+                                'encode_data_lines'. The data is
+                                decoded only when it is needed.
+        :type encoded_details: str or None
         """
         if isinstance(cmd_data, list) is False:
             msg = 'cmd_data is of type %r, expected a list object.'
             raise TypeError(msg % type(cmd_data))
         self._raw_data = list(cmd_data)
-        data = parse_command_result(cmd_data)
+        self._encoded_details = encoded_details
+        data = parse_command_result(cmd_data, lazy_keys=ERROR_STREAM_KEYS)
 
         # Common warning message in this method.
         msg = 'mmSolver data is incomplete, '
@@ -206,36 +291,54 @@ class SolveResult(object):
             v = _convert_to(name, key, typ, value, index)
             self._print_stats[name] = v
 
-        # List of errors, per-marker, per-frame.
+        # Errors per-marker, per-frame and errors per-frame are
+        # stored unparsed, and converted into arrays on first use.
         # Allows graphing the errors and detecting problems.
-        self._per_marker_per_frame_error = collections.defaultdict(dict)
-        key = 'error_per_marker_per_frame'
-        values = data.get(key)
-        name = ''
-        if values is None or len(values) == 0:
-            LOG.debug(msg.format(name, key, 'None', values))
-        else:
-            for value in values:
-                mkr = _convert_to(name, key, str, value, 0)
-                t = _convert_to(name, key, float, value, 1)
-                v = _convert_to(name, key, float, value, 2)
-                self._per_marker_per_frame_error[mkr][t] = v
+        self._error_lines = {}
+        for key in ERROR_STREAM_KEYS:
+            values = data.get(key)
+            if values is None or len(values) == 0:
+                LOG.debug(msg.format('', key, 'None', values))
+                values = []
+            self._error_lines[key] = values
+        self._per_frame_error_arrays = None
+        self._per_frame_error = None
+        self._per_marker_per_frame_error_arrays = None
+        self._per_marker_per_frame_error = None
+        return
 
-        # Errors per frame
-        # Allows graphing the errors and detecting problems.
-        self._per_frame_error = {}
-        name = ''
-        key = 'error_per_frame'
-        values = data.get(key)
-        if values is None or len(values) == 0:
-            LOG.debug(msg.format(name, key, 'None', values))
-        else:
-            for value in values:
-                t = _convert_to(name, key, float, value, 0)
-                v = _convert_to(name, key, float, value, 1)
-                self._per_frame_error[t] = v
+    def _decode_details(self):
+        """
+        Decode the detailed command data, if it has not been already.
+        """
+        if self._encoded_details is None:
+            return
+        lines = decode_data_lines(self._encoded_details)
+        self._encoded_details = None
+        self._raw_data += lines
+        data = parse_command_result(lines, lazy_keys=ERROR_STREAM_KEYS)
+        for key in ERROR_STREAM_KEYS:
+            values = data.get(key)
+            if values:
+                self._error_lines[key] = self._error_lines[key] + values
         return
 
+    def _get_per_frame_error(self):
+        if self._per_frame_error is None:
+            frames, errors = self.get_frame_error_arrays()
+            self._per_frame_error = dict(zip(frames.tolist(),
+                                             errors.tolist()))
+        return self._per_frame_error
+
+    def _get_per_marker_per_frame_error(self):
+        if self._per_marker_per_frame_error is None:
+            data = collections.defaultdict(dict)
+            arrays = self.get_marker_error_arrays()
+            for mkr, (frames, errors) in arrays.items():
+                data[mkr] = dict(zip(frames.tolist(), errors.tolist()))
+            self._per_marker_per_frame_error = data
+        return self._per_marker_per_frame_error
+
     def get_data_raw(self):
         """
         Get a copy of the raw data given to this object at initialization.
@@ -243,6 +346,7 @@ class SolveResult(object):
         It is possible to re-create this object exactly by saving this
         raw data and re-initializing the object with this data.
         """
+        self._decode_details()
         return list(self._raw_data)
 
     def get_success(self):
@@ -292,13 +396,83 @@ class SolveResult(object):
         """
         The list of frames that this solve result contains.
         """
-        return list(sorted(self._per_frame_error.keys()))
+        return list(sorted(self._get_per_frame_error().keys()))
 
     def get_frame_error_list(self):
         """
         The error (deviation) per-frame of the solver.
         """
-        return self._per_frame_error.copy()
+        return self._get_per_frame_error().copy()
+
+    def get_frame_error_arrays(self):
+        """
+        The frames and error (deviation) per-frame of the solver, as
+        arrays.
+
+        The arrays are parsed on the first call, and the same arrays
+        are returned afterwards; they must not be modified.
+
+        :returns: The frames and the errors, in the order given by the
+                  solver. NumPy arrays are returned if NumPy is
+                  available, otherwise 'array.array' objects.
+        :rtype: (numpy.ndarray, numpy.ndarray) or
+                (array.array, array.array)
+        """
+        if self._per_frame_error_arrays is None:
+            key = ERROR_PER_FRAME_KEY
+            frames, errors = _split_columns(key, self._error_lines[key], 2)
+            self._per_frame_error_arrays = (
+                _to_float_array(frames),
+                _to_float_array(errors),
+            )
+        return self._per_frame_error_arrays
+
+    def get_marker_error_arrays(self, marker_node=None):
+        """
+        Get the frames and errors (deviation) for all markers, or the
+        given marker, as arrays.
+
+        The arrays are parsed on the first call, and the same arrays
+        are returned afterwards; they must not be modified.
+
+        :param marker_node: The specific marker node to get arrays for.
+        :type marker_node: str or None
+
+        :returns: A dict of marker node names to frame and error
+                  arrays, or the frame and error arrays of the given
+                  marker node (None if the marker is not found).
+        :rtype: {str: (array, array)} or (array, array) or None
+        """
+        assert marker_node is None or isinstance(marker_node, (str, unicode))
+        if self._per_marker_per_frame_error_arrays is None:
+            self._decode_details()
+            key = ERROR_PER_MARKER_PER_FRAME_KEY
+            mkr_nodes, frames, errors = _split_columns(
+                key, self._error_lines[key], 3)
+            frames = _to_float_array(frames)
+            errors = _to_float_array(errors)
+
+            # Group the rows of each marker.
+            indices = collections.defaultdict(list)
+            for i, mkr_node in enumerate(mkr_nodes):
+                indices[str(mkr_node)].append(i)
+            arrays = {}
+            for mkr_node, mkr_indices in indices.items():
+                if np is not None:
+                    mkr_indices = np.array(mkr_indices, dtype=np.intp)
+                    arrays[mkr_node] = (frames[mkr_indices],
+                                        errors[mkr_indices])
+                else:
+                    arrays[mkr_node] = (
+                        array.array('d', [frames[i] for i in mkr_indices]),
+                        array.array('d', [errors[i] for i in mkr_indices]),
+                    )
+            self._per_marker_per_frame_error_arrays = arrays
+
+        arrays = self._per_marker_per_frame_error_arrays
+        if marker_node is None:
+            return arrays.copy()
+        return arrays.get(marker_node)
 
     def get_marker_error_list(self, marker_node=None):
         """
@@ -313,13 +487,300 @@ class SolveResult(object):
         """
         assert marker_node is None or isinstance(marker_node, (str, unicode))
         v = None
+        data = self._get_per_marker_per_frame_error()
         if marker_node is None:
-            v = self._per_marker_per_frame_error.copy()
-        elif marker_node in self._per_marker_per_frame_error:
-            v = self._per_marker_per_frame_error.get(marker_node)
+            v = data.copy()
+        elif marker_node in data:
+            v = data.get(marker_node)
         return v
 
 
+def encode_data_lines(lines):
+    """
+    Compress lines of command data into a text string.
+
+    :param lines: Lines of command data.
+    :type lines: [str, ..]
+
+    :returns: The lines compressed with zlib, and encoded as base64
+              text.
+    :rtype: str
+    """
+    text = '\n'.join(lines).encode('utf-8')
+    data = zlib.compress(text, ENCODE_COMPRESS_LEVEL)
+    return base64.b64encode(data).decode('ascii')
+
+
+def decode_data_lines(value):
+    """
+    Decompress lines of command data, encoded by 'encode_data_lines'.
+
+    :param value: The encoded text.
+    :type value: str
+
+    :rtype: [str, ..]
+    """
+    data = base64.b64decode(value.encode('ascii'))
+    text = zlib.decompress(data).decode('utf-8')
+    if len(text) == 0:
+        return []
+    return text.split('\n')
+
+
+def encode_solve_results(solres_list):
+    """
+    Encode SolveResult objects into a compact data structure, for
+    storage on a node.
+
+    The per-marker errors are stored separately from the summary,
+    so they can be decoded only when requested.
+
+    :param solres_list: The SolveResult objects to encode.
+    :type solres_list: [SolveResult, ..]
+
+    :returns: Data structure that can be serialised as JSON.
+    :rtype: dict
+    """
+    results = []
+    for solres in solres_list:
+        assert isinstance(solres, SolveResult)
+        summary_lines = []
+        detail_lines = []
+        for line in solres.get_data_raw():
+            key = line.partition(KEY_VALUE_SEP_CHAR)[0]
+            if key in ENCODE_DETAIL_KEYS:
+                detail_lines.append(line)
+            else:
+                summary_lines.append(line)
+        results.append({
+            'summary': encode_data_lines(summary_lines),
+            'details': encode_data_lines(detail_lines),
+        })
+    data = {
+        'version': ENCODE_FORMAT_VERSION,
+        'results': results,
+    }
+    return data
+
+
+def decode_solve_results(data):
+    """
+    Decode SolveResult objects from data stored on a node.
+
+    Both the data from 'encode_solve_results' and the older
+    (uncompressed) list of raw command data are supported.
+
+    :param data: The data structure to decode.
+    :type data: dict or list or None
+
+    :rtype: [SolveResult, ..]
+    """
+    solres_list = []
+    if not data:
+        return solres_list
+    if isinstance(data, list):
+        for raw_data in data:
+            solres_list.append(SolveResult(raw_data))
+        return solres_list
+    if isinstance(data, dict) is False:
+        LOG.warning('Solve results data is not valid: %r', type(data))
+        return solres_list
+
+    version = data.get('version')
+    if version != ENCODE_FORMAT_VERSION:
+        msg = 'Solve results format version is not supported: %r'
+        LOG.warning(msg, version)
+        return solres_list
+    for result in data.get('results', []):
+        summary_lines = decode_data_lines(result['summary'])
+        solres = SolveResult(
+            summary_lines,
+            encoded_details=result.get('details'))
+        solres_list.append(solres)
+    return solres_list
+
+
+def _check_solve_result_list(solres_list):
+    assert isinstance(solres_list, (list, tuple))
+    msg = 'solres must be a SolveResult object: solres=%r'
+    for solres in solres_list:
+        if isinstance(solres, SolveResult) is False:
+            raise TypeError(msg % solres)
+    return
+
+
+def _merge_arrays(frames_list, errors_list):
+    """
+    Concatenate frame and error arrays, keeping only the last error
+    value of each frame.
+
+    :returns: The sorted unique frames, and the errors.
+    :rtype: (array, array)
+    """
+    if np is not None:
+        if len(frames_list) == 0:
+            return (np.array([], dtype=np.float64),
+                    np.array([], dtype=np.float64))
+        frames = np.concatenate(frames_list)
+        errors = np.concatenate(errors_list)
+        # 'np.unique' returns the first index of each frame, reverse
+        # the arrays to get the last.
+        frames, indices = np.unique(frames[::-1], return_index=True)
+        errors = errors[::-1][indices]
+        return frames, errors
+
+    frame_error_list = {}
+    for frames, errors in zip(frames_list, errors_list):
+        frame_error_list.update(zip(frames, errors))
+    frames = sorted(frame_error_list.keys())
+    errors = [frame_error_list[f] for f in frames]
+    return array.array('d', frames), array.array('d', errors)
+
+
+def _get_average_error(errors):
+    num = len(errors)
+    if num == 0:
+        return 0.0
+    if np is not None:
+        return float(np.mean(errors))
+    return math.fsum(errors) / float(num)
+
+
+def _get_max_error(frames, errors):
+    frame = None
+    error = -0.0
+    if len(errors) == 0:
+        return frame, error
+    if np is not None:
+        index = int(np.argmax(errors))
+    else:
+        index = max(range(len(errors)), key=errors.__getitem__)
+    x = float(errors[index])
+    if x > error:
+        frame = int(frames[index])
+        error = x
+    return frame, error
+
+
+def merge_frame_error_arrays(solres_list):
+    """
+    Combine the per-frame error arrays from a list of SolveResult
+    objects.
+
+    The 'solres_list' is assumed to represent sequential solver
+    executions; The order of this list is important, because only
+    the last solved error value is used.
+
+    :param solres_list: List of SolveResult to merge together.
+    :type solres_list: [SolveResult, ..]
+
+    :returns: The sorted frame numbers and error values. NumPy arrays
+              are returned if NumPy is available, otherwise
+              'array.array' objects.
+    :rtype: (array, array)
+    """
+    _check_solve_result_list(solres_list)
+    frames_list = []
+    errors_list = []
+    for solres in solres_list:
+        frames, errors = solres.get_frame_error_arrays()
+        frames_list.append(frames)
+        errors_list.append(errors)
+    return _merge_arrays(frames_list, errors_list)
+
+
+def merge_marker_error_arrays(solres_list):
+    """
+    Combine the per-marker error arrays from a list of SolveResult
+    objects.
+
+    .. note::
+       The 'solres_list' is assumed to represent sequential
+       solver executions; The order of this list is important, because
+       only the last solved error value is used.
+
+    :param solres_list: List of SolveResult to merge together.
+    :type solres_list: [SolveResult, ..]
+
+    :returns: Mapping of marker node to the sorted frame numbers and
+              error values.
+    :rtype: {str: (array, array)}
+    """
+    _check_solve_result_list(solres_list)
+    frames_list = collections.defaultdict(list)
+    errors_list = collections.defaultdict(list)
+    for solres in solres_list:
+        arrays = solres.get_marker_error_arrays()
+        for mkr_node, (frames, errors) in arrays.items():
+            frames_list[mkr_node].append(frames)
+            errors_list[mkr_node].append(errors)
+    marker_error_arrays = {}
+    for mkr_node in frames_list.keys():
+        marker_error_arrays[mkr_node] = _merge_arrays(
+            frames_list[mkr_node],
+            errors_list[mkr_node])
+    return marker_error_arrays
+
+
+SolveResultSummary = collections.namedtuple(
+    'SolveResultSummary',
+    ('success',
+     'frames',
+     'errors',
+     'average_error',
+     'max_frame',
+     'max_error',
+     'timer_stats')
+)
+
+
+def summarise_solve_results(solres_list):
+    """
+    Merge the SolveResult objects, and compute the error statistics.
+
+    The per-frame errors of all SolveResults are merged and measured
+    with arrays, rather than per-frame dictionaries.
+
+    :param solres_list: List of SolveResult to merge together.
+    :type solres_list: [SolveResult, ..]
+
+    :returns: The success of all SolveResults, the merged frames and
+              errors, the average error, the frame and value of the
+              maximum error and the combined timer statistics.
+    :rtype: SolveResultSummary
+    """
+    frames, errors = merge_frame_error_arrays(solres_list)
+    success = all([solres.get_success() is True for solres in solres_list])
+    max_frame, max_error = _get_max_error(frames, errors)
+    summary = SolveResultSummary(
+        success=success,
+        frames=frames,
+        errors=errors,
+        average_error=_get_average_error(errors),
+        max_frame=max_frame,
+        max_error=max_error,
+        timer_stats=combine_timer_stats(solres_list),
+    )
+    return summary
+
+
+def get_average_marker_error_list(solres_list):
+    """
+    Get the average error of each marker, across all frames.
+
+    :param solres_list: List of SolveResult to merge together.
+    :type solres_list: [SolveResult, ..]
+
+    :returns: Mapping of marker node to average error.
+    :rtype: {str: float}
+    """
+    marker_error_arrays = merge_marker_error_arrays(solres_list)
+    marker_error_list = {}
+    for mkr_node, (_, errors) in marker_error_arrays.items():
+        marker_error_list[mkr_node] = _get_average_error(errors)
+    return marker_error_list
+
+
 def combine_timer_stats(solres_list):
     """
     Combine Timer statistics into one set.
@@ -359,16 +820,8 @@ def merge_frame_list(solres_list):
     :returns: A list of frame numbers.
     :rtype: [int, ..] or [float, ..]
     """
-    assert isinstance(solres_list, (list, tuple))
-    frame_list = set()
-    msg = 'solres must be a SolveResult object: solres=%r'
-    for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        frame_list |= set(solres.get_frame_list())
-    frame_list = list(frame_list)
-    frame_list = list(sorted(frame_list))
-    return frame_list
+    frames, _ = merge_frame_error_arrays(solres_list)
+    return frames.tolist()
 
 
 def merge_frame_error_list(solres_list):
@@ -385,15 +838,9 @@ def merge_frame_error_list(solres_list):
     :returns: Mapping of frame number to error values.
     :rtype: dict
     """
-    assert isinstance(solres_list, (list, tuple))
+    frames, errors = merge_frame_error_arrays(solres_list)
     frame_error_list = collections.defaultdict(float)
-    msg = 'solres must be a SolveResult object: solres=%r'
-    for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        frm_err_list = solres.get_frame_error_list()
-        for k, v in frm_err_list.items():
-            frame_error_list[k] = v
+    frame_error_list.update(zip(frames.tolist(), errors.tolist()))
     return frame_error_list
 
 
@@ -408,14 +855,8 @@ def get_average_frame_error_list(frame_error_list):
     :rtype: float
     """
     assert isinstance(frame_error_list, dict)
-    error = 0.0
-    total = 0
-    for k, v in frame_error_list.items():
-        error += float(v)
-        total += 1
-    if total > 0:
-        error = error / float(total)
-    return error
+    errors = [float(v) for v in frame_error_list.values()]
+    return _get_average_error(errors)
 
 
 def get_max_frame_error(frame_error_list):
@@ -431,14 +872,9 @@ def get_max_frame_error(frame_error_list):
     :rtype: (int or None, float)
     """
     assert isinstance(frame_error_list, dict)
-    frame = None
-    error = -0.0
-    for k, v in frame_error_list.items():
-        x = float(v)
-        if x > error:
-            frame = int(k)
-            error = x
-    return frame, error
+    frames = list(frame_error_list.keys())
+    errors = [float(frame_error_list[f]) for f in frames]
+    return _get_max_error(frames, errors)
 
 
 def merge_marker_error_list(solres_list):
@@ -456,16 +892,11 @@ def merge_marker_error_list(solres_list):
     :returns: Mapping of frame number to error values.
     :rtype: dict
     """
-    assert isinstance(solres_list, (list, tuple))
+    marker_error_arrays = merge_marker_error_arrays(solres_list)
     marker_error_list = collections.defaultdict(dict)
-    msg = 'solres must be a SolveResult object: solres=%r'
-    for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        mkr_err_data = solres.get_marker_error_list(marker_node=None)
-        for k1, v1 in mkr_err_data.items():
-            for k2, v2 in v1.items():
-                marker_error_list[k1][k2] = v2
+    for mkr_node, (frames, errors) in marker_error_arrays.items():
+        marker_error_list[mkr_node] = dict(
+            zip(frames.tolist(), errors.tolist()))
     return marker_error_list
 
 
@@ -479,13 +910,10 @@ def merge_marker_node_list(solres_list):
     :returns: A list of Maya nodes of Markers.
     :rtype: [str, ..]
     """
-    assert isinstance(solres_list, (list, tuple))
+    _check_solve_result_list(solres_list)
     mkr_nodes = set()
-    msg = 'solres must be a SolveResult object: solres=%r'
     for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        data = solres.get_marker_error_list()
+        data = solres.get_marker_error_arrays()
         mkr_nodes |= set(data.keys())
     mkr_nodes = list(mkr_nodes)
     mkr_nodes = list(sorted(mkr_nodes))
@@ -0,0 +1,460 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Export SolveResult statistics to files, for analysis outside of Maya.
+
+Each export writes three tables, as columns of values:
+
+- 'runs', one row per SolveResult; the solver, error, timer and
+  print statistics.
+- 'frames', one row per frame; the per-frame error.
+- 'markers', one row per marker and frame; the per-marker error.
+
+The tables are written as CSV, JSON-lines, or Parquet (if 'pyarrow'
+is installed), to files named '<name>.<table>.<format>'.
+
+This module does not use Maya, and can be run as a command line tool
+to aggregate a directory of exported files, for example::
+
+  $ python -m mmSolver._api.solveresultexport /path/to/exports
+  $ python -m mmSolver._api.solveresultexport /path/to/exports \\
+        --output summary.csv
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import csv
+import glob
+import json
+import math
+import os
+import sys
+
+import mmSolver.logger
+import mmSolver._api.solveresult as solveresult
+
+# PyArrow (optional)
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+LOG = mmSolver.logger.get_logger()
+
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+FORMAT_PARQUET = 'parquet'
+FORMAT_LIST = [
+    FORMAT_CSV,
+    FORMAT_JSONL,
+    FORMAT_PARQUET,
+]
+
+TABLE_RUNS = 'runs'
+TABLE_FRAMES = 'frames'
+TABLE_MARKERS = 'markers'
+TABLE_LIST = [
+    TABLE_RUNS,
+    TABLE_FRAMES,
+    TABLE_MARKERS,
+]
+
+# Columns that are always read as strings.
+STRING_COLUMN_LIST = [
+    'name',
+    'marker',
+    'stop_message',
+]
+
+SUMMARY_COLUMN_LIST = [
+    'name',
+    'solve_count',
+    'success',
+    'iteration_total_calls',
+    'solve_seconds',
+    'frame_count',
+    'average_error',
+    'max_error',
+    'max_error_frame',
+]
+
+
+def get_format_list():
+    """
+    The file formats that can be written, with the installed modules.
+
+    :rtype: [str, ..]
+    """
+    formats = [FORMAT_CSV, FORMAT_JSONL]
+    if pyarrow is not None:
+        formats.append(FORMAT_PARQUET)
+    return formats
+
+
+def create_tables(solres_list, name):
+    """
+    Convert SolveResult objects into tables of columns.
+
+    :param solres_list: The SolveResults to convert.
+    :type solres_list: [SolveResult, ..]
+
+    :param name: The name of the solve, for example the shot name.
+    :type name: str
+
+    :returns: Mapping of table name to an (ordered) mapping of column
+              name and values.
+    :rtype: {str: {str: [..]}}
+    """
+    runs = collections.OrderedDict()
+    frames = collections.OrderedDict(
+        (k, []) for k in ('name', 'solve_index', 'frame', 'error'))
+    markers = collections.OrderedDict(
+        (k, []) for k in ('name', 'solve_index', 'marker', 'frame', 'error'))
+
+    for i, solres in enumerate(solres_list):
+        assert isinstance(solres, solveresult.SolveResult)
+        row = [('name', name), ('solve_index', i)]
+        row += sorted(solres.get_solver_stats().items())
+        row += sorted(('error_' + k, v)
+                      for k, v in solres.get_error_stats().items())
+        row += sorted(solres.get_timer_stats().items())
+        row += sorted(solres.get_print_stats().items())
+        for column, value in row:
+            runs.setdefault(column, []).append(value)
+
+        frm_list, err_list = solres.get_frame_error_arrays()
+        num = len(frm_list)
+        frames['name'] += [name] * num
+        frames['solve_index'] += [i] * num
+        frames['frame'] += frm_list.tolist()
+        frames['error'] += err_list.tolist()
+
+        marker_error_arrays = solres.get_marker_error_arrays()
+        for mkr_node in sorted(marker_error_arrays.keys()):
+            frm_list, err_list = marker_error_arrays[mkr_node]
+            num = len(frm_list)
+            markers['name'] += [name] * num
+            markers['solve_index'] += [i] * num
+            markers['marker'] += [mkr_node] * num
+            markers['frame'] += frm_list.tolist()
+            markers['error'] += err_list.tolist()
+
+    tables = {
+        TABLE_RUNS: runs,
+        TABLE_FRAMES: frames,
+        TABLE_MARKERS: markers,
+    }
+    return tables
+
+
+def _get_row_count(columns):
+    if len(columns) == 0:
+        return 0
+    return len(next(iter(columns.values())))
+
+
+def _iter_rows(columns):
+    names = list(columns.keys())
+    for i in range(_get_row_count(columns)):
+        yield names, [columns[k][i] for k in names]
+
+
+def _open_csv_file(path, mode):
+    if sys.version_info[0] == 2:
+        return open(path, mode + 'b')
+    return open(path, mode, newline='')
+
+
+def _encode_csv_value(value):
+    if sys.version_info[0] == 2 and isinstance(value, unicode):
+        return value.encode('utf-8')
+    return value
+
+
+def _decode_csv_value(value, as_string=False):
+    """
+    Convert a CSV string back into a None, bool, int, float or string.
+    """
+    if sys.version_info[0] == 2:
+        value = value.decode('utf-8')
+    if as_string is True:
+        return value
+    if len(value) == 0:
+        return None
+    if value in ('True', 'False'):
+        return value == 'True'
+    for typ in (int, float):
+        try:
+            return typ(value)
+        except ValueError:
+            pass
+    return value
+
+
+def write_table(path, columns, file_format):
+    """
+    Write a table of columns to a file.
+
+    :param path: The file path to write.
+    :type path: str
+
+    :param columns: Mapping of column name to values; all columns
+                    have the same number of values.
+    :type columns: {str: [..]}
+
+    :param file_format: The file format to write, one of the
+                        FORMAT_LIST values.
+    :type file_format: str
+
+    :rtype: None
+    """
+    if file_format not in get_format_list():
+        msg = 'File format is not available: file_format=%r'
+        raise ValueError(msg % file_format)
+    if file_format == FORMAT_CSV:
+        with _open_csv_file(path, 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow([_encode_csv_value(k) for k in columns.keys()])
+            for _, values in _iter_rows(columns):
+                writer.writerow([_encode_csv_value(v) for v in values])
+    elif file_format == FORMAT_JSONL:
+        with open(path, 'w') as f:
+            for names, values in _iter_rows(columns):
+                row = collections.OrderedDict(zip(names, values))
+                f.write(json.dumps(row) + '\n')
+    elif file_format == FORMAT_PARQUET:
+        table = pyarrow.Table.from_pydict(dict(columns))
+        pyarrow.parquet.write_table(table, path)
+    return
+
+
+def read_table(path):
+    """
+    Read a table of columns from a file written by 'write_table'.
+
+    The file format is detected from the file extension.
+
+    :param path: The file path to read.
+    :type path: str
+
+    :returns: Mapping of column name to values.
+    :rtype: {str: [..]}
+    """
+    file_format = os.path.splitext(path)[-1].lstrip('.').lower()
+    if file_format not in get_format_list():
+        msg = 'File format is not available: path=%r'
+        raise ValueError(msg % path)
+    columns = collections.OrderedDict()
+    if file_format == FORMAT_CSV:
+        with _open_csv_file(path, 'r') as f:
+            reader = csv.reader(f)
+            names = [_decode_csv_value(k, as_string=True)
+                     for k in next(reader, [])]
+            for name in names:
+                columns[name] = []
+            for values in reader:
+                for name, value in zip(names, values):
+                    as_string = name in STRING_COLUMN_LIST
+                    value = _decode_csv_value(value, as_string=as_string)
+                    columns[name].append(value)
+    elif file_format == FORMAT_JSONL:
+        with open(path, 'r') as f:
+            for line in f:
+                if len(line.strip()) == 0:
+                    continue
+                row = json.loads(line, object_pairs_hook=collections.OrderedDict)
+                for name, value in row.items():
+                    columns.setdefault(name, []).append(value)
+    elif file_format == FORMAT_PARQUET:
+        table = pyarrow.parquet.read_table(path)
+        for name, values in table.to_pydict().items():
+            columns[name] = values
+    return columns
+
+
+def get_table_file_path(dir_path, name, table, file_format):
+    file_name = '{0}.{1}.{2}'.format(name, table, file_format)
+    return os.path.join(dir_path, file_name)
+
+
+def export_solve_results(solres_list, dir_path, name, file_format=None):
+    """
+    Write SolveResult statistics to files.
+
+    :param solres_list: The SolveResults to export.
+    :type solres_list: [SolveResult, ..]
+
+    :param dir_path: The directory to write files into.
+    :type dir_path: str
+
+    :param name: The name of the solve, for example the shot name.
+    :type name: str
+
+    :param file_format: The file format to write, one of the
+                        FORMAT_LIST values. Defaults to CSV.
+    :type file_format: str or None
+
+    :returns: The file paths written.
+    :rtype: [str, ..]
+    """
+    if file_format is None:
+        file_format = FORMAT_CSV
+    tables = create_tables(solres_list, name)
+    paths = []
+    for table in TABLE_LIST:
+        path = get_table_file_path(dir_path, name, table, file_format)
+        write_table(path, tables[table], file_format)
+        paths.append(path)
+    return paths
+
+
+def read_directory(dir_path):
+    """
+    Read and concatenate all exported tables in a directory.
+
+    :param dir_path: The directory with exported files.
+    :type dir_path: str
+
+    :returns: Mapping of table name to columns.
+    :rtype: {str: {str: [..]}}
+    """
+    tables = {}
+    for table in TABLE_LIST:
+        columns = collections.OrderedDict()
+        for file_format in get_format_list():
+            pattern = '*.{0}.{1}'.format(table, file_format)
+            for path in sorted(glob.glob(os.path.join(dir_path, pattern))):
+                num = _get_row_count(columns)
+                data = read_table(path)
+                data_num = _get_row_count(data)
+                for name, values in data.items():
+                    if name not in columns:
+                        columns[name] = [None] * num
+                    columns[name] += values
+                for name, values in columns.items():
+                    if name not in data:
+                        values += [None] * data_num
+        tables[table] = columns
+    return tables
+
+
+def aggregate_tables(tables):
+    """
+    Summarise the tables, per solve name.
+
+    :param tables: Tables, as returned by 'read_directory'.
+    :type tables: {str: {str: [..]}}
+
+    :returns: Columns of SUMMARY_COLUMN_LIST, one row per solve name.
+    :rtype: {str: [..]}
+    """
+    rows = collections.OrderedDict()
+
+    def get_row(name):
+        row = rows.get(name)
+        if row is None:
+            row = {
+                'name': name,
+                'solve_count': 0,
+                'success': True,
+                'iteration_total_calls': 0,
+                'solve_seconds': 0.0,
+                'frame_count': 0,
+                'error_sum': 0.0,
+                'max_error': -0.0,
+                'max_error_frame': None,
+            }
+            rows[name] = row
+        return row
+
+    runs = tables.get(TABLE_RUNS, {})
+    for _, values in _iter_rows(runs):
+        data = dict(zip(runs.keys(), values))
+        row = get_row(data.get('name'))
+        row['solve_count'] += 1
+        row['success'] = row['success'] and data.get('success') is True
+        row['iteration_total_calls'] += data.get('iteration_total_calls') or 0
+        row['solve_seconds'] += data.get('solve_seconds') or 0.0
+
+    frames = tables.get(TABLE_FRAMES, {})
+    for _, values in _iter_rows(frames):
+        data = dict(zip(frames.keys(), values))
+        row = get_row(data.get('name'))
+        error = float(data.get('error'))
+        if math.isinf(error) or math.isnan(error):
+            continue
+        row['frame_count'] += 1
+        row['error_sum'] += error
+        if error > row['max_error']:
+            row['max_error'] = error
+            row['max_error_frame'] = data.get('frame')
+
+    summary = collections.OrderedDict((k, []) for k in SUMMARY_COLUMN_LIST)
+    for row in rows.values():
+        average_error = 0.0
+        if row['frame_count'] > 0:
+            average_error = row['error_sum'] / row['frame_count']
+        row['average_error'] = average_error
+        for column in SUMMARY_COLUMN_LIST:
+            summary[column].append(row[column])
+    return summary
+
+
+def main(dir_path, output_path=None):
+    tables = read_directory(dir_path)
+    summary = aggregate_tables(tables)
+    if output_path is not None:
+        file_format = os.path.splitext(output_path)[-1].lstrip('.').lower()
+        write_table(output_path, summary, file_format)
+        return
+
+    names = list(summary.keys())
+    print(' '.join(names))
+    for _, values in _iter_rows(summary):
+        print(' '.join([str(v) for v in values]))
+    return
+
+
+def parse(args=None):
+    text = 'Aggregate a directory of exported solve statistics.'
+    parser = argparse.ArgumentParser(description=text)
+    parser.add_argument(
+        'directory',
+        metavar='DIR',
+        type=str,
+        help='Directory of exported files'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        metavar='FILE',
+        type=str,
+        default=None,
+        help=('Summary file to write, the format is taken from '
+              'the file extension; printed if not given.')
+    )
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    args = parse()
+    main(args.directory, output_path=args.output)
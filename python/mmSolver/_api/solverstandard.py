@@ -77,7 +77,14 @@ def _gen_two_frame_fwd(int_list):
     return batch_list
 
 
-def _filter_mkr_list_by_frame_list(mkr_list, frame_list):
+def _get_marker_activity_index(precomputed_data):
+    if precomputed_data is None:
+        return None
+    return precomputed_data.get(solverbase.MARKER_ACTIVITY_INDEX_KEY)
+
+
+def _filter_mkr_list_by_frame_list(mkr_list, frame_list,
+                                   mkr_activity_index=None):
     """
     Sort the Markers into used and unused based on the frames needed.
 
@@ -87,6 +94,10 @@ def _filter_mkr_list_by_frame_list(mkr_list, frame_list):
     :param frame_list: List of frames to use for filtering.
     :type frame_list: [Frame, ..]
 
+    :param mkr_activity_index: The enabled frames of the Markers, if
+        None the Markers are queried for each frame.
+    :type mkr_activity_index: MarkerActivityIndex or None
+
     :return: Two lists, one list is for Markers that have 2 or more
              frames specified in frame_list, and the other list is
              for Markers that do not have more than 2 frames in
@@ -99,8 +110,12 @@ def _filter_mkr_list_by_frame_list(mkr_list, frame_list):
     for mkr in mkr_list:
         assert isinstance(mkr, marker.Marker) is True
         frame_count = 0
-        for f in frame_list_num:
-            frame_count += mkr.get_enable(f)
+        if mkr_activity_index is not None:
+            frame_count = mkr_activity_index.get_enabled_frame_count(
+                mkr.get_node(), frame_list=frame_list_num)
+        else:
+            for f in frame_list_num:
+                frame_count += mkr.get_enable(f)
         if frame_count >= 2:
             used_mkr_list.append(mkr)
         else:
@@ -205,12 +220,15 @@ def _compile_multi_root_frames(col,
         solving, second Action is to validate the inputs given.
     :rtype: (Action, Action or None)
     """
+    mkr_activity_index = _get_marker_activity_index(precomputed_data)
+
     # Solve root frames.
     for frm_list in batch_frame_list:
         # Get root markers
         root_mkr_list, non_root_mkr_list = _filter_mkr_list_by_frame_list(
             mkr_list,
-            frm_list
+            frm_list,
+            mkr_activity_index=mkr_activity_index,
         )
         assert len(root_mkr_list) > 0
 
@@ -525,6 +543,7 @@ def _compile_multi_frame(col,
     if triangulate_bundles is True:
         sol = solvertriangulate.SolverTriangulate()
         # sol.root_frame_list = root_frame_list_num
+        sol.set_precomputed_data(precomputed_data)
         cache = api_compile.create_compile_solver_cache()
         generator = api_compile.compile_solver_with_cache(
             sol, col, mkr_list, attr_list, withtest, cache)
@@ -535,7 +554,8 @@ def _compile_multi_frame(col,
     # to solve.
     root_mkr_list, non_root_mkr_list = _filter_mkr_list_by_frame_list(
         mkr_list,
-        root_frame_list
+        root_frame_list,
+        mkr_activity_index=_get_marker_activity_index(precomputed_data),
     )
     if len(root_mkr_list) == 0:
         # TODO: Test we have enough markers to solve with, if not warn
@@ -41,7 +41,8 @@ LOG = mmSolver.logger.get_logger()
 BUNDLE_ATTR_NAMES = ['translateX', 'translateY', 'translateZ']
 
 
-def _get_marker_first_last_frame_list(mkr_node, consider_frame_list):
+def _get_marker_first_last_frame_list(mkr_node, consider_frame_list,
+                                      mkr_activity_index=None):
     """
     Get the list of frames that this marker is enabled for.
     """
@@ -54,13 +55,18 @@ def _get_marker_first_last_frame_list(mkr_node, consider_frame_list):
         first_time = max(int(times[0]), first_time)
         last_time = min(int(times[-1]), last_time)
 
-    for t in range(first_time, last_time + 1):
-        plug = mkr_node + '.enable'
-        value = maya.cmds.getAttr(plug, time=t)
-        if value > 0:
-            if consider_frame_list is None:
-                frm_list.append(t)
-            elif t in consider_frame_list:
+    frames = range(first_time, last_time + 1)
+    if consider_frame_list is not None:
+        consider_frame_set = set(consider_frame_list)
+        frames = [t for t in frames if t in consider_frame_set]
+    if mkr_activity_index is not None:
+        frm_list = mkr_activity_index.get_enabled_frames(
+            mkr_node, frame_list=frames)
+    else:
+        for t in frames:
+            plug = mkr_node + '.enable'
+            value = maya.cmds.getAttr(plug, time=t)
+            if value > 0:
                 frm_list.append(t)
     first_last_frames = []
     if len(frm_list) > 0:
@@ -143,6 +149,12 @@ class SolverTriangulate(solverbase.SolverBase):
         #
         # NOTE: We currently assume the camera is NOT nodal.
 
+        mkr_activity_index = None
+        precomputed_data = self.get_precomputed_data()
+        if precomputed_data is not None:
+            mkr_activity_index = precomputed_data.get(
+                solverbase.MARKER_ACTIVITY_INDEX_KEY)
+
         valid_bnd_node_list = []
         for mkr in mkr_list:
             bnd = mkr.get_bundle()
@@ -173,7 +185,9 @@ class SolverTriangulate(solverbase.SolverBase):
             bnd_mkr_node_list = [x.get_node() for x in bnd_mkr_list]
             bnd_cam_node_list = [x.get_camera().get_transform_node()
                                  for x in bnd_mkr_list]
-            bnd_mkr_frm_list = [_get_marker_first_last_frame_list(x, self.root_frame_list)
+            bnd_mkr_frm_list = [_get_marker_first_last_frame_list(
+                                    x, self.root_frame_list,
+                                    mkr_activity_index=mkr_activity_index)
                                 for x in bnd_mkr_node_list]
             bnd_mkr_cam_frm_list = zip(
                 bnd_mkr_node_list,
@@ -44,12 +44,20 @@ from mmSolver._api.frame import Frame
 from mmSolver._api.rootframe import (
     get_root_frames_from_markers,
 )
+from mmSolver._api.profiler import (
+    Profiler,
+)
+from mmSolver._api.markeractivity import (
+    MarkerActivityIndex,
+    create_marker_activity_index,
+)
 from mmSolver._api.action import (
     Action,
     action_func_is_mmSolver,
     action_func_is_mmSolverAffects,
     func_str_to_callable,
     action_to_components,
+    action_to_signature,
 )
 from mmSolver._api.solverbase import (
     SolverBase,
@@ -64,6 +72,9 @@ from mmSolver._api.solverstandard import (
 from mmSolver._api.solverbasic import (
     SolverBasic,
 )
+from mmSolver._api.compile import (
+    invalidate_compile_caches,
+)
 from mmSolver._api.collectionutils import (
     run_progress_func,
     run_status_func,
@@ -116,8 +127,16 @@ from mmSolver._api.solveresult import (
     get_max_frame_error,
     merge_marker_error_list,
     merge_marker_node_list,
+    merge_frame_error_arrays,
+    merge_marker_error_arrays,
+    get_average_marker_error_list,
+    SolveResultSummary,
+    summarise_solve_results,
     format_timestamp,
 )
+from mmSolver._api.solveresultexport import (
+    export_solve_results,
+)
 from mmSolver._api.excep import (
     MMException,
     NotValid,
@@ -251,6 +270,8 @@ __all__ = [
     'SolverBasic',
     'SolverStep',
     'SolveResult',
+    'MarkerActivityIndex',
+    'Profiler',
 
     # Constants
     'OBJECT_TYPE_UNKNOWN',
@@ -330,6 +351,9 @@ __all__ = [
     # Collection
     'update_deviation_on_collection',
 
+    # Compile
+    'invalidate_compile_caches',
+
     # Collection Utils
     'run_progress_func',
     'run_status_func',
@@ -344,6 +368,7 @@ __all__ = [
     'action_func_is_mmSolverAffects',
     'func_str_to_callable',
     'action_to_components',
+    'action_to_signature',
 
     # Execute
     'createExecuteOptions',    # Old function name, to be deprecated in v0.4.0.
@@ -375,6 +400,9 @@ __all__ = [
     # Root Frame
     'get_root_frames_from_markers',
 
+    # Marker Activity
+    'create_marker_activity_index',
+
     # Node Conversion
     'get_bundle_nodes_from_marker_nodes',
     'get_marker_nodes_from_bundle_nodes',
@@ -415,5 +443,11 @@ __all__ = [
     'get_max_frame_error',
     'merge_marker_error_list',
     'merge_marker_node_list',
+    'merge_frame_error_arrays',
+    'merge_marker_error_arrays',
+    'get_average_marker_error_list',
+    'SolveResultSummary',
+    'summarise_solve_results',
     'format_timestamp',
+    'export_solve_results',
 ]
@@ -30,6 +30,7 @@ UV_TRACK_FORMAT_VERSION_1 = 1
 UV_TRACK_FORMAT_VERSION_2 = 2
 UV_TRACK_FORMAT_VERSION_3 = 3
 UV_TRACK_FORMAT_VERSION_4 = 4
+UV_TRACK_FORMAT_VERSION_5 = 5
 
 UV_TRACK_HEADER_VERSION_2 = {
     'version': UV_TRACK_FORMAT_VERSION_2,
@@ -43,6 +44,22 @@ UV_TRACK_HEADER_VERSION_4 = {
     'version': UV_TRACK_FORMAT_VERSION_4,
 }
 
+UV_TRACK_HEADER_VERSION_5 = {
+    'version': UV_TRACK_FORMAT_VERSION_5,
+}
+
+# Binary (version 5) format layout.
+UV_TRACK_BINARY_MAGIC = b'MMSUVTRK'
+UV_TRACK_BINARY_PREFIX_FORMAT = '<8sII'
+UV_TRACK_BINARY_ALIGNMENT = 8
+UV_TRACK_BINARY_COLUMNS = [
+    'frame', 'pos_x', 'pos_y', 'pos_dist_x', 'pos_dist_y', 'weight'
+]
+
+# Parse cache, the approximate number of bytes of parsed marker data
+# to keep in memory.
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
 
 # UI values
 LOAD_MODE_NEW_VALUE = 'Create New Markers'
@@ -61,3 +78,9 @@ LOAD_MODE_DEFAULT_VALUE = LOAD_MODE_NEW_VALUE
 DISTORTION_MODE_DEFAULT_VALUE = UNDISTORTION_MODE_VALUE
 LOAD_BUNDLE_POS_DEFAULT_VALUE = True
 USE_OVERSCAN_DEFAULT_VALUE = True
+
+KEY_REDUCE_DEFAULT_VALUE = False
+
+# Maximum difference, in pixels, between the imported tracking data
+# and the reduced Marker translate keyframes.
+KEY_REDUCE_TOLERANCE_DEFAULT_VALUE = 0.01
@@ -0,0 +1,408 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Create many Marker and Bundle nodes at once.
+
+Creating Markers one at a time with 'Marker.create_node' runs dozens
+of Maya commands per Marker. This module creates the same node
+network for all Markers with Maya API (one) modifiers instead. All
+nodes, attributes, values, connections and animCurves are queued on
+the modifiers and are executed with a fixed number of 'doIt' calls,
+regardless of the number of Markers.
+
+The nodes are created in two passes; the dynamic attributes must
+exist before plugs can be set or connected.
+
+.. note:: Edits made by API modifiers from Python are not recorded in
+   the Maya undo queue.
+
+"""
+
+import collections
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaAnim as OpenMayaAnim
+
+import mmSolver.logger
+import mmSolver.utils.animcurve as anim_utils
+import mmSolver._api.constant as api_const
+
+
+LOG = mmSolver.logger.get_logger()
+
+MARKER_COLOUR = (1.0, 0.0, 0.0)
+BUNDLE_COLOUR = (0.0, 1.0, 0.0)
+MARKER_LOCAL_SCALE = (0.01, 0.01, 0.0)
+BUNDLE_LOCAL_SCALE = (0.1, 0.1, 0.1)
+
+# 'useObjectColor' value to use the 'wireColorRGB' attribute, as set
+# by the 'color' command.
+USE_OBJECT_COLOR_RGB = 2
+
+# Transform attributes locked and hidden on Markers and Bundles.
+_LOCKED_TRANSFORM_ATTRS = [
+    'rx', 'ry', 'rz',
+    'sx', 'sy', 'sz',
+    'shxy', 'shxz', 'shyz',
+]
+
+
+MarkerNodeData = collections.namedtuple(
+    'MarkerNodeData',
+    [
+        # Node names.
+        'marker_name',
+        'bundle_name',
+        # Values for the 'markerName' and 'markerId' attributes.
+        'point_name',
+        'point_id',
+        # Dict of attribute name to (times, values, tangent_in_type,
+        # tangent_out_type), to create animCurves.
+        'anim_curves',
+        # Dict of attribute name to value, for attributes without
+        # animCurves.
+        'static_values',
+        # Bundle translate X, Y and Z values; None values are not set.
+        'bundle_translate',
+        # Lock the bundle translate X, Y and Z attributes.
+        'bundle_translate_lock',
+    ]
+)
+
+
+def create_marker_node_data(marker_name,
+                            bundle_name=None,
+                            point_name=None,
+                            point_id=None,
+                            anim_curves=None,
+                            static_values=None,
+                            bundle_translate=None,
+                            bundle_translate_lock=None):
+    if point_name is None:
+        point_name = marker_name
+    if point_id is None:
+        point_id = -1
+    if anim_curves is None:
+        anim_curves = {}
+    if static_values is None:
+        static_values = {}
+    if bundle_translate is None:
+        bundle_translate = (None, None, None)
+    if bundle_translate_lock is None:
+        bundle_translate_lock = (False, False, False)
+    return MarkerNodeData(
+        marker_name=marker_name,
+        bundle_name=bundle_name,
+        point_name=point_name,
+        point_id=point_id,
+        anim_curves=anim_curves,
+        static_values=static_values,
+        bundle_translate=bundle_translate,
+        bundle_translate_lock=bundle_translate_lock,
+    )
+
+
+def _get_as_object(node):
+    sel_list = OpenMaya.MSelectionList()
+    sel_list.add(node)
+    obj = OpenMaya.MObject()
+    sel_list.getDependNode(0, obj)
+    return obj
+
+
+def _create_numeric_attr(long_name, data_type, default_value,
+                         min_value=None, max_value=None, keyable=True):
+    attr_fn = OpenMaya.MFnNumericAttribute()
+    attr = attr_fn.create(long_name, long_name, data_type, default_value)
+    if min_value is not None:
+        attr_fn.setMin(min_value)
+    if max_value is not None:
+        attr_fn.setMax(max_value)
+    attr_fn.setKeyable(keyable)
+    return attr
+
+
+def _create_marker_attributes():
+    """
+    Create the dynamic attribute objects for one Marker.
+
+    Attribute objects cannot be shared between nodes, so this is
+    called for each Marker.
+
+    The attributes match those created by 'Marker.create_node'.
+
+    :returns: List of attribute name and attribute object.
+    :rtype: [(str, maya.OpenMaya.MObject), ..]
+    """
+    kDouble = OpenMaya.MFnNumericData.kDouble
+    kLong = OpenMaya.MFnNumericData.kLong
+    kShort = OpenMaya.MFnNumericData.kShort
+    attrs = [
+        (api_const.MARKER_ATTR_LONG_NAME_ENABLE,
+         _create_numeric_attr(
+             api_const.MARKER_ATTR_LONG_NAME_ENABLE, kShort, 1,
+             min_value=0, max_value=1)),
+        (api_const.MARKER_ATTR_LONG_NAME_WEIGHT,
+         _create_numeric_attr(
+             api_const.MARKER_ATTR_LONG_NAME_WEIGHT, kDouble, 1.0,
+             min_value=0.0)),
+        (api_const.MARKER_ATTR_LONG_NAME_DEVIATION,
+         _create_numeric_attr(
+             api_const.MARKER_ATTR_LONG_NAME_DEVIATION, kDouble, -1.0,
+             min_value=-1.0)),
+        (api_const.MARKER_ATTR_LONG_NAME_AVG_DEVIATION,
+         _create_numeric_attr(
+             api_const.MARKER_ATTR_LONG_NAME_AVG_DEVIATION, kDouble, -1.0,
+             min_value=-1.0)),
+        (api_const.MARKER_ATTR_LONG_NAME_MAX_DEVIATION,
+         _create_numeric_attr(
+             api_const.MARKER_ATTR_LONG_NAME_MAX_DEVIATION, kDouble, -1.0,
+             min_value=-1.0)),
+        (api_const.MARKER_ATTR_LONG_NAME_MAX_DEV_FRAME,
+         _create_numeric_attr(
+             api_const.MARKER_ATTR_LONG_NAME_MAX_DEV_FRAME, kLong, -1,
+             min_value=-1)),
+        (api_const.MARKER_ATTR_LONG_NAME_MARKER_ID,
+         _create_numeric_attr(
+             api_const.MARKER_ATTR_LONG_NAME_MARKER_ID, kLong, -1,
+             keyable=False)),
+        (api_const.MARKER_ATTR_LONG_NAME_MARKER_USED_HINT,
+         _create_numeric_attr(
+             api_const.MARKER_ATTR_LONG_NAME_MARKER_USED_HINT, kLong, 0)),
+    ]
+
+    attr_name = api_const.MARKER_ATTR_LONG_NAME_BUNDLE
+    attr_fn = OpenMaya.MFnMessageAttribute()
+    attrs.append((attr_name, attr_fn.create(attr_name, attr_name)))
+
+    attr_name = api_const.MARKER_ATTR_LONG_NAME_MARKER_NAME
+    attr_fn = OpenMaya.MFnTypedAttribute()
+    attrs.append((attr_name, attr_fn.create(
+        attr_name, attr_name, OpenMaya.MFnData.kString)))
+    return attrs
+
+
+# Marker attributes locked after the values are set.
+_LOCKED_MARKER_ATTRS = [
+    'tz',
+    'translateX',
+    'translateY',
+    api_const.MARKER_ATTR_LONG_NAME_ENABLE,
+    api_const.MARKER_ATTR_LONG_NAME_WEIGHT,
+    api_const.MARKER_ATTR_LONG_NAME_DEVIATION,
+    api_const.MARKER_ATTR_LONG_NAME_AVG_DEVIATION,
+    api_const.MARKER_ATTR_LONG_NAME_MAX_DEVIATION,
+    api_const.MARKER_ATTR_LONG_NAME_MAX_DEV_FRAME,
+    api_const.MARKER_ATTR_LONG_NAME_MARKER_NAME,
+    api_const.MARKER_ATTR_LONG_NAME_MARKER_ID,
+    api_const.MARKER_ATTR_LONG_NAME_MARKER_USED_HINT,
+] + _LOCKED_TRANSFORM_ATTRS
+
+
+def _set_colour(dg_mod, shp_fn, rgb):
+    plug = shp_fn.findPlug('useObjectColor')
+    dg_mod.newPlugValueInt(plug, USE_OBJECT_COLOR_RGB)
+    for attr_name, value in zip(['wireColorR', 'wireColorG', 'wireColorB'],
+                                rgb):
+        plug = shp_fn.findPlug(attr_name)
+        dg_mod.newPlugValueDouble(plug, value)
+    return
+
+
+def _set_local_scale(dg_mod, shp_fn, scale):
+    for attr_name, value in zip(['localScaleX', 'localScaleY', 'localScaleZ'],
+                                scale):
+        plug = shp_fn.findPlug(attr_name)
+        dg_mod.newPlugValueDouble(plug, value)
+    return
+
+
+def _hide_transform_attrs(tfm_fn, attr_names):
+    for attr_name in attr_names:
+        plug = tfm_fn.findPlug(attr_name)
+        plug.setKeyable(False)
+        plug.setChannelBox(False)
+    return
+
+
+def _lock_attrs(node_fn, attr_names):
+    for attr_name in attr_names:
+        plug = node_fn.findPlug(attr_name)
+        plug.setLocked(True)
+    return
+
+
+def _create_anim_curve(dg_mod, plug, times, values,
+                       tangent_in_type, tangent_out_type,
+                       anim_type, anim_change):
+    """
+    Create an animCurve connected to 'plug', with the connection
+    queued on the modifier.
+    """
+    anim_fn = OpenMayaAnim.MFnAnimCurve()
+    anim_fn.create(plug, anim_type, dg_mod)
+    anim_utils.set_anim_curve_keys_apione(
+        anim_fn, times, values,
+        tangent_in_type=tangent_in_type,
+        tangent_out_type=tangent_out_type,
+        undo_cache=anim_change)
+    return anim_fn
+
+
+def _get_anim_curve_type(attr_name):
+    if attr_name in ['translateX', 'translateY', 'translateZ']:
+        return OpenMayaAnim.MFnAnimCurve.kAnimCurveTL
+    return OpenMayaAnim.MFnAnimCurve.kAnimCurveTU
+
+
+def _set_static_value(dg_mod, plug, value):
+    if isinstance(value, bool):
+        dg_mod.newPlugValueBool(plug, value)
+    elif isinstance(value, (int, long)):
+        dg_mod.newPlugValueInt(plug, value)
+    else:
+        dg_mod.newPlugValueDouble(plug, float(value))
+    return
+
+
+def create_marker_nodes(mkr_grp_node, node_data_list, with_bundles=True):
+    """
+    Create Marker (and Bundle) nodes for all the given node data.
+
+    The Markers are created underneath the Marker Group node, and the
+    Bundles are created at the root of the scene.
+
+    :param mkr_grp_node: Marker Group node to create the Markers under.
+    :type mkr_grp_node: str
+
+    :param node_data_list: Names, attribute values and keyframes of
+                           the Markers to create.
+    :type node_data_list: [MarkerNodeData, ..]
+
+    :param with_bundles: Create a Bundle for each Marker?
+    :type with_bundles: bool
+
+    :returns: The Marker transform node and Bundle transform node
+              (or None) created for each MarkerNodeData, in the same
+              order.
+    :rtype: [(str, str or None), ..]
+    """
+    assert isinstance(with_bundles, bool)
+    node_data_list = list(node_data_list)
+    if len(node_data_list) == 0:
+        return []
+    mkr_grp_obj = _get_as_object(mkr_grp_node)
+
+    # Pass 1: Create nodes and add dynamic attributes.
+    dag_mod = OpenMaya.MDagModifier()
+    node_objs = []
+    for node_data in node_data_list:
+        mkr_tfm = dag_mod.createNode(
+            api_const.MARKER_TRANSFORM_NODE_TYPE, mkr_grp_obj)
+        dag_mod.renameNode(mkr_tfm, node_data.marker_name)
+        mkr_shp = dag_mod.createNode(
+            api_const.MARKER_SHAPE_NODE_TYPE, mkr_tfm)
+        dag_mod.renameNode(mkr_shp, node_data.marker_name + 'Shape')
+        mkr_attrs = _create_marker_attributes()
+        for _, attr in mkr_attrs:
+            dag_mod.addAttribute(mkr_tfm, attr)
+
+        bnd_tfm = None
+        bnd_shp = None
+        if with_bundles is True:
+            bnd_tfm = dag_mod.createNode(
+                api_const.BUNDLE_TRANSFORM_NODE_TYPE)
+            dag_mod.renameNode(bnd_tfm, node_data.bundle_name)
+            bnd_shp = dag_mod.createNode(
+                api_const.BUNDLE_SHAPE_NODE_TYPE, bnd_tfm)
+            dag_mod.renameNode(bnd_shp, node_data.bundle_name + 'Shape')
+        node_objs.append((mkr_tfm, mkr_shp, bnd_tfm, bnd_shp))
+    dag_mod.doIt()
+
+    # Pass 2: Set values, connect attributes and create animCurves.
+    dg_mod = OpenMaya.MDGModifier()
+    anim_change = OpenMayaAnim.MAnimCurveChange()
+    lock_list = []
+    node_list = []
+    for node_data, objs in zip(node_data_list, node_objs):
+        mkr_tfm, mkr_shp, bnd_tfm, bnd_shp = objs
+        mkr_tfm_fn = OpenMaya.MFnDagNode(mkr_tfm)
+        mkr_shp_fn = OpenMaya.MFnDagNode(mkr_shp)
+
+        dg_mod.newPlugValueDouble(mkr_tfm_fn.findPlug('tz'), -1.0)
+        _hide_transform_attrs(mkr_tfm_fn, ['tz'] + _LOCKED_TRANSFORM_ATTRS)
+        _set_local_scale(dg_mod, mkr_shp_fn, MARKER_LOCAL_SCALE)
+        _set_colour(dg_mod, mkr_shp_fn, MARKER_COLOUR)
+        dg_mod.newPlugValueString(
+            mkr_tfm_fn.findPlug(api_const.MARKER_ATTR_LONG_NAME_MARKER_NAME),
+            node_data.point_name)
+        dg_mod.newPlugValueInt(
+            mkr_tfm_fn.findPlug(api_const.MARKER_ATTR_LONG_NAME_MARKER_ID),
+            node_data.point_id)
+        dg_mod.connect(
+            mkr_tfm_fn.findPlug(api_const.MARKER_ATTR_LONG_NAME_ENABLE),
+            mkr_tfm_fn.findPlug('lodVisibility'))
+
+        for attr_name, value in sorted(node_data.static_values.items()):
+            plug = mkr_tfm_fn.findPlug(attr_name)
+            _set_static_value(dg_mod, plug, value)
+        for attr_name, curve in sorted(node_data.anim_curves.items()):
+            times, values, tangent_in_type, tangent_out_type = curve
+            if len(times) == 0:
+                continue
+            plug = mkr_tfm_fn.findPlug(attr_name)
+            anim_type = _get_anim_curve_type(attr_name)
+            _create_anim_curve(
+                dg_mod, plug, times, values,
+                tangent_in_type, tangent_out_type,
+                anim_type, anim_change)
+        lock_list.append((mkr_tfm_fn, _LOCKED_MARKER_ATTRS))
+        lock_list.append((mkr_shp_fn, ['localScaleZ']))
+
+        bnd_node = None
+        if bnd_tfm is not None:
+            bnd_tfm_fn = OpenMaya.MFnDagNode(bnd_tfm)
+            bnd_shp_fn = OpenMaya.MFnDagNode(bnd_shp)
+            _hide_transform_attrs(bnd_tfm_fn, _LOCKED_TRANSFORM_ATTRS)
+            _set_local_scale(dg_mod, bnd_shp_fn, BUNDLE_LOCAL_SCALE)
+            _set_colour(dg_mod, bnd_shp_fn, BUNDLE_COLOUR)
+            dg_mod.connect(
+                bnd_tfm_fn.findPlug('message'),
+                mkr_tfm_fn.findPlug(api_const.MARKER_ATTR_LONG_NAME_BUNDLE))
+
+            bnd_lock_attrs = list(_LOCKED_TRANSFORM_ATTRS)
+            translate_attrs = ['translateX', 'translateY', 'translateZ']
+            for attr_name, value, lock in zip(
+                    translate_attrs,
+                    node_data.bundle_translate,
+                    node_data.bundle_translate_lock):
+                if value is not None:
+                    plug = bnd_tfm_fn.findPlug(attr_name)
+                    dg_mod.newPlugValueDouble(plug, value)
+                if lock is True:
+                    bnd_lock_attrs.append(attr_name)
+            lock_list.append((bnd_tfm_fn, bnd_lock_attrs))
+            bnd_node = bnd_tfm_fn.fullPathName()
+        node_list.append((mkr_tfm_fn.fullPathName(), bnd_node))
+    dg_mod.doIt()
+
+    # Locking is not a DG modification, so it is done after the
+    # values are set.
+    for node_fn, attr_names in lock_list:
+        _lock_attrs(node_fn, attr_names)
+    return node_list
@@ -73,6 +73,21 @@ def is_valid_file_path(text):
     return valid
 
 
+def get_file_index(file_path):
+    """
+    Get the file info and per-point metadata of the file path.
+
+    The result is cached, so calling this many times for an unchanged
+    file only reads the file once.
+
+    :param file_path: The marker file path to get info for.
+    :type file_path: str
+
+    :rtype: (FileInfo, [PointInfo, ..])
+    """
+    return mayareadfile.index(file_path)
+
+
 def get_file_info(file_path):
     """
     Get the file path information.
@@ -83,17 +98,21 @@ def get_file_info(file_path):
     :return: The file info.
     :rtype: FileInfo
     """
-    file_info, _ = mayareadfile.read(file_path)
+    file_info, _ = get_file_index(file_path)
     return file_info
 
 
-def get_file_info_strings(file_path):
+def get_file_info_strings(file_path, file_index=None):
     """
     Get the file path information, as user-readable strings.
 
     :param file_path: The marker file path to get info for.
     :type file_path: str
 
+    :param file_index: The value returned by 'get_file_index' for
+                       the file path, or None to look it up.
+    :type file_index: (FileInfo, [PointInfo, ..]) or None
+
     :return: Dictionary of various information about the given file path.
     :rtype: dict
     """
@@ -108,32 +127,30 @@ def get_file_info_strings(file_path):
         'positions': '?',
         'has_camera_fov': '?',
     }
-    file_info, mkr_data_list = mayareadfile.read(file_path)
-    if isinstance(mkr_data_list, list) is False:
+    if file_index is None:
+        file_index = get_file_index(file_path)
+    file_info, point_info_list = file_index
+    if isinstance(point_info_list, list) is False:
         return info
 
     fmt = get_file_path_format(file_path)
     info['fmt'] = fmt
     info['fmt_name'] = str(fmt.name)
 
-    info['num_points'] = str(len(mkr_data_list))
+    info['num_points'] = str(len(point_info_list))
     start_frame = int(999999)
     end_frame = int(-999999)
     point_names = []
-    for mkr_data in mkr_data_list:
-        name = mkr_data.get_name()
-        point_names.append(name)
+    for point_info in point_info_list:
+        point_names.append(point_info.name)
 
         # Get start / end frame.
-        # We assume that there are X and Y keyframes on each frame,
-        # therefore we do not test Y.
-        x_keys = mkr_data.get_x()
-        x_start = x_keys.get_start_frame()
-        x_end = x_keys.get_end_frame()
-        if x_start < start_frame:
-            start_frame = x_start
-        if x_end > end_frame:
-            end_frame = x_end
+        if point_info.num_frames == 0:
+            continue
+        if point_info.start_frame < start_frame:
+            start_frame = point_info.start_frame
+        if point_info.end_frame > end_frame:
+            end_frame = point_info.end_frame
 
     info['point_names'] = ' '.join(point_names)
     info['start_frame'] = start_frame
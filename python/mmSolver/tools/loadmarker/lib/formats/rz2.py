@@ -26,6 +26,103 @@ import mmSolver.tools.loadmarker.lib.interface as interface
 import mmSolver.tools.loadmarker.lib.formatmanager as fmtmgr
 
 
+def _read_image_sequence(text):
+    """
+    Read the image sequence resolution and frame range.
+
+    :param text: The full contents of the file.
+    :type text: str
+
+    :returns: The X and Y resolution, the start frame and frames of
+              the image sequence, and the index of the end of the
+              image sequence block in 'text'.
+    :rtype: (int, int, int, xrange, int)
+    """
+    idx = text.find('imageSequence')
+    if idx == -1:
+        msg = "Could not get 'imageSequence' index from: %r"
+        raise interface.ParserError(msg % text)
+
+    start_idx = text.find('{', idx+1)
+    if start_idx == -1:
+        msg = 'Could not get the starting index from: %r'
+        raise interface.ParserError(msg % text)
+
+    end_idx = text.find('}', start_idx+1)
+    if end_idx == -1:
+        msg = 'Could not get the ending index from: %r'
+        raise interface.ParserError(msg % text)
+
+    imgseq = text[start_idx+1:end_idx]
+    imgseq = imgseq.strip()
+    splt = imgseq.split()
+    x_res = int(splt[0])
+    y_res = int(splt[1])
+    
+    # Get path
+    imgseq_path = re.search(r'.*f\(\s\"(.*)\"\s\).*', imgseq)
+    if imgseq_path is None:
+        msg = 'Could not get the image sequence path from: %r'
+        raise interface.ParserError(msg % imgseq)
+    imgseq_path = imgseq_path.groups()
+
+    # Get frame range
+    range_regex = re.search(r'.*b\(\s(\d*)\s(\d*)\s(\d*)\s\)', imgseq)
+    if range_regex is None:
+        msg = 'Could not get the frame range from: %r'
+        raise interface.ParserError(msg % imgseq)
+    range_grps = range_regex.groups()
+    start_frame = int(range_grps[0])
+    end_frame = int(range_grps[1])
+    by_frame = int(range_grps[2])
+    frames = xrange(start_frame, end_frame, by_frame)
+    return x_res, y_res, start_frame, frames, end_idx
+
+
+def _iter_point_tracks(text, idx):
+    """
+    Find each 'pointTrack' block in the text, starting from 'idx'.
+
+    :returns: Generator of the text index of the block, the point
+              name, and the (undecoded) per-frame text of the block.
+    :rtype: iter of (int, str, str)
+    """
+    while True:
+        idx = text.find('pointTrack', idx+1)
+        if idx == -1:
+            break
+        start_idx = text.find('{', idx+1)
+        if start_idx == -1:
+            break
+        end_idx = text.find('}', start_idx+1)
+        if end_idx == -1:
+            break
+
+        # Get point track name
+        point_track_header = text[idx:start_idx]
+        track_regex = re.search(r'pointTrack\s*\"(.*)\".*', point_track_header)
+        if track_regex is None:
+            continue
+        track_grps = track_regex.groups()
+        if len(track_grps) == 0:
+            continue
+        mkr_name = track_grps[0]
+
+        point_track = text[start_idx + 1:end_idx]
+        yield idx, mkr_name, point_track
+
+
+def _read_text(file_path):
+    if not isinstance(file_path, basestring):
+        raise TypeError('file_path is not a string: %r' % file_path)
+    if not os.path.isfile(file_path):
+        raise OSError('File path does not exist: %s' % file_path)
+    f = open(file_path, 'r')
+    text = f.read()
+    f.close()
+    return text
+
+
 class LoaderRZ2(interface.LoaderBase):
 
     name = 'MatchMover TrackPoints (*.rz2)'
@@ -33,76 +130,15 @@ class LoaderRZ2(interface.LoaderBase):
     args = []
 
     def parse(self, file_path, **kwargs):
-        if not isinstance(file_path, basestring):
-            raise TypeError('file_path is not a string: %r' % file_path)
-        if not os.path.isfile(file_path):
-            raise OSError('File path does not exist: %s' % file_path)
+        text = _read_text(file_path)
+        x_res, y_res, start_frame, frames, idx = _read_image_sequence(text)
+        point_filter = interface.create_point_filter(kwargs.get('points'))
 
         mkr_data_list = []
-        f = open(file_path, 'r')
-        text = f.read()
-        f.close()
-
-        idx = text.find('imageSequence')
-        if idx == -1:
-            msg = "Could not get 'imageSequence' index from: %r"
-            raise interface.ParserError(msg % text)
-
-        start_idx = text.find('{', idx+1)
-        if start_idx == -1:
-            msg = 'Could not get the starting index from: %r'
-            raise interface.ParserError(msg % text)
-
-        end_idx = text.find('}', start_idx+1)
-        if end_idx == -1:
-            msg = 'Could not get the ending index from: %r'
-            raise interface.ParserError(msg % text)
-
-        imgseq = text[start_idx+1:end_idx]
-        imgseq = imgseq.strip()
-        splt = imgseq.split()
-        x_res = int(splt[0])
-        y_res = int(splt[1])
-        
-        # Get path
-        imgseq_path = re.search(r'.*f\(\s\"(.*)\"\s\).*', imgseq)
-        if imgseq_path is None:
-            msg = 'Could not get the image sequence path from: %r'
-            raise interface.ParserError(msg % imgseq)
-        imgseq_path = imgseq_path.groups()
-
-        # Get frame range
-        range_regex = re.search(r'.*b\(\s(\d*)\s(\d*)\s(\d*)\s\)', imgseq)
-        if range_regex is None:
-            msg = 'Could not get the frame range from: %r'
-            raise interface.ParserError(msg % imgseq)
-        range_grps = range_regex.groups()
-        start_frame = int(range_grps[0])
-        end_frame = int(range_grps[1])
-        by_frame = int(range_grps[2])
-        frames = xrange(start_frame, end_frame, by_frame)
-
-        idx = end_idx
-        while True:
-            idx = text.find('pointTrack', idx+1)
-            if idx == -1:
-                break
-            start_idx = text.find('{', idx+1)
-            if start_idx == -1:
-                break
-            end_idx = text.find('}', start_idx+1)
-            if end_idx == -1:
-                break
-
-            # Get point track name
-            point_track_header = text[idx:start_idx]
-            track_regex = re.search(r'pointTrack\s*\"(.*)\".*', point_track_header)
-            if track_regex is None:
-                continue
-            track_grps = track_regex.groups()
-            if len(track_grps) == 0:
-                continue
-            mkr_name = track_grps[0]
+        for _, mkr_name, point_track in _iter_point_tracks(text, idx):
+            if point_filter is not None:
+                if point_filter(mkr_name, None) is False:
+                    continue
 
             # create marker
             mkr_data = interface.MarkerData()
@@ -111,7 +147,6 @@ class LoaderRZ2(interface.LoaderBase):
             for frame in frames:
                 mkr_data.enable.set_value(frame, 0)
 
-            point_track = text[start_idx + 1:end_idx]
             for line in point_track.splitlines():
                 splt = line.split()
                 if len(splt) == 0:
@@ -132,6 +167,37 @@ class LoaderRZ2(interface.LoaderBase):
         file_info = interface.create_file_info()
         return file_info, mkr_data_list
 
+    def index(self, file_path, **kwargs):
+        """
+        Read the point names and frame ranges, without decoding the
+        per-frame positions.
+
+        :returns: The file info and a PointInfo for each point. The
+                  'offset' is the index of the 'pointTrack' block in
+                  the file text.
+        :rtype: (FileInfo, [PointInfo, ..])
+        """
+        text = _read_text(file_path)
+        _, _, _, _, idx = _read_image_sequence(text)
+        point_info_list = []
+        for offset, mkr_name, point_track in _iter_point_tracks(text, idx):
+            lines = [l for l in point_track.splitlines() if l.strip()]
+            start_frame = None
+            end_frame = None
+            if len(lines) > 0:
+                start_frame = int(lines[0].split(None, 1)[0])
+                end_frame = int(lines[-1].split(None, 1)[0])
+            point_info = interface.create_point_info(
+                name=mkr_name,
+                start_frame=start_frame,
+                end_frame=end_frame,
+                num_frames=len(lines),
+                offset=offset,
+            )
+            point_info_list.append(point_info)
+        file_info = interface.create_file_info()
+        return file_info, point_info_list
+
 
 # Register the File Format
 mgr = fmtmgr.get_format_manager()
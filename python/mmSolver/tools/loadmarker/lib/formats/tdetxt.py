@@ -48,56 +48,42 @@ import mmSolver.tools.loadmarker.lib.formatmanager as fmtmgr
 LOG = mmSolver.logger.get_logger()
 
 
-class Loader3DETXT(interface.LoaderBase):
+def _parse_iter(file_path, inv_image_width, inv_image_height,
+                point_filter=None):
+    """
+    Parse a 3DEqualizer .txt file, one point at a time.
 
-    name = '3DEqualizer Track Points (*.txt)'
-    file_exts = ['.txt']
-    args = [
-        ('image_width', None),
-        ('image_height', None),
-    ]
+    The file is read incrementally, line by line, so only the data
+    for the current point is held in memory. The lines of points
+    rejected by 'point_filter' are skipped without being decoded.
 
-    def parse(self, file_path, **kwargs):
-        """
-        Parse the file path as a 3DEqualizer .txt file.
+    :param file_path: File path to parse.
+    :type file_path: str
 
-        :param file_path: File path to parse.
-        :type file_path: str
+    :param inv_image_width: Multiplier to convert X positions to UV.
+    :type inv_image_width: float
 
-        :param kwargs: expected to contain 'image_width' and 'image_height'.
+    :param inv_image_height: Multiplier to convert Y positions to UV.
+    :type inv_image_height: float
 
-        :return: List of MarkerData.
-        """
-        # If the image width/height is not given we raise an error immediately.
-        image_width = kwargs.get('image_width')
-        image_height = kwargs.get('image_height')
-        if isinstance(image_width, (int, float)):
-            ValueError('image_width must be float or int.')
-        if isinstance(image_height, (int, float)):
-            ValueError('image_height must be float or int.')
-        if image_width is None:
-            image_width = 1.0
-        if image_height is None:
-            image_height = 1.0
-        inv_image_width = 1.0 / image_width
-        inv_image_height = 1.0 / image_height
+    :param point_filter: Function returning True if a point (name, id)
+                         should be parsed, or None to parse all points.
+    :type point_filter: callable or None
 
-        f = open(file_path, 'r')
-        lines = f.readlines()
-        f.close()
-        if len(lines) == 0:
+    :returns: Generator of MarkerData objects.
+    :rtype: iter of MarkerData
+    """
+    with open(file_path, 'r') as f:
+        line = f.readline()
+        if len(line) == 0:
             raise OSError('No contents in the file: %s' % file_path)
-        mkr_data_list = []
-
-        line = lines[0]
         line = line.strip()
         num_points = int(line)
         if num_points < 1:
             raise interface.ParserError('No points exist.')
 
-        idx = 1  # Skip the first line
         for i in xrange(num_points):
-            line = lines[idx]
+            line = f.readline()
             mkr_name = line.strip()
 
             # Create marker
@@ -105,28 +91,30 @@ class Loader3DETXT(interface.LoaderBase):
             mkr_data.set_name(mkr_name)
 
             # Get point color
-            idx += 1
-            line = lines[idx]
+            line = f.readline()
             line = line.strip()
             mkr_color = int(line)
             mkr_data.set_color(mkr_color)
 
-            idx += 1
-            line = lines[idx]
+            line = f.readline()
             line = line.strip()
             num_frames = int(line)
             if num_frames <= 0:
-                idx += 1
                 msg = 'point has no data: %r'
                 LOG.warning(msg, mkr_name)
                 continue
 
+            if point_filter is not None:
+                if point_filter(mkr_name, None) is False:
+                    for _ in xrange(num_frames):
+                        f.readline()
+                    continue
+
             # Frame data parsing
             frames = []
             j = num_frames
             while j > 0:
-                idx += 1
-                line = lines[idx]
+                line = f.readline()
                 line = line.strip()
                 if len(line) == 0:
                     # Have we reached the end of the file?
@@ -148,19 +136,135 @@ class Loader3DETXT(interface.LoaderBase):
                 frames.append(frame)
 
             # Fill in occluded point frames
-            all_frames = list(range(min(frames), max(frames)+1))
-            for frame in all_frames:
-                mkr_enable = int(frame in frames)
-                mkr_data.enable.set_value(frame, mkr_enable)
-                if mkr_enable is False:
-                    mkr_data.weight.set_value(frame, 0.0)
+            mkr_data = interface.fill_occluded_frames(mkr_data, frames)
 
-            mkr_data_list.append(mkr_data)
-            idx += 1
+            yield mkr_data
 
-        file_info = interface.create_file_info()
+
+def _index(file_path):
+    """
+    Read the point names and frame ranges of a 3DEqualizer .txt file,
+    without decoding the per-frame values.
+
+    The frames of each point are assumed to be stored in increasing
+    order, as written by 3DEqualizer.
+
+    :param file_path: File path to read.
+    :type file_path: str
+
+    :returns: A PointInfo for each point. The 'offset' is the file
+              position of the point name line.
+    :rtype: [PointInfo, ..]
+    """
+    point_info_list = []
+    with open(file_path, 'r') as f:
+        line = f.readline()
+        if len(line) == 0:
+            raise OSError('No contents in the file: %s' % file_path)
+        num_points = int(line.strip())
+        for _ in xrange(num_points):
+            offset = f.tell()
+            mkr_name = f.readline().strip()
+            f.readline()  # Point color
+            num_frames = int(f.readline().strip())
+            start_frame = None
+            end_frame = None
+            for j in xrange(num_frames):
+                line = f.readline()
+                if len(line.strip()) == 0:
+                    break
+                if j == 0:
+                    start_frame = int(line.split(None, 1)[0])
+                end_frame = line
+            if end_frame is not None:
+                end_frame = int(end_frame.split(None, 1)[0])
+            point_info = interface.create_point_info(
+                name=mkr_name,
+                start_frame=start_frame,
+                end_frame=end_frame,
+                num_frames=max(num_frames, 0),
+                offset=offset,
+            )
+            point_info_list.append(point_info)
+    return point_info_list
+
+
+class Loader3DETXT(interface.LoaderBase):
+
+    name = '3DEqualizer Track Points (*.txt)'
+    file_exts = ['.txt']
+    args = [
+        ('image_width', None),
+        ('image_height', None),
+    ]
+
+    def parse(self, file_path, **kwargs):
+        """
+        Parse the file path as a 3DEqualizer .txt file.
+
+        :param file_path: File path to parse.
+        :type file_path: str
+
+        :param kwargs: expected to contain 'image_width' and 'image_height'.
+
+        :return: List of MarkerData.
+        """
+        file_info, mkr_data_iter = self.parse_iter(file_path, **kwargs)
+        mkr_data_list = list(mkr_data_iter)
         return file_info, mkr_data_list
 
+    def parse_iter(self, file_path, **kwargs):
+        """
+        Parse the file path as a 3DEqualizer .txt file, yielding each
+        MarkerData as soon as it has been read.
+
+        :param file_path: File path to parse.
+        :type file_path: str
+
+        :param kwargs: expected to contain 'image_width' and
+                       'image_height', may contain 'points'.
+
+        :return: The file info and a generator of MarkerData.
+        :rtype: (FileInfo, iter of MarkerData)
+        """
+        # If the image width/height is not given we raise an error immediately.
+        image_width = kwargs.get('image_width')
+        image_height = kwargs.get('image_height')
+        if isinstance(image_width, (int, float)):
+            ValueError('image_width must be float or int.')
+        if isinstance(image_height, (int, float)):
+            ValueError('image_height must be float or int.')
+        if image_width is None:
+            image_width = 1.0
+        if image_height is None:
+            image_height = 1.0
+        inv_image_width = 1.0 / image_width
+        inv_image_height = 1.0 / image_height
+        point_filter = interface.create_point_filter(kwargs.get('points'))
+
+        mkr_data_iter = _parse_iter(
+            file_path,
+            inv_image_width,
+            inv_image_height,
+            point_filter=point_filter)
+        file_info = interface.create_file_info()
+        return file_info, mkr_data_iter
+
+    def index(self, file_path, **kwargs):
+        """
+        Read the per-point metadata of a 3DEqualizer .txt file,
+        without creating MarkerData.
+
+        :param file_path: File path to index.
+        :type file_path: str
+
+        :returns: The file info and a PointInfo for each point.
+        :rtype: (FileInfo, [PointInfo, ..])
+        """
+        file_info = interface.create_file_info()
+        point_info_list = _index(file_path)
+        return file_info, point_info_list
+
 
 # Register the File Format
 mgr = fmtmgr.get_format_manager()
@@ -132,9 +132,59 @@ Format version 4::
         }
     }
 
+
+
+Format version 5 is binary, and stores the per-frame data in
+contiguous columns rather than JSON dictionaries.
+
+All numbers are little-endian. The file starts with a fixed-size
+prefix::
+
+    char[8]  # Magic bytes, 'MMSUVTRK'
+    uint32   # Format version (5)
+    uint32   # Number of bytes in the JSON header
+
+The JSON header is the same as format version 4, except each point
+stores 'num_frames' and 'offset' instead of 'per_frame', and the
+header stores the size of each float value::
+
+    {
+        'version': int,
+        'num_points': int,
+        'is_undistorted': None,  # Deprecated
+        'float_size': int,  # 4 (float32) or 8 (float64)
+        'columns': ['frame', 'pos_x', 'pos_y',
+                    'pos_dist_x', 'pos_dist_y', 'weight'],
+        'points': [
+            {
+                'name': str,
+                'id': int,  # or None
+                'set_name': str,
+                'num_frames': int,
+                'offset': int,
+                '3d': {...},  # Same as version 4.
+            },
+        ],
+        'camera': {...},  # Same as version 4.
+    }
+
+After the header (padded to 8 bytes), each point has a block of
+'num_frames' float values for each of the 'columns'. A point's block
+starts 'offset' bytes after the end of the header, so reading one
+point does not need to read any other point's data.
+
+A file with no points has an empty 'points' list and no data after
+the header.
+
 """
 
+import os
+import re
+import sys
 import math
+import mmap
+import array
+import struct
 import json
 import mmSolver.logger
 import mmSolver.tools.loadmarker.lib.interface as interface
@@ -144,23 +194,137 @@ import mmSolver.tools.loadmarker.constant as const
 LOG = mmSolver.logger.get_logger()
 
 
-def determine_format_version(file_path):
+# Number of characters read from the start of a file to guess the
+# format version, without decoding the whole file.
+SNIFF_SIZE = 4096
+
+_SNIFF_VERSION_REGEX = re.compile(r'"version"\s*:\s*(-?\d+)')
+
+# The format versions stored as JSON documents.
+_JSON_FORMAT_VERSIONS = [
+    const.UV_TRACK_FORMAT_VERSION_2,
+    const.UV_TRACK_FORMAT_VERSION_3,
+    const.UV_TRACK_FORMAT_VERSION_4,
+]
+
+
+def _sniff_top_level_version(text):
     """
-    Work out the format version by reading the 'file_path'.
+    Find the 'version' key of the top-level JSON object in 'text'.
 
-    returns: The format version, must be one of constants.UV_TRACK_FORMAT_VERSION_LIST
+    'text' may be the start of a JSON document, it does not need to
+    be complete. Keys named 'version' in nested objects are ignored.
+
+    :returns: The version number, or None if not found.
+    :rtype: int or None
+    """
+    depth = 0
+    in_string = False
+    escape = False
+    for i, c in enumerate(text):
+        if in_string is True:
+            if escape is True:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+        if c == '"':
+            if depth == 1:
+                match = _SNIFF_VERSION_REGEX.match(text, i)
+                if match is not None:
+                    return int(match.group(1))
+            in_string = True
+        elif c in '{[':
+            depth += 1
+        elif c in '}]':
+            depth -= 1
+    return None
+
+
+def _sniff_format_version(file_path):
+    """
+    Guess the format version from the first few KB of 'file_path'.
+
+    ASCII (version 1) files start with a number, JSON files start
+    with a '{' character and usually store the top-level 'version'
+    key near the start of the file. Unknown JSON versions are not
+    trusted, the full file must be decoded.
+
+    :returns: The format version, or None if the version cannot be
+              worked out without decoding the full file.
+    :rtype: int or None
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(SNIFF_SIZE)
+    if head.startswith(const.UV_TRACK_BINARY_MAGIC):
+        return const.UV_TRACK_FORMAT_VERSION_5
+    head = head.decode('utf-8', 'ignore')
+    head = head.lstrip()
+    if len(head) == 0:
+        return const.UV_TRACK_FORMAT_VERSION_1
+    if head.startswith('{') is False:
+        return const.UV_TRACK_FORMAT_VERSION_1
+    version = _sniff_top_level_version(head)
+    if version not in _JSON_FORMAT_VERSIONS:
+        # Let the caller decode the full file.
+        return None
+    return version
+
+
+def _read_format_version_and_data(file_path):
+    """
+    Get the format version and decoded JSON data from 'file_path'.
+
+    The JSON document is decoded at most once; ASCII (version 1) and
+    binary (version 5) files are detected from the start of the file
+    and not decoded.
+
+    :returns: The format version and the decoded JSON data, or None
+              for ASCII and binary files.
+    :rtype: (int, dict or None)
     """
+    version = _sniff_format_version(file_path)
+    if version in [const.UV_TRACK_FORMAT_VERSION_1,
+                   const.UV_TRACK_FORMAT_VERSION_5]:
+        return version, None
     with open(file_path) as f:
         try:
             data = json.load(f)
         except ValueError:
             data = {}
     if len(data) == 0:
-        return const.UV_TRACK_FORMAT_VERSION_1
+        return const.UV_TRACK_FORMAT_VERSION_1, None
     version = data.get('version', const.UV_TRACK_FORMAT_VERSION_UNKNOWN)
+    return version, data
+
+
+def determine_format_version(file_path):
+    """
+    Work out the format version by reading the 'file_path'.
+
+    Only the start of the file is read when the version can be found
+    there, otherwise the whole file is decoded.
+
+    returns: The format version, must be one of constants.UV_TRACK_FORMAT_VERSION_LIST
+    """
+    version = _sniff_format_version(file_path)
+    if version is None:
+        version, _ = _read_format_version_and_data(file_path)
     return version
 
 
+def _load_data(file_path, data):
+    """
+    Decode the JSON 'file_path', unless the 'data' is already decoded.
+    """
+    if data is None:
+        with open(file_path) as f:
+            data = json.load(f)
+    return data
+
+
 def _parse_point_info_v2_v3(mkr_data, point_data):
     """
     Get general information from the point data.
@@ -276,23 +440,18 @@ def _parse_marker_occluded_frames_v1_v2_v3(mkr_data, frames):
 
     :rtype: MarkerData
     """
-    all_frames = list(range(min(frames), max(frames)+1))
-    for frame in all_frames:
-        mkr_enable = int(frame in frames)
-        mkr_data.enable.set_value(frame, mkr_enable)
-        if mkr_enable is False:
-            mkr_data.weight.set_value(frame, 0.0)
-    return mkr_data
+    return interface.fill_occluded_frames(mkr_data, frames)
 
 
-def _parse_v2_and_v3(file_path,
+def _parse_v2_and_v3(data,
                      undistorted=None,
-                     with_3d_pos=None):
+                     with_3d_pos=None,
+                     point_filter=None):
     """
     Parse the UV file format, using JSON.
 
-    :param file_path: File path to read.
-    :type file_path: str
+    :param data: The decoded JSON data of the file.
+    :type data: dict
 
     :param undistorted: Should we choose the undistorted or distorted
                         marker data?
@@ -304,6 +463,10 @@ def _parse_v2_and_v3(file_path,
                         uvtrack version 3+.
     :type with_3d_pos: bool or None
 
+    :param point_filter: Function returning True if a point (name, id)
+                         should be parsed, or None to parse all points.
+    :type point_filter: callable or None
+
     :return: List of MarkerData objects.
     """
     if with_3d_pos is None:
@@ -316,15 +479,17 @@ def _parse_v2_and_v3(file_path,
         pos_key = 'pos'
 
     mkr_data_list = []
-    with open(file_path) as f:
-        data = json.load(f)
-
     msg = (
         'Per-frame tracking data was not found on marker, skipping. '
         'name=%r'
     )
     points = data.get('points', [])
     for point_data in points:
+        if point_filter is not None:
+            name = point_data.get('name')
+            id_ = point_data.get('id')
+            if point_filter(name, id_) is False:
+                continue
         mkr_data = interface.MarkerData()
 
         # Static point information.
@@ -357,18 +522,15 @@ def _parse_v2_and_v3(file_path,
     return mkr_data_list
 
 
-def _parse_camera_fov_v4(file_path):
+def _parse_camera_fov_v4(data):
     """
-    Parse the UV file format, using JSON.
+    Parse the camera field of view from the UV file format.
 
-    :param file_path: File path to read.
-    :type file_path: str
+    :param data: The decoded JSON data of the file.
+    :type data: dict
 
-    :return: List of MarkerData objects.
+    :return: List of (frame, angle_x, angle_y) tuples.
     """
-    with open(file_path) as f:
-        data = json.load(f)
-
     camera_data = data.get('camera', {})
     img_width, img_height = camera_data.get('resolution', (0, 0))
     film_back_x, film_back_y = camera_data['film_back_cm']
@@ -389,156 +551,556 @@ def _parse_camera_fov_v4(file_path):
     return cam_fov_list
 
 
-def parse_v1(file_path, **kwargs):
+def _create_file_info(version, data):
     """
-    Parse the UV file format or 3DEqualizer .txt format.
+    Create the FileInfo for a JSON or binary format version.
 
-    :param file_path:
-    :return:
+    :param version: The format version of the file.
+    :type version: int
+
+    :param data: The decoded JSON data (or binary header) of the file.
+    :type data: dict
+
+    :rtype: FileInfo
     """
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-    if len(lines) == 0:
-        raise OSError('No contents in the file: %s' % file_path)
-    mkr_data_list = []
+    if version == const.UV_TRACK_FORMAT_VERSION_2:
+        return interface.create_file_info(marker_undistorted=True)
+    cam_fov_list = []
+    if version == const.UV_TRACK_FORMAT_VERSION_4:
+        cam_fov_list = _parse_camera_fov_v4(data)
+    elif version == const.UV_TRACK_FORMAT_VERSION_5 and 'camera' in data:
+        cam_fov_list = _parse_camera_fov_v4(data)
+    file_info = interface.create_file_info(
+        marker_distorted=True,
+        marker_undistorted=True,
+        bundle_positions=True,
+        camera_field_of_view=cam_fov_list,
+    )
+    return file_info
 
-    num_points = int(lines[0])
-    if num_points < 1:
-        raise interface.ParserError('No points exist.')
 
-    idx = 1  # Skip the first line
-    for _ in xrange(num_points):
-        mkr_name = lines[idx]
-        mkr_name = mkr_name.strip()
+def _index_v2_v3_v4(data):
+    """
+    Get the PointInfo of each point in the decoded JSON data.
 
-        # Create marker
-        mkr_data = interface.MarkerData()
-        mkr_data.set_name(mkr_name)
+    :param data: The decoded JSON data of the file.
+    :type data: dict
 
-        idx += 1
-        num_frames = int(lines[idx])
-        if num_frames <= 0:
-            idx += 1
-            msg = 'Point has no data: mkr_name=%r line_num=%r'
-            LOG.warning(msg, mkr_name, idx)
-            continue
+    :rtype: [PointInfo, ..]
+    """
+    point_info_list = []
+    for point_data in data.get('points', []):
+        per_frame = point_data.get('per_frame', [])
+        start_frame = None
+        end_frame = None
+        if len(per_frame) > 0:
+            start_frame = per_frame[0].get('frame')
+            end_frame = per_frame[-1].get('frame')
+        point_info = interface.create_point_info(
+            name=point_data.get('name'),
+            id_=point_data.get('id'),
+            group_name=point_data.get('set_name'),
+            start_frame=start_frame,
+            end_frame=end_frame,
+            num_frames=len(per_frame),
+        )
+        point_info_list.append(point_info)
+    return point_info_list
+
+
+def _parse_v1_iter(file_path, point_filter=None):
+    """
+    Parse the UV file format or 3DEqualizer .txt format, one point
+    at a time.
+
+    The file is read incrementally, line by line, so only the data
+    for the current point is held in memory. The lines of points
+    rejected by 'point_filter' are skipped without being decoded.
+
+    :param file_path: File path to read.
+    :type file_path: str
+
+    :param point_filter: Function returning True if a point (name, id)
+                         should be parsed, or None to parse all points.
+    :type point_filter: callable or None
+
+    :returns: Generator of MarkerData objects.
+    :rtype: iter of MarkerData
+    """
+    with open(file_path, 'r') as f:
+        line = f.readline()
+        if len(line) == 0:
+            raise OSError('No contents in the file: %s' % file_path)
+        num_points = int(line)
+        if num_points < 1:
+            raise interface.ParserError('No points exist.')
+
+        idx = 1  # Skip the first line
+        for _ in xrange(num_points):
+            mkr_name = f.readline()
+            mkr_name = mkr_name.strip()
+
+            # Create marker
+            mkr_data = interface.MarkerData()
+            mkr_data.set_name(mkr_name)
 
-        # Frame data parsing
-        frames = []
-        j = num_frames
-        while j > 0:
             idx += 1
-            line = lines[idx]
-            line = line.strip()
-            if len(line) == 0:
-                # Have we reached the end of the file?
-                break
-            j = j - 1
-            split = line.split()
-            if len(split) != 4:
-                # We should not get here
-                msg = (
-                    'File invalid, there must be 4 numbers in a line'
-                    ' (separated by spaces): line=%r line_num=%r'
-                )
-                raise interface.ParserError(msg % (line, idx))
-            frame = int(split[0])
-            mkr_u = float(split[1])
-            mkr_v = float(split[2])
-            mkr_weight = float(split[3])
+            num_frames = int(f.readline())
+            if num_frames <= 0:
+                idx += 1
+                msg = 'Point has no data: mkr_name=%r line_num=%r'
+                LOG.warning(msg, mkr_name, idx)
+                continue
+
+            if point_filter is not None:
+                if point_filter(mkr_name, None) is False:
+                    for _ in xrange(num_frames):
+                        f.readline()
+                    idx += num_frames + 1
+                    continue
+
+            # Frame data parsing
+            frames = []
+            j = num_frames
+            while j > 0:
+                idx += 1
+                line = f.readline()
+                line = line.strip()
+                if len(line) == 0:
+                    # Have we reached the end of the file?
+                    break
+                j = j - 1
+                split = line.split()
+                if len(split) != 4:
+                    # We should not get here
+                    msg = (
+                        'File invalid, there must be 4 numbers in a line'
+                        ' (separated by spaces): line=%r line_num=%r'
+                    )
+                    raise interface.ParserError(msg % (line, idx))
+                frame = int(split[0])
+                mkr_u = float(split[1])
+                mkr_v = float(split[2])
+                mkr_weight = float(split[3])
+
+                mkr_data.weight.set_value(frame, mkr_weight)
+                mkr_data.x.set_value(frame, mkr_u)
+                mkr_data.y.set_value(frame, mkr_v)
+                frames.append(frame)
+
+            # Fill in occluded point frames
+            mkr_data = _parse_marker_occluded_frames_v1_v2_v3(
+                mkr_data,
+                frames,
+            )
+
+            yield mkr_data
+            idx += 1
 
-            mkr_data.weight.set_value(frame, mkr_weight)
-            mkr_data.x.set_value(frame, mkr_u)
-            mkr_data.y.set_value(frame, mkr_v)
-            frames.append(frame)
 
-        # Fill in occluded point frames
-        mkr_data = _parse_marker_occluded_frames_v1_v2_v3(
-            mkr_data,
-            frames,
-        )
+def index_v1(file_path, **kwargs):
+    """
+    Read the point names and frame ranges of the UV file format
+    version 1, without decoding the per-frame values.
 
-        mkr_data_list.append(mkr_data)
-        idx += 1
+    The frames of each point are assumed to be stored in increasing
+    order, as written by the exporters.
 
+    :param file_path: File path to read.
+    :type file_path: str
+
+    :returns: The file info and a PointInfo for each point. The
+              'offset' is the file position of the point name line.
+    :rtype: (FileInfo, [PointInfo, ..])
+    """
     file_info = interface.create_file_info(marker_undistorted=True)
+    point_info_list = []
+    with open(file_path, 'r') as f:
+        line = f.readline()
+        if len(line) == 0:
+            raise OSError('No contents in the file: %s' % file_path)
+        num_points = int(line)
+        for _ in xrange(num_points):
+            offset = f.tell()
+            mkr_name = f.readline().strip()
+            num_frames = int(f.readline())
+            start_frame = None
+            end_frame = None
+            for j in xrange(num_frames):
+                line = f.readline()
+                if len(line.strip()) == 0:
+                    break
+                if j == 0:
+                    start_frame = int(line.split(None, 1)[0])
+                end_frame = line
+            if end_frame is not None:
+                end_frame = int(end_frame.split(None, 1)[0])
+            point_info = interface.create_point_info(
+                name=mkr_name,
+                start_frame=start_frame,
+                end_frame=end_frame,
+                num_frames=max(num_frames, 0),
+                offset=offset,
+            )
+            point_info_list.append(point_info)
+    return file_info, point_info_list
+
+
+def parse_v1_iter(file_path, **kwargs):
+    """
+    Parse the UV file format or 3DEqualizer .txt format, yielding
+    each MarkerData as soon as it has been read.
+
+    Accepts the keyword 'points'.
+
+    :param file_path: File path to read.
+    :type file_path: str
+
+    :returns: The file info and a generator of MarkerData objects.
+    :rtype: (FileInfo, iter of MarkerData)
+    """
+    point_filter = interface.create_point_filter(kwargs.get('points'))
+    file_info = interface.create_file_info(marker_undistorted=True)
+    mkr_data_iter = _parse_v1_iter(file_path, point_filter=point_filter)
+    return file_info, mkr_data_iter
+
+
+def parse_v1(file_path, **kwargs):
+    """
+    Parse the UV file format or 3DEqualizer .txt format.
+
+    :param file_path:
+    :return:
+    """
+    file_info, mkr_data_iter = parse_v1_iter(file_path, **kwargs)
+    mkr_data_list = list(mkr_data_iter)
     return file_info, mkr_data_list
 
 
-def parse_v2(file_path, **kwargs):
+def parse_v2(file_path, data=None, **kwargs):
     """
     Parse the UV file format, using JSON.
 
     :param file_path: File path to read.
     :type file_path: str
 
+    :param data: The already decoded JSON data of the file, or None
+                 to read 'file_path'.
+    :type data: dict or None
+
     :return: List of MarkerData objects.
     """
-    file_info = interface.create_file_info(marker_undistorted=True)
+    data = _load_data(file_path, data)
+    point_filter = interface.create_point_filter(kwargs.get('points'))
+    file_info = _create_file_info(const.UV_TRACK_FORMAT_VERSION_2, data)
     mkr_data_list = _parse_v2_and_v3(
-        file_path,
+        data,
         undistorted=True,
-        with_3d_pos=False
+        with_3d_pos=False,
+        point_filter=point_filter,
     )
     return file_info, mkr_data_list
 
 
-def parse_v3(file_path, **kwargs):
+def parse_v3(file_path, data=None, **kwargs):
     """
     Parse the UV file format, using JSON.
 
-    Accepts the keyword 'undistorted'.
+    Accepts the keywords 'undistorted' and 'points'.
 
     :param file_path: File path to read.
     :type file_path: str
 
+    :param data: The already decoded JSON data of the file, or None
+                 to read 'file_path'.
+    :type data: dict or None
+
     :return: List of MarkerData objects.
     """
+    data = _load_data(file_path, data)
     # Should we choose the undistorted or distorted marker data?
     undistorted = kwargs.get('undistorted', None)  # bool or None
-    file_info = interface.create_file_info(
-        marker_distorted=True,
-        marker_undistorted=True,
-        bundle_positions=True,
-    )
+    point_filter = interface.create_point_filter(kwargs.get('points'))
+    file_info = _create_file_info(const.UV_TRACK_FORMAT_VERSION_3, data)
     mkr_data_list = _parse_v2_and_v3(
-        file_path,
+        data,
         undistorted=undistorted,
         with_3d_pos=True,
+        point_filter=point_filter,
     )
     return file_info, mkr_data_list
 
 
-def parse_v4(file_path, **kwargs):
+def parse_v4(file_path, data=None, **kwargs):
     """
     Parse the UV file format, using JSON.
 
-    Accepts the keyword 'undistorted', 'overscan_x' and 'overscan_y'.
+    Accepts the keywords 'undistorted' and 'points'.
 
     :param file_path: File path to read.
     :type file_path: str
 
+    :param data: The already decoded JSON data of the file, or None
+                 to read 'file_path'.
+    :type data: dict or None
+
     :return: List of MarkerData objects.
     """
+    data = _load_data(file_path, data)
     # Should we choose the undistorted or distorted marker data?
     undistorted = kwargs.get('undistorted', None)  # bool or None
-    cam_fov_list = _parse_camera_fov_v4(
-        file_path,
-    )
-    file_info = interface.create_file_info(
-        marker_distorted=True,
-        marker_undistorted=True,
-        bundle_positions=True,
-        camera_field_of_view=cam_fov_list,
-    )
+    point_filter = interface.create_point_filter(kwargs.get('points'))
+    file_info = _create_file_info(const.UV_TRACK_FORMAT_VERSION_4, data)
     mkr_data_list = _parse_v2_and_v3(
-        file_path,
+        data,
         undistorted=undistorted,
         with_3d_pos=True,
+        point_filter=point_filter,
     )
     return file_info, mkr_data_list
 
 
+def _open_binary_file_v5(f):
+    """
+    Memory-map a binary (version 5) file, opened in binary mode.
+
+    :rtype: mmap.mmap
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        msg = 'File is empty, no points exist.'
+        raise interface.ParserError(msg)
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _read_binary_header_v5(buf):
+    """
+    Read the JSON header of a binary (version 5) file.
+
+    :param buf: The file contents, usually a memory-mapped file.
+    :type buf: mmap.mmap or str
+
+    :returns: The decoded header and the byte offset of the first
+              point's data.
+    :rtype: (dict, int)
+    """
+    prefix_size = struct.calcsize(const.UV_TRACK_BINARY_PREFIX_FORMAT)
+    if len(buf) < prefix_size:
+        msg = 'File is too small to be a binary UV Track file.'
+        raise interface.ParserError(msg)
+    magic, version, header_size = struct.unpack(
+        const.UV_TRACK_BINARY_PREFIX_FORMAT,
+        buf[:prefix_size])
+    if magic != const.UV_TRACK_BINARY_MAGIC:
+        msg = 'File is not a binary UV Track file.'
+        raise interface.ParserError(msg)
+    if version != const.UV_TRACK_FORMAT_VERSION_5:
+        msg = 'Binary UV Track format version is not supported: %r'
+        raise interface.ParserError(msg % version)
+    data_start = prefix_size + header_size
+    header_str = buf[prefix_size:data_start]
+    header = json.loads(header_str.decode('utf-8'))
+    return header, data_start
+
+
+def _read_point_columns_v5(buf, data_start, point_data, float_size):
+    """
+    Read the per-frame columns of a single point.
+
+    Only the bytes of the requested point are read from 'buf'.
+
+    :returns: Dictionary of column name to array of values.
+    :rtype: {str: array.array}
+    """
+    type_code = 'd'
+    if float_size == 4:
+        type_code = 'f'
+    num_frames = point_data.get('num_frames', 0)
+    column_size = num_frames * float_size
+    start = data_start + point_data.get('offset', 0)
+    columns = {}
+    for i, name in enumerate(const.UV_TRACK_BINARY_COLUMNS):
+        column_start = start + (i * column_size)
+        values = array.array(type_code)
+        data = buf[column_start:column_start + column_size]
+        if hasattr(values, 'frombytes'):
+            values.frombytes(data)
+        else:
+            # Python 2.x
+            values.fromstring(data)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        columns[name] = values
+    return columns
+
+
+def _parse_v5(buf, undistorted=None, with_3d_pos=None, point_filter=None):
+    """
+    Parse the binary UV file format.
+
+    :param buf: The file contents, usually a memory-mapped file.
+    :type buf: mmap.mmap or str
+
+    :param undistorted: Should we choose the undistorted or distorted
+                        marker data?
+    :type undistorted: bool or None
+
+    :param with_3d_pos: Try to parse 3D position bundle data from
+                        the file path? None means False.
+    :type with_3d_pos: bool or None
+
+    :param point_filter: Function returning True if a point (name, id)
+                         should be parsed, or None to parse all points.
+    :type point_filter: callable or None
+
+    :return: The decoded header and the list of MarkerData objects.
+    :rtype: (dict, [MarkerData, ..])
+    """
+    if with_3d_pos is None:
+        with_3d_pos = False
+
+    x_key = 'pos_dist_x'
+    y_key = 'pos_dist_y'
+    if undistorted is None:
+        undistorted = True
+    if undistorted is True:
+        x_key = 'pos_x'
+        y_key = 'pos_y'
+
+    header, data_start = _read_binary_header_v5(buf)
+    float_size = header.get('float_size', 8)
+
+    points = header.get('points', [])
+    if len(points) == 0:
+        LOG.warning('No points exist in binary UV Track file.')
+        return header, []
+
+    msg = (
+        'Per-frame tracking data was not found on marker, skipping. '
+        'name=%r'
+    )
+    mkr_data_list = []
+    for point_data in points:
+        if point_filter is not None:
+            name = point_data.get('name')
+            id_ = point_data.get('id')
+            if point_filter(name, id_) is False:
+                continue
+        mkr_data = interface.MarkerData()
+
+        # Static point information.
+        mkr_data = _parse_point_info_v2_v3(mkr_data, point_data)
+
+        # 3D point data
+        if with_3d_pos is True:
+            mkr_data = _parse_point_3d_data_v3(mkr_data, point_data)
+
+        if point_data.get('num_frames', 0) == 0:
+            name = mkr_data.get_name()
+            LOG.warning(msg, name)
+            continue
+
+        columns = _read_point_columns_v5(
+            buf, data_start, point_data, float_size)
+        frames = [int(f) for f in columns['frame']]
+        mkr_data.x.set_times_and_values(frames, columns[x_key])
+        mkr_data.y.set_times_and_values(frames, columns[y_key])
+        mkr_data.weight.set_times_and_values(frames, columns['weight'])
+
+        # Fill in occluded point frames
+        mkr_data = _parse_marker_occluded_frames_v1_v2_v3(
+            mkr_data,
+            frames,
+        )
+        mkr_data_list.append(mkr_data)
+    return header, mkr_data_list
+
+
+def parse_v5(file_path, **kwargs):
+    """
+    Parse the binary UV file format.
+
+    The file is memory-mapped, so only the header and the per-frame
+    data of each point are read, as needed.
+
+    Accepts the keywords 'undistorted' and 'points'.
+
+    :param file_path: File path to read.
+    :type file_path: str
+
+    :return: List of MarkerData objects.
+    """
+    # Should we choose the undistorted or distorted marker data?
+    undistorted = kwargs.get('undistorted', None)  # bool or None
+    point_filter = interface.create_point_filter(kwargs.get('points'))
+    with open(file_path, 'rb') as f:
+        buf = _open_binary_file_v5(f)
+        try:
+            header, mkr_data_list = _parse_v5(
+                buf,
+                undistorted=undistorted,
+                with_3d_pos=True,
+                point_filter=point_filter,
+            )
+        finally:
+            buf.close()
+    file_info = _create_file_info(const.UV_TRACK_FORMAT_VERSION_5, header)
+    return file_info, mkr_data_list
+
+
+def index_v5(file_path, **kwargs):
+    """
+    Read the point metadata of the binary UV file format from the
+    header, without reading the per-frame values.
+
+    Only the first and last value of each point's frame column are
+    read, to get the frame range.
+
+    :param file_path: File path to read.
+    :type file_path: str
+
+    :returns: The file info and a PointInfo for each point. The
+              'offset' is the byte offset of the point data from the
+              end of the header.
+    :rtype: (FileInfo, [PointInfo, ..])
+    """
+    point_info_list = []
+    with open(file_path, 'rb') as f:
+        buf = _open_binary_file_v5(f)
+        try:
+            header, data_start = _read_binary_header_v5(buf)
+            float_size = header.get('float_size', 8)
+            value_format = '<d'
+            if float_size == 4:
+                value_format = '<f'
+            for point_data in header.get('points', []):
+                num_frames = point_data.get('num_frames', 0)
+                offset = point_data.get('offset', 0)
+                start_frame = None
+                end_frame = None
+                if num_frames > 0:
+                    # The 'frame' column is the first column.
+                    start = data_start + offset
+                    end = start + ((num_frames - 1) * float_size)
+                    start_frame = int(struct.unpack(
+                        value_format, buf[start:start + float_size])[0])
+                    end_frame = int(struct.unpack(
+                        value_format, buf[end:end + float_size])[0])
+                point_info = interface.create_point_info(
+                    name=point_data.get('name'),
+                    id_=point_data.get('id'),
+                    group_name=point_data.get('set_name'),
+                    start_frame=start_frame,
+                    end_frame=end_frame,
+                    num_frames=num_frames,
+                    offset=offset,
+                )
+                point_info_list.append(point_info)
+        finally:
+            buf.close()
+    file_info = _create_file_info(const.UV_TRACK_FORMAT_VERSION_5, header)
+    return file_info, point_info_list
+
+
 class LoaderUVTrack(interface.LoaderBase):
 
     name = 'UV Track Points (*.uv)'
@@ -557,20 +1119,77 @@ class LoaderUVTrack(interface.LoaderBase):
 
         :return: List of MarkerData
         """
-        version = determine_format_version(file_path)
+        # The file is decoded once and shared with the sub-parsers.
+        version, data = _read_format_version_and_data(file_path)
         if version == const.UV_TRACK_FORMAT_VERSION_1:
             file_info, mkr_data_list = parse_v1(file_path, **kwargs)
         elif version == const.UV_TRACK_FORMAT_VERSION_2:
-            file_info, mkr_data_list = parse_v2(file_path, **kwargs)
+            file_info, mkr_data_list = parse_v2(
+                file_path, data=data, **kwargs)
         elif version == const.UV_TRACK_FORMAT_VERSION_3:
-            file_info, mkr_data_list = parse_v3(file_path, **kwargs)
+            file_info, mkr_data_list = parse_v3(
+                file_path, data=data, **kwargs)
         elif version == const.UV_TRACK_FORMAT_VERSION_4:
-            file_info, mkr_data_list = parse_v4(file_path, **kwargs)
+            file_info, mkr_data_list = parse_v4(
+                file_path, data=data, **kwargs)
+        elif version == const.UV_TRACK_FORMAT_VERSION_5:
+            file_info, mkr_data_list = parse_v5(file_path, **kwargs)
         else:
             msg = 'Could not determine format version for UV Track file.'
             raise interface.ParserError(msg)
         return file_info, mkr_data_list
 
+    def parse_iter(self, file_path, **kwargs):
+        """
+        Decodes a file path into an iterator of MarkerData.
+
+        The ASCII (version 1) format is read incrementally, other
+        versions are decoded fully before the first MarkerData is
+        returned.
+
+        :param file_path: The file path to parse.
+        :type file_path: str
+
+        :param kwargs: The keyword 'undistorted' is used by
+                       UV_TRACK_FORMAT_VERSION_3 formats.
+
+        :return: The file info and an iterator of MarkerData.
+        :rtype: (FileInfo, iter of MarkerData)
+        """
+        version = _sniff_format_version(file_path)
+        if version == const.UV_TRACK_FORMAT_VERSION_1:
+            return parse_v1_iter(file_path, **kwargs)
+        return super(LoaderUVTrack, self).parse_iter(file_path, **kwargs)
+
+    def index(self, file_path, **kwargs):
+        """
+        Read the per-point metadata of a file path, without creating
+        MarkerData.
+
+        Version 1 files are scanned line by line, version 5 files
+        only read the header; other versions must decode the JSON
+        document, but do not read the per-frame values.
+
+        :param file_path: The file path to index.
+        :type file_path: str
+
+        :returns: The file info and a PointInfo for each point.
+        :rtype: (FileInfo, [PointInfo, ..])
+        """
+        version, data = _read_format_version_and_data(file_path)
+        if version == const.UV_TRACK_FORMAT_VERSION_1:
+            return index_v1(file_path, **kwargs)
+        elif version == const.UV_TRACK_FORMAT_VERSION_5:
+            return index_v5(file_path, **kwargs)
+        elif version in [const.UV_TRACK_FORMAT_VERSION_2,
+                         const.UV_TRACK_FORMAT_VERSION_3,
+                         const.UV_TRACK_FORMAT_VERSION_4]:
+            file_info = _create_file_info(version, data)
+            point_info_list = _index_v2_v3_v4(data)
+            return file_info, point_info_list
+        msg = 'Could not determine format version for UV Track file.'
+        raise interface.ParserError(msg)
+
 
 # Register the File Format
 mgr = fmtmgr.get_format_manager()
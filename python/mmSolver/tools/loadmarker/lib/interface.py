@@ -21,8 +21,25 @@ Provides a base interface for marker import plug-ins.
 
 import sys
 import abc
+import array
+import bisect
 import collections
 
+# NumPy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Type codes for the KeyframeData buffers, see the 'array' module.
+_TIME_TYPE_CODE = 'l'
+_VALUE_TYPE_CODE = 'd'
+
+# Default tolerances used to compare float values.
+FLOAT_ABS_TOLERANCE = 1e-9
+FLOAT_REL_TOLERANCE = 1e-9
+
 
 class ParserWarning(Warning):
     """
@@ -38,29 +55,103 @@ class ParserError(Exception):
     pass
 
 
-def float_is_equal(x, y):
+def float_is_equal(x, y,
+                   abs_tolerance=FLOAT_ABS_TOLERANCE,
+                   rel_tolerance=FLOAT_REL_TOLERANCE):
     """
     Check the two float numbers match.
 
+    The numbers match if the difference is within the absolute
+    tolerance, or within the relative tolerance of the larger
+    (absolute) number.
+
     :returns: True or False, if float is equal or not.
     :rtype: bool
     """
-    # float equality
     if x == y:
         return True
+    tolerance = max(abs_tolerance, rel_tolerance * max(abs(x), abs(y)))
+    return abs(x - y) <= tolerance
 
-    # float equality, with an epsilon
-    eps = sys.float_info.epsilon * 100.0
-    if x < (y + eps) and x > (y - eps):
-        return True
 
-    # string equality, with nine decimal places.
-    x_str = '%.9f' % float(x)
-    y_str = '%.9f' % float(y)
-    if x_str == y_str:
-        return True
+def _as_float_array(values):
+    """
+    Convert values into a numpy float array, without copying
+    'array.array' buffers.
+    """
+    if isinstance(values, array.array) and values.typecode == 'd':
+        return np.frombuffer(values, dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
 
-    return False
+
+def float_array_is_equal(values, other,
+                         abs_tolerance=FLOAT_ABS_TOLERANCE,
+                         rel_tolerance=FLOAT_REL_TOLERANCE):
+    """
+    Compare each float value with the matching 'other' value, using
+    the same rules as 'float_is_equal'.
+
+    If numpy is available the comparison is made in one vectorised
+    pass.
+
+    :param values: The float values to compare.
+    :type values: [float, ..] or array.array
+
+    :param other: The values to compare against, or a single value
+                  compared against all 'values'.
+    :type other: [float, ..] or array.array or float
+
+    :returns: A list of True or False, one for each value.
+    :rtype: [bool, ..]
+    """
+    is_scalar = isinstance(other, (int, long, float))
+    if is_scalar is False and len(values) != len(other):
+        raise ValueError('Number of values to compare does not match.')
+    if len(values) == 0:
+        return []
+    if np is not None:
+        a = _as_float_array(values)
+        if is_scalar is True:
+            b = float(other)
+        else:
+            b = _as_float_array(other)
+        tolerance = np.maximum(
+            abs_tolerance,
+            rel_tolerance * np.maximum(np.abs(a), np.abs(b)))
+        equal = (a == b) | (np.abs(a - b) <= tolerance)
+        return equal.tolist()
+    if is_scalar is True:
+        other = [other] * len(values)
+    return [float_is_equal(x, y, abs_tolerance, rel_tolerance)
+            for x, y in zip(values, other)]
+
+
+def float_array_all_equal(values, other,
+                          abs_tolerance=FLOAT_ABS_TOLERANCE,
+                          rel_tolerance=FLOAT_REL_TOLERANCE):
+    """
+    Are all float values equal to the matching 'other' value?
+
+    :param values: The float values to compare.
+    :type values: [float, ..] or array.array
+
+    :param other: The values to compare against, or a single value
+                  compared against all 'values'.
+    :type other: [float, ..] or array.array or float
+
+    :rtype: bool
+    """
+    if np is not None:
+        equal = float_array_is_equal(
+            values, other, abs_tolerance, rel_tolerance)
+        return all(equal)
+    if isinstance(other, (int, long, float)):
+        return all(float_is_equal(x, other, abs_tolerance, rel_tolerance)
+                   for x in values)
+    if len(values) != len(other):
+        raise ValueError('Number of values to compare does not match.')
+    return all(float_is_equal(x, y, abs_tolerance, rel_tolerance)
+               for x, y in zip(values, other))
 
 
 def get_closest_frame(frame, value):
@@ -72,66 +163,164 @@ def get_closest_frame(frame, value):
 
     Returns the closest frame in the dict value.
     """
-    keys = value.keys()
-    int_keys = list()
-    for key in keys:
-        int_keys.append(int(key))
-    keys = sorted(int_keys)
-    diff = int()
-    closest_frame = None
-    for key in keys:
-        if closest_frame is None:
-            closest_frame = key
-            diff = frame - closest_frame
-        if (key <= frame) and (key > closest_frame):
-            closest_frame = key
-        diff = closest_frame - frame
-    keys.reverse()
-    closest_frame_rev = None
-    for key in keys:
-        if closest_frame_rev is None:
-            closest_frame_rev = key
-            diff = frame - closest_frame_rev
-        if (key >= frame) and (key < closest_frame_rev):
-            closest_frame_rev = key
-        diff = closest_frame_rev - frame
-    diffRef = abs(closest_frame_rev - frame)
-    diff = abs(closest_frame - frame)
-    if diffRef < diff:
-        closest_frame = closest_frame_rev
-    return closest_frame
+    keys = sorted([int(key) for key in value.keys()])
+    index = _get_closest_index(keys, frame)
+    if index is None:
+        return None
+    return keys[index]
+
+
+def _get_closest_index(sorted_frames, frame):
+    """
+    Find the index of the closest frame, using a binary search.
+
+    When two frames are equally close, the earlier frame is used.
+
+    :param sorted_frames: Frame numbers, sorted in ascending order.
+    :type sorted_frames: [int, ..] or array.array
+
+    :param frame: The frame to look up.
+    :type frame: int
+
+    :returns: Index into 'sorted_frames', or None if there are no
+              frames.
+    :rtype: int or None
+    """
+    num = len(sorted_frames)
+    if num == 0:
+        return None
+    index = bisect.bisect_left(sorted_frames, frame)
+    if index == 0:
+        return 0
+    if index == num:
+        return num - 1
+    before = sorted_frames[index - 1]
+    after = sorted_frames[index]
+    if (after - frame) < (frame - before):
+        return index
+    return index - 1
+
+
+def get_frame_intervals(frames):
+    """
+    Convert a list of frames into run-length encoded intervals.
+
+    Runs in linear time, if the frames are already sorted.
+
+    :param frames: Frame numbers, duplicates are allowed.
+    :type frames: [int, ..]
+
+    :returns: Sorted list of (start, end) frame intervals, both ends
+              are inclusive.
+    :rtype: [(int, int), ..]
+    """
+    intervals = []
+    frames = sorted(frames)
+    if len(frames) == 0:
+        return intervals
+    start = int(frames[0])
+    end = start
+    for frame in frames:
+        if frame > (end + 1):
+            intervals.append((start, end))
+            start = int(frame)
+            end = start
+        elif frame > end:
+            end = int(frame)
+    intervals.append((start, end))
+    return intervals
+
+
+def fill_occluded_frames(mkr_data, frames):
+    """
+    Set the enable and weight values based on the frames we have data
+    for.
+
+    Frames between the first and last frame that have no data are
+    occluded; they are disabled and given a weight of zero. The
+    enabled frames are also stored as run-length intervals on the
+    MarkerData, see MarkerData.get_enable_intervals().
+
+    Runs in linear time in the number of frames.
+
+    :param mkr_data: The Marker data to set.
+    :type mkr_data: MarkerData
+
+    :param frames: The frames this a marker has been enabled for.
+    :type frames: [int, ..]
+
+    :rtype: MarkerData
+    """
+    intervals = get_frame_intervals(frames)
+    if len(intervals) == 0:
+        return mkr_data
+    start_frame = intervals[0][0]
+    end_frame = intervals[-1][1]
+    num_frames = end_frame - start_frame + 1
+    all_frames = array.array(
+        _TIME_TYPE_CODE, range(start_frame, end_frame + 1))
+
+    # Each interval is filled with a single slice assignment, rather
+    # than testing every frame for membership.
+    weight_times = mkr_data.weight.get_time_array()
+    weight_values = mkr_data.weight.get_value_array()
+    enable_values = array.array(_VALUE_TYPE_CODE, [0.0]) * num_frames
+    new_weight_values = array.array(_VALUE_TYPE_CODE, [0.0]) * num_frames
+    for start, end in intervals:
+        length = end - start + 1
+        index = start - start_frame
+        enable_values[index:index + length] = (
+            array.array(_VALUE_TYPE_CODE, [1.0]) * length)
+
+        weight_start = bisect.bisect_left(weight_times, start)
+        weight_end = bisect.bisect_right(weight_times, end)
+        if (weight_end - weight_start) == length:
+            # There is a weight value on every frame of the interval.
+            new_weight_values[index:index + length] = (
+                weight_values[weight_start:weight_end])
+            continue
+        for i in range(weight_start, weight_end):
+            frame = weight_times[i]
+            new_weight_values[frame - start_frame] = weight_values[i]
+
+    mkr_data.enable.set_times_and_values(all_frames, enable_values)
+    mkr_data.weight.set_times_and_values(all_frames, new_weight_values)
+    mkr_data.set_enable_intervals(intervals)
+    return mkr_data
 
 
 class KeyframeData(object):
     """
     Keyframe data, used to store animated or static data.
 
+    Frames are stored as sorted integers and values as floats, in
+    compact 'array' buffers. Looking up a value is a binary search,
+    rather than a scan of all frames.
+
     Note: Static data is just a single keyframe of data, or multiple keyframes
     with the same value.
     """
 
     def __init__(self, data=None):
-        self._data = dict()
-        self._up_to_date = False
-        self._keyframe_values = None
+        self._times = array.array(_TIME_TYPE_CODE)
+        self._values = array.array(_VALUE_TYPE_CODE)
         if isinstance(data, dict):
-            self._data = data.copy()
+            frames = sorted([int(key) for key in data.keys()])
+            values = [float(data[str(f)]) for f in frames]
+            self.set_times_and_values(frames, values)
 
     def get_start_frame(self):
-        times = self.get_times()
-        if len(times) == 0:
+        if len(self._times) == 0:
             return None
-        return int(times[0])
+        return int(self._times[0])
 
     def get_end_frame(self):
-        times = self.get_times()
-        if len(times) == 0:
+        if len(self._times) == 0:
             return None
-        return int(times[-1])
+        return int(self._times[-1])
 
     def get_length(self):
-        times = self.get_times()
-        return len(times)
+        return len(self._times)
 
     def get_raw_data(self):
         """
@@ -139,108 +328,129 @@ class KeyframeData(object):
 
         This is so that the user can query the data then give it to the
         __init__ of a new class.
+
+        :returns: Dictionary of frame (as string) to value.
+        :rtype: {str: float}
         """
-        return self._data.copy()
+        data = dict()
+        for t, v in zip(self._times, self._values):
+            data[str(t)] = v
+        return data
 
     def get_value(self, frame):
         """
         Get the key value at frame. frame is an integer.
+
+        If there is no key on the frame, the value of the closest
+        frame is returned.
         """
-        assert isinstance(self._data, dict)
-        key = str(frame)
-        value = self._data.get(key)
-        if value is None:
-            # there is no key on the frame, find the closest frame.
-            frame = get_closest_frame(frame, self._data)
-            key = str(frame)
-            if key in self._data:
-                value = self._data[key]
-        return value
+        index = _get_closest_index(self._times, frame)
+        if index is None:
+            return None
+        return self._values[index]
 
     def get_keyframe_values(self):
-        assert isinstance(self._data, dict)
-
-        # This enables multiple calls not to re-compute this data.
-        if self._up_to_date is True:
-            return self._keyframe_values
-
-        key_values = list()
-
-        # Sort keys, based on int values, not string.
-        keys = self._data.keys()
-        int_keys = list()
-        for key in self._data.iterkeys():
-            int_keys.append(int(key))
-        keys = sorted(int_keys)
-
-        # Create key/value pairs.
-        for key in keys:
-            key_value = (int(key), self.get_value(int(key)))
-            key_values.append(key_value)
-
-        self._keyframe_values = key_values
-        self._up_to_date = True
-        return key_values
+        return list(zip(self._times, self._values))
 
     def get_times(self):
         """
         Get all times, should be first half of get_keyframe_values.
         """
-        time_values = list()
-        key_values = self.get_keyframe_values()
-        for kv in key_values:
-            time_values.append(kv[0])
-        return time_values
+        return self._times.tolist()
 
     def get_values(self):
         """
         Get all values, should be second half of get_keyframe_values.
         """
-        values = list()
-        key_values = self.get_keyframe_values()
-        for kv in key_values:
-            values.append(kv[1])
-        return values
+        return self._values.tolist()
 
     def get_times_and_values(self):
         """
         Get all times, should be first half of get_keyframe_values.
         """
-        times = list()
-        values = list()
-        key_values = self.get_keyframe_values()
-        for kv in key_values:
-            times.append(kv[0])
-            values.append(kv[1])
-        return times, values
+        return self._times.tolist(), self._values.tolist()
+
+    def get_time_array(self):
+        """
+        Get the underlying (sorted) frame buffer.
+
+        .. note:: The buffer is not copied, do not modify it.
+
+        :rtype: array.array
+        """
+        return self._times
+
+    def get_value_array(self):
+        """
+        Get the underlying value buffer, matching get_time_array().
+
+        .. note:: The buffer is not copied, do not modify it.
+
+        :rtype: array.array
+        """
+        return self._values
 
     def set_value(self, frame, value):
         """
         Set the 'value', at 'frame'.
         """
-        self._up_to_date = False
-        frame_str = str(frame)
-        self._data[frame_str] = value
+        frame = int(frame)
+        value = float(value)
+        times = self._times
+        if len(times) == 0 or frame > times[-1]:
+            # Most formats give frames in ascending order.
+            times.append(frame)
+            self._values.append(value)
+            return True
+        index = bisect.bisect_left(times, frame)
+        if times[index] == frame:
+            self._values[index] = value
+        else:
+            times.insert(index, frame)
+            self._values.insert(index, value)
+        return True
+
+    def set_times_and_values(self, times, values):
+        """
+        Replace all keyframes with the given times and values.
+
+        :param times: Frame numbers, one per value.
+        :type times: [int, ..]
+
+        :param values: Values, one per frame.
+        :type values: [float, ..]
+        """
+        if len(times) != len(values):
+            raise ValueError('Number of times and values does not match.')
+        try:
+            times = array.array(_TIME_TYPE_CODE, times)
+        except TypeError:
+            times = array.array(_TIME_TYPE_CODE, [int(t) for t in times])
+        values = array.array(_VALUE_TYPE_CODE, values)
+        sorted_times = array.array(_TIME_TYPE_CODE, sorted(times))
+        if times != sorted_times:
+            pairs = sorted(zip(times, values))
+            times = array.array(_TIME_TYPE_CODE, [t for t, _ in pairs])
+            values = array.array(_VALUE_TYPE_CODE, [v for _, v in pairs])
+        self._times = times
+        self._values = values
         return True
 
     def simplify_data(self):
         """
         Tries to convert the keyframe data into
         static if all values are the same.
+
+        Static data is stored as a single keyframe, on the first frame.
         """
-        assert isinstance(self._data, dict)
-        self._up_to_date = False
-        initial = None
-        total = float()  # assume it's a float?
-        total_num = int()
-        for key in iter(self._data):
-            if initial is None:
-                initial = self._data[key]
-            total = total + float(self._data[key])
-            total_num = total_num + 1
-        average = total / total_num
-        if float_is_equal(average, initial):
-            self._data = average
+        if len(self._values) == 0:
+            return True
+        initial = self._values[0]
+        if float_array_all_equal(self._values, initial):
+            average = sum(self._values) / len(self._values)
+            start_frame = self._times[0]
+            self._times = array.array(_TIME_TYPE_CODE, [start_frame])
+            self._values = array.array(_VALUE_TYPE_CODE, [average])
         return True
 
 
@@ -254,6 +464,7 @@ class MarkerData(object):
         self._y = KeyframeData()
         self._enable = KeyframeData()
         self._weight = KeyframeData()
+        self._enable_intervals = None
         self._bnd_x = None
         self._bnd_y = None
         self._bnd_z = None
@@ -302,6 +513,20 @@ class MarkerData(object):
 
     def set_enable(self, value):
         self._enable = value
+        self._enable_intervals = None
+
+    def get_enable_intervals(self):
+        """
+        Get the enabled frames, as run-length encoded intervals.
+
+        :returns: List of (start, end) inclusive frame intervals, or
+                  None if the intervals are not known.
+        :rtype: [(int, int), ..] or None
+        """
+        return self._enable_intervals
+
+    def set_enable_intervals(self, value):
+        self._enable_intervals = value
 
     def get_weight(self):
         return self._weight
@@ -350,6 +575,7 @@ class MarkerData(object):
     x = property(get_x, set_x)
     y = property(get_y, set_y)
     enable = property(get_enable, set_enable)
+    enable_intervals = property(get_enable_intervals, set_enable_intervals)
     weight = property(get_weight, set_weight)
     group_name = property(get_group_name, set_group_name)
     color = property(get_color, set_color)
@@ -393,6 +619,104 @@ def create_file_info(marker_distorted=None,
     return file_info
 
 
+PointInfo = collections.namedtuple(
+    'PointInfo',
+    [
+        'name',
+        'id',
+        'group_name',
+        'start_frame',
+        'end_frame',
+        'num_frames',
+        'offset',
+    ]
+)
+
+
+def create_point_info(name=None,
+                      id_=None,
+                      group_name=None,
+                      start_frame=None,
+                      end_frame=None,
+                      num_frames=None,
+                      offset=None):
+    """
+    Create the per-point metadata returned by 'LoaderBase.index'.
+
+    :param offset: Position in the file where the point data starts,
+                   for text formats, or None if not known.
+    :type offset: int or None
+    """
+    if num_frames is None:
+        num_frames = 0
+    point_info = PointInfo(
+        name=name,
+        id=id_,
+        group_name=group_name,
+        start_frame=start_frame,
+        end_frame=end_frame,
+        num_frames=num_frames,
+        offset=offset,
+    )
+    return point_info
+
+
+def create_point_filter(points=None):
+    """
+    Create a function to test if a point should be parsed.
+
+    :param points: Point names (str) or point ids (int) to parse, or
+                   None to parse all points.
+    :type points: [str or int, ..] or None
+
+    :returns: A function taking a point name and id, returning True if
+              the point should be parsed, or None if all points should
+              be parsed.
+    :rtype: callable or None
+    """
+    if points is None:
+        return None
+    names = set()
+    ids = set()
+    for point in points:
+        if isinstance(point, basestring):
+            names.add(point)
+        elif isinstance(point, (int, long)) and not isinstance(point, bool):
+            ids.add(point)
+        else:
+            msg = 'points must be names (str) or ids (int), got %r'
+            raise TypeError(msg % point)
+
+    def point_filter(name, id_):
+        return name in names or (id_ is not None and id_ in ids)
+    return point_filter
+
+
+def create_point_info_from_marker_data(mkr_data):
+    """
+    Create the PointInfo for an already parsed MarkerData.
+
+    :type mkr_data: MarkerData
+
+    :rtype: PointInfo
+    """
+    x_keys = mkr_data.get_x()
+    start_frame = None
+    end_frame = None
+    if x_keys.get_length() > 0:
+        start_frame = x_keys.get_start_frame()
+        end_frame = x_keys.get_end_frame()
+    point_info = create_point_info(
+        name=mkr_data.get_name(),
+        id_=mkr_data.get_id(),
+        group_name=mkr_data.get_group_name(),
+        start_frame=start_frame,
+        end_frame=end_frame,
+        num_frames=x_keys.get_length(),
+    )
+    return point_info
+
+
 class LoaderBase(object):
     """
     Base class for all format loaders.
@@ -413,3 +737,41 @@ class LoaderBase(object):
         Inherit from LoaderBase and override this method.
         """
         return
+
+    def parse_iter(self, file_path, **kwargs):
+        """
+        Parse the given file path, returning the MarkerData lazily.
+
+        The default implementation parses the whole file with
+        'parse'. Formats that can be read incrementally should
+        override this method and yield each MarkerData as soon as it
+        is available.
+
+        :returns: The file info and an iterator of MarkerData.
+        :rtype: (FileInfo, iter of MarkerData)
+        """
+        file_info, mkr_data_list = self.parse(file_path, **kwargs)
+        return file_info, iter(mkr_data_list)
+
+    def index(self, file_path, **kwargs):
+        """
+        Read the per-point metadata of the given file path, without
+        the per-frame data.
+
+        The default implementation parses the whole file with
+        'parse'. Formats should override this method to avoid
+        decoding the per-frame values.
+
+        Formats should also accept a 'points' keyword argument in
+        'parse', a list of point names or ids to parse; see
+        'create_point_filter'.
+
+        :returns: The file info and a PointInfo for each point.
+        :rtype: (FileInfo, [PointInfo, ..])
+        """
+        file_info, mkr_data_list = self.parse(file_path, **kwargs)
+        point_info_list = [
+            create_point_info_from_marker_data(mkr_data)
+            for mkr_data in mkr_data_list
+        ]
+        return file_info, point_info_list
@@ -21,56 +21,198 @@ Module for reading marker files.
 This should be used by end-users, not the internal modules.
 """
 
-import os
+import collections
 
 import maya.cmds
+import maya.OpenMaya as OpenMaya1
+import maya.OpenMayaAnim as OpenMayaAnim1
 
 import mmSolver.logger
 
 import mmSolver.api as mmapi
 import mmSolver.utils.animcurve as anim_utils
+import mmSolver.utils.keyreduce as keyreduce
 import mmSolver.utils.node as node_utils
+import mmSolver.utils.event as event_utils
+import mmSolver.utils.undo as undo_utils
 import mmSolver.tools.loadmarker.lib.fieldofview as fieldofview
+import mmSolver.tools.loadmarker.lib.utils as lib_utils
 import mmSolver.tools.loadmarker.lib.interface as interface
-import mmSolver.tools.loadmarker.lib.formatmanager as fmtmgr
-
-# Used to force importing of formats; do not remove this line.
-import mmSolver.tools.loadmarker.lib.formats
+import mmSolver.tools.loadmarker.lib.parsecache as parsecache
+import mmSolver.tools.loadmarker.lib.readfile as readfile
+import mmSolver.tools.loadmarker.lib.bulkcreate as bulkcreate
 
 
 LOG = mmSolver.logger.get_logger()
 
 
-def read(file_path, **kwargs):
+def read(file_path, use_cache=True, **kwargs):
     """
     Read a file path, find the format parser based on the file extension.
+
+    Parsed files are cached (see the 'parsecache' module), reading an
+    unchanged file again with the same arguments does not parse the
+    file.
+
+    :param file_path: The marker file path to read.
+    :type file_path: str
+
+    :param use_cache: Look up and store the parsed data in the cache.
+    :type use_cache: bool
+
+    :param kwargs: Keyword arguments given to the file format parser.
+
+    :returns: The file info and list of MarkerData. The MarkerData
+              objects may be shared with other callers and must not be
+              modified.
+    :rtype: (FileInfo, [MarkerData, ..])
     """
-    if isinstance(file_path, (str, unicode)) is False:
-        msg = 'file path must be a string, got %r'
-        raise TypeError(msg % type(file_path))
-    if os.path.isfile(file_path) is False:
-        msg = 'file path does not exist; %r'
-        raise OSError(msg % file_path)
-
-    file_format_class = None
-    mgr = fmtmgr.get_format_manager()
-    for fmt in mgr.get_formats():
-        attr = getattr(fmt, 'file_exts', None)
-        if attr is None:
-            continue
-        if not isinstance(fmt.file_exts, list):
-            continue
-        for ext in fmt.file_exts:
-            if file_path.endswith(ext):
-                file_format_class = fmt
-                break
-    if file_format_class is None:
-        msg = 'No file formats found for file path: %r'
-        raise RuntimeError(msg % file_path)
+    cache = None
+    key = None
+    if use_cache is True:
+        # Raise errors for invalid file paths, even if cached.
+        readfile.get_file_format_class(file_path)
+        cache = parsecache.get_parse_cache()
+        key = parsecache.create_key(file_path, **kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    file_info, mkr_data_list = readfile.read(file_path, **kwargs)
+    if cache is not None:
+        cache.set(key, file_info, mkr_data_list)
+    return file_info, mkr_data_list
+
+
+def index(file_path, use_cache=True, **kwargs):
+    """
+    Read the per-point metadata of a file path, see 'readfile.index'.
+
+    The result is cached (see the 'parsecache' module), indexing an
+    unchanged file again with the same arguments does not read the
+    file.
+
+    :param file_path: The marker file path to index.
+    :type file_path: str
+
+    :param use_cache: Look up and store the metadata in the cache.
+    :type use_cache: bool
+
+    :param kwargs: Keyword arguments given to the file format.
+
+    :rtype: (FileInfo, [PointInfo, ..])
+    """
+    cache = None
+    key = None
+    if use_cache is True:
+        # Raise errors for invalid file paths, even if cached.
+        readfile.get_file_format_class(file_path)
+        cache = parsecache.get_parse_cache()
+        key = parsecache.create_index_key(file_path, **kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    file_info, point_info_list = readfile.index(file_path, **kwargs)
+    if cache is not None:
+        cache.set(key, file_info, point_info_list)
+    return file_info, point_info_list
+
+
+def read_iter(file_path, use_cache=True, **kwargs):
+    """
+    Read a file path, returning the MarkerData objects lazily.
+
+    The returned iterator can be given directly to 'create_nodes', so
+    nodes are created while the file is still being read. If the file
+    has already been parsed and cached, the cached data is iterated
+    instead.
+
+    :returns: The file info and an iterator of MarkerData.
+    :rtype: (FileInfo, iter of MarkerData)
+    """
+    file_format_class = readfile.get_file_format_class(file_path)
+    if use_cache is True:
+        cache = parsecache.get_parse_cache()
+        key = parsecache.create_key(file_path, **kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            file_info, mkr_data_list = cached
+            return file_info, iter(mkr_data_list)
 
     file_format_obj = file_format_class()
-    file_info, mkr_data_list = file_format_obj.parse(file_path, **kwargs)
-    return file_info, mkr_data_list
+    file_info, mkr_data_iter = file_format_obj.parse_iter(file_path, **kwargs)
+    return file_info, mkr_data_iter
+
+
+def read_many(file_paths, use_cache=True, max_workers=None, prog_fn=None,
+              **kwargs):
+    """
+    Read many file paths at once.
+
+    Files not found in the parse cache are read in a pool of worker
+    processes, see 'readfile.read_many'. The returned MarkerData can
+    then be given to 'create_nodes'.
+
+    :param file_paths: The marker file paths to read.
+    :type file_paths: [str, ..]
+
+    :param use_cache: Look up and store the parsed data in the cache.
+    :type use_cache: bool
+
+    :param max_workers: The maximum number of worker processes. None
+                        uses the number of CPUs, 1 or less reads in
+                        the current process.
+    :type max_workers: None or int
+
+    :param prog_fn: A function called with an 'int' argument, to
+                    display progress information to the user. The
+                    value is between 0 and 100.
+    :type prog_fn: None or function
+
+    :param kwargs: Keyword arguments given to each file format parser.
+
+    :returns: A list of (file path, FileInfo, [MarkerData, ..]) in the
+              same order as 'file_paths', for all files read, and a
+              dict of file path to error message for the files that
+              could not be read.
+    :rtype: ([(str, FileInfo, [MarkerData, ..]), ..], {str: str})
+    """
+    file_paths = list(file_paths)
+    cache = None
+    results = {}
+    keys = {}
+    if use_cache is True:
+        cache = parsecache.get_parse_cache()
+        for file_path in file_paths:
+            key = parsecache.create_key(file_path, **kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                results[file_path] = cached
+            keys[file_path] = key
+
+    remaining = [f for f in file_paths if f not in results]
+    read_results, errors = readfile.read_many(
+        remaining,
+        max_workers=max_workers,
+        prog_fn=prog_fn,
+        **kwargs)
+    for file_path, data in read_results.items():
+        if cache is not None:
+            file_info, mkr_data_list = data
+            cache.set(keys.get(file_path), file_info, mkr_data_list)
+        results[file_path] = data
+    if prog_fn is not None:
+        prog_fn(100)
+
+    result_list = []
+    for file_path in file_paths:
+        data = results.get(file_path)
+        if data is None:
+            continue
+        file_info, mkr_data_list = data
+        result_list.append((file_path, file_info, mkr_data_list))
+    return result_list, errors
 
 
 def __create_node(mkr_data, cam, mkr_grp, with_bundles):
@@ -117,18 +259,13 @@ def __create_node(mkr_data, cam, mkr_grp, with_bundles):
     return mkr, bnd
 
 
-def __set_attr_keyframes(node, attr_name, keyframes,
-                         before_value=None,
-                         after_value=None,
-                         reduce_keys=None):
+def _get_attr_keyframes(keyframes,
+                        before_value=None,
+                        after_value=None,
+                        reduce_keys=None):
     """
-    Set keyframes on a node.attribute, from a KeyframeData instance.
-
-    :param node: Node to set data on.
-    :type node: str
-
-    :param attr_name: Attribute (on 'node') to set keyframes.
-    :type attr_name: str
+    Get the times and values to set as keyframes, from a KeyframeData
+    instance.
 
     :param keyframes: The keyframe information.
     :type keyframes: KeyframeData
@@ -139,14 +276,14 @@ def __set_attr_keyframes(node, attr_name, keyframes,
     :param after_value: Value to set after the first keyframe.
     :type after_value: int, float or bool
 
-    :param reduce_keys: Allow reducing the keyframes, potentially
-                        deleting all keyframes. Values will NEVER be
-                        changed, only duplicate keyframe data is
-                        removed.
+    :param reduce_keys: Remove keyframes with the same value as the
+                        previous and next keyframes. Values will
+                        NEVER be changed, only duplicate keyframe
+                        data is removed.
     :type reduce_keys: bool
 
-    :returns: Maya API (version 1) MFnAnimCurve object.
-    :rtype: maya.OpenMaya.MFnAnimCurve
+    :returns: The keyframe times and values.
+    :rtype: ([int, ..], [float, ..])
     """
     if isinstance(keyframes, interface.KeyframeData) is False:
         msg = 'keyframes must be type %r'
@@ -173,39 +310,251 @@ def __set_attr_keyframes(node, attr_name, keyframes,
     # Reduce keyframes, we don't need per-frame keyframes if the data
     # is the same. Change the times/values just before we set the
     # keyframes
-    if reduce_keys is True:
+    if reduce_keys is True and len(times) > 0:
         tmp_times = list(times)
         tmp_values = list(values)
-        times = []
-        values = []
-        prev_t = None
-        prev_v = None
-        for t, v in zip(tmp_times, tmp_values):
-            if prev_v is None:
-                times.append(t)
-                values.append(v)
-            elif interface.float_is_equal(prev_v, v) is False:
-                times.append(prev_t)
-                values.append(prev_v)
-                times.append(t)
-                values.append(v)
-            prev_t = t
-            prev_v = v
-
-    node_attr = node + '.' + attr_name
-    anim_fn = anim_utils.create_anim_curve_node_apione(times, values, node_attr)
-
-    if reduce_keys is True:
-        locked = maya.cmds.getAttr(node_attr, lock=True)
-        maya.cmds.setAttr(node_attr, lock=False)
-        maya.cmds.delete(node_attr, staticChannels=True)
-        maya.cmds.setAttr(node_attr, lock=locked)
-    return anim_fn
+        # Compare each value with the previous value, in one pass.
+        same_as_prev = interface.float_array_is_equal(
+            tmp_values[1:], tmp_values[:-1])
+        times = [tmp_times[0]]
+        values = [tmp_values[0]]
+        for i, is_same in enumerate(same_as_prev):
+            if is_same is False:
+                times.append(tmp_times[i])
+                values.append(tmp_values[i])
+                times.append(tmp_times[i + 1])
+                values.append(tmp_values[i + 1])
+    return times, values
+
+
+def _get_enable_interval_keyframes(intervals):
+    """
+    Get the stepped keyframe times and values for enabled intervals.
+
+    :param intervals: List of (start, end) inclusive frame intervals.
+    :type intervals: [(int, int), ..]
+
+    :returns: The keyframe times and values.
+    :rtype: ([int, ..], [float, ..])
+    """
+    assert len(intervals) > 0
+    times = [intervals[0][0] - 1]
+    values = [0.0]
+    for start, end in intervals:
+        times += [start, end + 1]
+        values += [1.0, 0.0]
+    return times, values
+
+
+def _get_key_reduce_tolerance(key_reduce_tolerance, image_resolution):
+    """
+    Convert a key reduction tolerance in pixels into UV coordinates.
+
+    :param key_reduce_tolerance: Tolerance in pixels, or None.
+    :type key_reduce_tolerance: float or None
+
+    :param image_resolution: The image width and height, in pixels. If
+                             None, the Maya render resolution is used.
+    :type image_resolution: (int, int) or None
+
+    :returns: The X and Y tolerance in UV coordinates, or None if
+              keyframes should not be reduced.
+    :rtype: (float, float) or None
+    """
+    if key_reduce_tolerance is None:
+        return None
+    assert isinstance(key_reduce_tolerance, (int, float))
+    if image_resolution is None:
+        image_resolution = lib_utils.get_default_image_resolution()
+    image_width, image_height = image_resolution
+    tolerance_x = float(key_reduce_tolerance) / image_width
+    tolerance_y = float(key_reduce_tolerance) / image_height
+    return tolerance_x, tolerance_y
+
+
+def _get_translate_keyframes(mkr_data, overscan_x, overscan_y,
+                             key_reduce_tolerance=None):
+    """
+    Get the Marker translate X and Y keyframes, in Marker space.
+
+    :param mkr_data: The data to get keyframes from.
+    :type mkr_data: MarkerData
+
+    :param overscan_x: Overscan factor to apply to the MarkerData x values.
+    :type overscan_x: float
+
+    :param overscan_y: Overscan factor to apply to the MarkerData y values.
+    :type overscan_y: float
+
+    :param key_reduce_tolerance: The X and Y tolerance (in UV
+                                 coordinates) used to reduce the
+                                 keyframes, or None.
+    :type key_reduce_tolerance: (float, float) or None
+
+    :returns: The X (times, values), Y (times, values) and the tangent
+              type to set the keyframes with (None uses the global
+              default).
+    :rtype: (([int, ..], [float, ..]), ([int, ..], [float, ..]), int or None)
+    """
+    mkr_x_times, mkr_x_values = mkr_data.get_x().get_times_and_values()
+    mkr_y_times, mkr_y_values = mkr_data.get_y().get_times_and_values()
+    tangent_type = None
+    if key_reduce_tolerance is not None:
+        # Reduced keyframes are linearly interpolated, so every
+        # original value stays within the tolerance.
+        tolerance_x, tolerance_y = key_reduce_tolerance
+        mkr_x_times, mkr_x_values = keyreduce.reduce_keys(
+            mkr_x_times, mkr_x_values, tolerance_x)
+        mkr_y_times, mkr_y_values = keyreduce.reduce_keys(
+            mkr_y_times, mkr_y_values, tolerance_y)
+        tangent_type = OpenMayaAnim1.MFnAnimCurve.kTangentLinear
+    mkr_x_values = [(v - 0.5) * overscan_x for v in mkr_x_values]
+    mkr_y_values = [(v - 0.5) * overscan_y for v in mkr_y_values]
+    return ((mkr_x_times, mkr_x_values),
+            (mkr_y_times, mkr_y_values),
+            tangent_type)
+
+
+def _get_marker_keyframes(mkr_data, overscan_x, overscan_y,
+                          key_reduce_tolerance=None):
+    """
+    Get the keyframes to set on the Marker attributes.
+
+    Attributes with the same value on all keyframes do not need an
+    animCurve, the value is returned instead.
+
+    :param mkr_data: The data to get keyframes from.
+    :type mkr_data: MarkerData
+
+    :param overscan_x: Overscan factor to apply to the MarkerData x values.
+    :type overscan_x: float
+
+    :param overscan_y: Overscan factor to apply to the MarkerData y values.
+    :type overscan_y: float
+
+    :param key_reduce_tolerance: The X and Y tolerance (in UV
+                                 coordinates) used to reduce the
+                                 translate keyframes, or None.
+    :type key_reduce_tolerance: (float, float) or None
+
+    :returns: A dict of attribute name to (times, values,
+              tangent_in_type, tangent_out_type) for animCurves, and
+              a dict of attribute name to value.
+    :rtype: ({str: ([int, ..], [float, ..], int, int)}, {str: float})
+    """
+    anim_curves = {}
+    static_values = {}
+    translate_keyframes = _get_translate_keyframes(
+        mkr_data, overscan_x, overscan_y,
+        key_reduce_tolerance=key_reduce_tolerance)
+    tangent_type = translate_keyframes[2]
+    if tangent_type is None:
+        tangent_type = OpenMayaAnim1.MFnAnimCurve.kTangentGlobal
+    for attr_name, (times, values) in zip(['translateX', 'translateY'],
+                                          translate_keyframes[:2]):
+        if len(times) == 0:
+            continue
+        anim_curves[attr_name] = (
+            times, values, tangent_type, tangent_type)
+
+    tangent_global = OpenMayaAnim1.MFnAnimCurve.kTangentGlobal
+    keyframe_attrs = [('weight', mkr_data.get_weight(), None, None)]
+    mkr_enable_intervals = mkr_data.get_enable_intervals()
+    if mkr_enable_intervals:
+        times, values = _get_enable_interval_keyframes(mkr_enable_intervals)
+        anim_curves['enable'] = (
+            times, values,
+            tangent_global,
+            OpenMayaAnim1.MFnAnimCurve.kTangentStep)
+    else:
+        keyframe_attrs.append(('enable', mkr_data.get_enable(), False, False))
+    for attr_name, keyframes, before_value, after_value in keyframe_attrs:
+        times, values = _get_attr_keyframes(
+            keyframes,
+            before_value=before_value,
+            after_value=after_value,
+            reduce_keys=True)
+        if len(values) == 0:
+            continue
+        # A curve with the same value everywhere is replaced by the
+        # value, the same as deleting static channels.
+        if interface.float_array_all_equal(values, values[0]):
+            value = values[0]
+            if attr_name == 'enable':
+                value = int(value)
+            static_values[attr_name] = value
+        else:
+            anim_curves[attr_name] = (
+                times, values, tangent_global, tangent_global)
+
+    return anim_curves, static_values
+
+
+def _get_anim_curve_keys(node_attr):
+    """
+    Get the keyframes of the animCurve connected to a node attribute.
+
+    :param node_attr: The node attribute to query.
+    :type node_attr: str
+
+    :returns: The keyframe times and values, or None if the attribute
+              is not animated.
+    :rtype: ([float, ..], [float, ..]) or None
+    """
+    plug = node_utils.get_as_plug_apione(node_attr)
+    if plug is None:
+        return None
+    objs = OpenMaya1.MObjectArray()
+    find = OpenMayaAnim1.MAnimUtil.findAnimation(plug, objs)
+    if find is False or objs.length() == 0:
+        return None
+    anim_fn = OpenMayaAnim1.MFnAnimCurve(objs[0])
+    unit = OpenMaya1.MTime.uiUnit()
+    num_keys = anim_fn.numKeys()
+    times = [anim_fn.time(i).asUnits(unit) for i in range(num_keys)]
+    values = [anim_fn.value(i) for i in range(num_keys)]
+    return times, values
+
+
+def _anim_curve_is_equal(node_attr, times, values):
+    """
+    Does the animCurve on 'node_attr' have exactly the given keyframes?
+    """
+    keys = _get_anim_curve_keys(node_attr)
+    if keys is None:
+        return False
+    old_times, old_values = keys
+    if len(old_times) != len(times):
+        return False
+    return (interface.float_array_all_equal(old_times, times)
+            and interface.float_array_all_equal(old_values, values))
+
+
+def _static_value_is_equal(node_attr, value):
+    """
+    Is 'node_attr' not animated and set to 'value'?
+    """
+    if _get_anim_curve_keys(node_attr) is not None:
+        return False
+    old_value = maya.cmds.getAttr(node_attr)
+    return interface.float_is_equal(old_value, value)
+
+
+def __set_locked_attr(node_attr, value):
+    maya.cmds.setAttr(node_attr, lock=False)
+    if isinstance(value, (str, unicode)):
+        maya.cmds.setAttr(node_attr, value, type='string')
+    else:
+        maya.cmds.setAttr(node_attr, value)
+    maya.cmds.setAttr(node_attr, lock=True)
+    return
 
 
 def __set_node_data(mkr, bnd, mkr_data,
                     load_bnd_pos,
-                    overscan_x, overscan_y):
+                    overscan_x, overscan_y,
+                    key_reduce_tolerance=None,
+                    skip_unchanged=None):
     """
     Set and override the data on the given marker node.
 
@@ -229,93 +578,211 @@ def __set_node_data(mkr, bnd, mkr_data,
     :param overscan_y: Overscan factor to apply to the MarkerData y values.
     :type overscan_y: float
 
-    :returns: Tuple of Marker and Bundle objects.
-    :rtype: (Marker, Bundle or None)
+    :param key_reduce_tolerance: The X and Y tolerance (in UV
+                                 coordinates) used to reduce the
+                                 translate keyframes, or None to set
+                                 a keyframe for every frame.
+    :type key_reduce_tolerance: (float, float) or None
+
+    :param skip_unchanged: Compare with the existing values and
+                           keyframes, and only set the attributes
+                           that are different. Defaults to False.
+    :type skip_unchanged: bool or None
+
+    :returns: True if any value on the Marker or Bundle was set.
+    :rtype: bool
     """
+    if skip_unchanged is None:
+        skip_unchanged = False
     assert isinstance(mkr, mmapi.Marker)
     assert bnd is None or isinstance(bnd, mmapi.Bundle)
     assert isinstance(mkr_data, interface.MarkerData)
     assert load_bnd_pos is None or isinstance(load_bnd_pos, bool)
     assert isinstance(overscan_x, float)
     assert isinstance(overscan_y, float)
+    assert isinstance(skip_unchanged, bool)
     mkr_node = mkr.get_node()
+    changed = False
 
     mkr_name = mkr_data.get_name()
     assert isinstance(mkr_name, (str, unicode))
-    maya.cmds.setAttr(mkr_node + '.markerName', lock=False)
-    maya.cmds.setAttr(mkr_node + '.markerName', mkr_name, type='string')
-    maya.cmds.setAttr(mkr_node + '.markerName', lock=True)
-
     # Add marker data ID onto the marker node, to be used
     # for re-mapping point data regardless of point name.
     mkr_id = mkr_data.get_id()
     if mkr_id is None:
         mkr_id = -1
-    maya.cmds.setAttr(mkr_node + '.markerId', lock=False)
-    maya.cmds.setAttr(mkr_node + '.markerId', mkr_id)
-    maya.cmds.setAttr(mkr_node + '.markerId', lock=True)
-
-    # Get keyframe data
-    mkr_x_data = mkr_data.get_x().get_raw_data()
-    mkr_y_data = mkr_data.get_y().get_raw_data()
-    for t, v in mkr_x_data.iteritems():
-        mkr_x_data[t] = (v - 0.5) * overscan_x
-    for t, v in mkr_y_data.iteritems():
-        mkr_y_data[t] = (v - 0.5) * overscan_y
-    mkr_x = interface.KeyframeData(data=mkr_x_data)
-    mkr_y = interface.KeyframeData(data=mkr_y_data)
-    mkr_enable = mkr_data.get_enable()
-    mkr_weight = mkr_data.get_weight()
-
-    # Unlock
-    maya.cmds.setAttr(mkr_node + '.translateX', lock=False)
-    maya.cmds.setAttr(mkr_node + '.translateY', lock=False)
-    maya.cmds.setAttr(mkr_node + '.enable', lock=False)
-    maya.cmds.setAttr(mkr_node + '.weight', lock=False)
-
-    # Set keyframes.
-    __set_attr_keyframes(mkr_node, 'translateX', mkr_x)
-    __set_attr_keyframes(mkr_node, 'translateY', mkr_y)
-    __set_attr_keyframes(mkr_node, 'enable', mkr_enable,
-                         before_value=False,
-                         after_value=False,
-                         reduce_keys=True)
-    __set_attr_keyframes(mkr_node, 'weight', mkr_weight, reduce_keys=True)
-
-    # Lock
-    maya.cmds.setAttr(mkr_node + '.translateX', lock=True)
-    maya.cmds.setAttr(mkr_node + '.translateY', lock=True)
-    maya.cmds.setAttr(mkr_node + '.enable', lock=True)
-    maya.cmds.setAttr(mkr_node + '.weight', lock=True)
+    for attr_name, value in [('markerName', mkr_name), ('markerId', mkr_id)]:
+        node_attr = mkr_node + '.' + attr_name
+        if skip_unchanged and maya.cmds.getAttr(node_attr) == value:
+            continue
+        __set_locked_attr(node_attr, value)
+        changed = True
+
+    # Set keyframes, or values when the attribute is not animated.
+    anim_curves, static_values = _get_marker_keyframes(
+        mkr_data, overscan_x, overscan_y,
+        key_reduce_tolerance=key_reduce_tolerance)
+    for attr_name in ['translateX', 'translateY', 'enable', 'weight']:
+        node_attr = mkr_node + '.' + attr_name
+        if attr_name in anim_curves:
+            times, values, tangent_in, tangent_out = anim_curves[attr_name]
+            if skip_unchanged and _anim_curve_is_equal(
+                    node_attr, times, values):
+                continue
+            maya.cmds.setAttr(node_attr, lock=False)
+            anim_utils.create_anim_curve_node_apione(
+                times, values, node_attr,
+                tangent_in_type=tangent_in,
+                tangent_out_type=tangent_out)
+        elif attr_name in static_values:
+            value = static_values[attr_name]
+            if skip_unchanged and _static_value_is_equal(node_attr, value):
+                continue
+            maya.cmds.setAttr(node_attr, lock=False)
+            maya.cmds.cutKey(node_attr, clear=True)
+            maya.cmds.setAttr(node_attr, value)
+        else:
+            continue
+        maya.cmds.setAttr(node_attr, lock=True)
+        changed = True
 
     # Set Bundle Position
     if bnd and load_bnd_pos:
         bnd_node = bnd.get_node()
-        bnd_x = mkr_data.get_bundle_x()
-        bnd_y = mkr_data.get_bundle_y()
-        bnd_z = mkr_data.get_bundle_z()
-        bnd_lock_x = mkr_data.get_bundle_lock_x()
-        bnd_lock_y = mkr_data.get_bundle_lock_y()
-        bnd_lock_z = mkr_data.get_bundle_lock_z()
-
-        maya.cmds.setAttr(bnd_node + '.translateX', lock=False)
-        maya.cmds.setAttr(bnd_node + '.translateY', lock=False)
-        maya.cmds.setAttr(bnd_node + '.translateZ', lock=False)
-
-        if isinstance(bnd_x, float):
-            maya.cmds.setAttr(bnd_node + '.translateX', bnd_x)
-        if isinstance(bnd_y, float):
-            maya.cmds.setAttr(bnd_node + '.translateY', bnd_y)
-        if isinstance(bnd_z, float):
-            maya.cmds.setAttr(bnd_node + '.translateZ', bnd_z)
-
-        if isinstance(bnd_lock_x, bool):
-            maya.cmds.setAttr(bnd_node + '.translateX', lock=True)
-        if isinstance(bnd_lock_y, bool):
-            maya.cmds.setAttr(bnd_node + '.translateY', lock=True)
-        if isinstance(bnd_lock_z, bool):
-            maya.cmds.setAttr(bnd_node + '.translateZ', lock=True)
-    return mkr, bnd
+        bnd_values = [
+            ('translateX', mkr_data.get_bundle_x(), mkr_data.get_bundle_lock_x()),
+            ('translateY', mkr_data.get_bundle_y(), mkr_data.get_bundle_lock_y()),
+            ('translateZ', mkr_data.get_bundle_z(), mkr_data.get_bundle_lock_z()),
+        ]
+        for attr_name, value, lock in bnd_values:
+            node_attr = bnd_node + '.' + attr_name
+            lock = isinstance(lock, bool)
+            if isinstance(value, float) is False:
+                value = None
+            if skip_unchanged:
+                same_lock = maya.cmds.getAttr(node_attr, lock=True) == lock
+                same_value = (value is None or interface.float_is_equal(
+                    maya.cmds.getAttr(node_attr), value))
+                if same_lock and same_value:
+                    continue
+            maya.cmds.setAttr(node_attr, lock=False)
+            if value is not None:
+                maya.cmds.setAttr(node_attr, value)
+            if lock is True:
+                maya.cmds.setAttr(node_attr, lock=True)
+            changed = True
+    return changed
+
+
+def _create_marker_node_data(mkr_data, with_bundles, load_bnd_pos,
+                             overscan_x, overscan_y,
+                             key_reduce_tolerance=None):
+    """
+    Convert a MarkerData into the values and keyframes used to create
+    Marker nodes in bulk.
+
+    The values are the same as set by '__set_node_data'.
+
+    :param mkr_data: The data to create the Marker with.
+    :type mkr_data: MarkerData
+
+    :param with_bundles: Create the Marker with Bundle attached?
+    :type with_bundles: bool
+
+    :param load_bnd_pos: Should we set Bundle positions?
+    :type load_bnd_pos: bool
+
+    :param overscan_x: Overscan factor to apply to the MarkerData x values.
+    :type overscan_x: float
+
+    :param overscan_y: Overscan factor to apply to the MarkerData y values.
+    :type overscan_y: float
+
+    :param key_reduce_tolerance: The X and Y tolerance (in UV
+                                 coordinates) used to reduce the
+                                 translate keyframes, or None.
+    :type key_reduce_tolerance: (float, float) or None
+
+    :rtype: bulkcreate.MarkerNodeData
+    """
+    if isinstance(mkr_data, interface.MarkerData) is False:
+        msg = 'mkr_data must be of type: %r'
+        raise TypeError(msg % interface.MarkerData.__name__)
+    name = mkr_data.get_name()
+    assert isinstance(name, (str, unicode))
+    mkr_name = mmapi.get_new_marker_name(name)
+    bnd_name = None
+    if with_bundles is True:
+        bnd_name = mmapi.get_new_bundle_name(name)
+
+    anim_curves, static_values = _get_marker_keyframes(
+        mkr_data, overscan_x, overscan_y,
+        key_reduce_tolerance=key_reduce_tolerance)
+
+    bnd_translate = None
+    bnd_translate_lock = None
+    if with_bundles is True and load_bnd_pos is True:
+        bnd_translate = []
+        for value in (mkr_data.get_bundle_x(),
+                      mkr_data.get_bundle_y(),
+                      mkr_data.get_bundle_z()):
+            if isinstance(value, float) is False:
+                value = None
+            bnd_translate.append(value)
+        bnd_translate_lock = [
+            isinstance(value, bool)
+            for value in (mkr_data.get_bundle_lock_x(),
+                          mkr_data.get_bundle_lock_y(),
+                          mkr_data.get_bundle_lock_z())]
+
+    return bulkcreate.create_marker_node_data(
+        mkr_name,
+        bundle_name=bnd_name,
+        point_name=name,
+        point_id=mkr_data.get_id(),
+        anim_curves=anim_curves,
+        static_values=static_values,
+        bundle_translate=bnd_translate,
+        bundle_translate_lock=bnd_translate_lock,
+    )
+
+
+def _create_nodes_batch(mkr_data_list, mkr_grp,
+                        with_bundles, load_bundle_position,
+                        overscan_x, overscan_y,
+                        key_reduce_tolerance=None):
+    """
+    Create Markers for all MarkerData objects, with 'bulkcreate'.
+
+    :returns: List of Markers.
+    :rtype: [Marker, ..]
+    """
+    mmapi.load_plugin()
+    node_data_list = [
+        _create_marker_node_data(
+            mkr_data, with_bundles, load_bundle_position,
+            overscan_x, overscan_y,
+            key_reduce_tolerance=key_reduce_tolerance)
+        for mkr_data in mkr_data_list
+    ]
+    node_list = bulkcreate.create_marker_nodes(
+        mkr_grp.get_node(),
+        node_data_list,
+        with_bundles=with_bundles)
+
+    mkr_list = []
+    for mkr_node, bnd_node in node_list:
+        mkr = mmapi.Marker(node=mkr_node)
+        if bnd_node is not None:
+            bnd = mmapi.Bundle(node=bnd_node)
+            event_utils.trigger_event(
+                mmapi.EVENT_NAME_BUNDLE_CREATED,
+                bnd=bnd)
+        event_utils.trigger_event(
+            mmapi.EVENT_NAME_MARKER_CREATED,
+            mkr=mkr)
+        mkr_list.append(mkr)
+    return mkr_list
 
 
 def create_nodes(mkr_data_list,
@@ -324,13 +791,18 @@ def create_nodes(mkr_data_list,
                  col=None,
                  with_bundles=None,
                  load_bundle_position=None,
-                 camera_field_of_view=None):
+                 camera_field_of_view=None,
+                 key_reduce_tolerance=None,
+                 image_resolution=None,
+                 batch=None):
     """
     Create Markers for all given MarkerData objects
 
-    :param mkr_data_list: List of MarkerData with data for creating
-                          markers.
-    :type mkr_data_list: [MarkerData, ..]
+    :param mkr_data_list: List (or iterator) of MarkerData with data
+                          for creating markers. Each MarkerData is
+                          consumed once, in order, so the iterator
+                          from 'read_iter' may be given.
+    :type mkr_data_list: [MarkerData, ..] or iter of MarkerData
 
     :param cam: Camera to create Markers under.
     :type cam: Camera
@@ -352,6 +824,28 @@ def create_nodes(mkr_data_list,
                                  original camera with this 2D data.
     :type camera_field_of_view: [(int, float, float)]
 
+    :param key_reduce_tolerance: Reduce the Marker translate
+                                 keyframes, keeping the curve within
+                                 this many pixels of the original
+                                 data. None does not reduce keyframes.
+    :type key_reduce_tolerance: float or None
+
+    :param image_resolution: The image width and height (in pixels)
+                             used to convert 'key_reduce_tolerance'.
+                             If None, the Maya render resolution is
+                             used.
+    :type image_resolution: (int, int) or None
+
+    :param batch: Create all the Markers at once with Maya API
+                  modifiers, which is much faster for many Markers.
+                  Maya API modifiers run from Python are not recorded
+                  in the undo queue, so nothing done by a batch
+                  'create_nodes' call (including adding to the
+                  Collection and the selection) can be undone. This is
+                  only used from the API; the Load Marker UI always
+                  creates undoable nodes. Defaults to False.
+    :type batch: bool or None
+
     :returns: List of Markers.
     :rtype: [Marker, ..]
     """
@@ -359,15 +853,20 @@ def create_nodes(mkr_data_list,
         with_bundles = True
     if load_bundle_position is None:
         load_bundle_position = True
+    if batch is None:
+        batch = False
     assert isinstance(cam, mmapi.Camera)
     assert isinstance(mkr_grp, mmapi.MarkerGroup)
     assert col is None or isinstance(col, mmapi.Collection)
     assert isinstance(with_bundles, bool)
     assert isinstance(load_bundle_position, bool)
+    assert isinstance(batch, bool)
     assert camera_field_of_view is None \
         or isinstance(camera_field_of_view, (list, tuple))
 
     selected_nodes = maya.cmds.ls(selection=True, long=True) or []
+    key_reduce_tolerance = _get_key_reduce_tolerance(
+        key_reduce_tolerance, image_resolution)
 
     overscan_x = 1.0
     overscan_y = 1.0
@@ -378,32 +877,51 @@ def create_nodes(mkr_data_list,
             camera_field_of_view
         )
 
-    mkr_nodes = []
-    mkr_list = []
-    for mkr_data in mkr_data_list:
-        # Create the nodes
-        mkr, bnd = __create_node(
-            mkr_data, cam, mkr_grp,
-            with_bundles,
-        )
-        mkr_nodes.append(mkr.get_node())
-        if mkr is not None:
-            # Set attributes and add into list
-            __set_node_data(
-                mkr, bnd, mkr_data,
-                load_bundle_position,
-                overscan_x, overscan_y
-            )
-            mkr_list.append(mkr)
-
-    if len(mkr_list) > 0 and col is not None:
-        assert isinstance(col, mmapi.Collection)
-        col.add_marker_list(mkr_list)
-
-    if len(mkr_nodes) > 0:
-        maya.cmds.select(mkr_nodes, replace=True)
+    if batch is True:
+        # A partly undoable batch would leave the created nodes behind
+        # when undone, so nothing is recorded in the undo queue.
+        LOG.warn('Creating Markers in a batch; this cannot be undone.')
+        undo_context = undo_utils.no_undo_context()
     else:
-        maya.cmds.select(selected_nodes, replace=True)
+        undo_context = undo_utils.undo_chunk_context()
+
+    with undo_context:
+        mkr_nodes = []
+        mkr_list = []
+        if batch is True:
+            mkr_list = _create_nodes_batch(
+                mkr_data_list, mkr_grp,
+                with_bundles, load_bundle_position,
+                overscan_x, overscan_y,
+                key_reduce_tolerance=key_reduce_tolerance,
+            )
+            mkr_nodes = [mkr.get_node() for mkr in mkr_list]
+        else:
+            for mkr_data in mkr_data_list:
+                # Create the nodes
+                mkr, bnd = __create_node(
+                    mkr_data, cam, mkr_grp,
+                    with_bundles,
+                )
+                mkr_nodes.append(mkr.get_node())
+                if mkr is not None:
+                    # Set attributes and add into list
+                    __set_node_data(
+                        mkr, bnd, mkr_data,
+                        load_bundle_position,
+                        overscan_x, overscan_y,
+                        key_reduce_tolerance=key_reduce_tolerance,
+                    )
+                    mkr_list.append(mkr)
+
+        if len(mkr_list) > 0 and col is not None:
+            assert isinstance(col, mmapi.Collection)
+            col.add_marker_list(mkr_list)
+
+        if len(mkr_nodes) > 0:
+            maya.cmds.select(mkr_nodes, replace=True)
+        else:
+            maya.cmds.select(selected_nodes, replace=True)
     return mkr_list
 
 
@@ -443,68 +961,151 @@ def _get_marker_internal_name(mkr):
     return value
 
 
-def _find_marker_data(mkr, mkr_data_list):
-    """
-    Find the matching MarkerData object for the given Marker.
+MarkerUpdatePlan = collections.namedtuple(
+    'MarkerUpdatePlan',
+    [
+        # List of (Marker, MarkerData) pairs to update.
+        'matched',
+        # Markers without any matching MarkerData.
+        'removed',
+        # MarkerData without any matching Marker.
+        'added',
+    ]
+)
 
-    :param mkr: Marker node to find a match for.
-    :type mkr:
 
-    :param mkr_data_list: The MarkerData objects to consider as a match for 'mkr'.
-    :type mkr_data_list: [MarkerData, ..]
+def _create_marker_data_index(mkr_data_list):
+    """
+    Index the MarkerData list on the point ID and point name.
 
-    :returns: A matching MarkerData object.
-    :rtype: MarkerData
+    :returns: Dicts of ID to MarkerData indices and name to MarkerData
+              indices. The indices are in reverse order, so the first
+              MarkerData is popped off the end of the list.
+    :rtype: ({int: [int, ..]}, {str: [int, ..]})
     """
-    assert isinstance(mkr, mmapi.Marker)
-    assert len(mkr_data_list) > 0
-    found_mkr_data = None
-    if len(mkr_data_list) == 1:
-        found_mkr_data = mkr_data_list[0]
-        return found_mkr_data
-
-    mkr_id = _get_marker_internal_id(mkr)
-    mkr_name = _get_marker_internal_name(mkr)
-    for mkr_data in mkr_data_list:
-        # Do the 'id's match? If not, try using the 'name's.
+    id_index = collections.defaultdict(list)
+    name_index = collections.defaultdict(list)
+    for i in reversed(range(len(mkr_data_list))):
+        mkr_data = mkr_data_list[i]
         mkr_data_id = mkr_data.get_id()
-        if (mkr_id is not None
-                and mkr_data_id is not None
-                and mkr_id == mkr_data_id):
-            found_mkr_data = mkr_data
-            break
+        if mkr_data_id is not None:
+            id_index[mkr_data_id].append(i)
         mkr_data_name = mkr_data.get_name()
-        if (mkr_name is not None
-                and mkr_data_name is not None
-                and mkr_name == mkr_data_name):
-            found_mkr_data = mkr_data
-            break
-    return found_mkr_data
+        if mkr_data_name is not None:
+            name_index[mkr_data_name].append(i)
+    return id_index, name_index
+
+
+def _pop_unused_index(index, key, used):
+    indices = index.get(key)
+    while indices:
+        i = indices.pop()
+        if i not in used:
+            return i
+    return None
+
+
+def plan_marker_update(mkr_list, mkr_data_list):
+    """
+    Match the Markers with the MarkerData used to update them.
+
+    A Marker is matched with the MarkerData with the same ID (the
+    'Persistent ID' given from 3DE), or if no ID matches, the same
+    point name. IDs are matched before names. Each MarkerData is matched with one Marker at most.
+    If only one Marker and one MarkerData are given, they are always
+    matched.
+
+    The MarkerData is indexed once, so the time taken grows linearly
+    with the number of Markers and MarkerData.
+
+    :param mkr_list: Markers to update.
+    :type mkr_list: [Marker, ..]
+
+    :param mkr_data_list: The MarkerData list to search for a match.
+    :type mkr_data_list: [MarkerData, ..]
+
+    :rtype: MarkerUpdatePlan
+    """
+    mkr_list = list(mkr_list)
+    mkr_data_list = list(mkr_data_list)
+    if len(mkr_list) == 1 and len(mkr_data_list) == 1:
+        matched = [(mkr_list[0], mkr_data_list[0])]
+        return MarkerUpdatePlan(matched=matched, removed=[], added=[])
+
+    id_index, name_index = _create_marker_data_index(mkr_data_list)
+    used = set()
+    mkr_indices = [None] * len(mkr_list)
+
+    # IDs are matched first, for all Markers, so a name cannot take
+    # the MarkerData matching another Marker's ID.
+    for i, mkr in enumerate(mkr_list):
+        mkr_id = _get_marker_internal_id(mkr)
+        if mkr_id is None:
+            continue
+        index = _pop_unused_index(id_index, mkr_id, used)
+        if index is not None:
+            used.add(index)
+            mkr_indices[i] = index
+
+    for i, mkr in enumerate(mkr_list):
+        if mkr_indices[i] is not None:
+            continue
+        mkr_name = _get_marker_internal_name(mkr)
+        if mkr_name is None:
+            continue
+        index = _pop_unused_index(name_index, mkr_name, used)
+        if index is not None:
+            used.add(index)
+            mkr_indices[i] = index
+
+    matched = []
+    removed = []
+    for mkr, index in zip(mkr_list, mkr_indices):
+        if index is None:
+            removed.append(mkr)
+        else:
+            matched.append((mkr, mkr_data_list[index]))
+    added = [mkr_data
+             for i, mkr_data in enumerate(mkr_data_list)
+             if i not in used]
+    return MarkerUpdatePlan(matched=matched, removed=removed, added=added)
 
 
 def _update_node(mkr, bnd, mkr_data,
                  load_bundle_position,
-                 overscan_x, overscan_y):
+                 overscan_x, overscan_y,
+                 key_reduce_tolerance=None):
     """
     Set the MarkerData on the given Marker and Bundle.
+
+    Only the values and animCurves that are different are set.
+
+    :returns: True if the Marker or Bundle was changed.
+    :rtype: bool
     """
     assert isinstance(mkr, mmapi.Marker)
     assert bnd is None or isinstance(bnd, mmapi.Bundle)
     assert isinstance(mkr_data, interface.MarkerData)
-    __set_node_data(
+    changed = __set_node_data(
         mkr, bnd, mkr_data,
         load_bundle_position,
-        overscan_x, overscan_y
+        overscan_x, overscan_y,
+        key_reduce_tolerance=key_reduce_tolerance,
+        skip_unchanged=True,
     )
-    return
+    return changed
 
 
 def update_nodes(mkr_list, mkr_data_list,
                  load_bundle_position=None,
-                 camera_field_of_view=None):
+                 camera_field_of_view=None,
+                 key_reduce_tolerance=None,
+                 image_resolution=None):
     """
     Update the given mkr_list with data from mkr_data_list.
-    The length of both lists must match.
+
+    Markers are matched with MarkerData using 'plan_marker_update',
+    and only the animCurves with different keyframes are re-written.
 
     :param mkr_list: Markers to update.
     :type mkr_list: [Marker, ..]
@@ -519,6 +1120,18 @@ def update_nodes(mkr_list, mkr_data_list,
                                  original camera with this 2D data.
     :type camera_field_of_view: [(int, float, float)]
 
+    :param key_reduce_tolerance: Reduce the Marker translate
+                                 keyframes, keeping the curve within
+                                 this many pixels of the original
+                                 data. None does not reduce keyframes.
+    :type key_reduce_tolerance: float or None
+
+    :param image_resolution: The image width and height (in pixels)
+                             used to convert 'key_reduce_tolerance'.
+                             If None, the Maya render resolution is
+                             used.
+    :type image_resolution: (int, int) or None
+
     :returns: List of Marker objects that were changed.
     :rtype: [Marker, ..]
     """
@@ -530,6 +1143,8 @@ def update_nodes(mkr_list, mkr_data_list,
     assert camera_field_of_view is None \
         or isinstance(camera_field_of_view, (list, tuple))
     selected_nodes = maya.cmds.ls(selection=True, long=True) or []
+    key_reduce_tolerance = _get_key_reduce_tolerance(
+        key_reduce_tolerance, image_resolution)
 
     # Calculate overscan for marker's camera node.
     overscan_per_camera = {}
@@ -547,46 +1162,28 @@ def update_nodes(mkr_list, mkr_data_list,
             )
             overscan_per_camera[cam_shp] = (overscan_x, overscan_y)
 
+    plan = plan_marker_update(mkr_list, mkr_data_list)
+    if len(plan.removed) > 0 or len(plan.added) > 0:
+        LOG.debug(
+            'Update Markers: matched=%r removed=%r added=%r',
+            len(plan.matched), len(plan.removed), len(plan.added))
+
     mkr_list_changed = []
-    if len(mkr_list) == 1 and len(mkr_data_list) == 1:
-        mkr = mkr_list[0]
+    fallback_overscan = (1.0, 1.0)
+    for mkr, mkr_data in plan.matched:
         cam = mkr.get_camera()
         bnd = mkr.get_bundle()
-        mkr_data = mkr_data_list[0]
         cam_shp = cam.get_shape_node()
-        fallback_overscan = (1.0, 1.0)
         overscan_x, overscan_y = overscan_per_camera.get(
-            cam_shp, fallback_overscan
+            cam_shp, fallback_overscan,
         )
-        _update_node(
+        changed = _update_node(
             mkr, bnd, mkr_data,
             load_bundle_position,
-            overscan_x, overscan_y
+            overscan_x, overscan_y,
+            key_reduce_tolerance=key_reduce_tolerance,
         )
-    else:
-        # Make a copy of mkr_list and mkr_data_list, to avoid any
-        # posiblity of the given arguments mkr_list and mkr_data_list
-        # being modified indirectly (which can happen in Python).
-        mkr_list = list(mkr_list)
-        mkr_data_list = list(mkr_data_list)
-        while len(mkr_list) > 0:
-            mkr = mkr_list.pop(0)
-            mkr_data = _find_marker_data(mkr, mkr_data_list)
-            if mkr_data is None:
-                continue
-            cam = mkr.get_camera()
-            bnd = mkr.get_bundle()
-            cam_shp = cam.get_shape_node()
-            fallback_overscan = (1.0, 1.0)
-            overscan_x, overscan_y = overscan_per_camera.get(
-                cam_shp, fallback_overscan,
-            )
-            _update_node(
-                mkr, bnd, mkr_data,
-                load_bundle_position,
-                overscan_x, overscan_y
-            )
-            mkr_data_list.remove(mkr_data)
+        if changed is True:
             mkr_list_changed.append(mkr)
 
     mkr_nodes_changed = [mkr.get_node() for mkr in mkr_list_changed]
@@ -0,0 +1,267 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+A cache of parsed marker files.
+
+The Load Marker tool reads the same file many times, for example to
+display file information in the UI, and then again to create the
+Markers. The cache stores the parsed (FileInfo, MarkerData list)
+tuple, keyed on the absolute file path, file size, modification time
+and the keyword arguments given to the parser. When the file changes
+on disk the key no longer matches, and the file is parsed again.
+
+The per-point metadata read by 'index' (used to display file
+information) is cached with a separate key, see 'create_index_key'.
+
+The least recently used entries are evicted when the (approximate)
+memory used by the cache goes above a byte budget.
+
+.. note:: MarkerData objects returned from the cache are shared
+   between callers, and must not be modified.
+"""
+
+import os
+import collections
+
+import mmSolver.logger
+import mmSolver.tools.loadmarker.constant as const
+import mmSolver.tools.loadmarker.lib.interface as interface
+
+
+LOG = mmSolver.logger.get_logger()
+
+# Approximate memory overhead of a MarkerData object, without the
+# keyframe buffers.
+_MARKER_DATA_OVERHEAD_BYTES = 1024
+
+# Approximate memory used by a PointInfo object.
+_POINT_INFO_BYTES = 256
+
+# Added to the key of cached 'index' results, so they are never
+# confused with parsed MarkerData.
+_INDEX_KEY_TAG = 'index'
+
+# module level cache, stores an instance of 'ParseCache'.
+__parse_cache = None
+
+
+def _get_keyframe_data_byte_size(keyframe_data):
+    times = keyframe_data.get_time_array()
+    values = keyframe_data.get_value_array()
+    size = (len(times) * times.itemsize) + (len(values) * values.itemsize)
+    return size
+
+
+def estimate_byte_size(mkr_data_list):
+    """
+    Estimate the memory used by a list of MarkerData (or PointInfo).
+
+    :param mkr_data_list: The MarkerData to estimate.
+    :type mkr_data_list: [MarkerData, ..] or [PointInfo, ..]
+
+    :returns: Approximate number of bytes.
+    :rtype: int
+    """
+    size = 0
+    for mkr_data in mkr_data_list:
+        if isinstance(mkr_data, interface.PointInfo):
+            size += _POINT_INFO_BYTES
+            continue
+        size += _MARKER_DATA_OVERHEAD_BYTES
+        for keyframe_data in (mkr_data.get_x(),
+                              mkr_data.get_y(),
+                              mkr_data.get_enable(),
+                              mkr_data.get_weight()):
+            size += _get_keyframe_data_byte_size(keyframe_data)
+    return size
+
+
+def create_key(file_path, **kwargs):
+    """
+    Create a cache key for the file path and parser arguments.
+
+    :param file_path: The marker file path.
+    :type file_path: str
+
+    :param kwargs: Keyword arguments given to the file parser.
+
+    :returns: A hashable key, or None if the file cannot be cached.
+    :rtype: tuple or None
+    """
+    abs_path = os.path.normcase(os.path.abspath(file_path))
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return None
+    # Lists, such as 'points', are converted to be hashable.
+    args = []
+    for name, value in sorted(kwargs.items()):
+        if isinstance(value, list):
+            value = tuple(value)
+        args.append((name, value))
+    key = (
+        abs_path,
+        stat.st_size,
+        stat.st_mtime,
+        tuple(args),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        LOG.debug('Cannot cache parser arguments: %r', kwargs)
+        return None
+    return key
+
+
+def create_index_key(file_path, **kwargs):
+    """
+    Create a cache key for the per-point metadata ('index') of the
+    file path.
+
+    :param file_path: The marker file path.
+    :type file_path: str
+
+    :param kwargs: Keyword arguments given to the file format.
+
+    :returns: A hashable key, or None if the file cannot be cached.
+    :rtype: tuple or None
+    """
+    key = create_key(file_path, **kwargs)
+    if key is None:
+        return None
+    return key + (_INDEX_KEY_TAG,)
+
+
+class ParseCache(object):
+    """
+    Least recently used cache of parsed marker files.
+    """
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = const.PARSE_CACHE_MAX_BYTES
+        self._max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._byte_size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get_max_bytes(self):
+        return self._max_bytes
+
+    def set_max_bytes(self, value):
+        self._max_bytes = value
+        self._evict()
+
+    def get_byte_size(self):
+        return self._byte_size
+
+    def get_hit_count(self):
+        return self._hits
+
+    def get_miss_count(self):
+        return self._misses
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Look up the parsed data for a key.
+
+        :param key: Key created with 'create_key' or
+                    'create_index_key'.
+
+        :returns: The (FileInfo, MarkerData list) stored, or the
+                  (FileInfo, PointInfo list) for an index key, or
+                  None.
+        :rtype: (FileInfo, [MarkerData, ..]) or None
+        """
+        if key is None:
+            return None
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self._misses += 1
+            return None
+        # Re-insert to mark as the most recently used.
+        self._entries[key] = entry
+        self._hits += 1
+        file_info, mkr_data_list, _ = entry
+        return file_info, list(mkr_data_list)
+
+    def set(self, key, file_info, mkr_data_list):
+        """
+        Store parsed data for a key.
+
+        Data larger than the whole cache budget is not stored.
+
+        :param key: Key created with 'create_key' or
+                    'create_index_key'.
+
+        :param file_info: The file info returned from the parser.
+        :type file_info: FileInfo
+
+        :param mkr_data_list: The markers returned from the parser,
+                              or the points returned from 'index'.
+        :type mkr_data_list: [MarkerData, ..] or [PointInfo, ..]
+        """
+        if key is None or isinstance(mkr_data_list, list) is False:
+            return
+        self.remove(key)
+        byte_size = estimate_byte_size(mkr_data_list)
+        if byte_size > self._max_bytes:
+            LOG.debug('Parsed file is too large to cache: %r', key[0])
+            return
+        self._entries[key] = (file_info, list(mkr_data_list), byte_size)
+        self._byte_size += byte_size
+        self._evict()
+        return
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._byte_size -= entry[2]
+        return
+
+    def clear(self):
+        self._entries.clear()
+        self._byte_size = 0
+        self._hits = 0
+        self._misses = 0
+        return
+
+    def _evict(self):
+        while self._byte_size > self._max_bytes and len(self._entries) > 0:
+            key = next(iter(self._entries))
+            self.remove(key)
+        return
+
+
+def get_parse_cache():
+    global __parse_cache
+    if __parse_cache is None:
+        __parse_cache = ParseCache()
+    return __parse_cache
+
+
+def clear_parse_cache():
+    """
+    Remove all parsed files from the cache.
+    """
+    get_parse_cache().clear()
+    return
@@ -0,0 +1,304 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Read marker files, without using Maya.
+
+The file format parsers are pure Python, so this module does not
+import Maya and may be used in worker processes to read many files at
+once. Use 'mayareadfile' to read files and create Maya nodes.
+"""
+
+import os
+import sys
+import traceback
+
+try:
+    import concurrent.futures as futures
+except ImportError:
+    futures = None
+
+import mmSolver.logger
+import mmSolver.tools.loadmarker.lib.formatmanager as fmtmgr
+
+# Used to force importing of formats; do not remove this line.
+import mmSolver.tools.loadmarker.lib.formats
+
+
+LOG = mmSolver.logger.get_logger()
+
+
+def get_file_format_class(file_path):
+    """
+    Find the format class for the file path, based on the file
+    extension.
+
+    :param file_path: The file path to find a format for.
+    :type file_path: str
+
+    :returns: The LoaderBase sub-class able to read 'file_path'.
+    """
+    if isinstance(file_path, (str, unicode)) is False:
+        msg = 'file path must be a string, got %r'
+        raise TypeError(msg % type(file_path))
+    if os.path.isfile(file_path) is False:
+        msg = 'file path does not exist; %r'
+        raise OSError(msg % file_path)
+
+    file_format_class = None
+    mgr = fmtmgr.get_format_manager()
+    for fmt in mgr.get_formats():
+        attr = getattr(fmt, 'file_exts', None)
+        if attr is None:
+            continue
+        if not isinstance(fmt.file_exts, list):
+            continue
+        for ext in fmt.file_exts:
+            if file_path.endswith(ext):
+                file_format_class = fmt
+                break
+    if file_format_class is None:
+        msg = 'No file formats found for file path: %r'
+        raise RuntimeError(msg % file_path)
+    return file_format_class
+
+
+def read(file_path, **kwargs):
+    """
+    Read a file path, find the format parser based on the file extension.
+
+    :param file_path: The marker file path to read.
+    :type file_path: str
+
+    :param kwargs: Keyword arguments given to the file format parser.
+
+    :rtype: (FileInfo, [MarkerData, ..])
+    """
+    file_format_class = get_file_format_class(file_path)
+    file_format_obj = file_format_class()
+    return file_format_obj.parse(file_path, **kwargs)
+
+
+def index(file_path, **kwargs):
+    """
+    Read the per-point metadata of a file path, without decoding the
+    per-frame data.
+
+    :param file_path: The marker file path to index.
+    :type file_path: str
+
+    :param kwargs: Keyword arguments given to the file format.
+
+    :rtype: (FileInfo, [PointInfo, ..])
+    """
+    file_format_class = get_file_format_class(file_path)
+    file_format_obj = file_format_class()
+    return file_format_obj.index(file_path, **kwargs)
+
+
+def _read_file_safe(file_path, kwargs):
+    """
+    Read a file, returning the error message rather than raising.
+
+    This function is run in worker processes, so the arguments and
+    return value must be picklable.
+
+    :returns: Tuple of the file path, parsed data (or None) and the
+              error message (or None).
+    :rtype: (str, (FileInfo, [MarkerData, ..]) or None, str or None)
+    """
+    try:
+        file_info, mkr_data_list = read(file_path, **kwargs)
+        mkr_data_list = list(mkr_data_list)
+    except Exception:
+        return file_path, None, traceback.format_exc()
+    return file_path, (file_info, mkr_data_list), None
+
+
+def _is_maya_application():
+    """
+    Is this process the Maya application (rather than 'mayapy' or
+    another Python interpreter)?
+
+    :rtype: bool
+    """
+    exe_name = os.path.basename(sys.executable or '')
+    name = os.path.splitext(exe_name)[0].lower()
+    return name.startswith('maya') and name != 'mayapy'
+
+
+def _get_worker_executable():
+    """
+    Get the Python executable used to start worker processes.
+
+    Inside the Maya GUI 'sys.executable' is the Maya application, so
+    workers must be started with 'mayapy' instead.
+
+    :returns: The executable path, or None to use the default.
+    :rtype: str or None
+    """
+    if _is_maya_application() is False:
+        return None
+    exe_path = sys.executable
+    exe_dir, exe_name = os.path.split(exe_path)
+    exe_ext = os.path.splitext(exe_name)[1]
+    mayapy_path = os.path.join(exe_dir, 'mayapy' + exe_ext)
+    if os.path.isfile(mayapy_path) is False:
+        return None
+    return mayapy_path
+
+
+def _get_spawn_context():
+    """
+    Get a multiprocessing context that starts new worker processes,
+    rather than forking this process.
+
+    :returns: The 'spawn' context, or None if contexts cannot be given
+              to the process pool (Python 2 and Python 3.6 or older).
+    """
+    if sys.version_info < (3, 7):
+        return None
+    import multiprocessing
+    return multiprocessing.get_context('spawn')
+
+
+def _can_use_pool():
+    """
+    Can worker processes be used to read files?
+
+    The Maya application is multi-threaded and must not be forked,
+    inside Maya the workers can only be started by spawning 'mayapy'.
+
+    :rtype: bool
+    """
+    if futures is None:
+        return False
+    if _is_maya_application() is False:
+        return True
+    if _get_spawn_context() is None:
+        LOG.debug('Cannot start worker processes inside Maya, '
+                  'without the "spawn" start method.')
+        return False
+    if _get_worker_executable() is None:
+        LOG.debug('Cannot start worker processes inside Maya, '
+                  'the "mayapy" executable was not found.')
+        return False
+    return True
+
+
+def _read_files_in_process(file_paths, kwargs, on_result):
+    for file_path in file_paths:
+        on_result(_read_file_safe(file_path, kwargs))
+    return
+
+
+def _read_files_in_pool(file_paths, kwargs, max_workers, on_result):
+    pool_kwargs = {'max_workers': max_workers}
+    context = _get_spawn_context()
+    if context is not None:
+        pool_kwargs['mp_context'] = context
+
+    # The spawn executable is global to the 'multiprocessing' module,
+    # so it is only changed while the pool is running.
+    exe_path = _get_worker_executable()
+    prev_exe_path = None
+    if context is not None and exe_path is not None:
+        import multiprocessing.spawn
+        prev_exe_path = multiprocessing.spawn.get_executable()
+        context.set_executable(exe_path)
+    try:
+        with futures.ProcessPoolExecutor(**pool_kwargs) as executor:
+            future_list = [
+                executor.submit(_read_file_safe, file_path, kwargs)
+                for file_path in file_paths
+            ]
+            for future in futures.as_completed(future_list):
+                on_result(future.result())
+    finally:
+        if prev_exe_path is not None:
+            context.set_executable(prev_exe_path)
+    return
+
+
+def read_many(file_paths, max_workers=None, prog_fn=None, **kwargs):
+    """
+    Read many file paths, using a pool of worker processes.
+
+    If 'concurrent.futures' is not available, or the process pool
+    cannot be used, the files are read one after another in this
+    process. Inside Maya, worker processes are only used when they
+    can be started with 'mayapy' using the 'spawn' start method.
+
+    Errors reading a file do not stop the other files from being read;
+    the errors are returned instead.
+
+    :param file_paths: The marker file paths to read.
+    :type file_paths: [str, ..]
+
+    :param max_workers: The maximum number of worker processes. None
+                        uses the number of CPUs, 1 or less reads in
+                        the current process.
+    :type max_workers: None or int
+
+    :param prog_fn: A function called with an 'int' argument, to
+                    display progress information to the user. The
+                    value is between 0 and 100.
+    :type prog_fn: None or function
+
+    :param kwargs: Keyword arguments given to each file format parser.
+
+    :returns: A dict of file path to parsed (FileInfo, [MarkerData,
+              ..]) data, and a dict of file path to error message for
+              the files that could not be read.
+    :rtype: ({str: (FileInfo, [MarkerData, ..])}, {str: str})
+    """
+    assert prog_fn is None or hasattr(prog_fn, '__call__')
+    file_paths = list(file_paths)
+    results = {}
+    errors = {}
+    if len(file_paths) == 0:
+        return results, errors
+
+    def on_result(value):
+        file_path, data, error = value
+        if error is not None:
+            LOG.warning('Could not read file %r: %s', file_path, error)
+            errors[file_path] = error
+        else:
+            results[file_path] = data
+        if prog_fn is not None:
+            ratio = float(len(results) + len(errors)) / len(file_paths)
+            prog_fn(int(ratio * 100.0))
+        return
+
+    use_pool = (len(file_paths) > 1
+                and (max_workers is None or max_workers > 1)
+                and _can_use_pool())
+    if use_pool is True:
+        try:
+            _read_files_in_pool(file_paths, kwargs, max_workers, on_result)
+        except (OSError, RuntimeError, ImportError) as e:
+            # A broken pool raises a RuntimeError sub-class.
+            LOG.warning('Reading files in one process, the process pool '
+                        'could not be used: %s', e)
+            use_pool = False
+
+    if use_pool is False:
+        remaining = [f for f in file_paths
+                     if f not in results and f not in errors]
+        _read_files_in_process(remaining, kwargs, on_result)
+    return results, errors
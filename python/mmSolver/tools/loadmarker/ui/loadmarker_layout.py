@@ -119,11 +119,14 @@ class LoadMarkerLayout(QtWidgets.QWidget, ui_loadmarker_layout.Ui_Form):
         self.filepath_lineEdit.editingFinished.connect(self.updateFilePathWidget)
         self.overscan_checkBox.toggled.connect(self.setOverscanEnabledState)
         self.overscan_checkBox.released.connect(self.updateOverscanValues)
+        self.keyReduce_checkBox.toggled.connect(
+            self.setKeyReduceEnabledState)
         return
 
     def populateUi(self):
         config = get_config()
         self._file_info = None
+        self._file_index = None
 
         w, h = lib.get_default_image_resolution()
         self.imageRes_label.setEnabled(False)
@@ -211,13 +214,27 @@ class LoadMarkerLayout(QtWidgets.QWidget, ui_loadmarker_layout.Ui_Form):
             const.USE_OVERSCAN_DEFAULT_VALUE)
         self.overscan_checkBox.setChecked(value)
         self.updateOverscanValues()
+
+        value = get_config_value(
+            config,
+            'data/key_reduce_tolerance',
+            const.KEY_REDUCE_TOLERANCE_DEFAULT_VALUE)
+        self.keyReduceTolerance_doubleSpinBox.setValue(value)
+        value = get_config_value(
+            config,
+            'data/key_reduce',
+            const.KEY_REDUCE_DEFAULT_VALUE)
+        self.keyReduce_checkBox.setChecked(value)
+        self.setKeyReduceEnabledState(value)
         return
 
     def updateFileInfo(self):
         file_path = self.getFilePath()
         if not file_path:
             return
-        file_info = fileutils.get_file_info(file_path)
+        file_index = fileutils.get_file_index(file_path)
+        self._file_index = (file_path, file_index)
+        file_info, _ = file_index
         self.setFileInfo(file_info)
         return
 
@@ -239,7 +256,12 @@ class LoadMarkerLayout(QtWidgets.QWidget, ui_loadmarker_layout.Ui_Form):
         text += 'Undistorted Data: {lens_undist}\n'
         text += 'Bundle Positions: {positions}\n'
         text += 'With Camera FOV: {has_camera_fov}\n'
-        info = fileutils.get_file_info_strings(file_path)
+        # Re-use the index read by 'updateFileInfo'.
+        file_index = None
+        if self._file_index is not None and self._file_index[0] == file_path:
+            file_index = self._file_index[1]
+        info = fileutils.get_file_info_strings(
+            file_path, file_index=file_index)
 
         # Change point names into single string.
         point_names = info.get('point_names', '')
@@ -645,6 +667,12 @@ class LoadMarkerLayout(QtWidgets.QWidget, ui_loadmarker_layout.Ui_Form):
         self.overscanY_label.setEnabled(value)
         return
 
+    def setKeyReduceEnabledState(self, value):
+        assert isinstance(value, bool)
+        self.keyReduceTolerance_label.setEnabled(value)
+        self.keyReduceTolerance_doubleSpinBox.setEnabled(value)
+        return
+
     def setFilePath(self, value):
         self.filepath_lineEdit.setText(value)
         self.updateFilePathWidget()
@@ -726,6 +754,14 @@ class LoadMarkerLayout(QtWidgets.QWidget, ui_loadmarker_layout.Ui_Form):
         value = self.loadBndPositions_checkBox.isChecked()
         return value
 
+    def getKeyReduceValue(self):
+        value = self.keyReduce_checkBox.isChecked()
+        return value
+
+    def getKeyReduceToleranceValue(self):
+        value = self.keyReduceTolerance_doubleSpinBox.value()
+        return value
+
     def getImageResolution(self):
         width = self.imageResWidth_spinBox.value()
         height = self.imageResHeight_spinBox.value()
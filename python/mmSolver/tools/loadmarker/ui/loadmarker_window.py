@@ -106,6 +106,12 @@ class LoadMarkerWindow(BaseWindow):
         undistorted = undist_mode == const.UNDISTORTION_MODE_VALUE
         width, height = self.subForm.getImageResolution()
 
+        key_reduce = self.subForm.getKeyReduceValue()
+        key_reduce_value = self.subForm.getKeyReduceToleranceValue()
+        key_reduce_tolerance = None
+        if key_reduce is True:
+            key_reduce_tolerance = key_reduce_value
+
         camera_field_of_view = None
         if use_overscan is True:
             camera_field_of_view = self.subForm.getCameraFieldOfViewValue()
@@ -161,6 +167,8 @@ class LoadMarkerWindow(BaseWindow):
                         with_bundles=True,
                         load_bundle_position=load_bnd_pos,
                         camera_field_of_view=camera_field_of_view,
+                        key_reduce_tolerance=key_reduce_tolerance,
+                        image_resolution=(width, height),
                     )
 
                 elif load_mode == const.LOAD_MODE_REPLACE_VALUE:
@@ -172,7 +180,9 @@ class LoadMarkerWindow(BaseWindow):
                     mayareadfile.update_nodes(
                         mkr_list, mkr_data_list,
                         load_bundle_position=load_bnd_pos,
-                        camera_field_of_view=camera_field_of_view
+                        camera_field_of_view=camera_field_of_view,
+                        key_reduce_tolerance=key_reduce_tolerance,
+                        image_resolution=(width, height),
                     )
                 else:
                     raise ValueError('Load mode is not valid: %r' % load_mode)
@@ -226,6 +236,8 @@ class LoadMarkerWindow(BaseWindow):
                 config.set_value("data/load_bundle_position", load_bnd_pos)
                 config.set_value("data/distortion_mode", undist_mode)
                 config.set_value("data/load_mode", load_mode)
+                config.set_value("data/key_reduce", key_reduce)
+                config.set_value("data/key_reduce_tolerance", key_reduce_value)
                 config.write()
 
         return
@@ -84,3 +84,15 @@ def run_update_output_attributes_in_solver_ui(**kwargs):
     e = time.time()
     LOG.debug("run_update_output_attributes_in_solver_ui: time=%s", e - s)
     return
+
+
+def run_invalidate_compile_caches(**kwargs):
+    LOG.debug("run_invalidate_compile_caches: %r", kwargs)
+    import mmSolver.api as mmapi
+    node_uuids = kwargs.get('node')
+    if node_uuids is None:
+        return
+    if not isinstance(node_uuids, (list, tuple)):
+        node_uuids = [node_uuids]
+    mmapi.invalidate_compile_caches(node_uuids=node_uuids)
+    return
@@ -29,6 +29,9 @@ Currently implemented events:
  - When the list of Attributes on a Collection are updated,
    update the Solver UI Output Attributes widget.
 
+ - When a node is deleted, renamed or re-connected, clear the
+   Collection compile caches using the node.
+
 """
 
 import mmSolver.logger
@@ -79,6 +82,33 @@ def _register_changed_attribute_update_solver_ui():
     return
 
 
+def _register_changed_node_invalidate_compile_caches():
+    """
+    When nodes are changed, the compile caches using the node are
+    cleared.
+
+    The events are only triggered by the Maya callbacks of the Solver
+    UI, so the caches are only cleared while the Solver UI is open.
+    'trigger_event' always runs the functions deferred (at the next
+    idle), even though the function itself is not deferred. These
+    events only free memory early; every compile checks the
+    Collection fingerprint, so a stale cache is never used.
+    """
+    import mmSolver.api as mmapi
+    event_names = [
+        mmapi.EVENT_NAME_NODE_DELETED,
+        mmapi.EVENT_NAME_NODE_NAME_CHANGED,
+        mmapi.EVENT_NAME_ATTRIBUTE_CONNECTION_CHANGED,
+        mmapi.EVENT_NAME_MEMBERSHIP_CHANGED,
+    ]
+    for event_name in event_names:
+        event_utils.add_function_to_event(
+            event_name,
+            lib.run_invalidate_compile_caches,
+            deferred=False)
+    return
+
+
 def register_events():
     """
     Initialises the registry of events for mmSolver.
@@ -90,4 +120,5 @@ def register_events():
     _register_created_marker_connect_to_collection()
     _register_changed_collection_update_solver_ui()
     _register_changed_attribute_update_solver_ui()
+    _register_changed_node_invalidate_compile_caches()
     return
@@ -86,26 +86,18 @@ def main():
         )
         stop = len(values)
         step = 3
-
-        plug = loc_tfm + '.translateX'
         values_x = values[0:stop:step]
-        animfn_x = anim_utils.create_anim_curve_node_apione(
-            times, values_x,
-            node_attr=plug
-        )
-
-        plug = loc_tfm + '.translateY'
         values_y = values[1:stop:step]
-        animfn_y = anim_utils.create_anim_curve_node_apione(
-            times, values_y,
-            node_attr=plug
-        )
-
-        plug = depth_tfm + '.scaleX'
         values_z = values[2:stop:step]
-        animfn_z = anim_utils.create_anim_curve_node_apione(
-            times, values_z,
-            node_attr=plug
+        plugs = [
+            loc_tfm + '.translateX',
+            loc_tfm + '.translateY',
+            depth_tfm + '.scaleX',
+        ]
+        anim_utils.create_anim_curve_nodes_apione(
+            [times, times, times],
+            [values_x, values_y, values_z],
+            node_attr_list=plugs
         )
 
     if len(created_loc_tfms) > 0:
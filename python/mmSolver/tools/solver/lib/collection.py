@@ -240,35 +240,29 @@ def log_solve_results(log, solres_list,
         status_str += stamp + ' | '
         long_status_str += stamp + ' | '
 
-    # Get Solver success.
-    success = True
-    for solres in solres_list:
-        value = solres.get_success()
-        if value is not True:
-            success = False
-            break
-    if success is True:
+    summary = mmapi.summarise_solve_results(solres_list)
+    if summary.success is True:
         status_str += 'Solved | '
         long_status_str += 'Solved | '
     else:
         status_str += 'Failed | '
         long_status_str += 'Failed | '
 
-    frame_error_list = mmapi.merge_frame_error_list(solres_list)
-    frame_error_txt = pprint.pformat(dict(frame_error_list))
     if log:
+        frame_error_list = dict(zip(summary.frames.tolist(),
+                                    summary.errors.tolist()))
+        frame_error_txt = pprint.pformat(frame_error_list)
         log.debug('Per-Frame Errors:\n%s', frame_error_txt)
 
-    timer_stats = mmapi.combine_timer_stats(solres_list)
-    timer_stats_txt = pprint.pformat(dict(timer_stats))
-    if log:
+        timer_stats_txt = pprint.pformat(dict(summary.timer_stats))
         log.debug('Timer Statistics:\n%s', timer_stats_txt)
 
-    avg_error = mmapi.get_average_frame_error_list(frame_error_list)
+    avg_error = summary.average_error
     status_str += 'avg deviation %.2fpx' % avg_error
     long_status_str += 'Average Deviation %.2fpx' % avg_error
 
-    max_frame, max_error = mmapi.get_max_frame_error(frame_error_list)
+    max_frame = summary.max_frame
+    max_error = summary.max_error
     status_str += ' | max deviation %.2fpx at %s' % (max_error, max_frame)
     long_status_str += ' | Max Deviation %.2fpx at %s' % (max_error, max_frame)
 
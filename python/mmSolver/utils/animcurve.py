@@ -34,58 +34,96 @@ import maya.OpenMayaAnim as OpenMayaAnim1
 import mmSolver.utils.node as node_utils
 
 
-def create_anim_curve_node_apione(times, values,
-                                  node_attr=None,
-                                  tangent_in_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
-                                  tangent_out_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
-                                  anim_type=OpenMayaAnim1.MFnAnimCurve.kAnimCurveTL,
-                                  undo_cache=None):
+def _as_list(values):
     """
-    Create an animCurve using Maya API (one).
+    Convert a buffer of numbers into a list, in bulk.
 
-    :param times: Time values for the animCurve
-    :type times: list
+    :param values: The values to convert.
+    :type values: list, tuple, array.array or numpy.ndarray
 
-    :param values: Values for the animCurve.
-    :type values: list
+    :rtype: list
+    """
+    if isinstance(values, list):
+        return values
+    tolist = getattr(values, 'tolist', None)
+    if tolist is not None:
+        # array.array and numpy.ndarray are converted in C.
+        return tolist()
+    return list(values)
 
-    :param node_attr: The 'plug' to connect the animCurve to.
-    :type node_attr: str
 
-    :param tangent_in_type: The "in" tangent type for keyframes.
-    :type tangent_in_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+def create_double_array_apione(values):
+    """
+    Create a MDoubleArray from a buffer of numbers.
 
-    :param tangent_out_type: The "out" tangent type for keyframes.
-    :type tangent_out_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+    The values are copied in one call, rather than appending each
+    value.
 
-    :param anim_type: The type of animation curve node.
-    :type anim_type: maya.OpenMayaAnim.MFnAnimCurve.kAnimCurve*
+    :param values: The values to copy.
+    :type values: list, tuple, array.array or numpy.ndarray
 
-    :param undo_cache: The Maya AnimCurve Undo Cache data structure or
-                       None if no undo is required.
-    :type undo_cache: maya.OpenMayaAnim.MAnimCurveChange
+    :rtype: maya.OpenMaya.MDoubleArray
+    """
+    values = _as_list(values)
+    num = len(values)
+    if num == 0:
+        return OpenMaya1.MDoubleArray()
+    util = OpenMaya1.MScriptUtil()
+    util.createFromList(values, num)
+    return OpenMaya1.MDoubleArray(util.asDoublePtr(), num)
 
-    :return: MFnAnimCurve object attached to a newly created animation curve.
-    :rtype: maya.OpenMaya.MFnAnimCurve
+
+def create_time_array_apione(times, unit=None):
     """
-    if not isinstance(times, list):
-        raise ValueError('times must be a list or sequence type.')
-    if not isinstance(values, list):
+    Create a MTimeArray from a buffer of numbers.
+
+    The array is allocated once and a single MTime object is re-used
+    to set each time, rather than creating an MTime per time.
+
+    :param times: The times to copy.
+    :type times: list, tuple, array.array or numpy.ndarray
+
+    :param unit: The unit of the times, None uses the Maya UI unit.
+    :type unit: maya.OpenMaya.MTime.Unit or None
+
+    :rtype: maya.OpenMaya.MTimeArray
+    """
+    times = _as_list(times)
+    if unit is None:
+        unit = OpenMaya1.MTime.uiUnit()
+    num = len(times)
+    mtime = OpenMaya1.MTime(0.0, unit)
+    time_array = OpenMaya1.MTimeArray(num, mtime)
+    for i, time in enumerate(times):
+        mtime.setValue(time)
+        time_array.set(mtime, i)
+    return time_array
+
+
+def _check_times_and_values(times, values):
+    if isinstance(times, basestring) or not hasattr(times, '__len__'):
         raise ValueError('times must be a list or sequence type.')
+    if isinstance(values, basestring) or not hasattr(values, '__len__'):
+        raise ValueError('values must be a list or sequence type.')
     if len(times) == 0:
         raise ValueError('times must have 1 or more values.')
     if len(values) == 0:
         raise ValueError('values must have 1 or more values.')
     if len(times) != len(values):
         raise ValueError('Number of times and values does not match.')
+    return
 
-    # create anim curve
+
+def _get_anim_curve_fn(node_attr, anim_type):
+    """
+    Get the animCurve connected to 'node_attr', or create a new one.
+    """
     animfn = OpenMayaAnim1.MFnAnimCurve()
     if node_attr is None:
-        animCurve = animfn.create(anim_type)
+        animfn.create(anim_type)
     else:
         # Get the plug to be animated.
-        dst_plug = node_utils.get_as_plug(node_attr)
+        dst_plug = node_utils.get_as_plug_apione(node_attr)
 
         objs = OpenMaya1.MObjectArray()
         find = OpenMayaAnim1.MAnimUtil.findAnimation(dst_plug, objs)
@@ -94,13 +132,46 @@ def create_anim_curve_node_apione(times, values,
         else:
             animfn = OpenMayaAnim1.MFnAnimCurve()
             animfn.create(dst_plug)
+    return animfn
 
-    # Copy the times into an MTimeArray and the values into an MDoubleArray.
-    time_array = OpenMaya1.MTimeArray()
-    value_array = OpenMaya1.MDoubleArray()
-    for time, value in zip(times, values):
-        time_array.append(OpenMaya1.MTime(time, OpenMaya1.MTime.uiUnit()))
-        value_array.append(value)
+
+def set_anim_curve_keys_apione(animfn, times, values,
+                               tangent_in_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                               tangent_out_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                               undo_cache=None):
+    """
+    Replace the keyframes on an animCurve, using Maya API (one).
+
+    :param animfn: The animCurve to set keyframes on.
+    :type animfn: maya.OpenMayaAnim.MFnAnimCurve
+
+    :param times: Time values for the animCurve.
+    :type times: list, tuple, array.array, numpy.ndarray or
+                 maya.OpenMaya.MTimeArray
+
+    :param values: Values for the animCurve.
+    :type values: list, tuple, array.array, numpy.ndarray or
+                  maya.OpenMaya.MDoubleArray
+
+    :param tangent_in_type: The "in" tangent type for keyframes.
+    :type tangent_in_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param tangent_out_type: The "out" tangent type for keyframes.
+    :type tangent_out_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param undo_cache: The Maya AnimCurve Undo Cache data structure or
+                       None if no undo is required.
+    :type undo_cache: maya.OpenMayaAnim.MAnimCurveChange
+
+    :return: The given MFnAnimCurve object.
+    :rtype: maya.OpenMaya.MFnAnimCurve
+    """
+    time_array = times
+    if not isinstance(times, OpenMaya1.MTimeArray):
+        time_array = create_time_array_apione(times)
+    value_array = values
+    if not isinstance(values, OpenMaya1.MDoubleArray):
+        value_array = create_double_array_apione(values)
 
     # force a default undo cache
     if not undo_cache:
@@ -118,6 +189,116 @@ def create_anim_curve_node_apione(times, values,
     return animfn
 
 
+def create_anim_curve_node_apione(times, values,
+                                  node_attr=None,
+                                  tangent_in_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                                  tangent_out_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                                  anim_type=OpenMayaAnim1.MFnAnimCurve.kAnimCurveTL,
+                                  undo_cache=None):
+    """
+    Create an animCurve using Maya API (one).
+
+    :param times: Time values for the animCurve
+    :type times: list, tuple, array.array or numpy.ndarray
+
+    :param values: Values for the animCurve.
+    :type values: list, tuple, array.array or numpy.ndarray
+
+    :param node_attr: The 'plug' to connect the animCurve to.
+    :type node_attr: str
+
+    :param tangent_in_type: The "in" tangent type for keyframes.
+    :type tangent_in_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param tangent_out_type: The "out" tangent type for keyframes.
+    :type tangent_out_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param anim_type: The type of animation curve node.
+    :type anim_type: maya.OpenMayaAnim.MFnAnimCurve.kAnimCurve*
+
+    :param undo_cache: The Maya AnimCurve Undo Cache data structure or
+                       None if no undo is required.
+    :type undo_cache: maya.OpenMayaAnim.MAnimCurveChange
+
+    :return: MFnAnimCurve object attached to a newly created animation curve.
+    :rtype: maya.OpenMaya.MFnAnimCurve
+    """
+    _check_times_and_values(times, values)
+    animfn = _get_anim_curve_fn(node_attr, anim_type)
+    set_anim_curve_keys_apione(
+        animfn, times, values,
+        tangent_in_type=tangent_in_type,
+        tangent_out_type=tangent_out_type,
+        undo_cache=undo_cache)
+    return animfn
+
+
+def create_anim_curve_nodes_apione(times_list, values_list,
+                                   node_attr_list=None,
+                                   tangent_in_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                                   tangent_out_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                                   anim_type=OpenMayaAnim1.MFnAnimCurve.kAnimCurveTL,
+                                   undo_cache=None):
+    """
+    Create many animCurves using Maya API (one).
+
+    Curves given the same 'times' object share one converted
+    MTimeArray, for example the X, Y and Z translate curves of a
+    baked node. All the curves are added to the same undo cache.
+
+    :param times_list: Time values for each animCurve.
+    :type times_list: [list, ..]
+
+    :param values_list: Values for each animCurve.
+    :type values_list: [list, ..]
+
+    :param node_attr_list: The 'plug' to connect each animCurve to,
+                           or None to create unconnected curves.
+    :type node_attr_list: [str, ..] or None
+
+    :param tangent_in_type: The "in" tangent type for keyframes.
+    :type tangent_in_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param tangent_out_type: The "out" tangent type for keyframes.
+    :type tangent_out_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param anim_type: The type of animation curve node.
+    :type anim_type: maya.OpenMayaAnim.MFnAnimCurve.kAnimCurve*
+
+    :param undo_cache: The Maya AnimCurve Undo Cache data structure or
+                       None if no undo is required.
+    :type undo_cache: maya.OpenMayaAnim.MAnimCurveChange
+
+    :return: MFnAnimCurve objects, one for each curve.
+    :rtype: [maya.OpenMaya.MFnAnimCurve, ..]
+    """
+    if node_attr_list is None:
+        node_attr_list = [None] * len(times_list)
+    if not (len(times_list) == len(values_list) == len(node_attr_list)):
+        raise ValueError('Number of times, values and plugs does not match.')
+    if not undo_cache:
+        undo_cache = OpenMayaAnim1.MAnimCurveChange()
+
+    time_arrays = {}
+    animfn_list = []
+    for times, values, node_attr in zip(times_list,
+                                        values_list,
+                                        node_attr_list):
+        _check_times_and_values(times, values)
+        time_array = time_arrays.get(id(times))
+        if time_array is None:
+            time_array = create_time_array_apione(times)
+            time_arrays[id(times)] = time_array
+        animfn = _get_anim_curve_fn(node_attr, anim_type)
+        set_anim_curve_keys_apione(
+            animfn, time_array, values,
+            tangent_in_type=tangent_in_type,
+            tangent_out_type=tangent_out_type,
+            undo_cache=undo_cache)
+        animfn_list.append(animfn)
+    return animfn_list
+
+
 def create_anim_curve_node(*args, **kwargs):
     msg = 'Use mmSolver.utils.animcurve.create_anim_curve_node_apione instead.'
     warnings.warn(msg, DeprecationWarning)
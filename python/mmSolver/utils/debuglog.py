@@ -0,0 +1,237 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Read the debug log files written by the 'mmSolver' command.
+
+The 'mmSolver' command writes a debug file (with the 'debugFile'
+flag) containing every iteration of the solver; the parameter values
+and errors of each evaluation. For long solves the file can be very
+large, so the file is read line-by-line and an IterationRecord is
+yielded for each iteration, only one iteration is kept in memory.
+
+This module is software agnostic and should not rely on any thirdparty
+software.
+
+Example usage::
+
+  import mmSolver.utils.debuglog as debuglog
+  summary = debuglog.summarise_records(
+      debuglog.read_records('/path/to/solve.log', errors=False))
+  print(summary.normal_count, summary.error_curve[-1])
+
+"""
+
+import collections
+
+import mmSolver.logger
+
+
+LOG = mmSolver.logger.get_logger()
+
+ITERATION_TYPE_NORMAL = 'normal'
+ITERATION_TYPE_JACOBIAN = 'jacobian'
+
+IterationRecord = collections.namedtuple(
+    'IterationRecord',
+    ('type',
+     'number',
+     'parameters',
+     'errors',
+     'error_min',
+     'error_max',
+     'error_avg')
+)
+
+DebugLogSummary = collections.namedtuple(
+    'DebugLogSummary',
+    ('normal_count',
+     'jacobian_count',
+     'error_curve',
+     'parameter_deltas',
+     'initial_parameters',
+     'final_parameters')
+)
+
+
+def _parse_key_values(line):
+    """
+    Parse 'key=value' tokens of a line into a dict of floats.
+    """
+    values = {}
+    for token in line.split():
+        key, sep, value = token.partition('=')
+        if len(sep) == 0:
+            continue
+        try:
+            values[key] = float(value)
+        except ValueError:
+            LOG.debug('Cannot parse debug log value: %r', token)
+    return values
+
+
+def iter_records(lines, parameters=True, errors=True):
+    """
+    Parse lines of a solver debug log, yielding each iteration.
+
+    :param lines: The lines of the debug log, for example a file
+                  object.
+    :type lines: iterable of str
+
+    :param parameters: Store the parameter values of each iteration?
+    :type parameters: bool
+
+    :param errors: Store the error distances of each iteration?
+    :type errors: bool
+
+    :returns: A generator of IterationRecord, in the order written by
+              the solver.
+    :rtype: generator of IterationRecord
+    """
+    it_type = None
+    it_num = None
+    parm_list = []
+    err_list = []
+    err_min = None
+    err_max = None
+    err_avg = None
+    for line in lines:
+        if line.startswith('iteration '):
+            if it_type is not None:
+                yield IterationRecord(
+                    it_type, it_num, parm_list, err_list,
+                    err_min, err_max, err_avg)
+            head, _, tail = line[len('iteration '):].partition(':')
+            it_type = head.strip()
+            try:
+                it_num = int(tail)
+            except ValueError:
+                it_num = None
+            parm_list = []
+            err_list = []
+            err_min = None
+            err_max = None
+            err_avg = None
+        elif it_type is None:
+            continue
+        elif line.startswith('i='):
+            if parameters is True:
+                values = _parse_key_values(line)
+                parm_list.append(values.get('v'))
+        elif line.startswith('error dist '):
+            if errors is True:
+                values = _parse_key_values(line)
+                err_list.append(values.get('v'))
+        elif line.startswith('emin='):
+            values = _parse_key_values(line)
+            err_min = values.get('emin')
+            err_max = values.get('emax')
+            err_avg = values.get('eavg')
+
+    if it_type is not None:
+        yield IterationRecord(
+            it_type, it_num, parm_list, err_list,
+            err_min, err_max, err_avg)
+    return
+
+
+def read_records(file_path, parameters=True, errors=True):
+    """
+    Read a solver debug log file, yielding each iteration.
+
+    :param file_path: The debug log file path.
+    :type file_path: str
+
+    :param parameters: Store the parameter values of each iteration?
+    :type parameters: bool
+
+    :param errors: Store the error distances of each iteration?
+    :type errors: bool
+
+    :rtype: generator of IterationRecord
+    """
+    with open(file_path, 'r') as f:
+        for record in iter_records(f, parameters=parameters, errors=errors):
+            yield record
+    return
+
+
+def summarise_records(records):
+    """
+    Summarise the iterations of a solver debug log.
+
+    The records are consumed one at a time, only the summary values
+    are kept in memory.
+
+    :param records: The iterations to summarise.
+    :type records: iterable of IterationRecord
+
+    :returns: The number of normal and jacobian iterations, the error
+              curve as (iteration number, error min, error average,
+              error max) of each normal iteration, the largest
+              absolute parameter change of each normal iteration
+              compared to the previous normal iteration as (iteration
+              number, delta), and the parameters of the first and last
+              normal iterations.
+    :rtype: DebugLogSummary
+    """
+    normal_count = 0
+    jacobian_count = 0
+    error_curve = []
+    parameter_deltas = []
+    initial_parameters = None
+    previous_parameters = None
+    for record in records:
+        if record.type == ITERATION_TYPE_JACOBIAN:
+            jacobian_count += 1
+            continue
+        if record.type != ITERATION_TYPE_NORMAL:
+            continue
+        normal_count += 1
+        error_curve.append((
+            record.number,
+            record.error_min,
+            record.error_avg,
+            record.error_max,
+        ))
+
+        parm_list = record.parameters
+        if len(parm_list) == 0:
+            continue
+        if initial_parameters is None:
+            initial_parameters = list(parm_list)
+        elif len(parm_list) == len(previous_parameters):
+            delta = 0.0
+            for a, b in zip(previous_parameters, parm_list):
+                if a is None or b is None:
+                    continue
+                delta = max(delta, abs(b - a))
+            parameter_deltas.append((record.number, delta))
+        previous_parameters = parm_list
+
+    final_parameters = None
+    if previous_parameters is not None:
+        final_parameters = list(previous_parameters)
+    summary = DebugLogSummary(
+        normal_count=normal_count,
+        jacobian_count=jacobian_count,
+        error_curve=error_curve,
+        parameter_deltas=parameter_deltas,
+        initial_parameters=initial_parameters,
+        final_parameters=final_parameters,
+    )
+    return summary
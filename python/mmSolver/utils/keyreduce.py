@@ -0,0 +1,175 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Generic keyframe reduction.
+
+This module is software agnostic and should not rely on any thirdparty
+software, however if numpy is available, an numpy-accelerated
+code-path will be used.
+
+Keyframes are reduced with the Ramer-Douglas-Peucker algorithm, using
+the vertical (value) distance to the line between two keyframes. When
+the remaining keyframes are linearly interpolated, every original
+value is guaranteed to be within the tolerance.
+
+Example usage::
+
+  import mmSolver.utils.keyreduce as keyreduce
+  times = [1, 2, 3, 4, 5]
+  values = [0.0, 1.0, 2.0, 3.0, 3.0]
+  times, values = keyreduce.reduce_keys(times, values, 0.001)
+  # times == [1, 4, 5]
+
+"""
+
+import sys
+
+# NumPy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Optimal 'range' function for Python 2
+if sys.version_info[0] == 2:
+    range = xrange
+
+
+def _reduce_key_indices_python(times, values, tolerance):
+    """
+    Find the keyframes to keep, using standard python functions only.
+
+    :rtype: [int, ..]
+    """
+    num = len(times)
+    keep = [False] * num
+    keep[0] = True
+    keep[-1] = True
+    stack = [(0, num - 1)]
+    while len(stack) > 0:
+        first, last = stack.pop()
+        if (last - first) < 2:
+            continue
+        t0 = times[first]
+        v0 = values[first]
+        slope = (values[last] - v0) / float(times[last] - t0)
+
+        max_error = tolerance
+        max_index = -1
+        for i in range(first + 1, last):
+            error = abs(values[i] - (v0 + (slope * (times[i] - t0))))
+            if error > max_error:
+                max_error = error
+                max_index = i
+        if max_index != -1:
+            keep[max_index] = True
+            stack.append((first, max_index))
+            stack.append((max_index, last))
+    return [i for i in range(num) if keep[i]]
+
+
+def _reduce_key_indices_numpy(times, values, tolerance):
+    """
+    Find the keyframes to keep, using numpy arrays.
+
+    :rtype: [int, ..]
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    num = len(times)
+    keep = np.zeros(num, dtype=np.bool_)
+    keep[0] = True
+    keep[-1] = True
+    stack = [(0, num - 1)]
+    while len(stack) > 0:
+        first, last = stack.pop()
+        if (last - first) < 2:
+            continue
+        t0 = times[first]
+        v0 = values[first]
+        slope = (values[last] - v0) / (times[last] - t0)
+
+        inner_times = times[first + 1:last]
+        inner_values = values[first + 1:last]
+        errors = np.abs(inner_values - (v0 + (slope * (inner_times - t0))))
+        index = int(np.argmax(errors))
+        if errors[index] > tolerance:
+            max_index = first + 1 + index
+            keep[max_index] = True
+            stack.append((first, max_index))
+            stack.append((max_index, last))
+    return np.flatnonzero(keep).tolist()
+
+
+def reduce_key_indices(times, values, tolerance):
+    """
+    Find the keyframes needed to keep the curve within 'tolerance'.
+
+    :param times: The keyframe times, sorted in increasing order with
+                  no duplicates.
+    :type times: [int or float, ..]
+
+    :param values: The keyframe values.
+    :type values: [float, ..]
+
+    :param tolerance: The maximum allowed difference between an
+                      original value and the linearly interpolated
+                      value of the reduced keyframes.
+    :type tolerance: float
+
+    :returns: The sorted indices of the keyframes to keep. The first
+              and last keyframes are always kept.
+    :rtype: [int, ..]
+    """
+    assert len(times) == len(values)
+    assert tolerance >= 0.0
+    num = len(times)
+    if num <= 2:
+        return list(range(num))
+    if np is not None:
+        return _reduce_key_indices_numpy(times, values, tolerance)
+    return _reduce_key_indices_python(times, values, tolerance)
+
+
+def reduce_keys(times, values, tolerance):
+    """
+    Remove keyframes that can be linearly interpolated from the
+    remaining keyframes, within 'tolerance'.
+
+    The reduced keyframes must be set with linear tangents to keep
+    the curve within the tolerance.
+
+    :param times: The keyframe times, sorted in increasing order with
+                  no duplicates.
+    :type times: [int or float, ..]
+
+    :param values: The keyframe values.
+    :type values: [float, ..]
+
+    :param tolerance: The maximum allowed difference between an
+                      original value and the reduced curve value.
+    :type tolerance: float
+
+    :returns: The reduced keyframe times and values.
+    :rtype: ([int or float, ..], [float, ..])
+    """
+    indices = reduce_key_indices(times, values, tolerance)
+    new_times = [times[i] for i in indices]
+    new_values = [values[i] for i in indices]
+    return new_times, new_values
@@ -25,6 +25,8 @@ import os
 
 import matplotlib.pyplot as plt
 
+import mmSolver.utils.debuglog as debuglog
+
 
 def generate_plot_error_per_iteration(data, ax):
     x = []
@@ -149,56 +151,18 @@ def generate_plot_value_lines(data, ax):
 def read_log(file_path):
     data = {}
     print 'file_path:', repr(file_path)
-    with open(file_path, 'r') as f:
-        it_key_fmt = 'iter_%s_%s'
-        it_key = 'iter_s_s'
-
-        for line in f:
-            name = 'iteration '
-            if line.startswith(name):
-                line = line[len(name):]
-                it_type = str(line.split(':')[0])
-                it_num = int(line.split(':')[-1])
-                it_key = it_key_fmt % (it_type, str(it_num).zfill(8))
-                data[it_key] = {
-                    'type': it_type,
-                    'number': it_num,
-                    'parm': [],
-                    'error': [],
-                    'error_min': None,
-                    'error_max': None,
-                    'error_avg': None,
-                }
-
-            name = 'i='
-            if line.startswith(name):
-                splt = line.split(' ')
-                parm_num = splt[0]
-                parm_val = splt[-1]
-                parm_num = int(parm_num.split('=')[-1])
-                parm_val = float(parm_val.split('=')[-1])
-                data[it_key]['parm'].append(parm_val)
-
-            name = 'error dist '
-            if line.startswith(name):
-                line = line[len(name):]
-                err_num = line.split(' ')[0]
-                err_val = line.split(' ')[-1]
-                err_num = int(err_num.split('=')[-1])
-                err_val = float(err_val.split('=')[-1])
-                data[it_key]['error'].append(err_val)
-
-            name = 'emin='
-            if line.startswith(name):
-                err_min = line.split(' ')[0]
-                err_max = line.split(' ')[1]
-                err_avg = line.split(' ')[2]
-                err_min = float(err_min.split('=')[-1])
-                err_max = float(err_max.split('=')[-1])
-                err_avg = float(err_avg.split('=')[-1])
-                data[it_key]['error_min'] = err_min
-                data[it_key]['error_max'] = err_max
-                data[it_key]['error_avg'] = err_avg
+    it_key_fmt = 'iter_%s_%s'
+    for record in debuglog.read_records(file_path):
+        it_key = it_key_fmt % (record.type, str(record.number).zfill(8))
+        data[it_key] = {
+            'type': record.type,
+            'number': record.number,
+            'parm': record.parameters,
+            'error': record.errors,
+            'error_min': record.error_min,
+            'error_max': record.error_max,
+            'error_avg': record.error_avg,
+        }
     return data
 
 
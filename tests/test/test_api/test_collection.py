@@ -37,6 +37,8 @@ import mmSolver._api.marker as marker
 import mmSolver._api.bundle as bundle
 import mmSolver._api.attribute as attribute
 import mmSolver._api.collection as collection
+import mmSolver._api.compile as api_compile
+import mmSolver._api.solveresult as solveresult
 import mmSolver._api.excep as excep
 
 
@@ -538,6 +540,123 @@ class TestCollection(test_api_utils.APITestCase):
         x.add_attribute(attr)
         self.assertTrue(x.is_valid())
 
+    def test_solve_history(self):
+        """
+        Only the last runs are kept, and two runs can be compared.
+        """
+        x = collection.Collection()
+        x.create_node('myCollection')
+        self.assertEqual(x.get_solve_history(), [])
+
+        x.set_solve_history_max_runs(2)
+        self.assertEqual(x.get_solve_history_max_runs(), 2)
+        for i in range(3):
+            cmd_data = [
+                'success=1',
+                'error_per_frame=1#%s' % (1.0 + i),
+                'error_per_frame=2#%s' % (2.0 - i),
+            ]
+            solres = solveresult.SolveResult(cmd_data)
+            x._add_solve_history([solres], float(i), 0.5,
+                                 options_hash='hash')
+
+        runs = x.get_solve_history()
+        self.assertEqual(len(runs), 2)
+        self.assertEqual([r['timestamp'] for r in runs], [1.0, 2.0])
+        self.assertEqual(runs[0]['options_hash'], 'hash')
+        self.assertEqual(x.get_solve_history_frame_error_list(-1),
+                         {1.0: 3.0, 2.0: 0.0})
+        self.assertEqual(x.diff_solve_history(0, 1),
+                         {1.0: 1.0, 2.0: -1.0})
+
+        # The byte budget evicts the oldest runs.
+        x.set_solve_history_max_bytes(1)
+        self.assertEqual(len(x.get_solve_history()), 0)
+
+        x.set_solve_history_max_bytes(1024 * 1024)
+        x._add_solve_history([solres], 3.0, 0.5)
+        self.assertEqual(len(x.get_solve_history()), 1)
+        x.clear_solve_history()
+        self.assertEqual(len(x.get_solve_history()), 0)
+
+    def test_compile_cache(self):
+        """
+        The compile cache is re-used between compiles, and cleared when
+        the Collection structure, or a node used, is changed.
+        """
+        x = collection.Collection()
+        x.create_node('myCollection')
+        sol = solver.Solver()
+        sol.add_frame(frame.Frame(1))
+        x.add_solver(sol)
+
+        cam_tfm = maya.cmds.createNode('transform', name='camera1')
+        cam_shp = maya.cmds.createNode('camera', name='cameraShape1',
+                                       parent=cam_tfm)
+        cam = camera.Camera(shape=cam_shp)
+        bnd = bundle.Bundle().create_node()
+        mkr = marker.Marker().create_node(cam=cam, bnd=bnd)
+        x.add_marker(mkr)
+        attr = attribute.Attribute(node=bnd.get_node(), attr='translateX')
+        x.add_attribute(attr)
+
+        api_compile.invalidate_compile_caches()
+        sol_list = x.get_solver_list()
+        mkr_list = x.get_marker_list()
+        attr_list = x.get_attribute_list()
+        api_compile.collection_compile(x, sol_list, mkr_list, attr_list)
+        cache = api_compile.get_compile_cache(x)
+        self.assertEqual(cache.get_miss_count(), 1)
+        self.assertEqual(cache.get_hit_count(), 0)
+        self.assertIsNotNone(cache.get_marker_values(mkr.get_node()))
+
+        # Nothing has changed, the cache is used.
+        api_compile.collection_compile(x, sol_list, mkr_list, attr_list)
+        self.assertEqual(cache.get_hit_count(), 1)
+
+        # The solver frames are part of the fingerprint.
+        sol.add_frame(frame.Frame(2))
+        x.set_solver_list([sol])
+        sol_list = x.get_solver_list()
+        api_compile.collection_compile(x, sol_list, mkr_list, attr_list)
+        self.assertEqual(cache.get_miss_count(), 2)
+
+        # Invalidating a node in the cache clears the values.
+        bnd_uuid = maya.cmds.ls(bnd.get_node(), uuid=True)[0]
+        self.assertTrue(cache.has_node_uuid(bnd_uuid))
+        api_compile.invalidate_compile_caches(node_uuids=[bnd_uuid])
+        self.assertIsNone(cache.get_marker_values(mkr.get_node()))
+
+        # Compile without the cache.
+        api_compile.collection_compile(x, sol_list, mkr_list, attr_list,
+                                       use_cache=False)
+        self.assertEqual(cache.get_miss_count(), 2)
+        self.assertEqual(cache.get_hit_count(), 1)
+
+        # Maya min/max values are queried, even when cached.
+        bnd_node = bnd.get_node()
+        maya.cmds.addAttr(bnd_node, longName='myAttr',
+                          attributeType='double', minValue=0.0,
+                          keyable=True)
+        attr = attribute.Attribute(node=bnd_node, attr='myAttr')
+        name = attr.get_name()
+        values = api_compile.get_attributes_static_values(
+            x, [attr], compile_cache=cache)
+        self.assertEqual(values[name]['maya_min_value'], [0.0])
+        maya.cmds.addAttr(bnd_node + '.myAttr', edit=True, minValue=-1.0)
+        values = api_compile.get_attributes_static_values(
+            x, [attr], compile_cache=cache)
+        self.assertEqual(values[name]['maya_min_value'], [-1.0])
+
+        # Re-opening the scene (with the same UUIDs) starts a new
+        # cache.
+        path = self.get_data_path('test_collection_compile_cache.ma')
+        maya.cmds.file(rename=path)
+        maya.cmds.file(save=True, type='mayaAscii', force=True)
+        maya.cmds.file(path, open=True, force=True)
+        y = collection.Collection(node='myCollection')
+        self.assertIsNot(api_compile.get_compile_cache(y), cache)
+
 
 if __name__ == '__main__':
     prog = unittest.main()
@@ -0,0 +1,150 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test the Marker activity index against the Marker enable values.
+"""
+
+import unittest
+
+import maya.cmds
+
+import mmSolver.utils.animcurve as anim_utils
+import mmSolver.api as mmapi
+import mmSolver._api.markeractivity as mod
+
+import test.test_api.apiutils as test_api_utils
+
+
+# @unittest.skip
+class TestMarkerActivity(test_api_utils.APITestCase):
+
+    def create_markers(self):
+        cam_tfm = maya.cmds.createNode('transform', name='cam_tfm')
+        cam_shp = maya.cmds.createNode('camera', name='cam_shp',
+                                       parent=cam_tfm)
+        cam = mmapi.Camera(shape=cam_shp)
+        mmapi.MarkerGroup().create_node(cam=cam)
+
+        mkr_a = mmapi.Marker().create_node()
+        times = [1, 5, 6, 10]
+        values = [1, 1, 0, 0]
+        anim_utils.create_anim_curve_node_apione(
+            times, values, mkr_a.get_node() + '.enable')
+
+        mkr_b = mmapi.Marker().create_node()
+        times = [1, 3, 4, 10]
+        values = [0, 0, 1, 1]
+        anim_utils.create_anim_curve_node_apione(
+            times, values, mkr_b.get_node() + '.enable')
+
+        # Marker C is not animated; always enabled.
+        mkr_c = mmapi.Marker().create_node()
+        return mkr_a, mkr_b, mkr_c
+
+    def test_enabled_frames(self):
+        mkr_a, mkr_b, mkr_c = self.create_markers()
+        mkr_list = [mkr_a, mkr_b, mkr_c]
+        index = mod.create_marker_activity_index(mkr_list, 1, 10)
+        self.assertEqual(index.get_frame_range(), (1, 10))
+
+        # The index must match the values queried from Maya.
+        for mkr in mkr_list:
+            mkr_node = mkr.get_node()
+            self.assertTrue(index.has_marker(mkr_node))
+            for f in range(1, 11):
+                self.assertEqual(index.is_enabled(mkr_node, f),
+                                 bool(mkr.get_enable(time=f)))
+                self.assertEqual(index.get_weight(mkr_node, f),
+                                 mkr.get_weight(time=f))
+
+        mkr_a_node = mkr_a.get_node()
+        mkr_b_node = mkr_b.get_node()
+        mkr_c_node = mkr_c.get_node()
+        self.assertEqual(index.get_enabled_frames(mkr_a_node),
+                         [1, 2, 3, 4, 5])
+        self.assertEqual(index.get_enabled_frame_count(mkr_a_node), 5)
+        self.assertEqual(index.get_first_last_frame(mkr_b_node), [4, 10])
+        self.assertEqual(index.get_first_last_frame(mkr_c_node), [1, 10])
+        self.assertEqual(
+            index.get_enabled_frames(mkr_a_node, frame_list=[2, 4, 6]),
+            [2, 4])
+
+        self.assertEqual(index.get_active_marker_nodes(2),
+                         [mkr_a_node, mkr_c_node])
+        self.assertEqual(index.get_active_marker_nodes(8),
+                         [mkr_b_node, mkr_c_node])
+        self.assertEqual(
+            index.get_common_frames([mkr_a_node, mkr_b_node, mkr_c_node]),
+            [4, 5])
+
+        # Frames outside of the index are queried from Maya.
+        self.assertEqual(
+            index.get_enabled_frames(mkr_a_node, frame_list=[0, 1, 11]),
+            [0, 1])
+        return
+
+    def test_key_range_enabled_frames(self):
+        mkr_a, mkr_b, mkr_c = self.create_markers()
+        mkr_list = [mkr_a, mkr_b, mkr_c]
+        index = mod.create_marker_activity_index(mkr_list, 3, 8)
+
+        # Animated Markers use the frames between the first and last
+        # key, even outside of the given frame range, the same as
+        # 'Marker.get_enabled_frames'.
+        for mkr in mkr_list:
+            mkr_node = mkr.get_node()
+            self.assertEqual(
+                index.get_key_range_enabled_frames(
+                    mkr_node, frame_range_start=3, frame_range_end=8),
+                mkr.get_enabled_frames(
+                    frame_range_start=3, frame_range_end=8))
+        self.assertEqual(index.get_key_range(mkr_a.get_node()), (1, 10))
+        self.assertEqual(
+            index.get_key_range_enabled_frames(mkr_a.get_node()),
+            [1, 2, 3, 4, 5])
+
+        # Markers without animation use the given frame range.
+        self.assertEqual(index.get_key_range(mkr_c.get_node()), None)
+        self.assertEqual(
+            index.get_key_range_enabled_frames(mkr_c.get_node()),
+            [3, 4, 5, 6, 7, 8])
+        return
+
+    def test_fractional_frames(self):
+        mkr_a, mkr_b, mkr_c = self.create_markers()
+        mkr_list = [mkr_a, mkr_b, mkr_c]
+        index = mod.create_marker_activity_index(mkr_list, 1, 10)
+
+        # Fractional frames are not stored in the index, they are
+        # queried from Maya.
+        for mkr in mkr_list:
+            mkr_node = mkr.get_node()
+            for f in [3.5, 5.4, 5.6, 6.5]:
+                self.assertEqual(index.is_enabled(mkr_node, f),
+                                 bool(mkr.get_enable(time=f)))
+        mkr_a_node = mkr_a.get_node()
+        frame_list = [5, 5.4, 5.6]
+        expected = [f for f in frame_list if mkr_a.get_enable(time=f)]
+        self.assertEqual(
+            index.get_enabled_frames(mkr_a_node, frame_list=frame_list),
+            expected)
+        return
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
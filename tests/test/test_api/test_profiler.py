@@ -0,0 +1,90 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for the profiler module.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import test.test_api.apiutils as test_api_utils
+import mmSolver._api.profiler as profiler
+
+
+# @unittest.skip
+class TestProfiler(test_api_utils.APITestCase):
+
+    def test_span_disabled(self):
+        self.assertIsNone(profiler.get_active_profiler())
+        with profiler.span('phase') as s:
+            pass
+        self.assertIs(s, profiler._NULL_SPAN)
+
+    def test_phase_stats(self):
+        prof = profiler.Profiler()
+        with prof:
+            self.assertIs(profiler.get_active_profiler(), prof)
+            with profiler.span('execute'):
+                for _ in profiler.iter_span(range(3), 'compile'):
+                    with profiler.span('solve', func='mmSolver'):
+                        pass
+        self.assertIsNone(profiler.get_active_profiler())
+
+        stats = prof.get_phase_stats()
+        self.assertEqual(
+            sorted(stats.keys()),
+            ['execute', 'execute/compile', 'execute/solve'])
+        self.assertEqual(stats['execute'].count, 1)
+        self.assertEqual(stats['execute/solve'].count, 3)
+        # The last 'compile' span finds the end of the iterator.
+        self.assertEqual(stats['execute/compile'].count, 4)
+        self.assertGreaterEqual(stats['execute'].total,
+                                stats['execute/solve'].total)
+        self.assertIn('solve', prof.format_phase_stats())
+
+    def test_write_chrome_trace(self):
+        prof = profiler.Profiler(max_events=2)
+        with prof:
+            for i in range(3):
+                with profiler.span('solve', index=i):
+                    pass
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'trace.json')
+            prof.write_chrome_trace(path)
+            with open(path, 'r') as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        events = data['traceEvents']
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]['ph'], 'X')
+        self.assertEqual(events[0]['name'], 'solve')
+        self.assertEqual(events[1]['args'], {'index': 1})
+        self.assertGreaterEqual(events[1]['ts'], events[0]['ts'])
+        # Dropped spans are still counted.
+        self.assertEqual(prof.get_phase_stats()['solve'].count, 3)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
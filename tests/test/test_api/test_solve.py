@@ -32,6 +32,8 @@ import maya.cmds
 import mmSolver.logger
 import mmSolver.utils.time as time_utils
 import mmSolver.api as mmapi
+import mmSolver._api.compile as api_compile
+import mmSolver._api.execute as api_execute
 import mmSolver.tools.solver.lib.collection as lib_col
 import mmSolver.tools.loadmarker.lib.mayareadfile as marker_read
 import test.test_api.apiutils as test_api_utils
@@ -40,6 +42,16 @@ import test.test_api.apiutils as test_api_utils
 LOG = mmSolver.logger.get_logger()
 
 
+class _NotValidSolver(mmapi.Solver):
+    """
+    A Solver that does not compile into a valid action.
+    """
+
+    def compile(self, col, mkr_list, attr_list, withtest=False):
+        yield None, None
+        return
+
+
 # @unittest.skip
 class TestSolve(test_api_utils.APITestCase):
 
@@ -486,6 +498,181 @@ class TestSolve(test_api_utils.APITestCase):
         self.checkSolveResults(results)
         return
 
+    def create_per_frame_collection(self):
+        """
+        Create a Collection to solve animated values, per-frame.
+        """
+        # Camera
+        cam_tfm = maya.cmds.createNode('transform',
+                                       name='cam_tfm')
+        cam_shp = maya.cmds.createNode('camera',
+                                       name='cam_shp',
+                                       parent=cam_tfm)
+        maya.cmds.setAttr(cam_tfm + '.tx', -1.0)
+        maya.cmds.setAttr(cam_tfm + '.ty',  1.0)
+        maya.cmds.setAttr(cam_tfm + '.tz', -5.0)
+        cam = mmapi.Camera(shape=cam_shp)
+
+        # Bundle
+        bnd = mmapi.Bundle().create_node()
+        bundle_tfm = bnd.get_node()
+        maya.cmds.setAttr(bundle_tfm + '.tx', 5.5)
+        maya.cmds.setAttr(bundle_tfm + '.ty', 6.4)
+        maya.cmds.setAttr(bundle_tfm + '.tz', -25.0)
+        for attr_name, value in [('translateX', 5.5),
+                                 ('translateY', 6.4)]:
+            maya.cmds.setKeyframe(bundle_tfm,
+                                  attribute=attr_name,
+                                  time=1, value=value,
+                                  inTangentType='linear',
+                                  outTangentType='linear')
+
+        # Marker
+        mkr = mmapi.Marker().create_node(cam=cam, bnd=bnd)
+        marker_tfm = mkr.get_node()
+        for attr_name in ['translateX', 'translateY']:
+            maya.cmds.setKeyframe(marker_tfm,
+                                  attribute=attr_name,
+                                  time=1, value=-0.5,
+                                  inTangentType='linear',
+                                  outTangentType='linear')
+            maya.cmds.setKeyframe(marker_tfm,
+                                  attribute=attr_name,
+                                  time=5, value=0.5,
+                                  inTangentType='linear',
+                                  outTangentType='linear')
+
+        # Attributes
+        attr_tx = mmapi.Attribute(bundle_tfm + '.tx')
+        attr_ty = mmapi.Attribute(bundle_tfm + '.ty')
+
+        # Solver
+        sol_list = []
+        for f in range(1, 6):
+            sol = mmapi.Solver()
+            sol.set_max_iterations(10)
+            sol.set_frame_list([mmapi.Frame(f)])
+            sol_list.append(sol)
+
+        # Collection
+        col = mmapi.Collection()
+        col.create_node('mySolveCollection')
+        col.add_solver_list(sol_list)
+        col.add_marker(mkr)
+        col.add_attribute(attr_tx)
+        col.add_attribute(attr_ty)
+        return col
+
+    def test_per_frame_stream_compile(self):
+        """
+        Solve animated values, per-frame, compiling each action just
+        before it is run.
+        """
+        col = self.create_per_frame_collection()
+
+        # Run solver!
+        options = mmapi.create_execute_options(stream_compile=True)
+        results = mmapi.execute(col, options=options)
+        self.assertEqual(len(results), 5)
+        self.checkSolveResults(results)
+        return
+
+    def test_per_frame_stream_compile_not_valid(self):
+        """
+        Solve animated values, per-frame, compiling each action just
+        before it is run, with a Solver that fails to compile after
+        the first frame.
+        """
+        col = self.create_per_frame_collection()
+        sol_list = col.get_solver_list()
+        col.remove_solver_list(sol_list[1:])
+        col.add_solver(_NotValidSolver())
+
+        # Run solver!
+        options = mmapi.create_execute_options(stream_compile=True)
+        results = mmapi.execute(col, options=options)
+        self.assertEqual(len(results), 1)
+        self.checkSolveResults(results)
+
+        # The results of the solves run are still stored.
+        self.assertIsNotNone(col.get_last_solve_timestamp())
+        self.assertEqual(len(col.get_last_solve_results()), 1)
+        return
+
+    def test_per_frame_refresh_interval(self):
+        """
+        Solve animated values, per-frame, refreshing the viewport at
+        most once per-interval, and always after the last solve.
+        """
+        col = self.create_per_frame_collection()
+
+        # Run solver!
+        options = mmapi.create_execute_options(
+            refresh=True,
+            refresh_min_interval=3600.0)
+        results = mmapi.execute(col, options=options)
+        self.assertEqual(len(results), 5)
+        self.checkSolveResults(results)
+
+        stats = col.get_last_solve_statistics()
+        self.assertEqual(stats['refresh_count'], 2)
+        self.assertEqual(stats['refresh_skipped_count'], 4)
+        self.assertGreaterEqual(stats['refresh_duration'], 0.0)
+        run = col.get_solve_history()[-1]
+        self.assertEqual(run['statistics'], stats)
+        return
+
+    def test_validate_duplicate_actions(self):
+        """
+        Validate actions that only differ in frame numbers are run
+        once, and the state is copied to the other actions.
+        """
+        col = self.create_per_frame_collection()
+        action_list, vaction_list = api_compile.collection_compile(
+            col,
+            col.get_solver_list(),
+            col.get_marker_list(),
+            col.get_attribute_list(),
+            withtest=True)
+        self.assertEqual(len(vaction_list), 5)
+
+        index = api_execute._create_validate_marker_activity_index(
+            vaction_list)
+        signatures = set([
+            api_execute._get_validate_action_signature(v, index)
+            for v in vaction_list])
+        self.assertEqual(len(signatures), 1)
+
+        state_list = api_execute._run_validate_action_list(vaction_list)
+        self.assertEqual(len(state_list), 5)
+        for vaction, state in zip(vaction_list, state_list):
+            self.assertEqual(state.status, mmapi.ACTION_STATUS_SUCCESS)
+            self.assertEqual(state.frames, vaction.kwargs['frame'])
+        return
+
+    def test_validate_duplicate_actions_at_runtime(self):
+        """
+        Validate actions that only differ in frame numbers are run
+        once when validating at runtime, with and without compiling
+        each action just before it is run.
+        """
+        for stream_compile in [False, True]:
+            maya.cmds.file(new=True, force=True)
+            col = self.create_per_frame_collection()
+            options = mmapi.create_execute_options(
+                stream_compile=stream_compile)
+            results = mmapi.execute(
+                col,
+                options=options,
+                validate_mode=mmapi.VALIDATE_MODE_AT_RUNTIME_VALUE)
+            self.assertEqual(len(results), 5)
+            self.checkSolveResults(results)
+
+            stats = col.get_last_solve_statistics()
+            self.assertEqual(stats['validate_count'], 1)
+            self.assertEqual(stats['validate_skipped_count'], 4)
+        return
+
     def test_stA_refine_good_solve(self):
         """
         Test file based on 3DEqualizer 'stA' image sequence.
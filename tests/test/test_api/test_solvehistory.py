@@ -0,0 +1,86 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test the solve history module.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+import mmSolver._api.solvehistory as solvehistory
+
+import test.test_api.apiutils as test_api_utils
+
+
+# Import the module in a new process, with all Maya modules blocked.
+_IMPORT_WITHOUT_MAYA_CODE = (
+    'import sys\n'
+    'sys.modules["maya"] = None\n'
+    'import mmSolver._api.solvehistory\n'
+)
+
+
+# @unittest.skip
+class TestSolveHistory(test_api_utils.APITestCase):
+
+    def test_import_without_maya(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([p for p in sys.path if p])
+        proc = subprocess.Popen(
+            [sys.executable, '-c', _IMPORT_WITHOUT_MAYA_CODE],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
+        _, stderr = proc.communicate()
+        self.assertEqual(proc.returncode, 0, msg=stderr)
+
+    def test_create_history(self):
+        history = solvehistory.create_history()
+        self.assertTrue(solvehistory.is_valid_history(history))
+        self.assertEqual(
+            history['max_runs'],
+            solvehistory.SOLVE_HISTORY_MAX_RUNS_DEFAULT)
+        self.assertEqual(
+            history['max_bytes'],
+            solvehistory.SOLVE_HISTORY_MAX_BYTES_DEFAULT)
+        self.assertEqual(history['runs'], [])
+
+    def test_encode_float_array(self):
+        values = [1.0, 2.5, -3.25, 1001.0]
+        text = solvehistory.encode_float_array(values)
+        decoded = solvehistory.decode_float_array(text)
+        self.assertEqual(list(decoded), values)
+
+    def test_evict_runs(self):
+        history = solvehistory.create_history(max_runs=2)
+        for i in range(4):
+            run = {
+                'timestamp': float(i),
+                'frames': solvehistory.encode_float_array([1.0]),
+                'errors': solvehistory.encode_float_array([float(i)]),
+            }
+            solvehistory.add_run(history, run)
+        runs = history['runs']
+        self.assertEqual(len(runs), 2)
+        self.assertEqual([r['timestamp'] for r in runs], [2.0, 3.0])
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -226,6 +226,146 @@ class TestSolveResult(test_api_utils.APITestCase):
         assert isinstance(nodes, list)
         assert len(nodes) > 0
 
+    def test_frame_error_arrays(self):
+        """
+        Error streams are parsed into arrays, and NaN/inf are -1.0.
+        """
+        cmd_data = [
+            'success=1',
+            'error_final=0.5',
+            'error_per_frame=1#0.5',
+            'error_per_frame=2#nan',
+            'error_per_frame=3#inf',
+            'error_per_frame=4',
+            'error_per_marker_per_frame=mkr1#1#0.25',
+            'error_per_marker_per_frame=mkr1#2#-inf',
+            'error_per_marker_per_frame=mkr2#1#0.75',
+        ]
+        solres = solveresult.SolveResult(cmd_data)
+        self.assertTrue(solres.get_success())
+        self.assertTrue(self.approx_equal(solres.get_final_error(), 0.5))
+
+        frames, errors = solres.get_frame_error_arrays()
+        self.assertEqual(list(frames), [1.0, 2.0, 3.0])
+        self.assertEqual(list(errors), [0.5, -1.0, -1.0])
+        self.assertIs(solres.get_frame_error_arrays()[0], frames)
+
+        self.assertEqual(solres.get_frame_list(), [1.0, 2.0, 3.0])
+        frame_error_list = solres.get_frame_error_list()
+        self.assertEqual(frame_error_list, {1.0: 0.5, 2.0: -1.0, 3.0: -1.0})
+        frame_error_list[1.0] = 42.0
+        self.assertEqual(solres.get_frame_error_list()[1.0], 0.5)
+
+        mkr_arrays = solres.get_marker_error_arrays()
+        self.assertEqual(sorted(mkr_arrays.keys()), ['mkr1', 'mkr2'])
+        frames, errors = solres.get_marker_error_arrays('mkr1')
+        self.assertEqual(list(frames), [1.0, 2.0])
+        self.assertEqual(list(errors), [0.25, -1.0])
+        self.assertIs(solres.get_marker_error_arrays('mkr3'), None)
+
+        mkr_error_list = solres.get_marker_error_list()
+        self.assertEqual(mkr_error_list['mkr1'], {1.0: 0.25, 2.0: -1.0})
+        self.assertEqual(solres.get_marker_error_list('mkr2'), {1.0: 0.75})
+        self.assertIs(solres.get_marker_error_list('mkr3'), None)
+
+        # No error streams.
+        solres = solveresult.SolveResult(['success=0'])
+        self.assertEqual(solres.get_frame_list(), [])
+        self.assertEqual(len(solres.get_frame_error_arrays()[0]), 0)
+        self.assertEqual(solres.get_marker_error_list(), {})
+        return
+
+    def test_encode_solve_results(self):
+        """
+        Solve results are compressed, and decoded back the same.
+        """
+        cmd_data = [
+            'success=1',
+            'error_final=0.5',
+            'error_per_frame=1#0.5',
+            'error_per_frame=2#0.25',
+            'error_per_marker_per_frame=mkr1#1#0.25',
+            'error_per_marker_per_frame=mkr1#2#0.5',
+        ]
+        solres = solveresult.SolveResult(cmd_data)
+        data = solveresult.encode_solve_results([solres])
+        self.assertEqual(data['version'], solveresult.ENCODE_FORMAT_VERSION)
+        self.assertEqual(len(data['results']), 1)
+
+        solres_list = solveresult.decode_solve_results(data)
+        self.assertEqual(len(solres_list), 1)
+        new_solres = solres_list[0]
+        self.assertTrue(new_solres.get_success())
+        self.assertEqual(new_solres.get_frame_error_list(),
+                         solres.get_frame_error_list())
+        self.assertEqual(new_solres.get_marker_error_list(),
+                         solres.get_marker_error_list())
+        self.assertEqual(sorted(new_solres.get_data_raw()), sorted(cmd_data))
+
+        # Older scenes store a list of raw data.
+        solres_list = solveresult.decode_solve_results([cmd_data])
+        self.assertEqual(solres_list[0].get_data_raw(), cmd_data)
+        self.assertEqual(solveresult.decode_solve_results(None), [])
+
+        # Scene data stored with the Collection node.
+        col = create_example_solve_scene()
+        results = col.execute()
+        stored_results = col.get_last_solve_results()
+        self.assertEqual(len(stored_results), len(results))
+        self.assertEqual(stored_results[0].get_final_error(),
+                         results[0].get_final_error())
+        self.assertEqual(stored_results[0].get_marker_error_list(),
+                         results[0].get_marker_error_list())
+        return
+
+    def test_summarise_solve_results(self):
+        """
+        Merged errors keep the last value of each frame.
+        """
+        solres_a = solveresult.SolveResult([
+            'success=1',
+            'error_per_frame=1#1.0',
+            'error_per_frame=2#3.0',
+            'error_per_marker_per_frame=mkr1#1#0.5',
+            'error_per_marker_per_frame=mkr1#2#1.5',
+        ])
+        solres_b = solveresult.SolveResult([
+            'success=1',
+            'error_per_frame=2#2.0',
+            'error_per_frame=3#0.5',
+            'error_per_marker_per_frame=mkr1#2#1.0',
+            'error_per_marker_per_frame=mkr2#2#3.0',
+        ])
+        solres_list = [solres_a, solres_b]
+
+        frames, errors = mmapi.merge_frame_error_arrays(solres_list)
+        self.assertEqual(list(frames), [1.0, 2.0, 3.0])
+        self.assertEqual(list(errors), [1.0, 2.0, 0.5])
+        self.assertEqual(dict(mmapi.merge_frame_error_list(solres_list)),
+                         {1.0: 1.0, 2.0: 2.0, 3.0: 0.5})
+        self.assertEqual(mmapi.merge_frame_list(solres_list),
+                         [1.0, 2.0, 3.0])
+
+        summary = mmapi.summarise_solve_results(solres_list)
+        self.assertTrue(summary.success)
+        self.assertTrue(self.approx_equal(summary.average_error, 3.5 / 3.0))
+        self.assertEqual(summary.max_frame, 2)
+        self.assertTrue(self.approx_equal(summary.max_error, 2.0))
+        self.assertIsInstance(summary.timer_stats, dict)
+
+        mkr_error_list = mmapi.merge_marker_error_list(solres_list)
+        self.assertEqual(mkr_error_list['mkr1'], {1.0: 0.5, 2.0: 1.0})
+        self.assertEqual(mkr_error_list['mkr2'], {2.0: 3.0})
+        self.assertEqual(mmapi.merge_marker_node_list(solres_list),
+                         ['mkr1', 'mkr2'])
+        avg_mkr_error_list = mmapi.get_average_marker_error_list(solres_list)
+        self.assertTrue(self.approx_equal(avg_mkr_error_list['mkr1'], 0.75))
+
+        summary = mmapi.summarise_solve_results([])
+        self.assertEqual(len(summary.frames), 0)
+        self.assertIs(summary.max_frame, None)
+        return
+
     def test_perfect_solve(self):
         """
         Open a file and trigger a solve to get perfect results.
@@ -0,0 +1,124 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for solve result export module.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import test.test_api.apiutils as test_api_utils
+import mmSolver._api.solveresult as solveresult
+import mmSolver._api.solveresultexport as solveresultexport
+
+
+def create_example_solve_results():
+    solres_a = solveresult.SolveResult([
+        'success=1',
+        'iteration_num=5',
+        'timer_solve=1.5',
+        'error_per_frame=1#1.0',
+        'error_per_frame=2#3.0',
+        'error_per_marker_per_frame=mkr1#1#0.5',
+        'error_per_marker_per_frame=mkr1#2#1.5',
+    ])
+    solres_b = solveresult.SolveResult([
+        'success=0',
+        'iteration_num=7',
+        'timer_solve=0.5',
+        'error_per_frame=2#2.0',
+        'error_per_frame=3#0.5',
+    ])
+    return [solres_a, solres_b]
+
+
+# @unittest.skip
+class TestSolveResultExport(test_api_utils.APITestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        super(TestSolveResultExport, self).setUp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+        super(TestSolveResultExport, self).tearDown()
+
+    def test_create_tables(self):
+        solres_list = create_example_solve_results()
+        tables = solveresultexport.create_tables(solres_list, 'shot')
+        runs = tables[solveresultexport.TABLE_RUNS]
+        self.assertEqual(runs['solve_index'], [0, 1])
+        self.assertEqual(runs['success'], [True, False])
+        self.assertEqual(runs['iteration_total_calls'], [5, 7])
+        self.assertEqual(runs['solve_seconds'], [1.5, 0.5])
+
+        frames = tables[solveresultexport.TABLE_FRAMES]
+        self.assertEqual(frames['frame'], [1.0, 2.0, 2.0, 3.0])
+        self.assertEqual(frames['error'], [1.0, 3.0, 2.0, 0.5])
+
+        markers = tables[solveresultexport.TABLE_MARKERS]
+        self.assertEqual(markers['marker'], ['mkr1', 'mkr1'])
+        self.assertEqual(markers['error'], [0.5, 1.5])
+
+    def test_export_solve_results(self):
+        solres_list = create_example_solve_results()
+        tables = solveresultexport.create_tables(solres_list, '010')
+        for file_format in solveresultexport.get_format_list():
+            paths = solveresultexport.export_solve_results(
+                solres_list, self.dir_path, '010',
+                file_format=file_format)
+            self.assertEqual(len(paths), 3)
+            for table, path in zip(solveresultexport.TABLE_LIST, paths):
+                self.assertTrue(os.path.isfile(path))
+                columns = solveresultexport.read_table(path)
+                self.assertEqual(dict(columns), dict(tables[table]))
+
+        with self.assertRaises(ValueError):
+            solveresultexport.export_solve_results(
+                solres_list, self.dir_path, '010',
+                file_format='unknown')
+
+    def test_aggregate(self):
+        solres_list = create_example_solve_results()
+        solveresultexport.export_solve_results(
+            solres_list, self.dir_path, 'shotA',
+            file_format=solveresultexport.FORMAT_CSV)
+        solveresultexport.export_solve_results(
+            solres_list[:1], self.dir_path, 'shotB',
+            file_format=solveresultexport.FORMAT_JSONL)
+
+        tables = solveresultexport.read_directory(self.dir_path)
+        summary = solveresultexport.aggregate_tables(tables)
+        self.assertEqual(summary['name'], ['shotA', 'shotB'])
+        self.assertEqual(summary['solve_count'], [2, 1])
+        self.assertEqual(summary['success'], [False, True])
+        self.assertEqual(summary['iteration_total_calls'], [12, 5])
+        self.assertEqual(summary['max_error'], [3.0, 3.0])
+        self.assertEqual(summary['max_error_frame'], [2.0, 2.0])
+        self.assertTrue(self.approx_equal(summary['average_error'][0], 1.625))
+
+        path = os.path.join(self.dir_path, 'summary.csv')
+        solveresultexport.main(self.dir_path, output_path=path)
+        columns = solveresultexport.read_table(path)
+        self.assertEqual(columns['name'], ['shotA', 'shotB'])
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
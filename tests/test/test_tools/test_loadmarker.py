@@ -20,6 +20,10 @@ Test functions for loadmarker tool module.
 """
 
 import os
+import json
+import array
+import struct
+import tempfile
 import unittest
 
 import maya.cmds
@@ -29,9 +33,89 @@ import mmSolver.tools.loadmarker.lib.mayareadfile as marker_read
 import mmSolver.tools.loadmarker.lib.interface as interface
 import mmSolver.tools.loadmarker.lib.utils as lib_utils
 import mmSolver.tools.loadmarker.lib.fileutils as lib_fileutils
+import mmSolver.tools.loadmarker.lib.parsecache as parsecache
+import mmSolver.tools.loadmarker.lib.readfile as readfile
+import mmSolver.tools.loadmarker.lib.bulkcreate as bulkcreate
+import mmSolver.tools.loadmarker.lib.formats.uvtrack as uvtrack
+import mmSolver.tools.loadmarker.constant as loadmarker_const
 import mmSolver.tools.createmarker.tool as create_marker
 
 
+def _write_uvtrack_v5_file(point_columns):
+    """
+    Write a binary (version 5) '.uv' file to a temporary file path.
+
+    :param point_columns: The name, id and column values of each point.
+    :type point_columns: [(str, int, [[float, ..], ..]), ..]
+
+    :returns: The temporary file path.
+    :rtype: str
+    """
+    blocks = []
+    points = []
+    offset = 0
+    for name, id_, columns in point_columns:
+        block = b''
+        for column in columns:
+            values = array.array('d', column)
+            if hasattr(values, 'tobytes'):
+                block += values.tobytes()
+            else:
+                block += values.tostring()
+        points.append({
+            'name': name,
+            'id': id_,
+            'set_name': None,
+            'num_frames': len(columns[0]),
+            'offset': offset,
+            '3d': {
+                'x': 1.0, 'y': 2.0, 'z': 3.0,
+                'x_lock': False, 'y_lock': False, 'z_lock': False
+            },
+        })
+        blocks.append(block)
+        offset += len(block)
+    header = loadmarker_const.UV_TRACK_HEADER_VERSION_5.copy()
+    header['num_points'] = len(points)
+    header['float_size'] = 8
+    header['columns'] = loadmarker_const.UV_TRACK_BINARY_COLUMNS
+    header['points'] = points
+    header_str = json.dumps(header).encode('utf-8')
+    header_str += b' ' * (-len(header_str) % 8)
+    prefix = struct.pack(
+        loadmarker_const.UV_TRACK_BINARY_PREFIX_FORMAT,
+        loadmarker_const.UV_TRACK_BINARY_MAGIC,
+        loadmarker_const.UV_TRACK_FORMAT_VERSION_5,
+        len(header_str))
+
+    fd, path = tempfile.mkstemp(suffix='.uv')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(prefix + header_str + b''.join(blocks))
+    return path
+
+
+class _FakeMayaObject(object):
+    """
+    Stand-in for a Maya module, class or object, recording all calls.
+
+    Any attribute may be accessed and called; the result of a call is
+    another fake object.
+    """
+
+    def __init__(self, calls, name):
+        self._calls = calls
+        self._name = name
+
+    def __getattr__(self, name):
+        return _FakeMayaObject(self._calls, name)
+
+    def __call__(self, *args, **kwargs):
+        self._calls.append(self._name)
+        if self._name == 'fullPathName':
+            return '|node{0}'.format(len(self._calls))
+        return _FakeMayaObject(self._calls, self._name)
+
+
 # @unittest.skip
 class TestLoadMarker(test_tools_utils.ToolsTestCase):
 
@@ -111,6 +195,524 @@ class TestLoadMarker(test_tools_utils.ToolsTestCase):
         assert isinstance(h, (int, long))
         return
 
+    def test_keyframe_data(self):
+        """
+        Set and query KeyframeData values, including closest frames.
+        """
+        keyframes = interface.KeyframeData()
+        keyframes.set_value(10, 4.0)
+        keyframes.set_value(1, 1.0)
+        keyframes.set_value(5, 2.0)
+        keyframes.set_value(5, 3.0)
+        times, values = keyframes.get_times_and_values()
+        self.assertEqual(times, [1, 5, 10])
+        self.assertEqual(values, [1.0, 3.0, 4.0])
+        self.assertEqual(keyframes.get_start_frame(), 1)
+        self.assertEqual(keyframes.get_end_frame(), 10)
+        self.assertEqual(keyframes.get_length(), 3)
+
+        # Frames without a key use the closest frame.
+        self.assertEqual(keyframes.get_value(7), 3.0)
+        self.assertEqual(keyframes.get_value(8), 4.0)
+        self.assertEqual(keyframes.get_value(-10), 1.0)
+        self.assertEqual(keyframes.get_value(100), 4.0)
+
+        # Round-trip through the raw data.
+        raw_data = keyframes.get_raw_data()
+        keyframes_copy = interface.KeyframeData(data=raw_data)
+        self.assertEqual(keyframes_copy.get_keyframe_values(),
+                         keyframes.get_keyframe_values())
+
+        static_keyframes = interface.KeyframeData()
+        for frame in range(1, 100):
+            static_keyframes.set_value(frame, 0.5)
+        static_keyframes.simplify_data()
+        self.assertEqual(static_keyframes.get_length(), 1)
+        self.assertEqual(static_keyframes.get_value(50), 0.5)
+        return
+
+    def test_float_array_is_equal(self):
+        """
+        Compare whole arrays of float values.
+        """
+        values = [1.0, 2.0, 0.0, 1000000.0]
+        other = [1.0 + 1e-12, 2.1, 1e-10, 1000000.0001]
+        self.assertEqual(interface.float_array_is_equal(values, other),
+                         [True, False, True, True])
+        self.assertEqual(
+            interface.float_array_is_equal(values, other, rel_tolerance=0.0),
+            [True, False, True, False])
+        self.assertEqual(interface.float_array_is_equal([], 1.0), [])
+        self.assertTrue(interface.float_array_all_equal([0.5] * 10, 0.5))
+        self.assertTrue(interface.float_array_all_equal(
+            array.array('d', [0.5] * 10), 0.5))
+
+        # The average matches the first value, but the data is not
+        # static.
+        self.assertFalse(
+            interface.float_array_all_equal([0.0, 1.0, -1.0], 0.0))
+        keyframes = interface.KeyframeData()
+        keyframes.set_times_and_values([1, 2, 3], [0.0, 1.0, -1.0])
+        keyframes.simplify_data()
+        self.assertEqual(keyframes.get_length(), 3)
+        return
+
+    def test_read_iter(self):
+        """
+        Read files lazily, and compare with reading the full file.
+        """
+        paths = [
+            (self.get_data_path('uvtrack', 'test_v1.uv'), {}),
+            (self.get_data_path('uvtrack', 'test_v3.uv'), {}),
+            (self.get_data_path('3de_v4', 'loadmarker_corners.txt'),
+             {'image_width': 1920.0, 'image_height': 1080.0}),
+        ]
+        for path, kwargs in paths:
+            _, mkr_data_list = marker_read.read(path, **kwargs)
+            _, mkr_data_iter = marker_read.read_iter(path, **kwargs)
+            self.assertFalse(isinstance(mkr_data_iter, list))
+            mkr_data_list_b = list(mkr_data_iter)
+            self.assertEqual(len(mkr_data_list), len(mkr_data_list_b))
+            for mkr_data_a, mkr_data_b in zip(mkr_data_list, mkr_data_list_b):
+                self.assertEqual(mkr_data_a.get_name(), mkr_data_b.get_name())
+                self.assertEqual(mkr_data_a.get_x().get_keyframe_values(),
+                                 mkr_data_b.get_x().get_keyframe_values())
+
+        # Create nodes while the file is being read.
+        cam = lib_utils.create_new_camera()
+        mkr_grp = lib_utils.create_new_marker_group(cam)
+        path = self.get_data_path('uvtrack', 'test_v1.uv')
+        _, mkr_data_iter = marker_read.read_iter(path)
+        mkr_list = marker_read.create_nodes(
+            mkr_data_iter, cam=cam, mkr_grp=mkr_grp)
+        self.assertGreater(len(mkr_list), 0)
+        return
+
+    def test_fill_occluded_frames(self):
+        """
+        Fill the enable and weight values of a Marker with gaps.
+        """
+        intervals = interface.get_frame_intervals([5, 1, 2, 3, 7, 8, 8, 10])
+        self.assertEqual(intervals, [(1, 3), (5, 5), (7, 8), (10, 10)])
+        self.assertEqual(interface.get_frame_intervals([]), [])
+
+        frames = [1, 2, 4, 5, 9]
+        mkr_data = interface.MarkerData()
+        mkr_data.weight.set_times_and_values(frames, [0.5, 0.6, 0.7, 0.8, 0.9])
+        mkr_data = interface.fill_occluded_frames(mkr_data, frames)
+        times, enable_values = mkr_data.enable.get_times_and_values()
+        _, weight_values = mkr_data.weight.get_times_and_values()
+        self.assertEqual(times, list(range(1, 10)))
+        self.assertEqual(
+            enable_values, [1.0, 1.0, 0.0, 1.0, 1.0, 0.0, 0.0, 0.0, 1.0])
+        self.assertEqual(
+            weight_values, [0.5, 0.6, 0.0, 0.7, 0.8, 0.0, 0.0, 0.0, 0.9])
+        self.assertEqual(mkr_data.get_enable_intervals(),
+                         [(1, 2), (4, 5), (9, 9)])
+
+        # A long track with many gaps; every frame between the first
+        # and last tracked frame is filled, and only tracked frames are
+        # enabled.
+        frames = [f for f in range(1, 5001) if (f // 37) % 4 != 1]
+        frame_set = set(frames)
+        weights = [1.0] * len(frames)
+        mkr_data = interface.MarkerData()
+        mkr_data.weight.set_times_and_values(frames, weights)
+        mkr_data = interface.fill_occluded_frames(mkr_data, frames)
+        times, enable_values = mkr_data.enable.get_times_and_values()
+        weight_times, weight_values = mkr_data.weight.get_times_and_values()
+        all_frames = list(range(frames[0], frames[-1] + 1))
+        self.assertEqual(times, all_frames)
+        self.assertEqual(weight_times, all_frames)
+        expected = [float(f in frame_set) for f in all_frames]
+        self.assertEqual(enable_values, expected)
+        self.assertEqual(weight_values, expected)
+        intervals = mkr_data.get_enable_intervals()
+        self.assertEqual(intervals, interface.get_frame_intervals(frames))
+        self.assertEqual(intervals[0], (1, 36))
+        self.assertEqual(intervals[-1], (4958, 5000))
+        return
+
+    def test_parse_cache(self):
+        """
+        Read a file twice, the second read should come from the cache.
+        """
+        parsecache.clear_parse_cache()
+        cache = parsecache.get_parse_cache()
+        path = self.get_data_path('uvtrack', 'test_v3.uv')
+        _, mkr_data_list_a = marker_read.read(path)
+        _, mkr_data_list_b = marker_read.read(path)
+        self.assertEqual(cache.get_miss_count(), 1)
+        self.assertEqual(cache.get_hit_count(), 1)
+        self.assertEqual(len(mkr_data_list_a), len(mkr_data_list_b))
+        self.assertIs(mkr_data_list_a[0], mkr_data_list_b[0])
+        self.assertGreater(cache.get_byte_size(), 0)
+
+        # Different parser arguments are cached separately.
+        marker_read.read(path, undistorted=False)
+        self.assertEqual(cache.get_miss_count(), 2)
+        self.assertEqual(len(cache), 2)
+
+        # Changing the file invalidates the cached data.
+        tmp_path = tempfile.mktemp(suffix='.uv')
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        marker_read.read(tmp_path)
+        os.utime(tmp_path, (0, 0))
+        marker_read.read(tmp_path)
+        self.assertEqual(cache.get_miss_count(), 4)
+        os.remove(tmp_path)
+
+        # Least recently used data is evicted over the byte budget.
+        cache.set_max_bytes(cache.get_byte_size() // len(cache))
+        self.assertLessEqual(cache.get_byte_size(), cache.get_max_bytes())
+        self.assertLess(len(cache), 4)
+        parsecache.clear_parse_cache()
+        cache.set_max_bytes(loadmarker_const.PARSE_CACHE_MAX_BYTES)
+        return
+
+    def test_read_many(self):
+        """
+        Read many files at once, then create the Markers.
+        """
+        parsecache.clear_parse_cache()
+        paths = [
+            self.get_data_path('uvtrack', 'test_v1.uv'),
+            self.get_data_path('uvtrack', 'test_v3.uv'),
+            self.get_data_path('uvtrack', 'test_v4.uv'),
+            self.get_data_path('uvtrack', 'does_not_exist.uv'),
+        ]
+        percents = []
+        results, errors = marker_read.read_many(
+            paths, max_workers=2, prog_fn=percents.append)
+        self.assertEqual([r[0] for r in results], paths[:3])
+        self.assertEqual(list(errors.keys()), paths[3:])
+        self.assertEqual(percents[-1], 100)
+        for file_path, _, mkr_data_list in results:
+            _, expected_list = marker_read.read(file_path, use_cache=False)
+            self.assertEqual(len(mkr_data_list), len(expected_list))
+
+        # The same files in-process, the results are cached.
+        cache = parsecache.get_parse_cache()
+        hit_count = cache.get_hit_count()
+        results_b, _ = marker_read.read_many(paths[:3], max_workers=1)
+        self.assertEqual(cache.get_hit_count(), hit_count + 3)
+        self.assertEqual(len(results_b), 3)
+
+        cam = lib_utils.create_new_camera()
+        mkr_grp = lib_utils.create_new_marker_group(cam)
+        for _, _, mkr_data_list in results:
+            mkr_list = marker_read.create_nodes(
+                mkr_data_list, cam=cam, mkr_grp=mkr_grp)
+            self.assertEqual(len(mkr_list), len(mkr_data_list))
+        parsecache.clear_parse_cache()
+        return
+
+    def test_index(self):
+        """
+        Index files, and parse only the selected points.
+        """
+        paths = [
+            (self.get_data_path('uvtrack', 'test_v1.uv'), {}),
+            (self.get_data_path('uvtrack', 'test_v3.uv'), {}),
+            (self.get_data_path('uvtrack', 'test_v4.uv'), {}),
+            (self.get_data_path('3de_v4', 'loadmarker_corners.txt'),
+             {'image_width': 1920.0, 'image_height': 1080.0}),
+        ]
+        for path, kwargs in paths:
+            file_info, point_info_list = readfile.index(path, **kwargs)
+            expected_file_info, mkr_data_list = readfile.read(path, **kwargs)
+            self.assertEqual(file_info, expected_file_info)
+
+            # Points without data are indexed, but not parsed.
+            point_info_list = [p for p in point_info_list if p.num_frames > 0]
+            self.assertEqual(len(point_info_list), len(mkr_data_list))
+            for point_info, mkr_data in zip(point_info_list, mkr_data_list):
+                x_keys = mkr_data.get_x()
+                self.assertEqual(point_info.name, mkr_data.get_name())
+                self.assertEqual(point_info.id, mkr_data.get_id())
+                self.assertEqual(point_info.start_frame,
+                                 x_keys.get_start_frame())
+                self.assertEqual(point_info.end_frame,
+                                 x_keys.get_end_frame())
+
+            # Parse only the last point.
+            point_name = point_info_list[-1].name
+            kwargs['points'] = [point_name]
+            _, selected_list = readfile.read(path, **kwargs)
+            self.assertEqual(len(selected_list), 1)
+            self.assertEqual(selected_list[0].get_name(), point_name)
+        return
+
+    def test_index_cache(self):
+        """
+        Index a file twice, the second index should come from the
+        cache, separately from the parsed data.
+        """
+        parsecache.clear_parse_cache()
+        cache = parsecache.get_parse_cache()
+        path = self.get_data_path('uvtrack', 'test_v3.uv')
+        file_info_a, point_info_list_a = marker_read.index(path)
+        file_info_b, point_info_list_b = marker_read.index(path)
+        self.assertEqual(cache.get_miss_count(), 1)
+        self.assertEqual(cache.get_hit_count(), 1)
+        self.assertEqual(file_info_a, file_info_b)
+        self.assertEqual(point_info_list_a, point_info_list_b)
+
+        # The file info functions use the cached index.
+        lib_fileutils.get_file_info(path)
+        lib_fileutils.get_file_info_strings(path)
+        self.assertEqual(cache.get_miss_count(), 1)
+        self.assertEqual(cache.get_hit_count(), 3)
+
+        # Parsing the file is not confused with the index.
+        _, mkr_data_list = marker_read.read(path)
+        self.assertEqual(cache.get_miss_count(), 2)
+        self.assertEqual(len(cache), 2)
+        self.assertIsInstance(mkr_data_list[0], interface.MarkerData)
+        parsecache.clear_parse_cache()
+        return
+
+    def test_uvtrack_format_version(self):
+        """
+        Detect the .uv format version of each test file.
+        """
+        values = (
+            ('test_v1.uv', loadmarker_const.UV_TRACK_FORMAT_VERSION_1),
+            ('test_v3.uv', loadmarker_const.UV_TRACK_FORMAT_VERSION_3),
+            ('test_v4.uv', loadmarker_const.UV_TRACK_FORMAT_VERSION_4),
+        )
+        for file_name, expected_version in values:
+            path = self.get_data_path('uvtrack', file_name)
+            version = uvtrack.determine_format_version(path)
+            self.assertEqual(version, expected_version)
+        return
+
+    def test_uvtrack_format_version_nested_key(self):
+        """
+        Only the top-level 'version' key is the format version.
+        """
+        text = '{"a": {"version": 3, "b": "}\\"version\\": 2"}, "version": 4}'
+        self.assertEqual(uvtrack._sniff_top_level_version(text), 4)
+        self.assertEqual(uvtrack._sniff_top_level_version('{"a": 1}'), None)
+
+        # The nested key is before the top-level key, in a file that
+        # is too large to sniff the top-level key.
+        data = {
+            'camera': {'version': 3},
+            'points': [{'name': 'point' * 1000}],
+            'version': loadmarker_const.UV_TRACK_FORMAT_VERSION_4,
+        }
+        text = json.dumps(data, sort_keys=True)
+        self.assertGreater(len(text), uvtrack.SNIFF_SIZE)
+        fd, path = tempfile.mkstemp(suffix='.uv')
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        try:
+            version = uvtrack.determine_format_version(path)
+            self.assertEqual(version, loadmarker_const.UV_TRACK_FORMAT_VERSION_4)
+        finally:
+            os.remove(path)
+        return
+
+    def test_loadmarker_uvtrack_binary_format(self):
+        """
+        Write and read a binary (version 5) '.uv' file.
+        """
+        frames = [1001.0, 1002.0, 1004.0]
+        point_columns = []
+        for i, name in enumerate(['pointA', 'pointB']):
+            columns = [
+                frames,
+                [0.1 * i] * 3,
+                [0.2 * i] * 3,
+                [0.3 * i] * 3,
+                [0.4 * i] * 3,
+                [1.0] * 3,
+            ]
+            point_columns.append((name, i, columns))
+        path = _write_uvtrack_v5_file(point_columns)
+        try:
+            version = uvtrack.determine_format_version(path)
+            self.assertEqual(version, loadmarker_const.UV_TRACK_FORMAT_VERSION_5)
+
+            file_info, mkr_data_list = marker_read.read(path)
+            self.assertTrue(file_info.bundle_positions)
+            self.assertEqual(len(mkr_data_list), 2)
+            mkr_data = mkr_data_list[1]
+            self.assertEqual(mkr_data.get_name(), 'pointB')
+            self.assertEqual(mkr_data.get_id(), 1)
+            self.assertEqual(mkr_data.get_bundle_z(), 3.0)
+            self.assertEqual(mkr_data.get_x().get_times(), [1001, 1002, 1004])
+            self.assertEqual(mkr_data.get_x().get_value(1001), 0.1)
+            self.assertEqual(mkr_data.get_enable().get_value(1003), 0.0)
+
+            _, mkr_data_list = marker_read.read(path, undistorted=False)
+            self.assertEqual(mkr_data_list[1].get_x().get_value(1001), 0.3)
+        finally:
+            os.remove(path)
+        return
+
+    def test_loadmarker_uvtrack_binary_format_no_points(self):
+        """
+        Write and read a binary (version 5) '.uv' file without points.
+        """
+        path = _write_uvtrack_v5_file([])
+        try:
+            version = uvtrack.determine_format_version(path)
+            self.assertEqual(version, loadmarker_const.UV_TRACK_FORMAT_VERSION_5)
+
+            file_info, mkr_data_list = uvtrack.parse_v5(path)
+            self.assertEqual(mkr_data_list, [])
+            file_info, point_info_list = uvtrack.index_v5(path)
+            self.assertEqual(point_info_list, [])
+        finally:
+            os.remove(path)
+
+        # An empty file is not a valid binary file.
+        fd, path = tempfile.mkstemp(suffix='.uv')
+        os.close(fd)
+        try:
+            with self.assertRaises(interface.ParserError):
+                uvtrack.parse_v5(path)
+        finally:
+            os.remove(path)
+        return
+
+    def test_bulk_create_round_trips(self):
+        """
+        Creating Markers in bulk must use a fixed number of modifier
+        'doIt' calls, regardless of the number of Markers.
+        """
+        def count_calls(num):
+            calls = []
+            node_data_list = []
+            for i in range(num):
+                name = 'point{0}'.format(i)
+                node_data = bulkcreate.create_marker_node_data(
+                    name + '_MKR',
+                    bundle_name=name + '_BND',
+                    point_name=name,
+                    point_id=i,
+                    anim_curves={
+                        'translateX': ([1, 2], [0.0, 1.0], 1, 1),
+                        'translateY': ([1, 2], [0.0, 1.0], 1, 1),
+                    },
+                    static_values={'enable': 1, 'weight': 1.0},
+                    bundle_translate=(1.0, 2.0, 3.0))
+                node_data_list.append(node_data)
+
+            open_maya = bulkcreate.OpenMaya
+            open_maya_anim = bulkcreate.OpenMayaAnim
+            anim_utils = bulkcreate.anim_utils
+            bulkcreate.OpenMaya = _FakeMayaObject(calls, 'OpenMaya')
+            bulkcreate.OpenMayaAnim = _FakeMayaObject(calls, 'OpenMayaAnim')
+            bulkcreate.anim_utils = _FakeMayaObject(calls, 'anim_utils')
+            try:
+                node_list = bulkcreate.create_marker_nodes(
+                    '|markerGroup', node_data_list, with_bundles=True)
+            finally:
+                bulkcreate.OpenMaya = open_maya
+                bulkcreate.OpenMayaAnim = open_maya_anim
+                bulkcreate.anim_utils = anim_utils
+            self.assertEqual(len(node_list), num)
+            return calls.count('doIt'), calls.count('MSelectionList')
+
+        self.assertEqual(count_calls(1), (2, 1))
+        self.assertEqual(count_calls(100), (2, 1))
+        self.assertEqual(count_calls(0), (0, 0))
+        return
+
+    def test_create_nodes_batch(self):
+        """
+        Markers created in a batch must match the Markers created one
+        at a time.
+        """
+        path = self.get_data_path('uvtrack', 'test_v3_with_3d_point.uv')
+        _, mkr_data_list = marker_read.read(path)
+        cam = lib_utils.create_new_camera()
+        mkr_grp = lib_utils.create_new_marker_group(cam)
+
+        mkr_list = marker_read.create_nodes(
+            mkr_data_list, cam=cam, mkr_grp=mkr_grp, batch=False)
+        expected = []
+        for mkr in mkr_list:
+            node = mkr.get_node()
+            bnd_node = mkr.get_bundle().get_node()
+            expected.append((
+                maya.cmds.getAttr(node + '.markerName'),
+                maya.cmds.getAttr(node + '.markerId'),
+                maya.cmds.keyframe(node + '.translateX', query=True,
+                                   valueChange=True),
+                maya.cmds.getAttr(bnd_node + '.translate'),
+            ))
+            maya.cmds.delete(node, bnd_node)
+
+        mkr_list = marker_read.create_nodes(
+            mkr_data_list, cam=cam, mkr_grp=mkr_grp, batch=True)
+        self.assertEqual(len(mkr_list), len(expected))
+        for mkr, values in zip(mkr_list, expected):
+            node = mkr.get_node()
+            bnd_node = mkr.get_bundle().get_node()
+            self.assertEqual(
+                maya.cmds.getAttr(node + '.markerName'), values[0])
+            self.assertEqual(maya.cmds.getAttr(node + '.markerId'), values[1])
+            self.assertEqual(
+                maya.cmds.keyframe(node + '.translateX', query=True,
+                                   valueChange=True),
+                values[2])
+            self.assertEqual(
+                maya.cmds.getAttr(bnd_node + '.translate'), values[3])
+            self.assertTrue(maya.cmds.getAttr(node + '.translateX', lock=True))
+            self.assertEqual(maya.cmds.getAttr(node + '.tz'), -1.0)
+        self.assertEqual(
+            sorted(maya.cmds.ls(selection=True, long=True)),
+            sorted([mkr.get_node() for mkr in mkr_list]))
+        return
+
+    def test_plan_marker_update(self):
+        path = self.get_data_path('uvtrack', 'test_v1.uv')
+        # The MarkerData is modified, so must not be shared with the
+        # cache.
+        _, mkr_data_list = marker_read.read(path, use_cache=False)
+        self.assertGreater(len(mkr_data_list), 1)
+        cam = lib_utils.create_new_camera()
+        mkr_grp = lib_utils.create_new_marker_group(cam)
+        mkr_list = marker_read.create_nodes(
+            mkr_data_list, cam=cam, mkr_grp=mkr_grp)
+
+        plan = marker_read.plan_marker_update(mkr_list, mkr_data_list)
+        self.assertEqual(len(plan.matched), len(mkr_list))
+        self.assertEqual(plan.removed, [])
+        self.assertEqual(plan.added, [])
+        for mkr, mkr_data in plan.matched:
+            name = maya.cmds.getAttr(mkr.get_node() + '.markerName')
+            self.assertEqual(name, mkr_data.get_name())
+
+        new_mkr_data = interface.MarkerData()
+        new_mkr_data.set_name('newPoint')
+        plan = marker_read.plan_marker_update(
+            mkr_list, mkr_data_list[1:] + [new_mkr_data])
+        self.assertEqual(len(plan.matched), len(mkr_list) - 1)
+        self.assertEqual(plan.removed, [mkr_list[0]])
+        self.assertEqual(plan.added, [new_mkr_data])
+
+        # Nothing is changed when updating with the same data.
+        changed = marker_read.update_nodes(mkr_list, mkr_data_list)
+        self.assertEqual(changed, [])
+
+        # Only the Marker with different data is changed.
+        mkr_data = mkr_data_list[-1]
+        x_data = mkr_data.get_x()
+        times, values = x_data.get_times_and_values()
+        values = [v + 0.1 for v in values]
+        x_data.set_times_and_values(times, values)
+        changed = marker_read.update_nodes(mkr_list, mkr_data_list)
+        self.assertEqual(changed, [mkr_list[-1]])
+        return
+
     def test_update_nodes(self):
         file_names = [
             'test_v1.uv',
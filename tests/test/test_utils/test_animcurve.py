@@ -0,0 +1,103 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for animcurve utils module.
+"""
+
+import array
+import unittest
+
+import maya.cmds
+
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.animcurve as anim_utils
+
+
+# @unittest.skip
+class TestAnimCurve(test_utils.UtilsTestCase):
+
+    def test_create_arrays(self):
+        values = [0.0, 1.5, -2.0, 3]
+        for buf in [values, tuple(values), array.array('d', values)]:
+            double_array = anim_utils.create_double_array_apione(buf)
+            self.assertEqual(double_array.length(), 4)
+            self.assertEqual([double_array[i] for i in range(4)],
+                             [0.0, 1.5, -2.0, 3.0])
+
+            time_array = anim_utils.create_time_array_apione(buf)
+            self.assertEqual(time_array.length(), 4)
+            self.assertEqual([time_array[i].value() for i in range(4)],
+                             [0.0, 1.5, -2.0, 3.0])
+
+        double_array = anim_utils.create_double_array_apione([])
+        self.assertEqual(double_array.length(), 0)
+        return
+
+    def test_create_anim_curve_node(self):
+        node = maya.cmds.createNode('transform')
+        times = array.array('l', [1, 2, 3])
+        values = array.array('d', [0.5, 1.0, 1.5])
+        anim_utils.create_anim_curve_node_apione(
+            times, values, node_attr=node + '.translateX')
+        keys = maya.cmds.keyframe(node + '.translateX', query=True,
+                                  valueChange=True)
+        self.assertEqual(keys, [0.5, 1.0, 1.5])
+
+        # Keys are replaced on the existing animCurve.
+        anim_utils.create_anim_curve_node_apione(
+            [1, 2], [2.0, 3.0], node_attr=node + '.translateX')
+        keys = maya.cmds.keyframe(node + '.translateX', query=True,
+                                  valueChange=True)
+        self.assertEqual(keys, [2.0, 3.0])
+
+        with self.assertRaises(ValueError):
+            anim_utils.create_anim_curve_node_apione([], [])
+        with self.assertRaises(ValueError):
+            anim_utils.create_anim_curve_node_apione([1, 2], [1.0])
+        return
+
+    def test_create_anim_curve_nodes(self):
+        node = maya.cmds.createNode('transform')
+        times = list(range(1, 101))
+        values_list = [
+            [float(t) for t in times],
+            [float(t) * 2.0 for t in times],
+            [float(t) * 3.0 for t in times],
+        ]
+        plugs = [node + '.translateX',
+                 node + '.translateY',
+                 node + '.translateZ']
+        animfn_list = anim_utils.create_anim_curve_nodes_apione(
+            [times, times, times],
+            values_list,
+            node_attr_list=plugs)
+        self.assertEqual(len(animfn_list), 3)
+        for plug, values in zip(plugs, values_list):
+            keys = maya.cmds.keyframe(plug, query=True, valueChange=True)
+            self.assertEqual(keys, values)
+            key_times = maya.cmds.keyframe(plug, query=True, timeChange=True)
+            self.assertEqual(key_times, [float(t) for t in times])
+
+        with self.assertRaises(ValueError):
+            anim_utils.create_anim_curve_nodes_apione(
+                [times], values_list, node_attr_list=plugs)
+        return
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -0,0 +1,91 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for debuglog utilities module.
+"""
+
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.debuglog as debuglog
+
+
+DEBUG_LOG_TEXT = """
+iteration normal: 1
+i=0 v=1.0
+i=1 v=2.0
+error i=0 x=0.5 y=0.5
+error dist i=0 v=0.7
+emin=0.7 emax=0.7 eavg=0.7
+
+iteration jacobian: 1
+i=0 v=1.1
+i=1 v=2.0
+error dist i=0 v=0.6
+emin=0.6 emax=0.6 eavg=0.6
+
+iteration normal: 2
+i=0 v=1.5
+i=1 v=1.75
+error dist i=0 v=0.25
+emin=0.25 emax=0.25 eavg=0.25
+"""
+
+
+# @unittest.skip
+class TestDebugLog(test_utils.UtilsTestCase):
+
+    def test_iter_records(self):
+        lines = DEBUG_LOG_TEXT.splitlines(True)
+        records = list(debuglog.iter_records(lines))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0].type, debuglog.ITERATION_TYPE_NORMAL)
+        self.assertEqual(records[0].number, 1)
+        self.assertEqual(records[0].parameters, [1.0, 2.0])
+        self.assertEqual(records[0].errors, [0.7])
+        self.assertEqual(records[1].type, debuglog.ITERATION_TYPE_JACOBIAN)
+        self.assertEqual(records[2].error_min, 0.25)
+        self.assertEqual(records[2].error_max, 0.25)
+        self.assertEqual(records[2].error_avg, 0.25)
+
+        # Records are yielded before the whole log is read.
+        gen = debuglog.iter_records(iter(lines))
+        self.assertEqual(next(gen).number, 1)
+
+        records = list(debuglog.iter_records(
+            lines, parameters=False, errors=False))
+        self.assertEqual(records[0].parameters, [])
+        self.assertEqual(records[0].errors, [])
+        self.assertEqual(records[0].error_avg, 0.7)
+
+        self.assertEqual(list(debuglog.iter_records([])), [])
+
+    def test_summarise_records(self):
+        lines = DEBUG_LOG_TEXT.splitlines(True)
+        summary = debuglog.summarise_records(debuglog.iter_records(lines))
+        self.assertEqual(summary.normal_count, 2)
+        self.assertEqual(summary.jacobian_count, 1)
+        self.assertEqual(summary.error_curve,
+                         [(1, 0.7, 0.7, 0.7), (2, 0.25, 0.25, 0.25)])
+        self.assertEqual(summary.parameter_deltas, [(2, 0.5)])
+        self.assertEqual(summary.initial_parameters, [1.0, 2.0])
+        self.assertEqual(summary.final_parameters, [1.5, 1.75])
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -0,0 +1,90 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for keyreduce utils module.
+"""
+
+import math
+import random
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.keyreduce as keyreduce
+
+
+def _linear_interpolate(times, values, frame):
+    for i in range(1, len(times)):
+        if times[i] >= frame:
+            t0 = times[i - 1]
+            t1 = times[i]
+            v0 = values[i - 1]
+            v1 = values[i]
+            return v0 + ((v1 - v0) * (frame - t0) / float(t1 - t0))
+    return values[-1]
+
+
+# @unittest.skip
+class TestKeyReduce(test_utils.UtilsTestCase):
+    """
+    Test keyreduce module.
+    """
+
+    def test_reduce_keys_line(self):
+        """
+        A straight line only needs the first and last keyframes.
+        """
+        times = [1, 2, 3, 4, 5]
+        values = [0.0, 1.0, 2.0, 3.0, 3.0]
+        new_times, new_values = keyreduce.reduce_keys(times, values, 0.001)
+        self.assertEqual(new_times, [1, 4, 5])
+        self.assertEqual(new_values, [0.0, 3.0, 3.0])
+
+        # Two or fewer keyframes are never changed.
+        self.assertEqual(keyreduce.reduce_keys([1], [2.0], 1.0), ([1], [2.0]))
+        self.assertEqual(keyreduce.reduce_keys([], [], 1.0), ([], []))
+        return
+
+    def test_reduce_keys_tolerance(self):
+        """
+        Every original value is within tolerance of the reduced curve.
+        """
+        random.seed(42)
+        times = list(range(1, 1001))
+        values = [math.sin(t * 0.01) + random.gauss(0.0, 0.0001)
+                  for t in times]
+        for tolerance in [0.0, 0.0005, 0.005]:
+            new_times, new_values = keyreduce.reduce_keys(
+                times, values, tolerance)
+            self.assertEqual(new_times[0], times[0])
+            self.assertEqual(new_times[-1], times[-1])
+            self.assertLessEqual(len(new_times), len(times))
+            for t, v in zip(times, values):
+                interp_v = _linear_interpolate(new_times, new_values, t)
+                self.assertLessEqual(abs(v - interp_v), tolerance + 1e-12)
+
+        # Both code paths give the same result.
+        indices_a = keyreduce._reduce_key_indices_python(times, values, 0.001)
+        if keyreduce.np is not None:
+            indices_b = keyreduce._reduce_key_indices_numpy(
+                times, values, 0.001)
+            self.assertEqual(indices_a, indices_b)
+        return
+
+
+if __name__ == '__main__':
+    prog = unittest.main()